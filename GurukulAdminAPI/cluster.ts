@@ -0,0 +1,227 @@
+// cluster.ts - Runs the API as a cluster of worker processes (npm run start:cluster)
+// One Express process serializes every response and hashes every password on a single core.
+// The primary forks WORKERS copies of index.ts (default: one per CPU) that share PORT, respawns
+// workers that die, and restarts them one at a time on SIGHUP (e.g. after a deploy) so the API
+// stays up. SIGTERM / SIGINT stop every worker gracefully and then the primary.
+//
+// Connection budget: every worker opens its own pools and its own change-feed LISTEN connection.
+// With DB_TOTAL_CONNECTIONS set, the primary sizes each worker's DB_POOL_MAX (and
+// DB_READ_POOL_MAX when a separate read pool uses the same database) so that all workers together
+// stay within it. DB_READ_TOTAL_CONNECTIONS (default DB_TOTAL_CONNECTIONS) does the same for the
+// read pool when it points at a replica.
+//
+// GET /metrics is answered by whichever worker gets the request; it asks the primary, which
+// gathers every worker's metrics over IPC (utils/workerMessages.ts, services/metricsService.ts).
+import dotenv from 'dotenv';
+dotenv.config();
+
+import cluster, { Worker } from 'cluster';
+import os from 'os';
+import path from 'path';
+import { isWorkerMessage, METRICS_COLLECT, METRICS_REPORT, METRICS_REQUEST, METRICS_RESULT, WORKER_SHUTDOWN } from './utils/workerMessages';
+
+const envInt = (name: string, fallback: number): number => parseInt(process.env[name] || String(fallback), 10);
+
+const WORKERS = Math.max(1, envInt('WORKERS', typeof os.availableParallelism === 'function' ? os.availableParallelism() : os.cpus().length));
+const SHUTDOWN_TIMEOUT_MS = envInt('WORKER_SHUTDOWN_TIMEOUT_MS', 30000); // then the worker is killed
+const RESPAWN_DELAY_MS = envInt('WORKER_RESPAWN_DELAY_MS', 1000); // for workers that die right after starting
+const METRICS_TIMEOUT_MS = envInt('METRICS_COLLECT_TIMEOUT_MS', 1000);
+
+// Same test as utils/db.ts: any DB_READ_* target means the read pool connects to a replica
+const READ_REPLICA = Boolean(process.env.DB_READ_URL || process.env.DB_READ_HOST || process.env.DB_READ_PORT || process.env.DB_READ_NAME);
+
+/**
+ * Pool sizes for each worker, as environment overrides (empty when no budget is configured).
+ * Each worker needs one connection for its change-feed LISTEN on top of its primary pool; when the
+ * read pool also connects to the primary database, the rest is split in the ratio of
+ * DB_POOL_MAX : DB_READ_POOL_MAX.
+ * @param workers Number of workers sharing the budget.
+ */
+export const workerPoolSizes = (workers: number): { [name: string]: string } => {
+  const sizes: { [name: string]: string } = {};
+  const total = envInt('DB_TOTAL_CONNECTIONS', 0);
+  if (total > 0) {
+    const perWorker = Math.floor(total / workers) - 1; // minus the LISTEN connection
+    const readMax = envInt('DB_READ_POOL_MAX', READ_REPLICA ? 10 : 0); // same default as utils/db.ts
+    const readShared = !READ_REPLICA && readMax > 0;
+    if (perWorker < (readShared ? 2 : 1)) {
+      throw new Error(`DB_TOTAL_CONNECTIONS=${total} is too small for ${workers} workers`);
+    }
+    if (readShared) {
+      const writeMax = envInt('DB_POOL_MAX', 10);
+      const primary = Math.min(perWorker - 1, Math.max(1, Math.round((perWorker * writeMax) / (writeMax + readMax))));
+      sizes.DB_POOL_MAX = String(primary);
+      sizes.DB_READ_POOL_MAX = String(perWorker - primary);
+    } else {
+      sizes.DB_POOL_MAX = String(perWorker);
+    }
+  }
+  const readTotal = envInt('DB_READ_TOTAL_CONNECTIONS', total);
+  if (readTotal > 0 && READ_REPLICA) {
+    sizes.DB_READ_POOL_MAX = String(Math.max(1, Math.floor(readTotal / workers)));
+  }
+  return sizes;
+};
+
+let poolSizes: { [name: string]: string } = {};
+let shuttingDown = false;
+let restarting = false;
+const startedAt = new Map<number, number>(); // worker id -> fork time
+const stopping = new Set<number>(); // ids of workers being stopped on purpose (not respawned)
+
+const forkWorker = (): Worker => {
+  const worker = cluster.fork(poolSizes);
+  startedAt.set(worker.id, Date.now());
+  worker.on('message', (message) => onWorkerMessage(worker, message));
+  return worker;
+};
+
+const liveWorkers = (): Worker[] => Object.values(cluster.workers || {}).filter((w): w is Worker => !!w && w.isConnected());
+
+/** Resolves once the worker accepts connections; rejects if it exits first. */
+const whenListening = (worker: Worker): Promise<void> =>
+  new Promise((resolve, reject) => {
+    worker.once('listening', () => resolve());
+    worker.once('exit', (code) => reject(new Error(`worker ${worker.process.pid} exited with code ${code} during startup`)));
+  });
+
+/**
+ * Stops a worker gracefully: it ends its change streams, stops accepting connections, finishes its
+ * requests and jobs, closes its pools and then disconnects itself (see index.ts). This goes through
+ * a WORKER_SHUTDOWN message, not worker.disconnect(): a worker only handles 'disconnect' once its
+ * server has closed, which open change streams never let happen. Killed if it is still running
+ * after WORKER_SHUTDOWN_TIMEOUT_MS.
+ */
+const stopWorker = (worker: Worker): Promise<void> =>
+  new Promise((resolve) => {
+    if (worker.isDead()) {
+      resolve();
+      return;
+    }
+    stopping.add(worker.id);
+    const timer = setTimeout(() => {
+      console.warn(`Worker ${worker.process.pid} did not stop within ${SHUTDOWN_TIMEOUT_MS} ms, killing it`);
+      worker.process.kill('SIGKILL');
+    }, SHUTDOWN_TIMEOUT_MS);
+    worker.once('exit', () => {
+      clearTimeout(timer);
+      resolve();
+    });
+    if (worker.isConnected()) {
+      worker.send({ type: WORKER_SHUTDOWN, id: 0 });
+    } else {
+      worker.process.kill('SIGTERM');
+    }
+  });
+
+/** Replaces the workers one at a time, starting each replacement before stopping the old one. */
+const rollingRestart = async (): Promise<void> => {
+  if (restarting || shuttingDown) {
+    return;
+  }
+  restarting = true;
+  console.log(`Rolling restart of ${liveWorkers().length} worker(s)`);
+  try {
+    for (const old of liveWorkers()) {
+      const replacement = forkWorker();
+      await whenListening(replacement);
+      await stopWorker(old);
+      console.log(`Worker ${old.process.pid} replaced by ${replacement.process.pid}`);
+    }
+    console.log('Rolling restart done');
+  } catch (error: any) {
+    console.error('Error in rollingRestart:', error.message);
+  } finally {
+    restarting = false;
+  }
+};
+
+const shutdown = async (signal: string): Promise<void> => {
+  if (shuttingDown) {
+    return;
+  }
+  shuttingDown = true;
+  console.log(`${signal} received, stopping ${liveWorkers().length} worker(s)`);
+  await Promise.all(Object.values(cluster.workers || {}).map((w) => (w ? stopWorker(w) : undefined)));
+  process.exit(0);
+};
+
+// --- Metrics aggregation over IPC ---
+
+let nextCollectId = 1;
+const collecting = new Map<number, { reports: any[]; expected: number; done: () => void }>();
+
+const onWorkerMessage = (worker: Worker, message: any): void => {
+  if (!isWorkerMessage(message)) {
+    return;
+  }
+  if (message.type === METRICS_REQUEST) {
+    collectFromWorkers().then((metrics) => {
+      if (worker.isConnected()) {
+        worker.send({ type: METRICS_RESULT, id: message.id, metrics });
+      }
+    });
+  } else if (message.type === METRICS_REPORT) {
+    const round = collecting.get(message.id);
+    if (round) {
+      round.reports.push(message.metrics);
+      if (round.reports.length >= round.expected) {
+        round.done();
+      }
+    }
+  }
+};
+
+/** Asks every live worker for its metrics; resolves with what arrived within METRICS_COLLECT_TIMEOUT_MS. */
+const collectFromWorkers = (): Promise<any[]> =>
+  new Promise((resolve) => {
+    const id = nextCollectId++;
+    const workers = liveWorkers();
+    const reports: any[] = [];
+    const done = () => {
+      clearTimeout(timer);
+      collecting.delete(id);
+      resolve(reports);
+    };
+    const timer = setTimeout(done, METRICS_TIMEOUT_MS);
+    collecting.set(id, { reports, expected: workers.length, done });
+    workers.forEach((w) => w.send({ type: METRICS_COLLECT, id }));
+  });
+
+// --- Start ---
+
+if (cluster.isPrimary) {
+  try {
+    poolSizes = workerPoolSizes(WORKERS);
+  } catch (error: any) {
+    console.error('Error in cluster startup:', error.message);
+    process.exit(1);
+  }
+  cluster.setupPrimary({ exec: path.join(__dirname, 'index.js') });
+
+  cluster.on('exit', (worker, code, signal) => {
+    const lived = Date.now() - (startedAt.get(worker.id) ?? 0);
+    startedAt.delete(worker.id);
+    if (stopping.delete(worker.id) || shuttingDown || worker.exitedAfterDisconnect) {
+      return;
+    }
+    console.error(`Worker ${worker.process.pid} died (${signal || `code ${code}`}), starting a new one`);
+    setTimeout(() => {
+      if (!shuttingDown) {
+        forkWorker();
+      }
+    }, lived < 5000 ? RESPAWN_DELAY_MS : 0);
+  });
+
+  process.on('SIGHUP', () => { rollingRestart(); });
+  process.on('SIGTERM', () => { shutdown('SIGTERM'); });
+  process.on('SIGINT', () => { shutdown('SIGINT'); });
+
+  const budget = Object.keys(poolSizes).length > 0
+    ? Object.entries(poolSizes).map(([name, value]) => `${name}=${value}`).join(', ')
+    : 'pool sizes from DB_POOL_MAX / DB_READ_POOL_MAX (DB_TOTAL_CONNECTIONS not set)';
+  console.log(`Cluster primary ${process.pid} starting ${WORKERS} worker(s); per worker: ${budget}`);
+  for (let i = 0; i < WORKERS; i++) {
+    forkWorker();
+  }
+}
@@ -0,0 +1,32 @@
+// controllers/batchController.ts - Runs multi-step admin workflows as one transactional batch
+
+import { RequestHandler } from 'express';
+import { BatchOperationError, runBatch, validateBatch } from '../services/batchService';
+
+// --- Batch Controller Functions ---
+
+/**
+ * Run an ordered list of operations in one transaction.
+ * @param req Request object (expects operations: [{ op, ref?, args }] in body; args may use { "$ref": "<ref>.<field>" })
+ * @param res Response object
+ */
+export const executeBatch: RequestHandler = async (req, res) => {
+  const { operations } = req.body;
+  const invalid = validateBatch(operations);
+  if (invalid) {
+    res.status(400).json({ message: invalid });
+    return;
+  }
+
+  try {
+    const results = await runBatch(operations);
+    res.status(201).json({ results });
+  } catch (error: any) {
+    if (error instanceof BatchOperationError) {
+      res.status(error.status).json({ message: error.message, index: error.index, op: error.op });
+      return;
+    }
+    console.error('Error in executeBatch:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
@@ -0,0 +1,108 @@
+// controllers/changeFeedController.ts - Streams database change events to the admin UI (Server-Sent Events)
+// and serves incremental collection deltas from the change log.
+
+import { RequestHandler } from 'express';
+import {
+  startChangeFeed,
+  isChangeFeedLive,
+  subscribeToChanges,
+  findChangesSince,
+  findLatestChangeSeq,
+  currentStreamPosition,
+  streamEventId,
+  ChangeEvent,
+} from '../services/changeFeedService';
+import { findCollectionDelta, DELTA_RESOURCES } from '../services/deltaSyncService';
+
+const HEARTBEAT_MS = 25000; // keeps proxies from closing an idle stream
+
+// --- Change Feed Controller Functions ---
+
+/**
+ * Stream change events as text/event-stream.
+ * Each event is `event: change` with a JSON ChangeEvent; `event: reset` means events
+ * may have been lost and the client should drop all cached data. The stream opens with
+ * `event: position` ({seq}: the newest change_log seq), the client's freshness hint until
+ * the next change.
+ * @param req Request object (honours the 'Last-Event-ID' header to resume)
+ * @param res Response object
+ */
+export const streamChanges: RequestHandler = async (req, res) => {
+  await startChangeFeed();
+  if (!isChangeFeedLive()) {
+    res.status(503).json({ message: 'Change feed is not available' });
+    return;
+  }
+
+  res.status(200);
+  res.setHeader('Content-Type', 'text/event-stream');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('Connection', 'keep-alive');
+  res.setHeader('X-Accel-Buffering', 'no');
+  res.flushHeaders();
+  res.write('retry: 3000\n\n');
+
+  let seq: number | null = null;
+  try {
+    seq = await findLatestChangeSeq();
+  } catch (error) {
+    // Without a seq the client keeps reading from the primary until the next change
+  }
+  // Events published from here on reach this client live or by replay below
+  res.write(`id: ${currentStreamPosition()}\nevent: position\ndata: ${JSON.stringify({ seq })}\n\n`);
+
+  const sendChange = (event: ChangeEvent) => {
+    res.write(`id: ${streamEventId(event)}\nevent: change\ndata: ${JSON.stringify(event)}\n\n`);
+  };
+  const sendReset = () => {
+    res.write('event: reset\ndata: {}\n\n');
+  };
+
+  // Resume: replay what the client missed, or tell it to start over.
+  const lastEventId = req.get('Last-Event-ID');
+  if (lastEventId) {
+    const missed = findChangesSince(lastEventId);
+    if (missed === null) {
+      sendReset();
+    } else {
+      missed.forEach(sendChange);
+    }
+  }
+
+  const unsubscribe = subscribeToChanges(sendChange, sendReset, () => res.end());
+  const heartbeat = setInterval(() => res.write(': ping\n\n'), HEARTBEAT_MS);
+
+  req.on('close', () => {
+    clearInterval(heartbeat);
+    unsubscribe();
+  });
+};
+
+/**
+ * Get the changes to a collection since a cursor (delta sync).
+ * Responds with { table, seq, reset, upserts, deletes }; pass `seq` back as `since` next time.
+ * @param req Request object (expects 'table' query param: users, topics or milestones; optional 'since')
+ * @param res Response object
+ */
+export const getChanges: RequestHandler = async (req, res) => {
+  const table = req.query.table as string | undefined;
+  const sinceParam = req.query.since as string | undefined;
+  const since = sinceParam === undefined || sinceParam === '' ? undefined : Number(sinceParam);
+
+  if (!table || !DELTA_RESOURCES[table]) {
+    res.status(400).json({ message: `Query param 'table' must be one of: ${Object.keys(DELTA_RESOURCES).join(', ')}` });
+    return;
+  }
+  if (since !== undefined && (!Number.isInteger(since) || since < 0)) {
+    res.status(400).json({ message: "Query param 'since' must be a non-negative integer" });
+    return;
+  }
+
+  try {
+    const delta = await findCollectionDelta(table, since);
+    res.status(200).json(delta);
+  } catch (error: any) {
+    console.error(`Error in getChanges (table: ${table}, since: ${sinceParam}):`, error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
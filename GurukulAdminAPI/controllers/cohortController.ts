@@ -0,0 +1,100 @@
+// controllers/cohortController.ts - Bulk status transitions for student cohorts (sgurukul / smilestones)
+
+import { Request, RequestHandler } from 'express';
+import { COHORT_KINDS, COHORT_STATUSES, CohortFilter, findCohortSummary, transitionCohort } from '../services/cohortService';
+
+/**
+ * Reads gid, mid and level from an object (query or body).
+ * @returns The filter, or an error message.
+ */
+const parseFilter = (source: any): CohortFilter | string => {
+  const filter: CohortFilter = {};
+  for (const key of ['gid', 'mid'] as const) {
+    const raw = source[key];
+    if (raw === undefined || raw === null || raw === '') {
+      continue;
+    }
+    const value = Number(raw);
+    if (!Number.isInteger(value) || value <= 0) {
+      return `'${key}' must be a positive integer`;
+    }
+    filter[key] = value;
+  }
+  if (source.level !== undefined && source.level !== null && source.level !== '') {
+    if (typeof source.level !== 'string') {
+      return "'level' must be a string";
+    }
+    filter.level = source.level;
+  }
+  return filter;
+};
+
+const parseKind = (req: Request): string | null => (COHORT_KINDS[req.params.kind] ? req.params.kind : null);
+
+// --- Cohort Controller Functions ---
+
+/**
+ * Count students per status for a cohort filter.
+ * @param req Request object (expects kind 'gurukul' or 'milestone' in params; optional gid, mid, level query params)
+ * @param res Response object
+ */
+export const getCohortSummary: RequestHandler = async (req, res) => {
+  const kind = parseKind(req);
+  if (!kind) {
+    res.status(400).json({ message: `Cohort kind must be one of: ${Object.keys(COHORT_KINDS).join(', ')}` });
+    return;
+  }
+  const filter = parseFilter(req.query);
+  if (typeof filter === 'string') {
+    res.status(400).json({ message: filter });
+    return;
+  }
+
+  try {
+    const summary = await findCohortSummary(kind, filter);
+    res.status(200).json({ kind, filter, summary });
+  } catch (error: any) {
+    console.error(`Error in getCohortSummary (kind: ${kind}):`, error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
+
+/**
+ * Move a cohort forward: every matching student with status 'from' gets status 'to'.
+ * @param req Request object (expects kind in params; 'from', optional 'to' (defaults to the next status),
+ *            and at least one of gid, mid, level in body)
+ * @param res Response object
+ */
+export const transitionCohortStatus: RequestHandler = async (req, res) => {
+  const kind = parseKind(req);
+  if (!kind) {
+    res.status(400).json({ message: `Cohort kind must be one of: ${Object.keys(COHORT_KINDS).join(', ')}` });
+    return;
+  }
+  const filter = parseFilter(req.body);
+  if (typeof filter === 'string') {
+    res.status(400).json({ message: filter });
+    return;
+  }
+  if (filter.gid === undefined && filter.mid === undefined && filter.level === undefined) {
+    res.status(400).json({ message: 'At least one of gid, mid or level is required to select a cohort' });
+    return;
+  }
+
+  const { from } = req.body;
+  const fromIndex = COHORT_STATUSES.indexOf(from);
+  const to = req.body.to ?? COHORT_STATUSES[fromIndex + 1];
+  const toIndex = COHORT_STATUSES.indexOf(to);
+  if (fromIndex === -1 || toIndex <= fromIndex) {
+    res.status(400).json({ message: `'from' and 'to' must be statuses in the order ${COHORT_STATUSES.join(' -> ')}, with 'to' after 'from'` });
+    return;
+  }
+
+  try {
+    const updated = await transitionCohort(kind, filter, from, to);
+    res.status(200).json({ kind, filter, from, to, updated });
+  } catch (error: any) {
+    console.error(`Error in transitionCohortStatus (kind: ${kind}):`, error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
@@ -0,0 +1,66 @@
+// controllers/exportController.ts - Streams users, students and teachers as CSV downloads
+
+import { RequestHandler } from 'express';
+import { EXPORT_QUERIES, forEachExportBatch } from '../services/exportService';
+import { csvLine } from '../utils/csv';
+import { waitForDrain } from '../utils/ndjson';
+
+// --- Export Controller Functions ---
+
+/**
+ * Stream an export as CSV (assignments flattened into columns, one row per user/student/teacher).
+ * Rows are written batch by batch as the cursor reads them; when the client reads slowly the
+ * cursor waits, and when it disconnects the export stops.
+ * @param req Request object (expects kind 'users', 'students' or 'teachers' in params; optional 'format=csv')
+ * @param res Response object
+ */
+export const exportRows: RequestHandler = async (req, res) => {
+  const kind = req.params.kind;
+  const format = (req.query.format as string | undefined) ?? 'csv';
+
+  if (!EXPORT_QUERIES[kind]) {
+    res.status(404).json({ message: `Unknown export '${kind}'. Expected one of: ${Object.keys(EXPORT_QUERIES).join(', ')}` });
+    return;
+  }
+  if (format !== 'csv') {
+    res.status(400).json({ message: "Only format=csv is served; the admin UI converts CSV to Parquet while downloading" });
+    return;
+  }
+
+  let clientGone = false;
+  res.on('close', () => {
+    clientGone = !res.writableFinished;
+  });
+
+  try {
+    const total = await forEachExportBatch(kind, async (columns, rows) => {
+      if (!res.headersSent) {
+        const stamp = new Date().toISOString().slice(0, 10);
+        res.status(200);
+        res.setHeader('Content-Type', 'text/csv; charset=utf-8');
+        res.setHeader('Content-Disposition', `attachment; filename="${kind}-${stamp}.csv"`);
+        res.write(csvLine(columns));
+      }
+      if (clientGone) {
+        return false;
+      }
+      const chunk = rows.map((row) => csvLine(columns.map((column) => row[column]))).join('');
+      if (chunk && !res.write(chunk)) {
+        return waitForDrain(res);
+      }
+      return true;
+    });
+    if (clientGone) {
+      console.warn(`Export of ${kind} stopped after ${total} rows: client disconnected`);
+      return;
+    }
+    res.end();
+  } catch (error: any) {
+    console.error(`Error in exportRows (kind: ${kind}):`, error);
+    if (res.headersSent) {
+      res.destroy(error); // the client sees a truncated download rather than a silent partial file
+      return;
+    }
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
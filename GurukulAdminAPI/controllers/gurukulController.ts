@@ -15,19 +15,22 @@ import {
   updateExistingGurukulOffering,
   deleteGurukulOfferingById,
   getGurukulOfferingsByGid,
+  findAvailableGtypes,
 } from '../services/gurukulService'; // Import service functions
+import { findLevelMapping } from '../services/levelService';
+import { sendRows } from '../utils/columnar';
 
 // --- Gurukul Controller Functions ---
 
 /**
  * Get all gurukuls.
- * @param req Request object
+ * @param req Request object (accepts optional 'format=columnar' query param)
  * @param res Response object
  */
 export const getAllGurukuls: RequestHandler = async (req, res) => {
   try {
     const gurukuls = await findAllGurukuls();
-    res.status(200).json(gurukuls);
+    sendRows(req, res, gurukuls);
     // No 'return' needed here, as this is the final action and implicit return is Promise<void>
   } catch (error: any) {
     console.error('Error in getAllGurukuls:', error);
@@ -148,13 +151,13 @@ export const deleteGurukul: RequestHandler = async (req, res) => {
 
 /**
  * Get all gurukul offerings.
- * @param req Request object
+ * @param req Request object (accepts optional 'format=columnar' query param)
  * @param res Response object
  */
 export const getAllGurukulOfferings: RequestHandler = async (req, res) => {
   try {
     const offerings = await findAllGurukulOfferings();
-    res.status(200).json(offerings);
+    sendRows(req, res, offerings);
   } catch (error: any) {
     console.error('Error in getAllGurukulOfferings:', error);
     res.status(500).json({ message: 'Internal Server Error', details: error.message });
@@ -232,7 +235,8 @@ export const createGurukulOffering: RequestHandler = async (req, res) => {
       return; // Explicitly return void
     }
     if (newOffering === undefined) {
-      res.status(400).json({ message: `Invalid gtype. Must be one of: G1, G2, G3, G4` });
+      const { mapping } = await findLevelMapping();
+      res.status(400).json({ message: `Invalid gtype. Must be one of: ${Object.keys(mapping).join(', ')}` });
       return; // Explicitly return void
     }
     if (newOffering === false) { // Handle the case where the offering already exists
@@ -277,7 +281,8 @@ export const updateGurukulOffering: RequestHandler = async (req, res) => {
       return; // Explicitly return void
     }
     if (updatedOffering === undefined) {
-      res.status(400).json({ message: `Invalid gtype. Must be one of: G1, G2, G3, G4` });
+      const { mapping } = await findLevelMapping();
+      res.status(400).json({ message: `Invalid gtype. Must be one of: ${Object.keys(mapping).join(', ')}` });
       return; // Explicitly return void
     }
     // If it's undefined (meaning no row was updated), it's a 404, not undefined
@@ -320,3 +325,24 @@ export const deleteGurukulOffering: RequestHandler = async (req, res) => {
   }
 };
 
+
+/**
+ * Get the offering types each gurukul is still missing (gurukuls with every type are left out).
+ * @param req Request object (accepts optional 'gid' query param for a single gurukul)
+ * @param res Response object
+ */
+export const getAvailableGtypes: RequestHandler = async (req, res) => {
+  const gid = req.query.gid === undefined ? undefined : Number(req.query.gid);
+  if (gid !== undefined && (!Number.isInteger(gid) || gid <= 0)) {
+    res.status(400).json({ message: "'gid' must be a positive integer" });
+    return;
+  }
+
+  try {
+    const available = await findAvailableGtypes(gid);
+    res.status(200).json(available);
+  } catch (error: any) {
+    console.error('Error in getAvailableGtypes:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
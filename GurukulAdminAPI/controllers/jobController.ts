@@ -0,0 +1,89 @@
+// controllers/jobController.ts - Queues background jobs and reports their progress
+
+import { RequestHandler } from 'express';
+import { validateJob, enqueueJob, findJobById, findRecentJobs } from '../services/jobService';
+
+const JOB_STATUSES = ['queued', 'running', 'succeeded', 'failed'];
+const DEFAULT_LIST_LIMIT = 20;
+const MAX_LIST_LIMIT = 200;
+
+// --- Job Controller Functions ---
+
+/**
+ * Queue a job. Responds 202 with the job row; poll GET /jobs/:id for progress.
+ * @param req Request object (expects 'type' and optional 'payload' in body)
+ * @param res Response object
+ */
+export const createJob: RequestHandler = async (req, res) => {
+  const { type, payload } = req.body;
+
+  if (!type || typeof type !== 'string') {
+    res.status(400).json({ message: 'Job type (string) is required' });
+    return;
+  }
+  const invalid = validateJob(type, payload);
+  if (invalid) {
+    res.status(400).json({ message: invalid });
+    return;
+  }
+
+  try {
+    const job = await enqueueJob(type, payload);
+    res.status(202).location(`/jobs/${job.id}`).json(job);
+  } catch (error: any) {
+    console.error('Error in createJob:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
+
+/**
+ * Get a job's status, progress (done/total/percent/message) and, once finished, its result or error.
+ * @param req Request object (expects id in params)
+ * @param res Response object
+ */
+export const getJobById: RequestHandler = async (req, res) => {
+  const id = parseInt(req.params.id);
+  if (isNaN(id)) {
+    res.status(400).json({ message: 'Invalid Job ID' });
+    return;
+  }
+
+  try {
+    const job = await findJobById(id);
+    if (!job) {
+      res.status(404).json({ message: 'Job not found' });
+      return;
+    }
+    res.status(200).json(job);
+  } catch (error: any) {
+    console.error(`Error in getJobById (ID: ${id}):`, error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
+
+/**
+ * Get the most recent jobs, newest first.
+ * @param req Request object (accepts optional 'status' and 'limit' query params)
+ * @param res Response object
+ */
+export const getRecentJobs: RequestHandler = async (req, res) => {
+  const status = req.query.status as string | undefined;
+  const limit = req.query.limit === undefined ? DEFAULT_LIST_LIMIT : parseInt(req.query.limit as string, 10);
+
+  if (status !== undefined && !JOB_STATUSES.includes(status)) {
+    res.status(400).json({ message: `Query param 'status' must be one of: ${JOB_STATUSES.join(', ')}` });
+    return;
+  }
+  if (isNaN(limit) || limit < 1 || limit > MAX_LIST_LIMIT) {
+    res.status(400).json({ message: `Query param 'limit' must be between 1 and ${MAX_LIST_LIMIT}` });
+    return;
+  }
+
+  try {
+    const jobs = await findRecentJobs(limit, status);
+    res.status(200).json(jobs);
+  } catch (error: any) {
+    console.error('Error in getRecentJobs:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
@@ -0,0 +1,32 @@
+// controllers/levelController.ts - Serves the gtype -> level mapping (public.level_mapping)
+
+import { RequestHandler } from 'express';
+import { findLevelMapping } from '../services/levelService';
+
+// The mapping changes only when the table is edited by hand, so clients may keep it for
+// LEVELS_MAX_AGE seconds and then revalidate it cheaply with If-None-Match.
+const LEVELS_MAX_AGE = parseInt(process.env.LEVELS_MAX_AGE || '86400', 10);
+
+// --- Level Controller Functions ---
+
+/**
+ * Get the level mapping ({ G1: ['L1', ...], ... }) with Cache-Control and ETag headers.
+ * @param req Request object (accepts optional 'fresh=true' query param to bypass the server-side cache)
+ * @param res Response object (304 with no body if If-None-Match matches)
+ */
+export const getLevelMapping: RequestHandler = async (req, res) => {
+  try {
+    const { mapping, etag } = await findLevelMapping(req.query.fresh === 'true');
+    res.setHeader('Cache-Control', `public, max-age=${LEVELS_MAX_AGE}`);
+    res.setHeader('ETag', etag);
+    // compression() weakens the ETag (W/"...") when it compresses the body
+    if (String(req.headers['if-none-match'] || '').replace(/^W\//, '') === etag) {
+      res.status(304).end();
+      return;
+    }
+    res.status(200).json(mapping);
+  } catch (error: any) {
+    console.error('Error in getLevelMapping:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
@@ -0,0 +1,22 @@
+// controllers/metricsController.ts - Serves process metrics for monitoring
+
+import { RequestHandler } from 'express';
+import { collectClusterMetrics, collectMetrics } from '../services/metricsService';
+
+// --- Metrics Controller Functions ---
+
+/**
+ * Get cache hit/miss counters and connection pool usage, summed over all workers when the API
+ * runs under cluster.ts (?scope=process reports only the worker that answers).
+ * @param req Request object
+ * @param res Response object
+ */
+export const getMetrics: RequestHandler = async (req, res) => {
+  try {
+    res.set('Cache-Control', 'no-store');
+    res.status(200).json(req.query.scope === 'process' ? collectMetrics() : await collectClusterMetrics());
+  } catch (error: any) {
+    console.error('Error in getMetrics:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
@@ -10,20 +10,21 @@ import {
   deleteMilestoneById,
   findAllMilestonesbyGid,
   findDistinctMilestoneLevels,
-
+  findAvailableLevels,
 } from '../services/milestoneService'; // Import milestone service functions
+import { sendRows } from '../utils/columnar';
 
 // --- Milestone Controller Functions ---
 
 /**
  * Get all milestones.
- * @param req Request object
+ * @param req Request object (accepts optional 'format=columnar' query param)
  * @param res Response object
  */
 export const getAllMilestones: RequestHandler = async (req, res) => {
   try {
     const milestones = await findAllMilestones();
-    res.status(200).json(milestones);
+    sendRows(req, res, milestones);
   } catch (error: any) {
     console.error('Error in getAllMilestones:', error);
     res.status(500).json({ message: 'Internal Server Error', details: error.message });
@@ -202,3 +203,31 @@ export const deleteMilestone: RequestHandler = async (req, res) => {
   }
 };
 
+
+/**
+ * Get the levels each offering has no milestone for yet (offerings with every level are left out).
+ * @param req Request object (accepts optional 'oid' or 'gid' query params)
+ * @param res Response object
+ */
+export const getAvailableLevels: RequestHandler = async (req, res) => {
+  const filter: { oid?: number; gid?: number } = {};
+  for (const key of ['oid', 'gid'] as const) {
+    if (req.query[key] === undefined) {
+      continue;
+    }
+    const value = Number(req.query[key]);
+    if (!Number.isInteger(value) || value <= 0) {
+      res.status(400).json({ message: `'${key}' must be a positive integer` });
+      return;
+    }
+    filter[key] = value;
+  }
+
+  try {
+    const available = await findAvailableLevels(filter);
+    res.status(200).json(available);
+  } catch (error: any) {
+    console.error('Error in getAvailableLevels:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
@@ -0,0 +1,44 @@
+// controllers/smilestoneController.ts - Bulk score updates for studentmate.smilestones
+
+import { RequestHandler } from 'express';
+import { applyMilestoneScores, MAX_SCORE_ROWS, ScoreRow } from '../services/smilestoneService';
+
+const isInt = (value: any): boolean => Number.isInteger(value);
+
+// --- Smilestone Controller Functions ---
+
+/**
+ * Apply a chunk of a score sheet.
+ * Each row is { sid or email, mid, score, line? }; line defaults to the row's position in the chunk.
+ * Responds with { received, updated, unchanged, duplicates, unknown: [{ line, sid, email, mid }] }.
+ * @param req Request object (expects 'rows' array in body, at most MAX_SCORE_ROWS)
+ * @param res Response object
+ */
+export const bulkUpdateScores: RequestHandler = async (req, res) => {
+  const { rows } = req.body;
+
+  if (!Array.isArray(rows) || rows.length === 0 || rows.length > MAX_SCORE_ROWS) {
+    res.status(400).json({ message: `'rows' must be a non-empty array of at most ${MAX_SCORE_ROWS} score rows` });
+    return;
+  }
+  const scoreRows: ScoreRow[] = [];
+  for (let i = 0; i < rows.length; i++) {
+    const { sid, email, mid, score, line } = rows[i] ?? {};
+    const hasStudent = isInt(sid) || (typeof email === 'string' && email !== '');
+    if (!hasStudent || !isInt(mid) || !isInt(score) || score < 0 || (line !== undefined && !isInt(line))) {
+      res.status(400).json({
+        message: `Row ${line ?? i + 1}: expected sid (number) or email (string), mid (number) and a non-negative integer score`,
+      });
+      return;
+    }
+    scoreRows.push({ line: line ?? i + 1, sid: isInt(sid) ? sid : null, email: isInt(sid) ? null : email, mid, score });
+  }
+
+  try {
+    const summary = await applyMilestoneScores(scoreRows);
+    res.status(200).json(summary);
+  } catch (error: any) {
+    console.error('Error in bulkUpdateScores:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
@@ -0,0 +1,21 @@
+// controllers/statsController.ts - Serves the admin dashboard statistics
+
+import { RequestHandler } from 'express';
+import { findAdminStats } from '../services/statsService';
+
+// --- Stats Controller Functions ---
+
+/**
+ * Get the dashboard statistics in one response.
+ * @param req Request object (accepts optional 'fresh=true' query param to bypass the server-side cache)
+ * @param res Response object
+ */
+export const getAdminStats: RequestHandler = async (req, res) => {
+  try {
+    const stats = await findAdminStats(req.query.fresh === 'true');
+    res.status(200).json(stats);
+  } catch (error: any) {
+    console.error('Error in getAdminStats:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
@@ -5,15 +5,21 @@ import {
   createStudentDirect,
   updateStudentDirect,
   findStudentDirectById,
-  findAllStudentsDirect
+  findAllStudentsDirect,
+  forEachStudentDirectBatch
 } from '../services/studentDirectService';
+import { streamNdjson, wantsNdjson } from '../utils/ndjson';
 
 /**
  * Get all students directly from studentmate.students.
- * @param req Request object
+ * @param req Request object (accepts optional 'stream=ndjson' query param)
  * @param res Response object
  */
 export const getAllStudentsDirect: RequestHandler = async (req, res) => {
+  if (wantsNdjson(req)) {
+    await streamNdjson(res, 'getAllStudentsDirect', forEachStudentDirectBatch);
+    return;
+  }
   try {
     const students = await findAllStudentsDirect();
     res.status(200).json(students); // Final success response, no 'return'
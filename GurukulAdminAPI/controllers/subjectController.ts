@@ -10,18 +10,19 @@ import {
   updateExistingSubject,
   deleteSubjectById,
 } from '../services/subjectService'; // Import subject service functions
+import { sendRows } from '../utils/columnar';
 
 // --- Subject Controller Functions ---
 
 /**
  * Get all subjects.
- * @param req Request object
+ * @param req Request object (accepts optional 'format=columnar' query param)
  * @param res Response object
  */
 export const getAllSubjects: RequestHandler = async (req, res) => {
   try {
     const subjects = await findAllSubjects();
-    res.status(200).json(subjects);
+    sendRows(req, res, subjects);
   } catch (error: any) {
     console.error('Error in getAllSubjects:', error);
     res.status(500).json({ message: 'Internal Server Error', details: error.message });
@@ -5,23 +5,30 @@
 import { Request, Response, RequestHandler } from 'express';
 import {
   findAllTopics,
+  forEachTopicBatch,
   findTopicById,
   createNewTopic,
   updateExistingTopic,
   deleteTopicById,
 } from '../services/topicService'; // Import topic service functions
+import { sendRows } from '../utils/columnar';
+import { streamNdjson, wantsNdjson } from '../utils/ndjson';
 
 // --- Topic Controller Functions ---
 
 /**
  * Get all topics.
- * @param req Request object
+ * @param req Request object (accepts optional 'format=columnar' or 'stream=ndjson' query param)
  * @param res Response object
  */
 export const getAllTopics: RequestHandler = async (req, res) => {
+  if (wantsNdjson(req)) {
+    await streamNdjson(res, 'getAllTopics', forEachTopicBatch);
+    return;
+  }
   try {
     const topics = await findAllTopics();
-    res.status(200).json(topics);
+    sendRows(req, res, topics);
   } catch (error: any) {
     console.error('Error in getAllTopics:', error);
     res.status(500).json({ message: 'Internal Server Error', details: error.message });
@@ -4,26 +4,53 @@
 import { Request, Response, RequestHandler } from 'express';
 import {
   findAllUsers,
+  forEachUserBatch,
   findUserById,
   createNewUser,
   updateExistingUser,
   softDeleteUserById,
+  softDeleteUsersByIds,
+  restoreUsersByIds,
   //assignSubjectsToTeacher,
   // findSubjectsAssignedToTeacher // Not directly used in controller, but in service
 } from '../services/userservice';
+import { sendRows } from '../utils/columnar';
+import { SLOG_MODES } from '../services/slogService';
+import { streamNdjson, wantsNdjson } from '../utils/ndjson';
+
+const MAX_BULK_USERS = 5000;
+
+/**
+ * Reads 'userids' from a bulk request body: a non-empty array of at most MAX_BULK_USERS integers.
+ * Duplicates are dropped. Returns null if the body is invalid.
+ */
+const parseBulkUserIds = (body: any): number[] | null => {
+  const userids = body?.userids;
+  if (!Array.isArray(userids) || userids.length === 0 || userids.length > MAX_BULK_USERS
+      || !userids.every((id) => Number.isInteger(id))) {
+    return null;
+  }
+  return Array.from(new Set<number>(userids));
+};
 
 // --- User Controller Functions ---
 
 /**
  * Get all users, optionally filtered by role.
- * @param req Request object (expects optional 'role' query param)
+ * @param req Request object (expects optional 'role' query param; 'deleted=true' lists only soft-deleted users;
+ *            'format=columnar' for column-oriented JSON, 'stream=ndjson' to stream one user per line)
  * @param res Response object
  */
 export const getAllUsers: RequestHandler = async (req, res) => {
   const role = req.query.role as string | undefined; // Get role from query parameter
+  const deleted = req.query.deleted === 'true';
+  if (wantsNdjson(req)) {
+    await streamNdjson(res, 'getAllUsers', (onBatch) => forEachUserBatch(role, deleted, onBatch));
+    return;
+  }
   try {
-    const users = await findAllUsers(role);
-    res.status(200).json(users);
+    const users = await findAllUsers(role, deleted);
+    sendRows(req, res, users);
   } catch (error: any) {
     console.error('Error in getAllUsers:', error);
     res.status(500).json({ message: 'Internal Server Error', details: error.message });
@@ -122,12 +149,13 @@ export const createUser: RequestHandler = async (req, res) => {
 /**
  * Update an existing user.
  * The service layer will handle the propagation of updates and assignments.
- * @param req Request object (expects id in params, optional username, email, role, subject_ids, gurukul_id, milestone_id in body)
+ * @param req Request object (expects id in params, optional username, email, role, subject_ids, gurukul_id, milestone_id in body;
+ *            slog_mode 'reconcile' (default) keeps journeys that still apply on a milestone change, 'reset' restarts them all)
  * @param res Response object
  */
 export const updateUser: RequestHandler = async (req, res) => {
   const userid = parseInt(req.params.id);
-  const { username, email, role, subject_ids, gurukul_id, milestone_id } = req.body;
+  const { username, email, role, subject_ids, gurukul_id, milestone_id, slog_mode } = req.body;
   console.log("In update User controller");
   if (isNaN(userid)) {
     res.status(400).json({ message: 'Invalid User ID' });
@@ -164,12 +192,16 @@ export const updateUser: RequestHandler = async (req, res) => {
     res.status(400).json({ message: 'If provided, milestone_id must be a number or null' });
     return;
   }
+  if (slog_mode !== undefined && !SLOG_MODES.includes(slog_mode)) {
+    res.status(400).json({ message: `If provided, slog_mode must be one of: ${SLOG_MODES.join(', ')}` });
+    return;
+  }
 
   try {
     // This call passes all relevant data to updateExistingUser.
     // updateExistingUser (in userService.ts) is now responsible for calling
     // assignSubjectsToTeacher, assignGurukulToStudent, etc., internally.
-    const updatedUser = await updateExistingUser(userid, { username, email, role, subject_ids, gurukulId: gurukul_id, milestoneId: milestone_id });
+    const updatedUser = await updateExistingUser(userid, { username, email, role, subject_ids, gurukulId: gurukul_id, milestoneId: milestone_id, slogMode: slog_mode });
 
     if (updatedUser === '404') {
       res.status(404).json({ message: 'User not found.' });
@@ -212,3 +244,48 @@ export const deleteUser: RequestHandler = async (req, res) => {
     res.status(500).json({ message: 'Internal Server Error', details: error.message });
   }
 };
+
+/**
+ * Soft-delete many users in one transaction.
+ * Responds with { requested, deleted: [userid], not_found: [userid] }; IDs that do not exist or
+ * were already deleted are reported in not_found rather than failing the request.
+ * @param req Request object (expects 'userids' array in body, at most MAX_BULK_USERS)
+ * @param res Response object
+ */
+export const bulkDeleteUsers: RequestHandler = async (req, res) => {
+  const userids = parseBulkUserIds(req.body);
+  if (!userids) {
+    res.status(400).json({ message: `'userids' must be a non-empty array of at most ${MAX_BULK_USERS} user IDs` });
+    return;
+  }
+
+  try {
+    const { deleted, notFound } = await softDeleteUsersByIds(userids);
+    res.status(200).json({ requested: userids.length, deleted, not_found: notFound });
+  } catch (error: any) {
+    console.error('Error in bulkDeleteUsers:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
+
+/**
+ * Restore many soft-deleted users in one transaction (their assignments are not restored).
+ * Responds with { requested, restored: [userid], not_found: [userid] }.
+ * @param req Request object (expects 'userids' array in body, at most MAX_BULK_USERS)
+ * @param res Response object
+ */
+export const bulkRestoreUsers: RequestHandler = async (req, res) => {
+  const userids = parseBulkUserIds(req.body);
+  if (!userids) {
+    res.status(400).json({ message: `'userids' must be a non-empty array of at most ${MAX_BULK_USERS} user IDs` });
+    return;
+  }
+
+  try {
+    const { restored, notFound } = await restoreUsersByIds(userids);
+    res.status(200).json({ requested: userids.length, restored, not_found: notFound });
+  } catch (error: any) {
+    console.error('Error in bulkRestoreUsers:', error);
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
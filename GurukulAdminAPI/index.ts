@@ -3,8 +3,10 @@
 import dotenv from 'dotenv';
 dotenv.config();
 
+import cluster from 'cluster';
 import express, { Request, Response, NextFunction } from 'express'; // Import NextFunction
 import bodyParser from 'body-parser';
+import compression from 'compression';
 import gurukulRoutes from './routes/gururkulRoutes';
 import milestoneRoutes from './routes/milestoneRoutes'; // Import new milestone routes
 import subjectRoutes from './routes/subjectRoutes'; // Import new subject routes
@@ -12,12 +14,47 @@ import topicRoutes from './routes/topicRoutes';     // Import new topic routes
 import userRoutes from './routes/userRoutes'; // Import new user routes
 import teacherDirectRoutes from './routes/teacherDirectRoutes'; // NEW import
 import studentDirectRoutes from './routes/studentDirectRoutes'; // NEW import
+import changeFeedRoutes from './routes/changeFeedRoutes';
+import jobRoutes from './routes/jobRoutes';
+import cohortRoutes from './routes/cohortRoutes';
+import smilestoneRoutes from './routes/smilestoneRoutes';
+import statsRoutes from './routes/statsRoutes';
+import exportRoutes from './routes/exportRoutes';
+import batchRoutes from './routes/batchRoutes';
+import levelRoutes from './routes/levelRoutes';
+import metricsRoutes from './routes/metricsRoutes';
+import { startChangeFeed, stopChangeFeed, closeChangeStreams } from './services/changeFeedService';
+import { pruneChangeLog } from './services/deltaSyncService';
+import { startJobWorkers, stopJobWorkers, pruneJobs } from './services/jobService';
+import { requestLoaders } from './utils/dataLoader';
+import pool, { readPool, routeReads } from './utils/db';
+import { isWorkerMessage, WORKER_SHUTDOWN } from './utils/workerMessages';
 
 const app = express();
 const PORT = process.env.PORT || 3000;
-
-// Middleware to parse JSON request bodies
-app.use(bodyParser.json());
+const DRAIN_TIMEOUT_MS = parseInt(process.env.WORKER_DRAIN_TIMEOUT_MS || '10000', 10); // then open connections are cut
+
+// Middleware to parse JSON request bodies (bulk endpoints take a few thousand rows per request)
+app.use(bodyParser.json({ limit: process.env.JSON_BODY_LIMIT || '2mb' }));
+
+// Per-request loaders: lookups by ID (subjects, gurukuls, milestones) made during one request
+// are batched into a single `= ANY($1)` query and not repeated (utils/dataLoader.ts)
+app.use(requestLoaders());
+
+// GET/HEAD requests read from the read pool (DB_READ_*); writes and everything they read stay on the primary
+app.use(routeReads());
+
+// Compress responses larger than COMPRESSION_THRESHOLD (gzip or brotli, whichever the client accepts).
+// The SSE change stream is skipped so events are not held back in the compressor's buffer.
+app.use(compression({
+  threshold: process.env.COMPRESSION_THRESHOLD || '1kb',
+  filter: (req, res) => {
+    if (String(res.getHeader('Content-Type') || '').startsWith('text/event-stream')) {
+      return false;
+    }
+    return compression.filter(req, res);
+  },
+}));
 
 // Basic route for testing the server
 app.get('/', (req, res) => {
@@ -43,6 +80,34 @@ app.use('/users', userRoutes); // New route for users
 app.use('/teachers', teacherDirectRoutes); // Direct teacher management (old way)
 app.use('/students', studentDirectRoutes); // Direct student management (old way)
 
+// Change feed (LISTEN/NOTIFY relayed as Server-Sent Events) for UI cache invalidation,
+// and delta sync (GET /changes?table=&since=) for incremental collection refreshes
+app.use('/changes', changeFeedRoutes);
+
+// Background jobs (cascading deletes, lesson assignment, bulk user import) with progress polling
+app.use('/jobs', jobRoutes);
+
+// Cohort status transitions (Started -> In_progress -> Done) for sgurukul / smilestones
+app.use('/cohorts', cohortRoutes);
+
+// Student milestone records (bulk score upload)
+app.use('/smilestones', smilestoneRoutes);
+
+// Dashboard statistics (SQL aggregates)
+app.use('/stats', statsRoutes);
+
+// Streamed CSV exports of users, students and teachers
+app.use('/export', exportRoutes);
+
+// Multi-step create workflows (gurukul -> offerings -> milestones) in one transaction
+app.use('/batch', batchRoutes);
+
+// gtype -> level mapping (public.level_mapping), cacheable by clients
+app.use('/levels', levelRoutes);
+
+// Cache hit/miss counters and pool usage for monitoring
+app.use('/metrics', metricsRoutes);
+
 
 // --- Centralized Error Handling Middleware ---
 app.use((err: Error, req: Request, res: Response, next: NextFunction) => {
@@ -54,25 +119,88 @@ app.use((err: Error, req: Request, res: Response, next: NextFunction) => {
 });
 
 // Start the server
-app.listen(PORT, () => {
+const server = app.listen(PORT, () => {
   console.log(`Server is running on port ${PORT}`);
   console.log(`Gurukul routes will be accessible directly:`);
   console.log(`   http://localhost:${PORT}/gurukul`);
   console.log(`   http://localhost:${PORT}/gurukul-offerings`);
+  console.log(`   http://localhost:${PORT}/gurukul/available-gtypes`);
   console.log(`Milestone routes will be accessible at:`);
   console.log(`   http://localhost:${PORT}/milestones`);
+  console.log(`   http://localhost:${PORT}/milestones/available-levels`);
   console.log(`Subject routes will be accessible at:`);
   console.log(`   http://localhost:${PORT}/subjects`);
   console.log(`Topic routes will be accessible at:`);
   console.log(`   http://localhost:${PORT}/topics`);
   console.log(`User routes will be accessible at:`);
   console.log(`   http://localhost:${PORT}/users`);
+  console.log(`   http://localhost:${PORT}/users/bulk-delete`);
+  console.log(`   http://localhost:${PORT}/users/bulk-restore`);
   console.log(`Direct teacher routes will be accessible at:`);
   console.log(`   http://localhost:${PORT}/teachers`);
   console.log(`Direct Students routes will be accessible at:`);
   console.log(`   http://localhost:${PORT}/students`);
+  console.log(`Change feed (SSE) will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/changes/stream`);
+  console.log(`   http://localhost:${PORT}/changes?table=topics&since=<seq>`);
+  console.log(`Job routes will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/jobs`);
+  console.log(`Cohort routes will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/cohorts/gurukul`);
+  console.log(`   http://localhost:${PORT}/cohorts/milestone`);
+  console.log(`Student milestone routes will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/smilestones/scores/bulk`);
+  console.log(`Dashboard statistics will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/stats`);
+  console.log(`Export routes will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/export/users`);
+  console.log(`   http://localhost:${PORT}/export/students`);
+  console.log(`   http://localhost:${PORT}/export/teachers`);
+  console.log(`Batch route will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/batch`);
+  console.log(`Level mapping will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/levels`);
+  console.log(`Metrics will be accessible at:`);
+  console.log(`   http://localhost:${PORT}/metrics`);
+  startChangeFeed();
+  startJobWorkers();
+  // Keep the change log and finished jobs bounded; clients with older cursors get a full reset.
+  setInterval(() => {
+    pruneChangeLog().catch(() => undefined); // pruneChangeLog logs its own errors
+    pruneJobs().catch(() => undefined);
+  }, 60 * 60 * 1000);
 
 
 
 });
 
+// Under cluster.ts the primary stops a worker (rolling restart, shutdown) with a WORKER_SHUTDOWN
+// message. The worker then stops accepting connections and claiming jobs, ends its change streams
+// (they never finish on their own; clients reconnect elsewhere), and waits for open requests and
+// running jobs. Connections still open after WORKER_DRAIN_TIMEOUT_MS are cut. The LISTEN
+// connection and the pools are closed last, once nothing can use them any more; then the worker
+// disconnects from the primary (so it is not respawned) and exits.
+const stopWorker = async (): Promise<void> => {
+  const jobsDone = stopJobWorkers();
+  const serverClosed = new Promise<void>((resolve) => server.close(() => resolve()));
+  closeChangeStreams();
+  setImmediate(() => server.closeIdleConnections()); // the ended streams' keep-alive connections
+  const drainTimer = setTimeout(() => server.closeAllConnections(), DRAIN_TIMEOUT_MS);
+  await Promise.all([jobsDone, serverClosed]);
+  clearTimeout(drainTimer);
+  await stopChangeFeed().catch(() => undefined);
+  await Promise.all([pool.end(), readPool === pool ? undefined : readPool.end()]).catch(() => undefined);
+  cluster.worker!.once('disconnect', () => process.exit(0));
+  cluster.worker!.disconnect();
+};
+
+if (cluster.isWorker) {
+  process.on('SIGINT', () => undefined); // Ctrl-C reaches every worker; the primary coordinates the shutdown
+  let stopping = false;
+  process.on('message', (message: any) => {
+    if (isWorkerMessage(message) && message.type === WORKER_SHUTDOWN && !stopping) {
+      stopping = true;
+      stopWorker();
+    }
+  });
+}
@@ -0,0 +1,17 @@
+// routes/batchRoutes.ts - Defines the API route for transactional batches of operations
+
+import { Router } from 'express';
+import { executeBatch } from '../controllers/batchController';
+
+const router = Router();
+
+// --- Batch Routes ---
+
+/**
+ * @route POST /
+ * @description Run operations (gurukul.create, offering.create, milestone.create) in order in one transaction
+ * Corresponds to http://localhost:5002/batch when mounted at '/batch'
+ */
+router.post('/', executeBatch);
+
+export default router;
@@ -0,0 +1,24 @@
+// routes/changeFeedRoutes.ts - Defines API routes for the database change feed
+
+import { Router } from 'express';
+import { getChanges, streamChanges } from '../controllers/changeFeedController';
+
+const router = Router();
+
+// --- Change Feed Routes ---
+
+/**
+ * @route GET /
+ * @description Delta sync: rows of a collection changed since a cursor (?table=users|topics|milestones&since=<seq>)
+ * Corresponds to http://localhost:5002/changes when mounted at '/changes'
+ */
+router.get('/', getChanges);
+
+/**
+ * @route GET /stream
+ * @description Server-Sent Events stream of table change events (LISTEN/NOTIFY relay)
+ * Corresponds to http://localhost:5002/changes/stream when mounted at '/changes'
+ */
+router.get('/stream', streamChanges);
+
+export default router;
@@ -0,0 +1,24 @@
+// routes/cohortRoutes.ts - Defines API routes for cohort status transitions
+
+import { Router } from 'express';
+import { getCohortSummary, transitionCohortStatus } from '../controllers/cohortController';
+
+const router = Router();
+
+// --- Cohort Routes ---
+
+/**
+ * @route GET /:kind
+ * @description Students per status for a cohort (kind: gurukul | milestone; ?gid=&mid=&level=)
+ * Corresponds to http://localhost:5002/cohorts/:kind when mounted at '/cohorts'
+ */
+router.get('/:kind', getCohortSummary);
+
+/**
+ * @route POST /:kind/transition
+ * @description Move a cohort from one status to a later one ({ from, to?, gid?, mid?, level? })
+ * Corresponds to http://localhost:5002/cohorts/:kind/transition when mounted at '/cohorts'
+ */
+router.post('/:kind/transition', transitionCohortStatus);
+
+export default router;
@@ -0,0 +1,17 @@
+// routes/exportRoutes.ts - Defines API routes for streamed exports
+
+import { Router } from 'express';
+import { exportRows } from '../controllers/exportController';
+
+const router = Router();
+
+// --- Export Routes ---
+
+/**
+ * @route GET /:kind
+ * @description Stream users, students or teachers (with assignments) as CSV
+ * Corresponds to http://localhost:5002/export/users|students|teachers when mounted at '/export'
+ */
+router.get('/:kind', exportRows);
+
+export default router;
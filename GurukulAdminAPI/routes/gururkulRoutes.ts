@@ -13,6 +13,7 @@ import {
   updateGurukulOffering,
   deleteGurukulOffering,
   getOfferingsByGid,
+  getAvailableGtypes,
 } from '../controllers/gurukulController';
 
 const router = Router();
@@ -36,6 +37,12 @@ const router = Router();
  */
 router.get('/gurukul', getAllGurukuls);
 
+/**
+ * @route GET /api/gurukul/available-gtypes
+ * @description Offering types each gurukul does not have yet (?gid= for one gurukul)
+ */
+router.get('/gurukul/available-gtypes', getAvailableGtypes);
+
 /**
  * @route GET /api/gurukul/:id
  * @description Get a gurukul by its ID
@@ -0,0 +1,31 @@
+// routes/jobRoutes.ts - Defines API routes for background jobs
+
+import { Router } from 'express';
+import { createJob, getJobById, getRecentJobs } from '../controllers/jobController';
+
+const router = Router();
+
+// --- Job Routes ---
+
+/**
+ * @route POST /
+ * @description Queue a job: { type: 'delete_gurukul' | 'delete_subject' | 'assign_lessons' | 'create_users', payload }
+ * Corresponds to http://localhost:5002/jobs when mounted at '/jobs'
+ */
+router.post('/', createJob);
+
+/**
+ * @route GET /
+ * @description Most recent jobs (?status=&limit=)
+ * Corresponds to http://localhost:5002/jobs when mounted at '/jobs'
+ */
+router.get('/', getRecentJobs);
+
+/**
+ * @route GET /:id
+ * @description A job's status and progress
+ * Corresponds to http://localhost:5002/jobs/:id when mounted at '/jobs'
+ */
+router.get('/:id', getJobById);
+
+export default router;
@@ -0,0 +1,17 @@
+// routes/levelRoutes.ts - Defines the API route for the gtype -> level mapping
+
+import { Router } from 'express';
+import { getLevelMapping } from '../controllers/levelController';
+
+const router = Router();
+
+// --- Level Routes ---
+
+/**
+ * @route GET /
+ * @description The levels of each offering type, in order (cacheable; ETag / If-None-Match)
+ * Corresponds to http://localhost:5002/levels when mounted at '/levels'
+ */
+router.get('/', getLevelMapping);
+
+export default router;
@@ -0,0 +1,18 @@
+// routes/metricsRoutes.ts - Defines the API route for process metrics
+
+import { Router } from 'express';
+import { getMetrics } from '../controllers/metricsController';
+
+const router = Router();
+
+// --- Metrics Routes ---
+
+/**
+ * @route GET /
+ * @description Reference cache hits/misses/evictions and connection pool usage of this process,
+ * or summed over all workers under cluster.ts (?scope=process: only the answering worker)
+ * Corresponds to http://localhost:5002/metrics when mounted at '/metrics'
+ */
+router.get('/', getMetrics);
+
+export default router;
@@ -9,6 +9,7 @@ import {
   deleteMilestone,
   getMilestonesByGurukul,
   getDistinctMilestoneLevels,
+  getAvailableLevels,
 } from '../controllers/milestoneController';
 
 const router = Router();
@@ -24,6 +25,13 @@ router.get('/by-gurukul/:gid', getMilestonesByGurukul); // NEW route
  */
 router.get('/distinct-levels', getDistinctMilestoneLevels);
 
+/**
+ * @route GET /available-levels
+ * @description Levels each offering has no milestone for yet (?oid= or ?gid= to narrow it down)
+ * Corresponds to http://localhost:5002/milestones/available-levels
+ */
+router.get('/available-levels', getAvailableLevels);
+
 /**
  * @route GET /
  * @description Get all milestones
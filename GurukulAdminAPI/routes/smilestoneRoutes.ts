@@ -0,0 +1,17 @@
+// routes/smilestoneRoutes.ts - Defines API routes for student milestone records (studentmate.smilestones)
+
+import { Router } from 'express';
+import { bulkUpdateScores } from '../controllers/smilestoneController';
+
+const router = Router();
+
+// --- Smilestone Routes ---
+
+/**
+ * @route POST /scores/bulk
+ * @description Set milestone scores for many students: { rows: [{ sid | email, mid, score, line? }] }
+ * Corresponds to http://localhost:5002/smilestones/scores/bulk when mounted at '/smilestones'
+ */
+router.post('/scores/bulk', bulkUpdateScores);
+
+export default router;
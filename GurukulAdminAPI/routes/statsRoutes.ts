@@ -0,0 +1,18 @@
+// routes/statsRoutes.ts - Defines API routes for dashboard statistics
+
+import { Router } from 'express';
+import { getAdminStats } from '../controllers/statsController';
+
+const router = Router();
+
+// --- Stats Routes ---
+
+/**
+ * @route GET /
+ * @description Dashboard aggregates: totals, students per gurukul/level, status breakdowns,
+ * average score per milestone and teachers per subject (?fresh=true skips the cache)
+ * Corresponds to http://localhost:5002/stats when mounted at '/stats'
+ */
+router.get('/', getAdminStats);
+
+export default router;
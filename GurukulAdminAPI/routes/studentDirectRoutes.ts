@@ -10,7 +10,7 @@ import {
 
 const router = Router();
 
-// GET all students directly
+// GET all students directly (?stream=ndjson streams them one per line)
 router.get('/', getAllStudentsDirect);
 
 // GET a single student directly by ID
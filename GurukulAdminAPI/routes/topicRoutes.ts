@@ -15,7 +15,7 @@ const router = Router();
 
 /**
  * @route GET /
- * @description Get all topics
+ * @description Get all topics (?stream=ndjson streams them one per line)
  * Corresponds to http://localhost:5002/topics when mounted at '/topics'
  */
 router.get('/', getAllTopics);
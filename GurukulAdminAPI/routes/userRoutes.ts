@@ -7,6 +7,8 @@ import {
   createUser,
   updateUser,
   deleteUser,
+  bulkDeleteUsers,
+  bulkRestoreUsers,
 } from '../controllers/userController';
 
 const router = Router();
@@ -15,7 +17,8 @@ const router = Router();
 
 /**
  * @route GET /
- * @description Get all users, optionally filtered by role (e.g., /users?role=teacher)
+ * @description Get all users, optionally filtered by role (e.g., /users?role=teacher); ?deleted=true lists only
+ * soft-deleted users and ?stream=ndjson streams them
  * Corresponds to http://localhost:5002/users
  */
 router.get('/', getAllUsers);
@@ -34,6 +37,20 @@ router.get('/:id', getUserById);
  */
 router.post('/', createUser);
 
+/**
+ * @route POST /bulk-delete
+ * @description Soft deletes many users at once ({ userids: [...] }, one transaction)
+ * Corresponds to http://localhost:5002/users/bulk-delete
+ */
+router.post('/bulk-delete', bulkDeleteUsers);
+
+/**
+ * @route POST /bulk-restore
+ * @description Restores many soft-deleted users at once ({ userids: [...] }, one transaction)
+ * Corresponds to http://localhost:5002/users/bulk-restore
+ */
+router.post('/bulk-restore', bulkRestoreUsers);
+
 /**
  * @route PUT /:id
  * @description Update an existing user (and update subject assignments if role is teacher)
@@ -0,0 +1,174 @@
+// services/batchService.ts - Runs an ordered list of create operations in one transaction
+// Multi-step admin workflows (a gurukul, its offerings, their milestones) used to be one
+// request per row, each needing the id returned by the one before. A batch sends them all
+// at once; later operations refer to earlier results with { "$ref": "<ref>.<field>" },
+// and either every operation is committed or none is.
+
+import pool, { Queryable } from '../utils/db';
+import { createNewGurukul, createNewGurukulOffering } from './gurukulService';
+import { findLevelMapping } from './levelService';
+import { createNewMilestone } from './milestoneService';
+
+export const MAX_BATCH_OPERATIONS = parseInt(process.env.MAX_BATCH_OPERATIONS || '200', 10);
+
+export interface BatchOperation {
+  op: string;
+  ref?: string;
+  args: { [key: string]: any };
+}
+
+/**
+ * An operation that could not be applied; the whole batch is rolled back.
+ * status is the HTTP status the request should fail with (400 or 409);
+ * index and op identify the operation (filled in by runBatch).
+ */
+export class BatchOperationError extends Error {
+  index = -1;
+  op = '';
+
+  constructor(public status: number, message: string) {
+    super(message);
+  }
+}
+
+type OperationHandler = (args: { [key: string]: any }, db: Queryable) => Promise<any>;
+
+// Each handler returns the created row, or fails with the controller's status and message
+// for the sentinel results of the underlying service (null / undefined / false).
+const fail = (status: number, message: string): never => {
+  throw new BatchOperationError(status, message);
+};
+
+// { "$ref": "name.field" } -> "name.field"; anything else -> undefined
+const refTarget = (value: any): string | undefined =>
+  value !== null && typeof value === 'object' && typeof value.$ref === 'string' ? value.$ref : undefined;
+
+export const BATCH_OPERATIONS: { [op: string]: OperationHandler } = {
+  'gurukul.create': async ({ gname }, db) => {
+    if (!gname || typeof gname !== 'string') {
+      fail(400, "'gname' (string) is required");
+    }
+    return createNewGurukul(gname, db);
+  },
+  'offering.create': async ({ gid, gtype }, db) => {
+    if (!Number.isInteger(gid) || typeof gtype !== 'string') {
+      fail(400, "'gid' (integer) and 'gtype' (string) are required");
+    }
+    const offering = await createNewGurukulOffering(gid, gtype, db);
+    if (offering === null) fail(400, `Gurukul with ID ${gid} does not exist.`);
+    if (offering === undefined) {
+      const { mapping } = await findLevelMapping();
+      fail(400, `Invalid gtype. Must be one of: ${Object.keys(mapping).join(', ')}`);
+    }
+    if (offering === false) fail(409, `Offering type '${gtype}' already exists for Gurukul ID ${gid}.`);
+    return offering;
+  },
+  'milestone.create': async ({ class: milestoneClass, level, oid }, db) => {
+    if (!Number.isInteger(milestoneClass) || typeof level !== 'string' || !Number.isInteger(oid)) {
+      fail(400, "'class' (integer), 'level' (string) and 'oid' (integer) are required");
+    }
+    const milestone = await createNewMilestone({ class: milestoneClass, level, oid }, db);
+    if (milestone === null) fail(400, `Gurukul Offering with ID ${oid} does not exist.`);
+    if (milestone === undefined) fail(400, `Level '${level}' is not valid for offering ${oid}.`);
+    if (milestone === false) fail(409, `Milestone for level '${level}' already exists for offering ${oid}.`);
+    return milestone;
+  },
+};
+
+/**
+ * Checks the shape of a batch before anything runs: known ops, unique refs, and $refs
+ * that only point at earlier operations.
+ * @returns An error message, or null if the batch is well-formed.
+ */
+export const validateBatch = (operations: any): string | null => {
+  if (!Array.isArray(operations) || operations.length === 0) {
+    return "'operations' must be a non-empty array";
+  }
+  if (operations.length > MAX_BATCH_OPERATIONS) {
+    return `A batch can contain at most ${MAX_BATCH_OPERATIONS} operations`;
+  }
+  const refs = new Set<string>();
+  for (let i = 0; i < operations.length; i++) {
+    const { op, ref, args } = operations[i] ?? {};
+    if (!BATCH_OPERATIONS[op]) {
+      return `Operation ${i}: 'op' must be one of: ${Object.keys(BATCH_OPERATIONS).join(', ')}`;
+    }
+    if (args === null || typeof args !== 'object' || Array.isArray(args)) {
+      return `Operation ${i}: 'args' must be an object`;
+    }
+    for (const value of Object.values(args)) {
+      const target = refTarget(value);
+      if (target !== undefined && !refs.has(target.split('.')[0])) {
+        return `Operation ${i}: '$ref' ${target} does not name an earlier operation`;
+      }
+    }
+    if (ref !== undefined) {
+      if (typeof ref !== 'string' || ref === '' || ref.includes('.')) {
+        return `Operation ${i}: 'ref' must be a non-empty string without dots`;
+      }
+      if (refs.has(ref)) {
+        return `Operation ${i}: 'ref' ${ref} is used more than once`;
+      }
+      refs.add(ref);
+    }
+  }
+  return null;
+};
+
+const resolveArgs = (args: { [key: string]: any }, results: { [ref: string]: any }): { [key: string]: any } => {
+  const resolved: { [key: string]: any } = {};
+  for (const [key, value] of Object.entries(args)) {
+    const target = refTarget(value);
+    if (target === undefined) {
+      resolved[key] = value;
+      continue;
+    }
+    const [ref, field] = target.split('.');
+    const result = results[ref];
+    resolved[key] = field === undefined ? result : result?.[field];
+    if (resolved[key] === undefined) {
+      fail(400, `'$ref' ${target} has no value`);
+    }
+  }
+  return resolved;
+};
+
+// --- Batch Service Functions ---
+
+/**
+ * Runs a validated batch in order on one connection, inside a single transaction.
+ * @param operations The operations (see validateBatch).
+ * @returns A Promise that resolves to [{ op, ref, result }] in request order.
+ * @throws BatchOperationError if an operation is rejected; nothing is committed then.
+ */
+export const runBatch = async (operations: BatchOperation[]): Promise<{ op: string; ref?: string; result: any }[]> => {
+  const client = await pool.connect();
+  const results: { [ref: string]: any } = {};
+  const output: { op: string; ref?: string; result: any }[] = [];
+  let index = 0;
+  try {
+    await client.query('BEGIN');
+    for (; index < operations.length; index++) {
+      const { op, ref, args } = operations[index];
+      const result = await BATCH_OPERATIONS[op](resolveArgs(args, results), client);
+      if (ref !== undefined) {
+        results[ref] = result;
+      }
+      output.push({ op, ref, result });
+    }
+    await client.query('COMMIT');
+    console.log(`Batch of ${operations.length} operations committed`);
+    return output;
+  } catch (error) {
+    await client.query('ROLLBACK').catch(() => undefined);
+    if (error instanceof BatchOperationError) {
+      error.index = index;
+      error.op = operations[index].op;
+      throw error;
+    }
+    console.error(`Error in runBatch (operation ${index}):`, error);
+    throw new Error(`Could not run batch: operation ${index} (${operations[index]?.op}) failed`);
+  } finally {
+    client.release();
+  }
+};
@@ -0,0 +1,214 @@
+// services/changeFeedService.ts - Relays Postgres LISTEN/NOTIFY change events to subscribers
+// The triggers in `tables` (section 7) NOTIFY on the 'admin_changes' channel. One
+// dedicated connection LISTENs for the whole process and fans events out to the
+// SSE clients; recent events are kept so a reconnecting client can catch up.
+// Event ids are only meaningful to the process that issued them: under cluster.ts a client
+// may reconnect to another worker, or to a restarted one. SSE ids therefore carry BOOT_ID,
+// and a client resuming with an id from another process is told to reset.
+
+import crypto from 'crypto';
+import { Client } from 'pg';
+import { EventEmitter } from 'events';
+import pool, { connectionConfig } from '../utils/db';
+
+const CHANNEL = 'admin_changes';
+const RECONNECT_DELAY_MS = parseInt(process.env.CHANGE_FEED_RECONNECT_MS || '5000', 10);
+const HISTORY_SIZE = parseInt(process.env.CHANGE_FEED_HISTORY || '1000', 10);
+const BOOT_ID = crypto.randomBytes(6).toString('hex'); // new for every process start
+
+/**
+ * One change event as sent to clients. `id` is a per-process sequence number (the SSE
+ * event id is streamEventId(event)); `row` is the changed row's key from the trigger and
+ * `seq` its public.change_log entry.
+ */
+export interface ChangeEvent {
+  id: number;
+  table: string;
+  op: 'INSERT' | 'UPDATE' | 'DELETE';
+  row: string | null;
+  seq: number | null;
+  at: string;
+}
+
+export type ChangeListener = (event: ChangeEvent) => void;
+
+const emitter = new EventEmitter();
+emitter.setMaxListeners(0); // one listener per connected admin UI process
+
+const history: ChangeEvent[] = [];
+let nextEventId = 1;
+let listenClient: Client | null = null;
+let listening = false;
+let starting: Promise<void> | null = null;
+let reconnectTimer: NodeJS.Timeout | null = null; // the one pending retry while the feed is down
+let resetSent = false; // 'reset' goes out once per outage, not once per failed retry
+
+const publish = (table: string, op: ChangeEvent['op'], row: string | null, seq: number | null): void => {
+  const event: ChangeEvent = { id: nextEventId++, table, op, row, seq, at: new Date().toISOString() };
+  history.push(event);
+  if (history.length > HISTORY_SIZE) {
+    history.shift();
+  }
+  emitter.emit('change', event);
+};
+
+const scheduleReconnect = (): void => {
+  listening = false;
+  listenClient = null;
+  // Events may have been missed while disconnected; subscribers must drop everything.
+  if (!resetSent) {
+    resetSent = true;
+    emitter.emit('reset');
+  }
+  if (reconnectTimer) {
+    return; // a retry is already pending
+  }
+  reconnectTimer = setTimeout(() => {
+    reconnectTimer = null;
+    startChangeFeed().catch(() => undefined); // startChangeFeed logs and reschedules itself
+  }, RECONNECT_DELAY_MS);
+};
+
+/**
+ * Opens the LISTEN connection if it is not open yet. Safe to call repeatedly.
+ * On failure or disconnect it retries every CHANGE_FEED_RECONNECT_MS.
+ * @returns A Promise that resolves once LISTEN is active (or the attempt failed).
+ */
+export const startChangeFeed = async (): Promise<void> => {
+  if (listening || reconnectTimer) {
+    return; // while down, only the pending retry reconnects (not every SSE request)
+  }
+  if (starting) {
+    return starting;
+  }
+  starting = (async () => {
+    const client = new Client(connectionConfig);
+    try {
+      await client.connect();
+      client.on('notification', (msg) => {
+        if (msg.channel !== CHANNEL || !msg.payload) {
+          return;
+        }
+        try {
+          const payload = JSON.parse(msg.payload);
+          publish(payload.table, payload.op, payload.id ?? null, payload.seq ?? null);
+        } catch (error) {
+          console.error('Error in changeFeed notification (bad payload):', msg.payload);
+        }
+      });
+      client.on('error', (error) => {
+        console.error('Change feed connection error:', error.message);
+        client.end().catch(() => undefined);
+        if (listenClient === client) {
+          scheduleReconnect();
+        }
+      });
+      await client.query(`LISTEN ${CHANNEL}`);
+      listenClient = client;
+      listening = true;
+      resetSent = false;
+      console.log(`Change feed listening on '${CHANNEL}'`);
+    } catch (error: any) {
+      console.error('Error in startChangeFeed:', error.message);
+      client.end().catch(() => undefined);
+      scheduleReconnect();
+    } finally {
+      starting = null;
+    }
+  })();
+  return starting;
+};
+
+/**
+ * Closes the LISTEN connection (used on shutdown).
+ */
+export const stopChangeFeed = async (): Promise<void> => {
+  if (reconnectTimer) {
+    clearTimeout(reconnectTimer);
+    reconnectTimer = null;
+  }
+  const client = listenClient;
+  listenClient = null;
+  listening = false;
+  if (client) {
+    await client.end();
+  }
+};
+
+/**
+ * True while the LISTEN connection is up.
+ */
+export const isChangeFeedLive = (): boolean => listening;
+
+/**
+ * Subscribes to change events.
+ * @param onChange Called for every change event.
+ * @param onReset Called when the LISTEN connection dropped and events may have been lost.
+ * @param onClose Called by closeChangeStreams (SSE clients end their stream).
+ * @returns A function that removes the listeners.
+ */
+export const subscribeToChanges = (onChange: ChangeListener, onReset: () => void, onClose?: () => void): (() => void) => {
+  emitter.on('change', onChange);
+  emitter.on('reset', onReset);
+  if (onClose) {
+    emitter.on('close', onClose);
+  }
+  return () => {
+    emitter.off('change', onChange);
+    emitter.off('reset', onReset);
+    if (onClose) {
+      emitter.off('close', onClose);
+    }
+  };
+};
+
+/**
+ * Ends every open change stream (used on shutdown, so server.close() is not held up by
+ * streams that never finish on their own). Clients reconnect to another worker.
+ */
+export const closeChangeStreams = (): void => {
+  emitter.emit('close');
+};
+
+/**
+ * The newest public.change_log seq (read on the primary), or null if the log is empty.
+ * Sent to a client when its stream opens, as the freshness hint for later list requests
+ * (see routeReads in utils/db.ts).
+ */
+export const findLatestChangeSeq = async (): Promise<number | null> => {
+  try {
+    const result = await pool.query('SELECT MAX(seq)::bigint AS seq FROM public.change_log');
+    return result.rows[0].seq === null ? null : Number(result.rows[0].seq);
+  } catch (error) {
+    console.error('Error in findLatestChangeSeq:', error);
+    throw new Error('Could not retrieve the latest change sequence');
+  }
+};
+
+/** The SSE id of an event: `<BOOT_ID>.<id>`. */
+export const streamEventId = (event: ChangeEvent): string => `${BOOT_ID}.${event.id}`;
+
+/** The SSE id of the newest event published so far (a resume point for clients that saw none). */
+export const currentStreamPosition = (): string => `${BOOT_ID}.${nextEventId - 1}`;
+
+/**
+ * Returns the events after `lastStreamId`, or null if the client has to invalidate
+ * everything: the id comes from another process (another cluster worker, or this one
+ * before a restart), or the events are no longer all in the history buffer.
+ * @param lastStreamId The Last-Event-ID the client sent.
+ */
+export const findChangesSince = (lastStreamId: string): ChangeEvent[] | null => {
+  const match = /^([0-9a-f]+)\.(\d+)$/.exec(lastStreamId);
+  if (!match || match[1] !== BOOT_ID) {
+    return null;
+  }
+  const lastEventId = Number(match[2]);
+  if (lastEventId >= nextEventId) {
+    return null;
+  }
+  const oldest = history.length > 0 ? history[0].id : nextEventId;
+  if (lastEventId < oldest - 1) {
+    return null;
+  }
+  return history.filter((event) => event.id > lastEventId);
+};
@@ -0,0 +1,108 @@
+// services/cohortService.ts - Set-based status transitions for student cohorts
+// A cohort is every studentmate.sgurukul or studentmate.smilestones row matching a
+// filter (gid, mid, level) and a current status. Moving a cohort forward
+// (Started -> In_progress -> Done) is a single UPDATE, instead of one
+// PUT /users/:id per student that deletes and re-inserts the assignment.
+
+import pool from '../utils/db';
+
+export const COHORT_STATUSES = ['Started', 'In_progress', 'Done'];
+
+export interface CohortFilter {
+  gid?: number;
+  mid?: number;
+  level?: string;
+}
+
+interface CohortKind {
+  table: string;
+  alias: string;
+  // SQL filter conditions; $1..$3 are gid, mid and level (NULL when not filtering).
+  conditions: string;
+}
+
+// A student's level is the level of the milestone they are assigned to.
+export const COHORT_KINDS: { [kind: string]: CohortKind } = {
+  gurukul: {
+    table: 'studentmate.sgurukul',
+    alias: 'sg',
+    conditions: `
+      ($1::int IS NULL OR sg.gid = $1)
+      AND ($2::int IS NULL OR EXISTS (
+        SELECT 1 FROM studentmate.smilestones sm WHERE sm.sid = sg.sid AND sm.mid = $2))
+      AND ($3::text IS NULL OR EXISTS (
+        SELECT 1 FROM studentmate.smilestones sm
+        JOIN public.milestones m ON m.mid = sm.mid
+        WHERE sm.sid = sg.sid AND m.level = $3))
+    `,
+  },
+  milestone: {
+    table: 'studentmate.smilestones',
+    alias: 'sm',
+    conditions: `
+      ($2::int IS NULL OR sm.mid = $2)
+      AND (($1::int IS NULL AND $3::text IS NULL) OR EXISTS (
+        SELECT 1 FROM public.milestones m
+        JOIN public.gurukul_offerings go ON go.oid = m.oid
+        WHERE m.mid = sm.mid
+          AND ($1::int IS NULL OR go.gid = $1)
+          AND ($3::text IS NULL OR m.level = $3)))
+    `,
+  },
+};
+
+const filterParams = (filter: CohortFilter): any[] => [filter.gid ?? null, filter.mid ?? null, filter.level ?? null];
+
+// --- Cohort Service Functions ---
+
+/**
+ * Counts the students matching a filter, per status.
+ * @param kind 'gurukul' (studentmate.sgurukul) or 'milestone' (studentmate.smilestones).
+ * @param filter Optional gid, mid and level.
+ * @returns A Promise that resolves to [{ status, students }] for every status (zero counts included).
+ */
+export const findCohortSummary = async (kind: string, filter: CohortFilter): Promise<{ status: string; students: number }[]> => {
+  const { table, alias, conditions } = COHORT_KINDS[kind];
+  try {
+    const result = await pool.query(
+      `SELECT s.status, COUNT(${alias}.sid)::int AS students
+       FROM unnest($4::text[]) AS s(status)
+       LEFT JOIN ${table} ${alias} ON ${alias}.status = s.status AND ${conditions}
+       GROUP BY s.status
+       ORDER BY array_position($4::text[], s.status)`,
+      [...filterParams(filter), COHORT_STATUSES]
+    );
+    return result.rows;
+  } catch (error) {
+    console.error(`Error in findCohortSummary (kind: ${kind}):`, error);
+    throw new Error(`Could not summarize ${kind} cohort`);
+  }
+};
+
+/**
+ * Moves every matching student from one status to a later one in a single UPDATE.
+ * starttime is filled in if missing; endtime is set when the cohort reaches 'Done'.
+ * @param kind 'gurukul' or 'milestone'.
+ * @param filter gid, mid and/or level selecting the cohort.
+ * @param fromStatus The cohort's current status.
+ * @param toStatus The new status; must come after fromStatus.
+ * @returns A Promise that resolves to the number of rows updated.
+ */
+export const transitionCohort = async (kind: string, filter: CohortFilter, fromStatus: string, toStatus: string): Promise<number> => {
+  const { table, alias, conditions } = COHORT_KINDS[kind];
+  try {
+    const result = await pool.query(
+      `UPDATE ${table} ${alias}
+       SET status = $5::text,
+           starttime = COALESCE(${alias}.starttime, NOW()),
+           endtime = CASE WHEN $5::text = 'Done' THEN NOW() ELSE ${alias}.endtime END
+       WHERE ${alias}.status = $4::text AND ${conditions}`,
+      [...filterParams(filter), fromStatus, toStatus]
+    );
+    console.log(`Moved ${result.rowCount ?? 0} ${kind} cohort rows from ${fromStatus} to ${toStatus}`);
+    return result.rowCount ?? 0;
+  } catch (error) {
+    console.error(`Error in transitionCohort (kind: ${kind}, ${fromStatus} -> ${toStatus}):`, error);
+    throw new Error(`Could not move ${kind} cohort from ${fromStatus} to ${toStatus}`);
+  }
+};
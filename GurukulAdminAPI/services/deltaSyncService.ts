@@ -0,0 +1,171 @@
+// services/deltaSyncService.ts - Incremental collection sync from public.change_log
+// GET /changes?table=<resource>&since=<seq> returns only the rows of a collection that
+// changed after `seq`: { table, seq, reset, upserts, deletes }. Clients keep `seq` as
+// their cursor. `reset: true` means the cursor is unusable (first sync, pruned log, or a
+// rebuilt database) and `upserts` then holds the whole collection.
+//
+// The cursor is a transaction id, not change_log.seq: seq values are handed out before
+// commit, so a lower seq can become visible after a higher one and a seq cursor would
+// skip it. Instead `seq` is the xmin of the reader's snapshot (every transaction below it
+// has finished) and the next call returns all entries with txid >= that cursor. Entries
+// from transactions at or above it may be sent twice; upserts/deletes are idempotent.
+// That only holds if the rows are read where the cursor was taken, so a delta is read on the
+// primary even though GET /changes would otherwise use the read pool (see utils/db.ts).
+
+import pool, { onPrimary } from '../utils/db';
+import { findAllUsers, findUsersByIds } from './userservice';
+import { findAllTopics, findTopicsByIds } from './topicService';
+import { findAllMilestones, findMilestonesByIds } from './milestoneService';
+
+const CHANGE_LOG_RETENTION_DAYS = parseInt(process.env.CHANGE_LOG_RETENTION_DAYS || '7', 10);
+
+interface DeltaResource {
+  key: string; // row key column in the list response
+  tables: string[]; // change_log.table_name values that affect the collection
+  findAll: () => Promise<any[]>;
+  findByIds: (ids: number[]) => Promise<any[]>;
+  // Maps change_log entries since a cursor to collection keys; defaults to row_id of `tables`.
+  changedKeysQuery?: string;
+}
+
+// Users are listed with their teacher/student assignments, so changes to those tables
+// (keyed by teachid/sid, i.e. users.user_role_link) also mark the user as changed. The
+// assignments embed subject names/levels, gurukul names and milestone class/level, so a
+// change to a subject, gurukul or milestone marks every user assigned to it.
+const USERS_CHANGED_KEYS = `
+  WITH changed AS (
+    SELECT DISTINCT table_name, row_id
+    FROM public.change_log
+    WHERE txid >= $1 AND table_name = ANY($2::text[])
+  )
+  SELECT row_id::int AS id FROM changed WHERE table_name = 'public.users'
+  UNION
+  SELECT u.userid AS id
+  FROM changed c
+  JOIN public.users u ON u.user_role_link::text = c.row_id
+  WHERE (u.role = 'teacher' AND c.table_name IN ('teachmate.teachers', 'teachmate.teacher_assignments'))
+     OR (u.role = 'student' AND c.table_name IN ('studentmate.students', 'studentmate.sgurukul', 'studentmate.smilestones'))
+  UNION
+  SELECT u.userid AS id
+  FROM changed c
+  JOIN teachmate.teacher_assignments ta ON ta.sub_id::text = c.row_id
+  JOIN public.users u ON u.role = 'teacher' AND u.user_role_link = ta.teacher_id
+  WHERE c.table_name = 'teachmate.subjects'
+  UNION
+  SELECT u.userid AS id
+  FROM changed c
+  JOIN studentmate.sgurukul sg ON sg.gid::text = c.row_id
+  JOIN public.users u ON u.role = 'student' AND u.user_role_link = sg.sid
+  WHERE c.table_name = 'public.gurukul'
+  UNION
+  SELECT u.userid AS id
+  FROM changed c
+  JOIN studentmate.smilestones sm ON sm.mid::text = c.row_id
+  JOIN public.users u ON u.role = 'student' AND u.user_role_link = sm.sid
+  WHERE c.table_name = 'public.milestones'
+`;
+
+const DEFAULT_CHANGED_KEYS = `
+  SELECT DISTINCT row_id::int AS id
+  FROM public.change_log
+  WHERE txid >= $1 AND table_name = ANY($2::text[])
+`;
+
+export const DELTA_RESOURCES: { [resource: string]: DeltaResource } = {
+  users: {
+    key: 'userid',
+    tables: [
+      'public.users', 'teachmate.teachers', 'teachmate.teacher_assignments',
+      'studentmate.students', 'studentmate.sgurukul', 'studentmate.smilestones',
+      'teachmate.subjects', 'public.gurukul', 'public.milestones',
+    ],
+    findAll: () => findAllUsers(),
+    findByIds: findUsersByIds,
+    changedKeysQuery: USERS_CHANGED_KEYS,
+  },
+  topics: {
+    key: 'tid',
+    tables: ['teachmate.topics'],
+    findAll: findAllTopics,
+    findByIds: findTopicsByIds,
+  },
+  milestones: {
+    key: 'mid',
+    tables: ['public.milestones'],
+    findAll: findAllMilestones,
+    findByIds: findMilestonesByIds,
+  },
+};
+
+export interface Delta {
+  table: string;
+  seq: number;
+  reset: boolean;
+  upserts: any[];
+  deletes: number[];
+}
+
+/**
+ * Returns the changes to a collection since a cursor from an earlier call.
+ * @param resource One of the DELTA_RESOURCES names (users, topics, milestones).
+ * @param since The client's cursor; omit for a full sync.
+ * @returns A Promise that resolves to the Delta, or null for an unknown resource.
+ */
+export const findCollectionDelta = async (resource: string, since?: number): Promise<Delta | null> => {
+  const config = DELTA_RESOURCES[resource];
+  if (!config) {
+    return null;
+  }
+  return onPrimary(() => readCollectionDelta(resource, config, since));
+};
+
+// findCollectionDelta on the primary: a replica could still miss rows committed below the cursor
+const readCollectionDelta = async (resource: string, config: DeltaResource, since?: number): Promise<Delta> => {
+  try {
+    // Read the cursor first: everything below it has finished and is visible to the queries that follow.
+    const bounds = await pool.query(`
+      SELECT
+        txid_snapshot_xmin(txid_current_snapshot())::bigint AS head,
+        (SELECT MIN(txid) FROM public.change_log)::bigint AS oldest
+    `);
+    const head = Number(bounds.rows[0].head);
+    const oldest = bounds.rows[0].oldest === null ? null : Number(bounds.rows[0].oldest);
+
+    // Unusable: first sync, a cursor from another database, or one older than the pruned log.
+    const cursorUsable = since !== undefined && since >= 0 && since <= head && (oldest === null || since >= oldest);
+    if (!cursorUsable) {
+      return { table: resource, seq: head, reset: true, upserts: await config.findAll(), deletes: [] };
+    }
+
+    const changed = await pool.query(config.changedKeysQuery || DEFAULT_CHANGED_KEYS, [since, config.tables]);
+    const ids: number[] = changed.rows.map((row: any) => row.id).filter((id: any) => id !== null);
+    const upserts = await config.findByIds(ids);
+    const present = new Set(upserts.map((row: any) => row[config.key]));
+    const deletes = ids.filter((id) => !present.has(id));
+    return { table: resource, seq: head, reset: false, upserts, deletes };
+  } catch (error) {
+    console.error(`Error in findCollectionDelta (${resource}, since ${since}):`, error);
+    throw new Error(`Could not retrieve changes for ${resource}`);
+  }
+};
+
+/**
+ * Deletes change_log entries older than CHANGE_LOG_RETENTION_DAYS.
+ * The newest entry is always kept, so cursors issued since then stay usable on a quiet
+ * database; clients whose cursor falls before the remaining entries get a full reset.
+ * @returns A Promise that resolves to the number of entries removed.
+ */
+export const pruneChangeLog = async (): Promise<number> => {
+  try {
+    const result = await pool.query(
+      `DELETE FROM public.change_log
+       WHERE changed_at < now() - make_interval(days => $1)
+         AND seq < (SELECT MAX(seq) FROM public.change_log)`,
+      [CHANGE_LOG_RETENTION_DAYS]
+    );
+    return result.rowCount ?? 0;
+  } catch (error) {
+    console.error('Error in pruneChangeLog:', error);
+    throw new Error('Could not prune change log');
+  }
+};
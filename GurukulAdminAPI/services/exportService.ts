@@ -0,0 +1,77 @@
+// services/exportService.ts - Streams users, students and teachers for export
+// Each export is one query with the assignments flattened into columns. Rows are read
+// through a server-side cursor (DECLARE ... / FETCH n) on a dedicated connection, so
+// the API holds one batch in memory at a time however large the table is.
+
+import { forEachCursorBatch } from '../utils/cursor';
+
+export const EXPORT_BATCH_SIZE = parseInt(process.env.EXPORT_BATCH_SIZE || '1000', 10);
+
+export const EXPORT_QUERIES: { [kind: string]: string } = {
+  users: `
+    SELECT u.userid, u.username, u.email, u.role, u.isdeleted, u.created_at, u.user_role_link,
+           ts.subject_ids, ts.subjects,
+           sg.gid, g.gname, sg.status AS gurukul_status,
+           sm.mid, m.class, m.level, sm.status AS milestone_status, sm.score
+    FROM public.users u
+    LEFT JOIN LATERAL (
+      SELECT array_agg(s.subid ORDER BY s.subid) AS subject_ids,
+             string_agg(s.subname || ' (' || s.level || ')', '; ' ORDER BY s.subid) AS subjects
+      FROM teachmate.teacher_assignments ta
+      JOIN teachmate.subjects s ON s.subid = ta.sub_id
+      WHERE u.role = 'teacher' AND ta.teacher_id = u.user_role_link
+    ) ts ON true
+    LEFT JOIN studentmate.sgurukul sg ON u.role = 'student' AND sg.sid = u.user_role_link
+    LEFT JOIN public.gurukul g ON g.gid = sg.gid
+    LEFT JOIN studentmate.smilestones sm ON u.role = 'student' AND sm.sid = u.user_role_link
+    LEFT JOIN public.milestones m ON m.mid = sm.mid
+    ORDER BY u.userid
+  `,
+  students: `
+    SELECT st.sid, st.sname, st.email,
+           sg.gid, g.gname, sg.status AS gurukul_status, sg.starttime AS gurukul_start, sg.endtime AS gurukul_end,
+           sm.mid, m.class, m.level, sm.status AS milestone_status, sm.score,
+           sm.starttime AS milestone_start, sm.endtime AS milestone_end
+    FROM studentmate.students st
+    LEFT JOIN studentmate.sgurukul sg ON sg.sid = st.sid
+    LEFT JOIN public.gurukul g ON g.gid = sg.gid
+    LEFT JOIN studentmate.smilestones sm ON sm.sid = st.sid
+    LEFT JOIN public.milestones m ON m.mid = sm.mid
+    ORDER BY st.sid
+  `,
+  teachers: `
+    SELECT t.teachid, t.name, t.email, t.created_at, t.last_login,
+           ts.subject_ids, ts.subjects
+    FROM teachmate.teachers t
+    LEFT JOIN LATERAL (
+      SELECT array_agg(s.subid ORDER BY s.subid) AS subject_ids,
+             string_agg(s.subname || ' (' || s.level || ')', '; ' ORDER BY s.subid) AS subjects
+      FROM teachmate.teacher_assignments ta
+      JOIN teachmate.subjects s ON s.subid = ta.sub_id
+      WHERE ta.teacher_id = t.teachid
+    ) ts ON true
+    ORDER BY t.teachid
+  `,
+};
+
+// --- Export Service Functions ---
+
+/**
+ * Reads an export batch by batch through a server-side cursor (see utils/cursor.ts).
+ * onBatch is awaited before the next FETCH, so a slow consumer slows the reads down;
+ * it is called once with no rows for an empty export, so the column names are still known.
+ * @param kind 'users', 'students' or 'teachers'.
+ * @param onBatch Receives the column names and the next rows; resolve to false to stop early.
+ * @returns A Promise that resolves to the number of rows read.
+ */
+export const forEachExportBatch = async (
+  kind: string,
+  onBatch: (columns: string[], rows: any[]) => Promise<boolean>
+): Promise<number> => {
+  try {
+    return await forEachCursorBatch(EXPORT_QUERIES[kind], [], EXPORT_BATCH_SIZE, (rows, columns) => onBatch(columns, rows));
+  } catch (error) {
+    console.error(`Error in forEachExportBatch (kind: ${kind}):`, error);
+    throw new Error(`Could not export ${kind}`);
+  }
+};
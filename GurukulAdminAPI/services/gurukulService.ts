@@ -1,7 +1,12 @@
 // services/gurukulService.ts - Handles the core business logic for Gurukuls and Gurukul Offerings
 // Now interacts with the PostgreSQL database and safely handles rowCount.
 
-import pool from '../utils/db'; // Import the database connection pool
+import pool, { isUniqueViolation, Queryable, queryPrepared, reader, readsAreCurrent } from '../utils/db'; // Import the database connection pool
+import { isValidGtype } from './levelService'; // Offering types come from public.level_mapping
+import { clearLoader, getLoader, rowsByKey } from '../utils/dataLoader';
+import { cachedRow, gurukulCache, milestoneCache, offeringCache } from './referenceCache';
+
+const GURUKUL_LOADER = 'gurukul';
 
 // --- Gurukul Service Functions ---
 
@@ -11,7 +16,7 @@ import pool from '../utils/db'; // Import the database connection pool
  */
 export const findAllGurukuls = async (): Promise<any[]> => {
   try {
-    const result = await pool.query('SELECT gid, gname FROM public.gurukul ORDER BY gid ASC');
+    const result = await queryPrepared('gurukul_all', 'SELECT gid, gname FROM public.gurukul ORDER BY gid ASC', [], reader());
     console.log("In findAllGurukuls");
     //console.table(result.rows);
     return result.rows;
@@ -21,14 +26,48 @@ export const findAllGurukuls = async (): Promise<any[]> => {
   }
 };
 
+/**
+ * Retrieves the gurukuls with the given IDs in one query.
+ * @param gids The gurukul IDs.
+ * @returns A Promise that resolves to the Gurukul objects that exist, ordered by gid.
+ */
+export const findGurukulsByIds = async (gids: number[]): Promise<any[]> => {
+  if (gids.length === 0) {
+    return [];
+  }
+  try {
+    const result = await queryPrepared('gurukul_by_ids', 'SELECT gid, gname FROM public.gurukul WHERE gid = ANY($1::int[]) ORDER BY gid ASC', [gids], reader());
+    return result.rows;
+  } catch (error) {
+    console.error('Error in findGurukulsByIds:', error);
+    throw new Error('Could not retrieve gurukuls by IDs');
+  }
+};
+
+// Batch loader behind findGurukulById; what it reads goes into the reference cache unless it came from a replica
+const loadGurukuls = async (gids: number[]): Promise<Map<number, any>> => {
+  const rows = await findGurukulsByIds(gids);
+  if (readsAreCurrent()) {
+    rows.forEach((row) => gurukulCache.set(row.gid, { ...row }));
+  }
+  return rowsByKey(rows, 'gid');
+};
+
 /**
  * Retrieves a single gurukul by its ID from the database.
+ * On the pool, it is answered from the reference cache (services/referenceCache.ts) when
+ * possible, and misses within one request are batched and remembered (utils/dataLoader.ts);
+ * a transaction client is always queried directly, so it sees its own uncommitted rows.
  * @param gid The ID of the gurukul.
+ * @param db Optional transaction client (defaults to the pool).
  * @returns A Promise that resolves to the Gurukul object if found, otherwise undefined.
  */
-export const findGurukulById = async (gid: number): Promise<any | undefined> => {
+export const findGurukulById = async (gid: number, db: Queryable = pool): Promise<any | undefined> => {
   try {
-    const result = await pool.query('SELECT gid, gname FROM public.gurukul WHERE gid = $1', [gid]);
+    if (db === pool) {
+      return cachedRow(gurukulCache, gid) ?? await getLoader(GURUKUL_LOADER, loadGurukuls).load(gid);
+    }
+    const result = await db.query('SELECT gid, gname FROM public.gurukul WHERE gid = $1', [gid]);
     console.log("In findGurukulById");
     return result.rows[0]; // Returns undefined if no row is found
   } catch (error) {
@@ -40,12 +79,13 @@ export const findGurukulById = async (gid: number): Promise<any | undefined> =>
 /**
  * Creates a new gurukul in the database.
  * @param gname The name of the gurukul.
+ * @param db Optional transaction client (defaults to the pool).
  * @returns A Promise that resolves to the newly created Gurukul object.
  */
-export const createNewGurukul = async (gname: string): Promise<any> => {
+export const createNewGurukul = async (gname: string, db: Queryable = pool): Promise<any> => {
   try {
     // Note: Assuming `gid` is handled by an IDENTITY column or SERIAL in your database for auto-increment.
-    const result = await pool.query(
+    const result = await db.query(
       'INSERT INTO public.gurukul (gname) VALUES ($1) RETURNING gid, gname',
       [gname]
     );
@@ -70,6 +110,10 @@ export const updateExistingGurukul = async (gid: number, gname: string): Promise
       [gname, gid]
     );
     console.log("updateExistingGurukul");
+    clearLoader(GURUKUL_LOADER, gid);
+    if (result.rows[0]) {
+      gurukulCache.set(gid, { ...result.rows[0] });
+    }
     return result.rows[0]; // Returns undefined if no row was updated
   } catch (error) {
     console.error(`Error in updateExistingGurukul (GID: ${gid}):`, error);
@@ -96,6 +140,11 @@ export const deleteGurukulAndOfferings = async (gid: number): Promise<boolean> =
     const deleteGurukulResult = await client.query('DELETE FROM public.gurukul WHERE gid = $1 RETURNING gid', [gid]);
 
     await client.query('COMMIT'); // Commit transaction
+    clearLoader(GURUKUL_LOADER, gid);
+    const deletedOids = new Set(deleteOfferingsResult.rows.map((row) => row.oid));
+    gurukulCache.delete(gid);
+    offeringCache.deleteWhere((offering) => offering.gid === gid);
+    milestoneCache.deleteWhere((milestone) => deletedOids.has(milestone.oid));
 
     return (deleteGurukulResult.rowCount ?? 0) > 0; // Safely use rowCount
   } catch (error) {
@@ -115,7 +164,7 @@ export const deleteGurukulAndOfferings = async (gid: number): Promise<boolean> =
  */
 export const findAllGurukulOfferings = async (): Promise<any[]> => {
   try {
-    const result = await pool.query('SELECT oid, gid, gtype FROM public.gurukul_offerings ORDER BY oid ASC');
+    const result = await queryPrepared('offering_all', 'SELECT oid, gid, gtype FROM public.gurukul_offerings ORDER BY oid ASC', [], reader());
     console.log("In findAllGurukulOfferings");
     return result.rows;
   } catch (error) {
@@ -126,13 +175,22 @@ export const findAllGurukulOfferings = async (): Promise<any[]> => {
 
 /**
  * Retrieves a single gurukul offering by its ID from the database.
+ * On the pool, it is answered from the reference cache (services/referenceCache.ts) when possible.
  * @param oid The ID of the gurukul offering.
+ * @param db Optional transaction client (defaults to the pool).
  * @returns A Promise that resolves to the GurukulOffering object if found, otherwise undefined.
  */
-export const findGurukulOfferingById = async (oid: number): Promise<any | undefined> => {
+export const findGurukulOfferingById = async (oid: number, db: Queryable = pool): Promise<any | undefined> => {
   try {
-    const result = await pool.query('SELECT oid, gid, gtype FROM public.gurukul_offerings WHERE oid = $1', [oid]);
+    const cached = db === pool ? cachedRow(offeringCache, oid) : undefined;
+    if (cached) {
+      return cached;
+    }
+    const result = await (db === pool ? reader() : db).query('SELECT oid, gid, gtype FROM public.gurukul_offerings WHERE oid = $1', [oid]);
     console.log("In findGurukulOfferingById ");
+    if (db === pool && result.rows[0] && readsAreCurrent()) {
+      offeringCache.set(oid, { ...result.rows[0] });
+    }
     return result.rows[0];
   } catch (error) {
     console.error(`Error in findGurukulOfferingById (OID: ${oid}):`, error);
@@ -143,7 +201,7 @@ export const findGurukulOfferingById = async (oid: number): Promise<any | undefi
 export const getGurukulOfferingsByGid = async (gid: number) => {
   try{
   const query = 'SELECT * FROM gurukul_offerings WHERE gid = $1';
-  const result = await pool.query(query, [gid]); // adjust if using ORM
+  const result = await reader().query(query, [gid]); // adjust if using ORM
   return result.rows;
   }
   catch(error) {
@@ -155,36 +213,35 @@ export const getGurukulOfferingsByGid = async (gid: number) => {
  * Creates a new gurukul offering in the database.
  * @param gid The Gurukul ID it belongs to.
  * @param gtype The type of offering (G1, G2, G3, G4).
+ * @param db Optional transaction client (defaults to the pool).
  * @returns A Promise that resolves to the newly created GurukulOffering object if successful, or throws an error.
  */
-export const createNewGurukulOffering = async (gid: number, gtype: string): Promise<any | null | undefined> => {
-  // Validate gtype against the CHECK constraint
-  const validGTypes = ['G1', 'G2', 'G3', 'G4'];
-  if (!validGTypes.includes(gtype)) {
+export const createNewGurukulOffering = async (gid: number, gtype: string, db: Queryable = pool): Promise<any | null | undefined | false> => {
+  // Validate gtype against the level mapping
+  if (!(await isValidGtype(gtype))) {
     return undefined; // Indicate invalid gtype
   }
 
   try {
-    // Check if Gurukul exists before creating the offering (to enforce FK constraint logic)
-    const gurukulExists = await findGurukulById(gid);
-    if (!gurukulExists) {
-      return null; // Indicate Gurukul does not exist
-    }
-    // Check for duplicate offering (same gid and gtype)
-    const existingOffering = await pool.query(
-      'SELECT oid FROM public.gurukul_offerings WHERE gid = $1 AND gtype = $2',
-      [gid, gtype]
-    );
-    if (existingOffering.rowCount != null && existingOffering.rowCount > 0) {
-      return false; // Indicate duplicate offering
-    }
-
-    const result = await pool.query(
-      'INSERT INTO public.gurukul_offerings (gid, gtype) VALUES ($1, $2) RETURNING oid, gid, gtype',
+    // One statement: insert only if the Gurukul exists; the (gid, gtype) unique index turns a
+    // duplicate into "nothing inserted" instead of a second row, even for concurrent requests.
+    const result = await db.query(
+      `WITH parent AS (SELECT gid FROM public.gurukul WHERE gid = $1),
+       inserted AS (
+         INSERT INTO public.gurukul_offerings (gid, gtype)
+         SELECT gid, $2::text FROM parent
+         ON CONFLICT (gid, gtype) DO NOTHING
+         RETURNING oid, gid, gtype)
+       SELECT EXISTS (SELECT 1 FROM parent) AS parent_exists,
+              (SELECT row_to_json(inserted) FROM inserted) AS offering`,
       [gid, gtype]
     );
     console.log("In createNewGurukulOffering ");
-    return result.rows[0];
+    const { parent_exists, offering } = result.rows[0];
+    if (!parent_exists) {
+      return null; // Indicate Gurukul does not exist
+    }
+    return offering ?? false; // false: duplicate offering (same gid and gtype)
   } catch (error) {
     console.error('Error in createNewGurukulOffering:', error);
     throw new Error('Could not create gurukul offering');
@@ -199,8 +256,7 @@ export const createNewGurukulOffering = async (gid: number, gtype: string): Prom
  * @returns A Promise that resolves to the updated GurukulOffering object if successful, or throws an error.
  */
 export const updateExistingGurukulOffering = async (oid: number, gid: number, gtype: string): Promise<any | null | undefined | false> => {
-  const validGTypes = ['G1', 'G2', 'G3', 'G4'];
-  if (!validGTypes.includes(gtype)) {
+  if (!(await isValidGtype(gtype))) {
     return undefined; // Indicate invalid gtype
   }
 
@@ -210,22 +266,19 @@ export const updateExistingGurukulOffering = async (oid: number, gid: number, gt
     if (!gurukulExists) {
       return null; // Indicate Gurukul does not exist
     }
-    // Check for duplicate *for another offering* (if changing gtype or gid)
-    const existingOfferingForOtherId = await pool.query(
-      'SELECT oid FROM public.gurukul_offerings WHERE gid = $1 AND gtype = $2 AND oid != $3',
-      [gid, gtype, oid]
-    );
-    if (existingOfferingForOtherId.rowCount !=null && existingOfferingForOtherId.rowCount > 0) {
-      return false; // Indicate this update would create a duplicate with another existing offering
-    }
-
     const result = await pool.query(
       'UPDATE public.gurukul_offerings SET gid = $1, gtype = $2 WHERE oid = $3 RETURNING oid, gid, gtype',
       [gid, gtype, oid]
     );
     console.log("In updateExistingGurukulOffering");
+    if (result.rows[0]) {
+      offeringCache.set(oid, { ...result.rows[0] });
+    }
     return result.rows[0]; // Returns undefined if no row was updated
   } catch (error) {
+    if (isUniqueViolation(error)) {
+      return false; // Indicate this update would create a duplicate with another existing offering
+    }
     console.error(`Error in updateExistingGurukulOffering (OID: ${oid}):`, error);
     throw new Error(`Could not update gurukul offering with ID ${oid}`);
   }
@@ -240,6 +293,8 @@ export const deleteGurukulOfferingById = async (oid: number): Promise<boolean> =
   try {
     const result = await pool.query('DELETE FROM public.gurukul_offerings WHERE oid = $1 RETURNING oid', [oid]);
     console.log("In deleteGurukulOfferingById ");
+    offeringCache.delete(oid);
+    milestoneCache.deleteWhere((milestone) => milestone.oid === oid);
     return (result.rowCount ?? 0) > 0; // Safely use rowCount
   } catch (error) {
     console.error(`Error in deleteGurukulOfferingById (OID: ${oid}):`, error);
@@ -247,3 +302,30 @@ export const deleteGurukulOfferingById = async (oid: number): Promise<boolean> =
   }
 };
 
+
+/**
+ * Offering types each gurukul does not have yet, computed in SQL as an anti-join of
+ * gurukul x level_mapping gtypes against gurukul_offerings. Gurukuls that already have
+ * every gtype are left out, so the result stays small as gurukuls fill up.
+ * @param gid Optional gurukul ID to compute a single entry.
+ * @returns A Promise that resolves to [{ gid, gtypes }] ordered by gid.
+ */
+export const findAvailableGtypes = async (gid?: number): Promise<{ gid: number; gtypes: string[] }[]> => {
+  try {
+    const result = await reader().query(
+      `SELECT g.gid, array_agg(lm.gtype ORDER BY length(lm.gtype), lm.gtype) AS gtypes
+       FROM public.gurukul g
+       CROSS JOIN (SELECT DISTINCT gtype FROM public.level_mapping) lm
+       WHERE ($1::int IS NULL OR g.gid = $1)
+         AND NOT EXISTS (
+           SELECT 1 FROM public.gurukul_offerings go WHERE go.gid = g.gid AND go.gtype = lm.gtype)
+       GROUP BY g.gid
+       ORDER BY g.gid`,
+      [gid ?? null]
+    );
+    return result.rows;
+  } catch (error) {
+    console.error(`Error in findAvailableGtypes (GID: ${gid}):`, error);
+    throw new Error('Could not retrieve available offering types');
+  }
+};
@@ -0,0 +1,400 @@
+// services/jobService.ts - Background job queue for long-running admin operations
+// Jobs are rows in public.admin_jobs (see `tables`, section 8). POST /jobs inserts a
+// 'queued' row and returns at once; a small pool of workers in this process claims
+// queued rows (FOR UPDATE SKIP LOCKED, so several API processes can share the table),
+// runs the matching handler and records progress, result or error on the row.
+// While a worker holds a job it touches the row every JOB_HEARTBEAT_MS, however long a step
+// takes. A job whose worker died (no heartbeat for JOB_STALE_MS) is queued again, up to
+// MAX_ATTEMPTS times; every handler is safe to re-run. Progress and the result are only
+// written while the row still belongs to the worker's claim (worker + attempts), so a worker
+// that lost its job to a requeue cannot complete it a second time.
+
+import os from 'os';
+import pool from '../utils/db';
+import { deleteGurukulAndOfferings } from './gurukulService';
+import { deleteSubjectById } from './subjectService';
+import { assignLessonsToStudentByLevel } from './studentDirectService';
+import { createNewUser } from './userservice';
+
+const WORKER_COUNT = Math.max(1, parseInt(process.env.JOB_WORKERS || '2', 10));
+const POLL_INTERVAL_MS = parseInt(process.env.JOB_POLL_MS || '2000', 10);
+const STALE_AFTER_MS = parseInt(process.env.JOB_STALE_MS || '300000', 10);
+const HEARTBEAT_MS = parseInt(process.env.JOB_HEARTBEAT_MS || String(Math.min(60000, STALE_AFTER_MS / 5)), 10);
+const JOB_RETENTION_DAYS = parseInt(process.env.JOB_RETENTION_DAYS || '7', 10);
+const PROGRESS_WRITE_MS = 500; // progress is written at most this often per job
+const MAX_ATTEMPTS = 3;
+const MAX_BATCH_ITEMS = 5000;
+const WORKER_ID = `${os.hostname()}:${process.pid}`;
+
+// `percent` is derived so clients do not have to guard against total = 0.
+const JOB_COLUMNS = `
+  id, job_type, payload, status, done, total,
+  CASE WHEN total > 0 THEN ROUND(100.0 * done / total)::int ELSE NULL END AS percent,
+  message, result, error, attempts, created_at, started_at, finished_at, updated_at
+`;
+
+export interface JobContext {
+  /** Records progress; writes are throttled, so call it as often as convenient. */
+  progress: (done: number, total: number, message?: string) => Promise<void>;
+}
+
+interface JobHandler {
+  /** Returns an error message for an unusable payload, or null. */
+  validate: (payload: any) => string | null;
+  /** Does the work; the resolved value is stored as the job's result. Throwing fails the job. */
+  run: (payload: any, ctx: JobContext) => Promise<any>;
+}
+
+const isId = (value: any): boolean => Number.isInteger(value) && value > 0;
+
+const validateList = (payload: any, field: string, validateItem: (item: any) => boolean, itemShape: string): string | null => {
+  const items = payload?.[field];
+  if (!Array.isArray(items) || items.length === 0 || items.length > MAX_BATCH_ITEMS) {
+    return `payload.${field} must be a non-empty array of at most ${MAX_BATCH_ITEMS} items`;
+  }
+  return items.every(validateItem) ? null : `Each item of payload.${field} must be ${itemShape}`;
+};
+
+// --- Job Handlers ---
+
+export const JOB_TYPES: { [jobType: string]: JobHandler } = {
+  delete_gurukul: {
+    validate: (payload) => (isId(payload?.gid) ? null : 'payload.gid must be a positive integer'),
+    run: async (payload, ctx) => {
+      await ctx.progress(0, 1, `Deleting gurukul ${payload.gid} and its offerings`);
+      const deleted = await deleteGurukulAndOfferings(payload.gid);
+      if (!deleted) {
+        throw new Error(`Gurukul ${payload.gid} not found`);
+      }
+      await ctx.progress(1, 1, `Gurukul ${payload.gid} deleted`);
+      return { gid: payload.gid, deleted };
+    },
+  },
+
+  delete_subject: {
+    validate: (payload) => (isId(payload?.subid) ? null : 'payload.subid must be a positive integer'),
+    run: async (payload, ctx) => {
+      await ctx.progress(0, 1, `Deleting subject ${payload.subid} and its topics`);
+      const deleted = await deleteSubjectById(payload.subid);
+      if (!deleted) {
+        throw new Error(`Subject ${payload.subid} not found`);
+      }
+      await ctx.progress(1, 1, `Subject ${payload.subid} deleted`);
+      return { subid: payload.subid, deleted };
+    },
+  },
+
+  // payload: { students: [{ sid, level }, ...] }
+  assign_lessons: {
+    validate: (payload) => validateList(payload, 'students',
+      (s) => isId(s?.sid) && typeof s.level === 'string' && s.level !== '', '{ sid: number, level: string }'),
+    run: async (payload, ctx) => {
+      const students: { sid: number; level: string }[] = payload.students;
+      let newSlogsCount = 0;
+      for (let i = 0; i < students.length; i++) {
+        const { sid, level } = students[i];
+        const outcome = await assignLessonsToStudentByLevel(sid, level);
+        newSlogsCount += outcome.newSlogsCount;
+        await ctx.progress(i + 1, students.length, `Assigned lessons to student ${sid}`);
+      }
+      return { students: students.length, newSlogsCount };
+    },
+  },
+
+  // payload: { users: [{ username, email, role, subject_ids?, gurukul_id?, milestone_id? }, ...] }
+  // Duplicate emails are skipped and reported, not treated as failures.
+  create_users: {
+    validate: (payload) => validateList(payload, 'users',
+      (u) => typeof u?.username === 'string' && u.username !== '' && typeof u.email === 'string' && u.email !== ''
+        && typeof u.role === 'string' && u.role !== '',
+      '{ username: string, email: string, role: string, ... }'),
+    run: async (payload, ctx) => {
+      const users: any[] = payload.users;
+      const created: number[] = [];
+      const duplicates: string[] = [];
+      const failed: { email: string; error: string }[] = [];
+      for (let i = 0; i < users.length; i++) {
+        const u = users[i];
+        try {
+          const newUser = await createNewUser(u.username, u.email, u.role, u.gurukul_id, u.milestone_id, u.subject_ids);
+          if (newUser === false) {
+            duplicates.push(u.email);
+          } else {
+            created.push(newUser.userid);
+          }
+        } catch (error: any) {
+          failed.push({ email: u.email, error: error.message });
+        }
+        await ctx.progress(i + 1, users.length, `Processed ${u.email}`);
+      }
+      return { created: created.length, userids: created, duplicates, failed };
+    },
+  },
+};
+
+// --- Queue Service Functions ---
+
+/**
+ * Checks a job request before it is queued.
+ * @param jobType One of the JOB_TYPES keys.
+ * @param payload The job's parameters.
+ * @returns An error message, or null when the job can be queued.
+ */
+export const validateJob = (jobType: string, payload: any): string | null => {
+  const handler = JOB_TYPES[jobType];
+  if (!handler) {
+    return `Unknown job type '${jobType}'. Expected one of: ${Object.keys(JOB_TYPES).join(', ')}`;
+  }
+  return handler.validate(payload);
+};
+
+/**
+ * Queues a job and wakes an idle worker.
+ * @param jobType One of the JOB_TYPES keys (call validateJob first).
+ * @param payload The job's parameters.
+ * @returns A Promise that resolves to the new job row.
+ */
+export const enqueueJob = async (jobType: string, payload: any): Promise<any> => {
+  try {
+    const result = await pool.query(
+      `INSERT INTO public.admin_jobs (job_type, payload) VALUES ($1, $2) RETURNING ${JOB_COLUMNS}`,
+      [jobType, JSON.stringify(payload ?? {})]
+    );
+    wakeWorkers();
+    return result.rows[0];
+  } catch (error) {
+    console.error(`Error in enqueueJob (type: ${jobType}):`, error);
+    throw new Error('Could not queue job');
+  }
+};
+
+/**
+ * Retrieves a job with its progress.
+ * @param id The job ID.
+ * @returns A Promise that resolves to the job row, or undefined if not found.
+ */
+export const findJobById = async (id: number): Promise<any | undefined> => {
+  try {
+    const result = await pool.query(`SELECT ${JOB_COLUMNS} FROM public.admin_jobs WHERE id = $1`, [id]);
+    return result.rows[0];
+  } catch (error) {
+    console.error(`Error in findJobById (ID: ${id}):`, error);
+    throw new Error(`Could not retrieve job with ID ${id}`);
+  }
+};
+
+/**
+ * Retrieves the most recent jobs, newest first.
+ * @param limit Maximum number of jobs to return.
+ * @param status Optional status filter (queued, running, succeeded, failed).
+ * @returns A Promise that resolves to an array of job rows.
+ */
+export const findRecentJobs = async (limit: number, status?: string): Promise<any[]> => {
+  try {
+    const result = await pool.query(
+      `SELECT ${JOB_COLUMNS} FROM public.admin_jobs
+       WHERE $2::text IS NULL OR status = $2
+       ORDER BY id DESC LIMIT $1`,
+      [limit, status ?? null]
+    );
+    return result.rows;
+  } catch (error) {
+    console.error('Error in findRecentJobs:', error);
+    throw new Error('Could not retrieve jobs');
+  }
+};
+
+/**
+ * Deletes finished jobs older than JOB_RETENTION_DAYS.
+ * @returns A Promise that resolves to the number of jobs removed.
+ */
+export const pruneJobs = async (): Promise<number> => {
+  try {
+    const result = await pool.query(
+      `DELETE FROM public.admin_jobs
+       WHERE status IN ('succeeded', 'failed') AND finished_at < now() - make_interval(days => $1)`,
+      [JOB_RETENTION_DAYS]
+    );
+    return result.rowCount ?? 0;
+  } catch (error) {
+    console.error('Error in pruneJobs:', error);
+    throw new Error('Could not prune jobs');
+  }
+};
+
+// --- Worker Pool ---
+
+let workersRunning = false;
+let idleWaiters: (() => void)[] = [];
+let maintenanceTimer: NodeJS.Timeout | null = null;
+let workerLoops: Promise<void>[] = [];
+
+const wakeWorkers = (): void => {
+  const waiters = idleWaiters;
+  idleWaiters = [];
+  waiters.forEach((resolve) => resolve());
+};
+
+const waitForWork = (): Promise<void> =>
+  new Promise((resolve) => {
+    const timer = setTimeout(resolve, POLL_INTERVAL_MS);
+    idleWaiters.push(() => {
+      clearTimeout(timer);
+      resolve();
+    });
+  });
+
+const claimNextJob = async (worker: string): Promise<any | undefined> => {
+  const result = await pool.query(
+    `UPDATE public.admin_jobs
+     SET status = 'running', attempts = attempts + 1, worker = $1,
+         started_at = COALESCE(started_at, NOW()), updated_at = NOW()
+     WHERE id = (
+       SELECT id FROM public.admin_jobs
+       WHERE status = 'queued'
+       ORDER BY id
+       FOR UPDATE SKIP LOCKED
+       LIMIT 1
+     )
+     RETURNING id, job_type, payload, attempts`,
+    [worker]
+  );
+  return result.rows[0];
+};
+
+// Matches the job row only while it still belongs to this claim ($1 id, $2 worker, $3 attempts)
+const OWNED_BY_CLAIM = `id = $1 AND worker = $2 AND attempts = $3 AND status = 'running'`;
+
+/**
+ * Records a claimed job's outcome.
+ * @returns A Promise that resolves to false if the job was requeued and claimed again meanwhile.
+ */
+const finishJob = async (job: any, worker: string, status: 'succeeded' | 'failed', result: any, error: string | null): Promise<boolean> => {
+  const update = await pool.query(
+    `UPDATE public.admin_jobs
+     SET status = $4, result = $5, error = $6, finished_at = NOW(), updated_at = NOW(),
+         done = CASE WHEN $4 = 'succeeded' THEN GREATEST(done, total) ELSE done END
+     WHERE ${OWNED_BY_CLAIM}`,
+    [job.id, worker, job.attempts, status, result === undefined ? null : JSON.stringify(result), error]
+  );
+  return (update.rowCount ?? 0) > 0;
+};
+
+const runJob = async (job: any, worker: string): Promise<void> => {
+  let lastWrite = 0;
+  const ctx: JobContext = {
+    progress: async (done, total, message) => {
+      const now = Date.now();
+      if (done < total && now - lastWrite < PROGRESS_WRITE_MS) {
+        return;
+      }
+      lastWrite = now;
+      await pool.query(
+        `UPDATE public.admin_jobs SET done = $4, total = $5, message = COALESCE($6, message), updated_at = NOW()
+         WHERE ${OWNED_BY_CLAIM}`,
+        [job.id, worker, job.attempts, done, total, message ?? null]
+      );
+    },
+  };
+
+  // Keeps the claim alive during steps that report no progress for a while
+  const heartbeat = setInterval(() => {
+    pool.query(`UPDATE public.admin_jobs SET updated_at = NOW() WHERE ${OWNED_BY_CLAIM}`, [job.id, worker, job.attempts])
+      .catch((error) => console.error(`Error in job ${job.id} heartbeat:`, error.message));
+  }, HEARTBEAT_MS);
+
+  try {
+    const result = await JOB_TYPES[job.job_type].run(job.payload, ctx);
+    if (await finishJob(job, worker, 'succeeded', result, null)) {
+      console.log(`Job ${job.id} (${job.job_type}) succeeded`);
+    } else {
+      console.warn(`Job ${job.id} (${job.job_type}) finished after it was requeued; result discarded`);
+    }
+  } catch (error: any) {
+    console.error(`Job ${job.id} (${job.job_type}) failed:`, error);
+    await finishJob(job, worker, 'failed', undefined, error.message).catch((finishError) => {
+      console.error(`Error recording failure of job ${job.id}:`, finishError);
+    });
+  } finally {
+    clearInterval(heartbeat);
+  }
+};
+
+const runWorker = async (worker: string): Promise<void> => {
+  while (workersRunning) {
+    let job: any;
+    try {
+      job = await claimNextJob(worker);
+    } catch (error) {
+      console.error(`Job worker ${worker} could not claim a job:`, error);
+    }
+    if (!job) {
+      await waitForWork();
+      continue;
+    }
+    if (!JOB_TYPES[job.job_type]) {
+      await finishJob(job, worker, 'failed', undefined, `Unknown job type '${job.job_type}'`).catch(() => undefined);
+      continue;
+    }
+    await runJob(job, worker);
+  }
+};
+
+/**
+ * Requeues running jobs whose worker has stopped sending heartbeats; jobs that already
+ * used MAX_ATTEMPTS are marked failed instead.
+ * @returns A Promise that resolves to the number of jobs recovered or failed.
+ */
+const recoverStaleJobs = async (): Promise<number> => {
+  try {
+    const result = await pool.query(
+      `UPDATE public.admin_jobs
+       SET status = CASE WHEN attempts < $2 THEN 'queued' ELSE 'failed' END,
+           error = CASE WHEN attempts < $2 THEN error ELSE 'Worker stopped responding' END,
+           finished_at = CASE WHEN attempts < $2 THEN NULL ELSE NOW() END,
+           worker = NULL, updated_at = NOW()
+       WHERE status = 'running' AND updated_at < NOW() - make_interval(secs => $1)`,
+      [STALE_AFTER_MS / 1000, MAX_ATTEMPTS]
+    );
+    const recovered = result.rowCount ?? 0;
+    if (recovered > 0) {
+      console.warn(`Recovered ${recovered} stale job(s)`);
+      wakeWorkers();
+    }
+    return recovered;
+  } catch (error) {
+    console.error('Error in recoverStaleJobs:', error);
+    return 0;
+  }
+};
+
+/**
+ * Starts JOB_WORKERS workers in this process. Safe to call repeatedly.
+ */
+export const startJobWorkers = (): void => {
+  if (workersRunning) {
+    return;
+  }
+  workersRunning = true;
+  workerLoops = [];
+  for (let i = 1; i <= WORKER_COUNT; i++) {
+    workerLoops.push(runWorker(`${WORKER_ID}/${i}`));
+  }
+  recoverStaleJobs();
+  maintenanceTimer = setInterval(recoverStaleJobs, Math.max(STALE_AFTER_MS / 5, 10000));
+  console.log(`Started ${WORKER_COUNT} job worker(s) as ${WORKER_ID}`);
+};
+
+/**
+ * Stops claiming new jobs.
+ * @returns A Promise that resolves once the jobs already running have finished.
+ */
+export const stopJobWorkers = (): Promise<void> => {
+  workersRunning = false;
+  if (maintenanceTimer) {
+    clearInterval(maintenanceTimer);
+    maintenanceTimer = null;
+  }
+  wakeWorkers();
+  return Promise.all(workerLoops.map((loop) => loop.catch(() => undefined))).then(() => undefined);
+};
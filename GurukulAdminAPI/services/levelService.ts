@@ -0,0 +1,87 @@
+// services/levelService.ts - The gtype -> level mapping, read from public.level_mapping
+// The mapping used to be a constant repeated in the API and in several admin UI pages.
+// It now lives in one table; this service loads it once, keeps it for LEVELS_CACHE_MS,
+// and validates offering types and levels against it. GET /levels serves the same
+// object with an ETag so clients can cache it too.
+
+import crypto from 'crypto';
+import pool from '../utils/db';
+
+const LEVELS_CACHE_MS = parseInt(process.env.LEVELS_CACHE_MS || '3600000', 10);
+
+export interface LevelMapping {
+  // gtype -> its levels in teaching order, e.g. { G1: ['L1', 'L2', 'L3', 'L4'], ... }
+  mapping: { [gtype: string]: string[] };
+  etag: string;
+}
+
+let cached: { levels: LevelMapping; expires: number } | null = null;
+let inFlight: Promise<LevelMapping> | null = null;
+
+// --- Level Service Functions ---
+
+/**
+ * Retrieves the gtype -> level mapping, ordered by gtype and position.
+ * @param fresh Skip the cache and reload.
+ * @returns A Promise that resolves to the mapping and an ETag derived from it.
+ */
+export const findLevelMapping = async (fresh = false): Promise<LevelMapping> => {
+  if (!fresh && cached && cached.expires > Date.now()) {
+    return cached.levels;
+  }
+  if (!inFlight) {
+    inFlight = pool.query(
+      `SELECT gtype, array_agg(level ORDER BY position) AS levels
+       FROM public.level_mapping
+       GROUP BY gtype
+       ORDER BY gtype`
+    )
+      .then((result) => {
+        const mapping: { [gtype: string]: string[] } = {};
+        for (const row of result.rows) {
+          mapping[row.gtype] = row.levels;
+        }
+        const etag = `"${crypto.createHash('sha1').update(JSON.stringify(mapping)).digest('hex')}"`;
+        const levels = { mapping, etag };
+        cached = { levels, expires: Date.now() + LEVELS_CACHE_MS };
+        return levels;
+      })
+      .finally(() => {
+        inFlight = null;
+      });
+  }
+  try {
+    return await inFlight;
+  } catch (error) {
+    console.error('Error in findLevelMapping:', error);
+    throw new Error('Could not load level mapping');
+  }
+};
+
+/**
+ * Checks that an offering type exists in the mapping.
+ * @param gtype The Gurukul Offering type (e.g., G1, G2).
+ */
+export const isValidGtype = async (gtype: string): Promise<boolean> => {
+  const { mapping } = await findLevelMapping();
+  return Object.prototype.hasOwnProperty.call(mapping, gtype);
+};
+
+/**
+ * Checks that a level exists in the mapping (for any gtype).
+ * @param level The level (e.g., L1, L5).
+ */
+export const isValidLevel = async (level: string): Promise<boolean> => {
+  const { mapping } = await findLevelMapping();
+  return Object.values(mapping).some((levels) => levels.includes(level));
+};
+
+/**
+ * Checks that a level belongs to the given offering type.
+ * @param gtype The Gurukul Offering type (e.g., G1, G2).
+ * @param level The milestone level (e.g., L1, L5).
+ */
+export const isValidLevelForGtype = async (gtype: string, level: string): Promise<boolean> => {
+  const { mapping } = await findLevelMapping();
+  return Object.prototype.hasOwnProperty.call(mapping, gtype) && mapping[gtype].includes(level);
+};
@@ -0,0 +1,123 @@
+// services/metricsService.ts - Process metrics for monitoring (GET /metrics)
+// Reports the in-process caches (hits, misses, evictions; see utils/lruCache.ts) and the
+// connection pools, so cache effectiveness and pool pressure can be watched without a profiler.
+// Under cluster.ts, collectClusterMetrics() adds up the metrics of every worker over IPC.
+
+import cluster from 'cluster';
+import pool, { readPool } from '../utils/db';
+import { cacheStats, CacheStats } from '../utils/lruCache';
+import { isWorkerMessage, METRICS_COLLECT, METRICS_REPORT, METRICS_REQUEST, METRICS_RESULT } from '../utils/workerMessages';
+import './referenceCache'; // registers the reference caches even before their first use
+
+// How long a worker waits for the primary's answer before reporting only itself
+const CLUSTER_METRICS_TIMEOUT_MS = parseInt(process.env.CLUSTER_METRICS_TIMEOUT_MS || '3000', 10);
+
+export interface PoolStats {
+  total: number;
+  idle: number;
+  waiting: number;
+}
+
+export interface Metrics {
+  pid: number;
+  uptimeSeconds: number;
+  pool: PoolStats;
+  readPool: PoolStats | null; // null when reads share the primary pool
+  caches: CacheStats[];
+}
+
+const poolStats = (p: typeof pool): PoolStats => ({ total: p.totalCount, idle: p.idleCount, waiting: p.waitingCount });
+
+/**
+ * Collects the current metrics of this process.
+ * @returns Pool connection counts and the counters of every LRU cache.
+ */
+export const collectMetrics = (): Metrics => ({
+  pid: process.pid,
+  uptimeSeconds: Math.round(process.uptime()),
+  pool: poolStats(pool),
+  readPool: readPool === pool ? null : poolStats(readPool),
+  caches: cacheStats(),
+});
+
+/** Metrics of all cluster workers: pools and cache counters summed, plus each worker's own. */
+export interface ClusterMetrics {
+  workers: number;
+  pool: PoolStats;
+  readPool: PoolStats | null;
+  caches: CacheStats[];
+  processes: Metrics[];
+}
+
+const addPoolStats = (a: PoolStats, b: PoolStats): PoolStats =>
+  ({ total: a.total + b.total, idle: a.idle + b.idle, waiting: a.waiting + b.waiting });
+
+/**
+ * Adds up the metrics of several processes; caches are matched by name.
+ * @param processes Metrics of each worker.
+ */
+export const mergeMetrics = (processes: Metrics[]): ClusterMetrics => {
+  const caches = new Map<string, CacheStats>();
+  for (const stats of processes.flatMap((m) => m.caches)) {
+    const sum = caches.get(stats.name);
+    caches.set(stats.name, sum
+      ? { ...sum, size: sum.size + stats.size, maxEntries: sum.maxEntries + stats.maxEntries, hits: sum.hits + stats.hits,
+          misses: sum.misses + stats.misses, evictions: sum.evictions + stats.evictions }
+      : { ...stats });
+  }
+  const readPools = processes.map((m) => m.readPool).filter((p): p is PoolStats => p !== null);
+  const empty: PoolStats = { total: 0, idle: 0, waiting: 0 };
+  return {
+    workers: processes.length,
+    pool: processes.map((m) => m.pool).reduce(addPoolStats, empty),
+    readPool: readPools.length > 0 ? readPools.reduce(addPoolStats, empty) : null,
+    caches: Array.from(caches.values()).map((c) => {
+      const lookups = c.hits + c.misses;
+      return { ...c, hitRate: lookups > 0 ? c.hits / lookups : null };
+    }),
+    processes: processes.slice().sort((a, b) => a.pid - b.pid),
+  };
+};
+
+// --- Cluster workers: answer the primary's collection rounds, and ask it for everyone's metrics ---
+
+let nextRequestId = 1;
+const pendingRequests = new Map<number, (metrics: Metrics[]) => void>();
+
+if (cluster.isWorker) {
+  process.on('message', (message: any) => {
+    if (!isWorkerMessage(message)) {
+      return;
+    }
+    if (message.type === METRICS_COLLECT) {
+      process.send!({ type: METRICS_REPORT, id: message.id, metrics: collectMetrics() });
+    } else if (message.type === METRICS_RESULT) {
+      pendingRequests.get(message.id)?.(message.metrics);
+    }
+  });
+}
+
+/**
+ * Collects the metrics of every worker when running under cluster.ts, otherwise of this process.
+ * If the primary does not answer in time, only this worker's metrics are reported.
+ * @returns The merged metrics of the cluster, or this process's metrics.
+ */
+export const collectClusterMetrics = (): Promise<Metrics | ClusterMetrics> => {
+  if (!cluster.isWorker || !process.send) {
+    return Promise.resolve(collectMetrics());
+  }
+  return new Promise((resolve) => {
+    const id = nextRequestId++;
+    const finish = (processes: Metrics[]) => {
+      clearTimeout(timer);
+      pendingRequests.delete(id);
+      resolve(mergeMetrics(processes.length > 0 ? processes : [collectMetrics()]));
+    };
+    const timer = setTimeout(() => {
+      console.warn('Cluster metrics: no answer from the primary, reporting this worker only');
+      finish([]);
+    }, CLUSTER_METRICS_TIMEOUT_MS);
+    pendingRequests.set(id, finish);
+    process.send!({ type: METRICS_REQUEST, id });
+  });
+};
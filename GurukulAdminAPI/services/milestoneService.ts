@@ -1,27 +1,13 @@
 // services/milestoneService.ts - Handles the core business logic for Milestones
 // Interacts with the public.milestones table and performs foreign key validation.
 
-import pool from '../utils/db'; // Import the database connection pool
+import pool, { isUniqueViolation, Queryable, queryPrepared, reader, readsAreCurrent } from '../utils/db'; // Import the database connection pool
 import { findGurukulOfferingById } from './gurukulService'; // Import to validate oid
+import { isValidLevelForGtype } from './levelService'; // Levels per gtype come from public.level_mapping
+import { clearLoader, getLoader, rowsByKey } from '../utils/dataLoader';
+import { cachedRow, milestoneCache } from './referenceCache';
 
-// --- Level Mapping (MUST be consistent with UI) ---
-export const LEVEL_MAPPING: { [key: string]: string[] } = {
-  "G1": ["L1", "L2", "L3", "L4"],
-  "G2": ["L5", "L6", "L7", "L8"],
-  "G3": ["L9", "L10", "L11", "L12"],
-  "G4": ["L13", "L14", "L15", "L16"],
-};
-
-/**
- * Helper function to check if a level is valid for a given gtype.
- * @param gtype The Gurukul Offering type (e.g., G1, G2).
- * @param level The milestone level (e.g., L1, L5).
- * @returns True if the level is valid for the gtype, false otherwise.
- */
-const isValidLevelForGType = (gtype: string, level: string): boolean => {
-  const allowedLevels = LEVEL_MAPPING[gtype];
-  return allowedLevels ? allowedLevels.includes(level) : false;
-};
+const MILESTONE_LOADER = 'milestone';
 
 // --- Milestone Service Functions ---
 
@@ -31,7 +17,7 @@ const isValidLevelForGType = (gtype: string, level: string): boolean => {
  */
 export const findAllMilestones = async (): Promise<any[]> => {
   try {
-    const result = await pool.query('SELECT mid, class, level, oid FROM public.milestones ORDER BY mid ASC');
+    const result = await queryPrepared('milestone_all', 'SELECT mid, class, level, oid FROM public.milestones ORDER BY mid ASC', [], reader());
     return result.rows;
   } catch (error) {
     console.error('Error in findAllMilestones:', error);
@@ -39,9 +25,31 @@ export const findAllMilestones = async (): Promise<any[]> => {
   }
 };
 
+/**
+ * Retrieves the milestones with the given IDs in one query (delta sync, findMilestoneById batches).
+ * @param mids The milestone IDs.
+ * @returns A Promise that resolves to the Milestone objects that still exist.
+ */
+export const findMilestonesByIds = async (mids: number[]): Promise<any[]> => {
+  if (mids.length === 0) {
+    return [];
+  }
+  try {
+    const result = await queryPrepared('milestone_by_ids',
+      'SELECT mid, class, level, oid FROM public.milestones WHERE mid = ANY($1::int[]) ORDER BY mid ASC',
+      [mids],
+      reader()
+    );
+    return result.rows;
+  } catch (error) {
+    console.error('Error in findMilestonesByIds:', error);
+    throw new Error('Could not retrieve milestones by IDs');
+  }
+};
+
 export const findAllMilestonesbyGid = async (gid: number): Promise<any[]> => {
   try {
-    const result = await pool.query(
+    const result = await reader().query(
       `SELECT
           m.mid,
           m.class,
@@ -69,15 +77,25 @@ export const findAllMilestonesbyGid = async (gid: number): Promise<any[]> => {
 };
 
 
+// Batch loader behind findMilestoneById; what it reads goes into the reference cache unless it came from a replica
+const loadMilestones = async (mids: number[]): Promise<Map<number, any>> => {
+  const rows = await findMilestonesByIds(mids);
+  if (readsAreCurrent()) {
+    rows.forEach((row) => milestoneCache.set(row.mid, { ...row }));
+  }
+  return rowsByKey(rows, 'mid');
+};
+
 /**
  * Retrieves a single milestone by its ID from the database.
+ * Answered from the reference cache (services/referenceCache.ts) when possible; misses within
+ * one request are batched into findMilestonesByIds and remembered (utils/dataLoader.ts).
  * @param mid The ID of the milestone.
  * @returns A Promise that resolves to the Milestone object if found, otherwise undefined.
  */
 export const findMilestoneById = async (mid: number): Promise<any | undefined> => {
   try {
-    const result = await pool.query('SELECT mid, class, level, oid FROM public.milestones WHERE mid = $1', [mid]);
-    return result.rows[0]; // Returns undefined if no row is found
+    return cachedRow(milestoneCache, mid) ?? await getLoader(MILESTONE_LOADER, loadMilestones).load(mid);
   } catch (error) {
     console.error(`Error in findMilestoneById (MID: ${mid}):`, error);
     throw new Error(`Could not retrieve milestone with ID ${mid}`);
@@ -90,7 +108,7 @@ export const findMilestoneById = async (mid: number): Promise<any | undefined> =
  */
 export const findDistinctMilestoneLevels = async (): Promise<string[]> => {
   try {
-    const result = await pool.query('SELECT DISTINCT level FROM public.milestones ORDER BY level ASC');
+    const result = await reader().query('SELECT DISTINCT level FROM public.milestones ORDER BY level ASC');
     return result.rows.map(row => row.level);
   } catch (error) {
     console.error('Error in findDistinctMilestoneLevels:', error);
@@ -103,42 +121,46 @@ export const findDistinctMilestoneLevels = async (): Promise<string[]> => {
  * Validates that the provided 'oid' exists in gurukul_offerings,
  * that the level is valid for the offering's gtype, and prevents duplicate levels for the same offering.
  * @param milestoneData Object containing class, level, and oid.
+ * @param db Optional transaction client (defaults to the pool).
  * @returns A Promise that resolves to the newly created Milestone object.
  * Returns null if gurukul offering (oid) does not exist.
  * Returns undefined if level is invalid for gtype.
  * Returns false if a duplicate level already exists for this offering.
  */
-export const createNewMilestone = async (milestoneData: { class: number; level: string; oid: number }): Promise<any | null | undefined | false> => {
+export const createNewMilestone = async (
+  milestoneData: { class: number; level: string; oid: number },
+  db: Queryable = pool
+): Promise<any | null | undefined | false> => {
   const { class: milestoneClass, level, oid } = milestoneData;
 
   try {
-    // 1. Validate that the oid (gurukul_offering) exists and get its gtype
-    const offering = await findGurukulOfferingById(oid);
-    if (!offering) {
+    // One statement: the offering must exist and the level must belong to its gtype
+    // (public.level_mapping); the (oid, level) unique index turns a duplicate into
+    // "nothing inserted" instead of a second row, even for concurrent requests.
+    const result = await db.query(
+      `WITH target AS (
+         SELECT go.oid, lm.level
+         FROM public.gurukul_offerings go
+         LEFT JOIN public.level_mapping lm ON lm.gtype = go.gtype AND lm.level = $2
+         WHERE go.oid = $3),
+       inserted AS (
+         INSERT INTO public.milestones (class, level, oid)
+         SELECT $1::int, level, oid FROM target WHERE level IS NOT NULL
+         ON CONFLICT (oid, level) DO NOTHING
+         RETURNING mid, class, level, oid)
+       SELECT EXISTS (SELECT 1 FROM target) AS offering_exists,
+              EXISTS (SELECT 1 FROM target WHERE level IS NOT NULL) AS level_valid,
+              (SELECT row_to_json(inserted) FROM inserted) AS milestone`,
+      [milestoneClass, level, oid]
+    );
+    const { offering_exists, level_valid, milestone } = result.rows[0];
+    if (!offering_exists) {
       return null; // Indicate that the foreign key (oid) is invalid
     }
-    const gtype = offering.gtype;
-
-    // 2. Validate if the provided level is valid for the offering's gtype
-    if (!isValidLevelForGType(gtype, level)) {
+    if (!level_valid) {
       return undefined; // Indicate level is out of range for this gtype
     }
-
-    // 3. Check for duplicate level for this specific offering (oid)
-    const existingMilestone = await pool.query(
-      'SELECT mid FROM public.milestones WHERE oid = $1 AND level = $2',
-      [oid, level]
-    );
-    if (existingMilestone.rowCount != null && existingMilestone.rowCount > 0) {
-      return false; // Indicate duplicate level for this offering
-    }
-
-    // Note: Assuming 'mid' is handled by an IDENTITY column or SERIAL in your database.
-    const result = await pool.query(
-      'INSERT INTO public.milestones (class, level, oid) VALUES ($1, $2, $3) RETURNING mid, class, level, oid',
-      [milestoneClass, level, oid]
-    );
-    return result.rows[0];
+    return milestone ?? false; // false: duplicate level for this offering
   } catch (error) {
     console.error('Error in createNewMilestone:', error);
     throw new Error('Could not create milestone');
@@ -172,7 +194,6 @@ export const updateExistingMilestone = async (mid: number, milestoneData: { clas
 
   // Determine the target OID and GType for validation
   const targetOid = oid !== undefined ? oid : currentMilestone.oid;
-  const targetLevel = level !== undefined ? level : currentMilestone.level;
 
   const targetOffering = await findGurukulOfferingById(targetOid);
   if (!targetOffering) {
@@ -181,23 +202,14 @@ export const updateExistingMilestone = async (mid: number, milestoneData: { clas
   const targetGtype = targetOffering.gtype;
 
   // 1. Validate if the new/updated level is valid for the target offering's gtype
-  if (level !== undefined && !isValidLevelForGType(targetGtype, level)) {
+  if (level !== undefined && !(await isValidLevelForGtype(targetGtype, level))) {
     return undefined; // Invalid level for target gtype
   }
   // Also check if current level becomes invalid after changing OID
-  if (oid !== undefined && !isValidLevelForGType(targetGtype, currentMilestone.level)) {
+  if (oid !== undefined && !(await isValidLevelForGtype(targetGtype, currentMilestone.level))) {
     return undefined; // Current level is invalid for new target gtype
   }
-
-
-  // 2. Check for duplicate level for the target offering (excluding self)
-  const existingDuplicateMilestone = await pool.query(
-    'SELECT mid FROM public.milestones WHERE oid = $1 AND level = $2 AND mid != $3',
-    [targetOid, targetLevel, mid]
-  );
-  if (existingDuplicateMilestone.rowCount != null && existingDuplicateMilestone.rowCount > 0) {
-    return false; // This update would create a duplicate level for this offering
-  }
+  // A duplicate level for the target offering is rejected by the (oid, level) unique index
 
   if (milestoneClass !== undefined) {
     fields.push(`class = $${paramIndex++}`);
@@ -222,8 +234,15 @@ export const updateExistingMilestone = async (mid: number, milestoneData: { clas
 
   try {
     const result = await pool.query(query, values);
+    clearLoader(MILESTONE_LOADER, mid);
+    if (result.rows[0]) {
+      milestoneCache.set(mid, { ...result.rows[0] });
+    }
     return result.rows[0]; // Returns undefined if no row was updated (should be caught by 404 check above)
   } catch (error) {
+    if (isUniqueViolation(error)) {
+      return false; // This update would create a duplicate level for this offering
+    }
     console.error(`Error in updateExistingMilestone (MID: ${mid}):`, error);
     throw new Error(`Could not update milestone with ID ${mid}`);
   }
@@ -237,6 +256,8 @@ export const updateExistingMilestone = async (mid: number, milestoneData: { clas
 export const deleteMilestoneById = async (mid: number): Promise<boolean> => {
   try {
     const result = await pool.query('DELETE FROM public.milestones WHERE mid = $1 RETURNING mid', [mid]);
+    clearLoader(MILESTONE_LOADER, mid);
+    milestoneCache.delete(mid);
     return (result.rowCount ?? 0) > 0; // True if at least one milestone was deleted
   } catch (error) {
     console.error(`Error in deleteMilestoneById (MID: ${mid}):`, error);
@@ -244,3 +265,33 @@ export const deleteMilestoneById = async (mid: number): Promise<boolean> => {
   }
 };
 
+
+/**
+ * Levels each offering has no milestone for yet, computed in SQL as an anti-join of the
+ * offering's level_mapping levels against milestones. Offerings with a milestone for every
+ * level are left out.
+ * @param filter Optional oid or gid to compute only those offerings.
+ * @returns A Promise that resolves to [{ oid, gid, gtype, levels }] ordered by oid; levels in mapping order.
+ */
+export const findAvailableLevels = async (
+  filter: { oid?: number; gid?: number } = {}
+): Promise<{ oid: number; gid: number; gtype: string; levels: string[] }[]> => {
+  try {
+    const result = await reader().query(
+      `SELECT go.oid, go.gid, go.gtype, array_agg(lm.level ORDER BY lm.position) AS levels
+       FROM public.gurukul_offerings go
+       JOIN public.level_mapping lm ON lm.gtype = go.gtype
+       WHERE ($1::int IS NULL OR go.oid = $1)
+         AND ($2::int IS NULL OR go.gid = $2)
+         AND NOT EXISTS (
+           SELECT 1 FROM public.milestones m WHERE m.oid = go.oid AND m.level = lm.level)
+       GROUP BY go.oid, go.gid, go.gtype
+       ORDER BY go.oid`,
+      [filter.oid ?? null, filter.gid ?? null]
+    );
+    return result.rows;
+  } catch (error) {
+    console.error('Error in findAvailableLevels:', error);
+    throw new Error('Could not retrieve available milestone levels');
+  }
+};
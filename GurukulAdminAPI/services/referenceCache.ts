@@ -0,0 +1,46 @@
+// services/referenceCache.ts - In-process caches of gurukul, offering, milestone and subject rows
+// Create and update paths validate their references (findGurukulById, findGurukulOfferingById,
+// findMilestoneById, findSubjectById) on every write. These rows change rarely, so the find
+// functions answer from an LRU cache and only go to Postgres on a miss.
+// The service functions that write these tables update or drop their entries (write-through).
+// Writes from other API processes or plain SQL arrive through the change feed (LISTEN/NOTIFY,
+// see changeFeedService.ts); if the feed drops, everything is cleared. REFERENCE_CACHE_TTL_MS
+// bounds how stale an entry can get while the feed is down.
+
+import { LruCache } from '../utils/lruCache';
+import { subscribeToChanges } from './changeFeedService';
+
+const REFERENCE_CACHE_SIZE = parseInt(process.env.REFERENCE_CACHE_SIZE || '1000', 10);
+const REFERENCE_CACHE_TTL_MS = parseInt(process.env.REFERENCE_CACHE_TTL_MS || '300000', 10);
+
+export const gurukulCache = new LruCache<number, any>('gurukul', REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL_MS);
+export const offeringCache = new LruCache<number, any>('gurukul_offering', REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL_MS);
+export const milestoneCache = new LruCache<number, any>('milestone', REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL_MS);
+export const subjectCache = new LruCache<number, any>('subject', REFERENCE_CACHE_SIZE, REFERENCE_CACHE_TTL_MS);
+
+// Change feed table name -> the cache of its rows (the event's row is the primary key)
+const CACHE_BY_TABLE: { [table: string]: LruCache<number, any> } = {
+  'public.gurukul': gurukulCache,
+  'public.gurukul_offerings': offeringCache,
+  'public.milestones': milestoneCache,
+  'teachmate.subjects': subjectCache,
+};
+
+subscribeToChanges(
+  (event) => {
+    const cache = CACHE_BY_TABLE[event.table];
+    if (cache && event.row !== null) {
+      cache.delete(Number(event.row));
+    }
+  },
+  () => Object.values(CACHE_BY_TABLE).forEach((cache) => cache.clear())
+);
+
+/**
+ * Returns a copy of a cached row, so callers that decorate the row they get back
+ * cannot change the cached one.
+ */
+export const cachedRow = <V>(cache: LruCache<number, V>, key: number): V | undefined => {
+  const row = cache.get(key);
+  return row === undefined ? undefined : { ...row };
+};
@@ -0,0 +1,82 @@
+// services/slogService.ts - Keeps a student's journey log (studentmate.slog) in line with their level
+// A student at a level should have one slog row per journey of that level's subjects.
+// When the level changes (new milestone), the target set is computed in SQL and only the
+// difference is applied: rows that still apply keep their status and starttime, missing
+// journeys are inserted, and unfinished rows for journeys of other levels are removed.
+
+import { PoolClient } from 'pg';
+
+export const SLOG_MODES = ['reconcile', 'reset'];
+
+// $1 = sid, $2 = level. One statement; the CTEs all see the slog rows as they were before it.
+const RECONCILE_SLOG = `
+  WITH target AS (
+    SELECT DISTINCT j.jid
+    FROM teachmate.journey j
+    JOIN teachmate.subjects s ON s.subid = j.subject_id
+    WHERE s.level = $2
+  ),
+  removed AS (
+    DELETE FROM studentmate.slog sl
+    WHERE sl.sid = $1
+      AND sl.status IS DISTINCT FROM 'Done'
+      AND NOT EXISTS (SELECT 1 FROM target t WHERE t.jid = sl.jid)
+    RETURNING sl.jid
+  ),
+  added AS (
+    INSERT INTO studentmate.slog (sid, jid, starttime, status)
+    SELECT $1::int, t.jid, NOW(), 'Started'
+    FROM target t
+    WHERE NOT EXISTS (SELECT 1 FROM studentmate.slog sl WHERE sl.sid = $1 AND sl.jid = t.jid)
+    RETURNING jid
+  )
+  SELECT (SELECT COUNT(*) FROM target)::int AS target,
+         (SELECT COUNT(*) FROM removed)::int AS removed,
+         (SELECT COUNT(*) FROM added)::int AS added
+`;
+
+// 'reset' mode: the old behaviour (drop the whole log, start every journey of the level again),
+// as one DELETE and one INSERT ... SELECT instead of one INSERT per journey.
+const INSERT_LEVEL_SLOG = `
+  INSERT INTO studentmate.slog (sid, jid, starttime, status)
+  SELECT DISTINCT $1::int, j.jid, NOW(), 'Started'
+  FROM teachmate.journey j
+  JOIN teachmate.subjects s ON s.subid = j.subject_id
+  WHERE s.level = $2
+`;
+
+// --- Slog Service Functions ---
+
+/**
+ * Brings a student's slog rows in line with a (new) level inside the caller's transaction.
+ * 'reconcile' keeps rows whose journey still applies and completed ('Done') rows as history;
+ * 'reset' deletes the whole log first and starts every journey of the level afresh.
+ * @param client The PG PoolClient of the surrounding transaction.
+ * @param sid The studentmate.students.sid of the student.
+ * @param level The student's level (the level of their milestone).
+ * @param mode 'reconcile' (default) or 'reset'.
+ * @returns A Promise that resolves to { target, removed, added } row counts.
+ */
+export const reconcileStudentSlog = async (
+  client: PoolClient,
+  sid: number,
+  level: string,
+  mode: string = 'reconcile'
+): Promise<{ target: number; removed: number; added: number }> => {
+  try {
+    let counts;
+    if (mode === 'reset') {
+      const removed = (await client.query('DELETE FROM studentmate.slog WHERE sid = $1', [sid])).rowCount ?? 0;
+      const added = (await client.query(INSERT_LEVEL_SLOG, [sid, level])).rowCount ?? 0;
+      counts = { target: added, removed, added };
+    } else {
+      counts = (await client.query(RECONCILE_SLOG, [sid, level])).rows[0];
+    }
+    console.log(`Slog ${mode} for student ${sid} at level ${level}: ${counts.target} journeys, `
+      + `${counts.removed} removed, ${counts.added} added`);
+    return counts;
+  } catch (error) {
+    console.error(`Error in reconcileStudentSlog (Student ID: ${sid}, level: ${level}, mode: ${mode}):`, error);
+    throw new Error(`Could not update journeys for student ${sid}`);
+  }
+};
@@ -0,0 +1,107 @@
+// services/smilestoneService.ts - Bulk operations on studentmate.smilestones
+// Score sheets arrive as thousands of (student, milestone, score) rows. They are loaded
+// into a temporary table in one statement and applied with a single UPDATE ... FROM,
+// instead of one round trip per student.
+
+import pool from '../utils/db';
+
+export const MAX_SCORE_ROWS = 5000;
+
+export interface ScoreRow {
+  line: number; // position in the uploaded sheet, echoed back for unknown rows
+  sid?: number | null;
+  email?: string | null;
+  mid: number;
+  score: number;
+}
+
+export interface ScoreUploadSummary {
+  received: number;
+  updated: number;
+  unchanged: number;
+  duplicates: number;
+  unknown: { line: number; sid: number | null; email: string | null; mid: number }[];
+}
+
+// --- Smilestone Service Functions ---
+
+/**
+ * Sets studentmate.smilestones.score for many (student, milestone) pairs at once.
+ * Students are identified by sid or, when sid is missing, by studentmate.students.email.
+ * If the same pair appears more than once, the last row wins.
+ * Rows whose student is not assigned to the milestone are reported as unknown, not created.
+ * @param rows At most MAX_SCORE_ROWS score rows.
+ * @returns A Promise that resolves to a summary of updated, unchanged, duplicate and unknown rows.
+ */
+export const applyMilestoneScores = async (rows: ScoreRow[]): Promise<ScoreUploadSummary> => {
+  const client = await pool.connect();
+  try {
+    await client.query('BEGIN');
+    await client.query(
+      `CREATE TEMP TABLE score_upload (
+         line INTEGER NOT NULL,
+         sid INTEGER,
+         email TEXT,
+         mid INTEGER NOT NULL,
+         score INTEGER NOT NULL
+       ) ON COMMIT DROP`
+    );
+    await client.query(
+      `INSERT INTO score_upload (line, sid, email, mid, score)
+       SELECT * FROM unnest($1::int[], $2::int[], $3::text[], $4::int[], $5::int[])`,
+      [
+        rows.map((r) => r.line),
+        rows.map((r) => r.sid ?? null),
+        rows.map((r) => r.email ?? null),
+        rows.map((r) => r.mid),
+        rows.map((r) => r.score),
+      ]
+    );
+    await client.query(
+      `UPDATE score_upload su SET sid = s.sid
+       FROM studentmate.students s
+       WHERE su.sid IS NULL AND lower(s.email) = lower(su.email)`
+    );
+
+    const result = await client.query(
+      `WITH latest AS (
+         SELECT DISTINCT ON (sid, mid) line, sid, mid, score
+         FROM score_upload
+         WHERE sid IS NOT NULL
+         ORDER BY sid, mid, line DESC
+       ),
+       updated AS (
+         UPDATE studentmate.smilestones sm
+         SET score = l.score
+         FROM latest l
+         WHERE sm.sid = l.sid AND sm.mid = l.mid AND sm.score IS DISTINCT FROM l.score
+         RETURNING sm.sid
+       )
+       SELECT
+         (SELECT COUNT(*) FROM updated)::int AS updated,
+         (SELECT COUNT(*) FROM latest l
+            JOIN studentmate.smilestones sm ON sm.sid = l.sid AND sm.mid = l.mid
+            WHERE sm.score IS NOT DISTINCT FROM l.score)::int AS unchanged,
+         (SELECT COUNT(*) FROM score_upload WHERE sid IS NOT NULL)::int
+           - (SELECT COUNT(*) FROM latest)::int AS duplicates`
+    );
+    const unknown = await client.query(
+      `SELECT su.line, su.sid, su.email, su.mid
+       FROM score_upload su
+       WHERE NOT EXISTS (
+         SELECT 1 FROM studentmate.smilestones sm WHERE sm.sid = su.sid AND sm.mid = su.mid
+       )
+       ORDER BY su.line`
+    );
+
+    await client.query('COMMIT');
+    const { updated, unchanged, duplicates } = result.rows[0];
+    return { received: rows.length, updated, unchanged, duplicates, unknown: unknown.rows };
+  } catch (error) {
+    await client.query('ROLLBACK');
+    console.error(`Error in applyMilestoneScores (${rows.length} rows):`, error);
+    throw new Error('Could not apply milestone scores');
+  } finally {
+    client.release();
+  }
+};
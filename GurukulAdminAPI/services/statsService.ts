@@ -0,0 +1,106 @@
+// services/statsService.ts - Dashboard statistics computed with SQL aggregates
+// One query builds the whole dashboard payload as JSON inside Postgres, so the admin
+// UI no longer downloads every user, milestone and assignment to count them in pandas.
+// The result is kept for STATS_CACHE_MS; concurrent callers share one running query.
+
+import pool from '../utils/db';
+
+const STATS_CACHE_MS = parseInt(process.env.STATS_CACHE_MS || '60000', 10);
+
+const STATS_QUERY = `
+  SELECT json_build_object(
+    'totals', json_build_object(
+      'gurukuls', (SELECT COUNT(*) FROM public.gurukul),
+      'offerings', (SELECT COUNT(*) FROM public.gurukul_offerings),
+      'milestones', (SELECT COUNT(*) FROM public.milestones),
+      'subjects', (SELECT COUNT(*) FROM teachmate.subjects WHERE isdeleted IS NOT TRUE),
+      'topics', (SELECT COUNT(*) FROM teachmate.topics),
+      'teachers', (SELECT COUNT(*) FROM public.users WHERE role = 'teacher' AND isdeleted IS NOT TRUE),
+      'students', (SELECT COUNT(*) FROM public.users WHERE role = 'student' AND isdeleted IS NOT TRUE)
+    ),
+    'students_per_gurukul', (
+      SELECT COALESCE(json_agg(row_to_json(t) ORDER BY t.students DESC, t.gname), '[]'::json)
+      FROM (
+        SELECT g.gid, g.gname, COUNT(sg.sid)::int AS students
+        FROM public.gurukul g
+        LEFT JOIN studentmate.sgurukul sg ON sg.gid = g.gid
+        GROUP BY g.gid, g.gname
+      ) t
+    ),
+    'students_per_level', (
+      SELECT COALESCE(json_agg(row_to_json(t) ORDER BY t.level), '[]'::json)
+      FROM (
+        SELECT m.level, COUNT(sm.sid)::int AS students
+        FROM public.milestones m
+        LEFT JOIN studentmate.smilestones sm ON sm.mid = m.mid
+        GROUP BY m.level
+      ) t
+    ),
+    'gurukul_status', (
+      SELECT COALESCE(json_object_agg(COALESCE(status, 'None'), students), '{}'::json)
+      FROM (SELECT status, COUNT(*)::int AS students FROM studentmate.sgurukul GROUP BY status) t
+    ),
+    'milestone_status', (
+      SELECT COALESCE(json_object_agg(COALESCE(status, 'None'), students), '{}'::json)
+      FROM (SELECT status, COUNT(*)::int AS students FROM studentmate.smilestones GROUP BY status) t
+    ),
+    'milestone_scores', (
+      SELECT COALESCE(json_agg(row_to_json(t) ORDER BY t.gname, t.level), '[]'::json)
+      FROM (
+        SELECT m.mid, m.class, m.level, g.gname,
+               COUNT(sm.sid)::int AS students,
+               ROUND(AVG(sm.score)::numeric, 1)::float AS avg_score
+        FROM public.milestones m
+        JOIN public.gurukul_offerings go ON go.oid = m.oid
+        JOIN public.gurukul g ON g.gid = go.gid
+        LEFT JOIN studentmate.smilestones sm ON sm.mid = m.mid
+        GROUP BY m.mid, m.class, m.level, g.gname
+      ) t
+    ),
+    'teachers_per_subject', (
+      SELECT COALESCE(json_agg(row_to_json(t) ORDER BY t.teachers DESC, t.subname), '[]'::json)
+      FROM (
+        SELECT s.subid, s.subname, s.level, COUNT(ta.teacher_id)::int AS teachers
+        FROM teachmate.subjects s
+        LEFT JOIN teachmate.teacher_assignments ta ON ta.sub_id = s.subid
+        WHERE s.isdeleted IS NOT TRUE
+        GROUP BY s.subid, s.subname, s.level
+      ) t
+    ),
+    'generated_at', now()
+  ) AS stats
+`;
+
+let cached: { stats: any; expires: number } | null = null;
+let inFlight: Promise<any> | null = null;
+
+// --- Stats Service Functions ---
+
+/**
+ * Retrieves the dashboard statistics (totals, students per gurukul and level, status
+ * breakdowns, average score per milestone, teachers per subject).
+ * @param fresh Skip the cache and recompute.
+ * @returns A Promise that resolves to the statistics object; `generated_at` says when it was computed.
+ */
+export const findAdminStats = async (fresh = false): Promise<any> => {
+  if (!fresh && cached && cached.expires > Date.now()) {
+    return cached.stats;
+  }
+  if (!inFlight) {
+    inFlight = pool.query(STATS_QUERY)
+      .then((result) => {
+        const stats = result.rows[0].stats;
+        cached = { stats, expires: Date.now() + STATS_CACHE_MS };
+        return stats;
+      })
+      .finally(() => {
+        inFlight = null;
+      });
+  }
+  try {
+    return await inFlight;
+  } catch (error) {
+    console.error('Error in findAdminStats:', error);
+    throw new Error('Could not compute dashboard statistics');
+  }
+};
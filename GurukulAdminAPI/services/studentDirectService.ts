@@ -1,62 +1,35 @@
 // services/studentDirectService.ts - Direct operations on studentmate.students
 
-import pool from '../utils/db';
+import pool, { queryPrepared, reader } from '../utils/db';
+import { forEachCursorBatch, STREAM_BATCH_SIZE } from '../utils/cursor';
+import { mapWithConcurrency } from '../utils/concurrency';
 import bcrypt from 'bcryptjs';
 import { findGurukulById } from './gurukulService'; // Reusing existing gurukul validation
 import { findMilestoneById } from './milestoneService'; // Reusing existing milestone validation
 import { PoolClient } from 'pg'; // For transactional consistency
 
+/**
+ * Starts (status 'In_progress') every published lesson journey of a level that the student
+ * does not have yet, with one INSERT ... SELECT; existing slog rows are left as they are.
+ * @param studentId The studentmate.students.sid of the student.
+ * @param studentLevel The level whose lessons (status = 2) to assign.
+ * @returns A Promise that resolves to a message and the number of slog rows created.
+ */
 export const assignLessonsToStudentByLevel = async (studentId: number, studentLevel: string): Promise<{ message: string, newSlogsCount: number }> => {
     try {
-        console.log(`Attempting to assign lessons to student ID: ${studentId} at level: ${studentLevel}`);
-
-        // 1. Get all lessons that are status=2 and match the student's level,
-        //    along with their associated journey IDs.
-        const getEligibleLessonsQuery = `
-            SELECT l.lid, l.lname, s.subid, s.level, j.jid
-            FROM teachmate.lessons l
-            JOIN teachmate.topics t ON l.tid = t.tid
-            JOIN teachmate.subjects s ON t.subid = s.subid
-            JOIN teachmate.journey j ON l.lid = j.lesson_id
-            WHERE l.status = 2 AND s.level = $1;
-        `;
-        const eligibleLessonsResult = await pool.query(getEligibleLessonsQuery, [studentLevel]);
-
-        if (eligibleLessonsResult.rowCount === 0) {
-            console.log(`No eligible lessons (status=2, level=${studentLevel}) found for student ID: ${studentId}.`);
-            return { message: `No eligible lessons found for student at level ${studentLevel}.`, newSlogsCount: 0 };
-        }
-
-        console.log(`${eligibleLessonsResult.rowCount} eligible lessons found for student ID: ${studentId}.`);
-
-        // 2. Insert slog entries for each eligible lesson's journey ID against the student ID.
-        //    Only insert if the slog entry does not already exist.
-        const insertSlogQuery = `
-            INSERT INTO studentmate.slog (sid, jid, starttime, status)
-            VALUES ($1, $2, NOW(), 'In_progress')
-        `;
-        const checkSlogExistsQuery = `
-            SELECT 1 FROM studentmate.slog WHERE sid = $1 AND jid = $2
-        `;
-        let newSlogsCreatedCount = 0;
-
-        for (const lesson of eligibleLessonsResult.rows) {
-            const { jid, lid, lname } = lesson; // Extract jid and other lesson info for logging
-
-            // Check if a slog entry already exists for this student and journey
-            const existsResult = await pool.query(checkSlogExistsQuery, [studentId, jid]);
-            
-            if (existsResult.rowCount === 0) {
-                // If it doesn't exist, insert a new slog entry
-                await pool.query(insertSlogQuery, [studentId, jid]);
-                console.log(`Created new slog for student ID: ${studentId}, journey ID: ${jid} (Lesson: ${lname}, ID: ${lid}).`);
-                newSlogsCreatedCount++;
-            } else {
-                console.log(`Slog already exists for student ID: ${studentId} and journey ID: ${jid} (Lesson: ${lname}, ID: ${lid}). Skipping insertion.`);
-            }
-        }
-
-        console.log(`Finished assigning lessons. Total new slogs created: ${newSlogsCreatedCount}.`);
+        const result = await pool.query(
+            `INSERT INTO studentmate.slog (sid, jid, starttime, status)
+             SELECT DISTINCT $1::int, j.jid, NOW(), 'In_progress'
+             FROM teachmate.lessons l
+             JOIN teachmate.topics t ON l.tid = t.tid
+             JOIN teachmate.subjects s ON t.subid = s.subid
+             JOIN teachmate.journey j ON l.lid = j.lesson_id
+             WHERE l.status = 2 AND s.level = $2
+               AND NOT EXISTS (SELECT 1 FROM studentmate.slog sl WHERE sl.sid = $1 AND sl.jid = j.jid)`,
+            [studentId, studentLevel]
+        );
+        const newSlogsCreatedCount = result.rowCount ?? 0;
+        console.log(`Assigned lessons to student ID: ${studentId} at level ${studentLevel}: ${newSlogsCreatedCount} new slogs.`);
         return { message: `Successfully created ${newSlogsCreatedCount} new slogs for student ID ${studentId} at level ${studentLevel}.`, newSlogsCount: newSlogsCreatedCount };
 
     } catch (err) {
@@ -146,7 +119,7 @@ const assignMilestoneToStudentDirect = async (sid: number, milestoneId: number |
  */
 const findGurukulsAssignedToStudentDirect = async (sid: number): Promise<any[]> => {
     try {
-        const result = await pool.query(
+        const result = await queryPrepared('student_direct_gurukuls',
             `SELECT
                 g.gid,
                 g.gname,
@@ -159,7 +132,8 @@ const findGurukulsAssignedToStudentDirect = async (sid: number): Promise<any[]>
                 studentmate.sgurukul sg ON g.gid = sg.gid
             WHERE
                 sg.sid = $1`,
-            [sid]
+            [sid],
+            reader()
         );
         return result.rows;
     } catch (error) {
@@ -175,7 +149,7 @@ const findGurukulsAssignedToStudentDirect = async (sid: number): Promise<any[]>
  */
 const findMilestonesAssignedToStudentDirect = async (sid: number): Promise<any[]> => {
     try {
-        const result = await pool.query(
+        const result = await queryPrepared('student_direct_milestones',
             `SELECT
         m.mid,
         m.class,
@@ -190,7 +164,8 @@ const findMilestonesAssignedToStudentDirect = async (sid: number): Promise<any[]
         studentmate.smilestones sm ON m.mid = sm.mid
       WHERE
         sm.sid = $1`,
-            [sid]
+            [sid],
+            reader()
         );
         return result.rows;
     } catch (error) {
@@ -358,44 +333,68 @@ export const updateStudentDirect = async (
  */
 export const findStudentDirectById = async (sid: number): Promise<any | undefined> => {
   try {
-    const result = await pool.query(
+    const result = await reader().query(
       `SELECT sid, sname, email FROM studentmate.students WHERE sid = $1`,
       [sid]
     );
     const student = result.rows[0];
-
-    if (student) {
-        student.assigned_gurukuls = await findGurukulsAssignedToStudentDirect(student.sid);
-        student.assigned_milestones = await findMilestonesAssignedToStudentDirect(student.sid);
-    }
-    return student;
+    return student ? await enhanceStudentDirect(student) : student;
   } catch (error) {
     console.error(`Error in findStudentDirectById (Student ID: ${sid}):`, error);
     throw new Error(`Could not retrieve student with ID ${sid} directly`);
   }
 };
 
+/**
+ * Adds the assigned gurukuls and milestones to a student row (both looked up concurrently).
+ * @param student A row from studentmate.students.
+ * @returns The same row, enhanced in place.
+ */
+const enhanceStudentDirect = async (student: any): Promise<any> => {
+    [student.assigned_gurukuls, student.assigned_milestones] = await Promise.all([
+      findGurukulsAssignedToStudentDirect(student.sid),
+      findMilestonesAssignedToStudentDirect(student.sid),
+    ]);
+    return student;
+};
+
+/**
+ * Adds the assigned gurukuls and milestones to student rows, a few students at a time.
+ * @param students Rows from studentmate.students.
+ * @returns The same rows, enhanced in place.
+ */
+const enhanceStudentsDirect = async (students: any[]): Promise<any[]> => mapWithConcurrency(students, enhanceStudentDirect);
+
 /**
  * Retrieves all students from studentmate.students.
  * @returns A Promise that resolves to an array of Student objects.
  */
 export const findAllStudentsDirect = async (): Promise<any[]> => {
   try {
-    const result = await pool.query(
+    const result = await reader().query(
       `SELECT sid, sname, email FROM studentmate.students ORDER BY sname ASC`
     );
-    const students = result.rows;
-
-    const enhancedStudents = [];
-    for (const student of students) {
-      student.assigned_gurukuls = await findGurukulsAssignedToStudentDirect(student.sid);
-      student.assigned_milestones = await findMilestonesAssignedToStudentDirect(student.sid);
-      // ### CHANGE END: Fetch assigned milestones
-      enhancedStudents.push(student);
-    }
-    return enhancedStudents;
+    return await enhanceStudentsDirect(result.rows);
   } catch (error) {
     console.error('Error in findAllStudentsDirect:', error);
     throw new Error('Could not retrieve students directly');
   }
 };
+
+/**
+ * Reads all students batch by batch through a server-side cursor, with their assignments
+ * (GET /students?stream=ndjson).
+ * @param onBatch Receives the next enhanced students; resolve to false to stop early.
+ * @returns A Promise that resolves to the number of students read.
+ */
+export const forEachStudentDirectBatch = async (onBatch: (students: any[]) => Promise<boolean>): Promise<number> => {
+  try {
+    return await forEachCursorBatch(
+      `SELECT sid, sname, email FROM studentmate.students ORDER BY sname ASC`, [], STREAM_BATCH_SIZE,
+      async (rows) => onBatch(await enhanceStudentsDirect(rows))
+    );
+  } catch (error) {
+    console.error('Error in forEachStudentDirectBatch:', error);
+    throw new Error('Could not stream students directly');
+  }
+};
@@ -2,18 +2,12 @@
 // Interacts with the teachmate.subjects table and uses corrected column names.
 // Corrected: Explicit null checks for rowCount and added image_url to create.
 
-import pool from '../utils/db'; // Import the database connection pool
-import { LEVEL_MAPPING } from './milestoneService'; // Corrected: LEVEL_MAPPING is now exported
+import pool, { isUniqueViolation, queryPrepared, reader, readsAreCurrent } from '../utils/db'; // Import the database connection pool
+import { isValidLevel } from './levelService'; // Valid levels come from public.level_mapping
+import { clearLoader, getLoader, rowsByKey } from '../utils/dataLoader';
+import { cachedRow, subjectCache } from './referenceCache';
 
-/**
- * Helper function to check if a level string is valid (exists in LEVEL_MAPPING).
- * @param level The level string (e.g., L1, L5).
- * @returns True if the level is valid, false otherwise.
- */
-const isValidLevel = (level: string): boolean => {
-  // Check if the level exists as a value in any of the gtype arrays in LEVEL_MAPPING
-  return Object.values(LEVEL_MAPPING).some(levels => levels.includes(level));
-};
+const SUBJECT_LOADER = 'subject';
 
 // --- Subject Service Functions ---
 
@@ -24,7 +18,7 @@ const isValidLevel = (level: string): boolean => {
 export const findAllSubjects = async (): Promise<any[]> => {
   try {
     // Corrected table and column names
-    const result = await pool.query('SELECT subid, subname, level, image_url, isdeleted FROM teachmate.subjects ORDER BY subid ASC');
+    const result = await queryPrepared('subject_all', 'SELECT subid, subname, level, image_url, isdeleted FROM teachmate.subjects ORDER BY subid ASC', [], reader());
     return result.rows;
   } catch (error) {
     console.error('Error in findAllSubjects:', error);
@@ -32,16 +26,47 @@ export const findAllSubjects = async (): Promise<any[]> => {
   }
 };
 
+/**
+ * Retrieves the subjects with the given IDs in one query.
+ * @param subids The subject IDs.
+ * @returns A Promise that resolves to the Subject objects that exist, ordered by subid.
+ */
+export const findSubjectsByIds = async (subids: number[]): Promise<any[]> => {
+  if (subids.length === 0) {
+    return [];
+  }
+  try {
+    const result = await queryPrepared('subject_by_ids',
+      'SELECT subid, subname, level, image_url, isdeleted FROM teachmate.subjects WHERE subid = ANY($1::int[]) ORDER BY subid ASC',
+      [subids],
+      reader()
+    );
+    return result.rows;
+  } catch (error) {
+    console.error('Error in findSubjectsByIds:', error);
+    throw new Error('Could not retrieve subjects by IDs');
+  }
+};
+
+// Batch loader behind findSubjectById; what it reads goes into the reference cache unless it came from a replica
+const loadSubjects = async (subids: number[]): Promise<Map<number, any>> => {
+  const rows = await findSubjectsByIds(subids);
+  if (readsAreCurrent()) {
+    rows.forEach((row) => subjectCache.set(row.subid, { ...row }));
+  }
+  return rowsByKey(rows, 'subid');
+};
+
 /**
  * Retrieves a single subject by its ID from the database.
+ * Answered from the reference cache (services/referenceCache.ts) when possible; misses within
+ * one request are batched into findSubjectsByIds and remembered (utils/dataLoader.ts).
  * @param subid The ID of the subject.
  * @returns A Promise that resolves to the Subject object if found, otherwise undefined.
  */
 export const findSubjectById = async (subid: number): Promise<any | undefined> => {
   try {
-    // Corrected table and column names
-    const result = await pool.query('SELECT subid, subname, level, image_url, isdeleted FROM teachmate.subjects WHERE subid = $1', [subid]);
-    return result.rows[0]; // Returns undefined if no row is found
+    return cachedRow(subjectCache, subid) ?? await getLoader(SUBJECT_LOADER, loadSubjects).load(subid);
   } catch (error) {
     console.error(`Error in findSubjectById (SUBID: ${subid}):`, error);
     throw new Error(`Could not retrieve subject with ID ${subid}`);
@@ -56,7 +81,7 @@ export const findSubjectById = async (subid: number): Promise<any | undefined> =
 export const findSubjectsByLevel = async (level: string): Promise<any[]> => {
   try {
     // Corrected table and column names
-    const result = await pool.query('SELECT subid, subname, level, image_url, isdeleted FROM teachmate.subjects WHERE level = $1 ORDER BY subname ASC', [level]);
+    const result = await reader().query('SELECT subid, subname, level, image_url, isdeleted FROM teachmate.subjects WHERE level = $1 ORDER BY subname ASC', [level]);
     return result.rows;
   } catch (error) {
     console.error(`Error in findSubjectsByLevel (Level: ${level}):`, error);
@@ -77,26 +102,23 @@ export const findSubjectsByLevel = async (level: string): Promise<any[]> => {
 export const createNewSubject = async (subname: string, level: string, image_url?: string): Promise<any | undefined | false> => {
   
     // 1. Validate the level
-  if (!isValidLevel(level)) {
+  if (!(await isValidLevel(level))) {
     return undefined; // Indicate invalid level
   }
 
   try {
-    // 2. Check for duplicate subject (same subname and level)
-    const existingSubject = await pool.query(
-      'SELECT subid FROM teachmate.subjects WHERE subname = $1 AND level = $2', // Corrected table and column names
-      [subname, level]
-    );
-    if (existingSubject.rowCount != null && existingSubject.rowCount > 0) { // Added null check
-      return false; // Indicate duplicate subject
-    }
-    console.log("createNewSubject Service: Not duplicate");
+    // 2. Insert; the (subname, level) unique index turns a duplicate into "nothing inserted"
     // Note: Assuming 'subid' is handled by an IDENTITY column or SERIAL in your database.
     // image_url is now included in the insert. isdeleted is assumed to have a default value.
     const result = await pool.query(
-      'INSERT INTO teachmate.subjects (subname, level, image_url) VALUES ($1, $2, $3) RETURNING subid, subname, level, image_url, isdeleted', // Corrected table and column names, added image_url
+      `INSERT INTO teachmate.subjects (subname, level, image_url) VALUES ($1, $2, $3)
+       ON CONFLICT (subname, level) DO NOTHING
+       RETURNING subid, subname, level, image_url, isdeleted`,
       [subname, level, image_url]
     );
+    if (result.rows.length === 0) {
+      return false; // Indicate duplicate subject
+    }
     console.table(result.rows);
     return result.rows[0];
   } catch (error) {
@@ -127,24 +149,11 @@ export const updateExistingSubject = async (subid: number, subjectData: { subnam
     return '404'; // Subject not found
   }
 
-  const targetSname = subname !== undefined ? subname : currentSubject.subname; // Corrected to subname
-  const targetLevel = level !== undefined ? level : currentSubject.level;
-
   // 1. Validate the new/updated level if provided
-  if (level !== undefined && !isValidLevel(level)) {
+  if (level !== undefined && !(await isValidLevel(level))) {
     return undefined; // Invalid level
   }
-  // Also check if current level becomes invalid after changing it, although the client should prevent this
-  // or if subname/level are changed such that it conflicts.
-
-  // 2. Check for duplicate subject (subname and level) with another subject (excluding self)
-  const existingDuplicateSubject = await pool.query(
-    'SELECT subid FROM teachmate.subjects WHERE subname = $1 AND level = $2 AND subid != $3', // Corrected table and column names
-    [targetSname, targetLevel, subid]
-  );
-  if (existingDuplicateSubject.rowCount != null && existingDuplicateSubject.rowCount > 0) { // Added null check
-    return false; // This update would create a duplicate subject
-  }
+  // 2. A duplicate (subname, level) with another subject is rejected by the unique index
 
   if (subname !== undefined) {
     fields.push(`subname = $${paramIndex++}`); // Corrected to subname
@@ -168,8 +177,15 @@ export const updateExistingSubject = async (subid: number, subjectData: { subnam
 
   try {
     const result = await pool.query(query, values);
+    clearLoader(SUBJECT_LOADER, subid);
+    if (result.rows[0]) {
+      subjectCache.set(subid, { ...result.rows[0] });
+    }
     return result.rows[0]; // Returns undefined if no row was updated (should be caught by 404 check above)
   } catch (error) {
+    if (isUniqueViolation(error)) {
+      return false; // This update would create a duplicate subject
+    }
     console.error(`Error in updateExistingSubject (SUBID: ${subid}):`, error);
     throw new Error(`Could not update subject with ID ${subid}`);
   }
@@ -196,6 +212,8 @@ export const deleteSubjectById = async (subid: number): Promise<boolean> => {
     const deleteSubjectResult = await client.query('DELETE FROM teachmate.subjects WHERE subid = $1 RETURNING subid', [subid]);
 
     await client.query('COMMIT');
+    clearLoader(SUBJECT_LOADER, subid);
+    subjectCache.delete(subid);
 
     return (deleteSubjectResult.rowCount ?? 0) > 0; // Corrected to use nullish coalescing for safety
   } catch (error) {
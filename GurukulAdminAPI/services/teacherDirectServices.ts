@@ -1,6 +1,7 @@
 // services/teacherDirectService.ts - Direct operations on teachmate.teachers
 
-import pool from '../utils/db';
+import pool, { queryPrepared, reader } from '../utils/db';
+import { mapWithConcurrency } from '../utils/concurrency';
 import bcrypt from 'bcryptjs';
 import { findSubjectById } from './subjectService'; // Reusing existing subject validation
 import { PoolClient } from 'pg'; // For transactional consistency
@@ -22,20 +23,25 @@ const assignSubjectsToTeacherDirect = async (teachid: number, subjectIds: number
       return false;
     }
 
-    // 2. Clear existing assignments for this teacher
-    await queryClient.query('DELETE FROM teachmate.teacher_assignments WHERE teacher_id = $1', [teachid]);
+    // 2. Clear existing assignments for this teacher, while the subjects are validated on the
+    // global 'pool' (findSubjectById batches the concurrent lookups into one query)
+    const [subjects] = await Promise.all([
+      Promise.all(subjectIds.map((subid) => findSubjectById(subid))),
+      queryClient.query('DELETE FROM teachmate.teacher_assignments WHERE teacher_id = $1', [teachid]),
+    ]);
 
-    // 3. Assign new subjects assumption here is that UI sends changed information.
-    for (const subid of subjectIds) {
-      const subjectExists = await findSubjectById(subid); // This still uses global 'pool' for subject validation
-      if (!subjectExists) {
+    // 3. Assign new subjects in one INSERT; assumption here is that UI sends changed information.
+    const existingSubjectIds = subjectIds.filter((subid, i) => {
+      if (!subjects[i]) {
         console.warn(`Subject with ID ${subid} not found during assignment to teacher ${teachid}. Skipping.`);
-      } else {
-        await queryClient.query(
-          'INSERT INTO teachmate.teacher_assignments (teacher_id, sub_id, isapprover) VALUES ($1, $2, FALSE)',
-          [teachid, subid]
-        );
       }
+      return Boolean(subjects[i]);
+    });
+    if (existingSubjectIds.length > 0) {
+      await queryClient.query(
+        'INSERT INTO teachmate.teacher_assignments (teacher_id, sub_id, isapprover) SELECT $1, unnest($2::int[]), FALSE',
+        [teachid, existingSubjectIds]
+      );
     }
     return true;
   } catch (error) {
@@ -51,7 +57,7 @@ const assignSubjectsToTeacherDirect = async (teachid: number, subjectIds: number
  */
 const findSubjectsAssignedToTeacherDirect = async (teachid: number): Promise<any[]> => {
   try {
-    const result = await pool.query(
+    const result = await queryPrepared('teacher_direct_subjects',
       `SELECT
           s.subid,
           s.subname,
@@ -65,7 +71,8 @@ const findSubjectsAssignedToTeacherDirect = async (teachid: number): Promise<any
           ts.teacher_id = $1
       ORDER BY
           s.subname ASC`,
-      [teachid]
+      [teachid],
+      reader()
     );
     return result.rows;
   } catch (error) {
@@ -208,7 +215,7 @@ export const updateTeacherDirect = async (
  */
 export const findTeacherDirectById = async (teachid: number): Promise<any | undefined> => {
   try {
-    const result = await pool.query(
+    const result = await reader().query(
       `SELECT teachid, name, email, last_login, created_at FROM teachmate.teachers WHERE teachid = $1`,
       [teachid]
     );
@@ -230,17 +237,15 @@ export const findTeacherDirectById = async (teachid: number): Promise<any | unde
  */
 export const findAllTeachersDirect = async (): Promise<any[]> => {
   try {
-    const result = await pool.query(
+    const result = await reader().query(
       `SELECT teachid, name, email, last_login, created_at FROM teachmate.teachers ORDER BY teachid ASC`
     );
     const teachers = result.rows;
 
-    const enhancedTeachers = [];
-    for (const teacher of teachers) {
+    return await mapWithConcurrency(teachers, async (teacher) => {
       teacher.assigned_subjects = await findSubjectsAssignedToTeacherDirect(teacher.teachid);
-      enhancedTeachers.push(teacher);
-    }
-    return enhancedTeachers;
+      return teacher;
+    });
   } catch (error) {
     console.error('Error in findAllTeachersDirect:', error);
     throw new Error('Could not retrieve teachers directly');
@@ -2,7 +2,8 @@
 // Interacts with the teachmate.topics table and uses corrected column names.
 // Corrected: Explicit null checks for rowCount and added image_url to create and update.
 
-import pool from '../utils/db'; // Import the database connection pool
+import pool, { isUniqueViolation, queryPrepared, reader } from '../utils/db'; // Import the database connection pool
+import { forEachCursorBatch, STREAM_BATCH_SIZE } from '../utils/cursor';
 import { findSubjectById } from './subjectService'; // Import to validate subid
 
 // --- Topic Service Functions ---
@@ -14,7 +15,7 @@ import { findSubjectById } from './subjectService'; // Import to validate subid
 export const findAllTopics = async (): Promise<any[]> => {
   try {
     // Corrected table and column names
-    const result = await pool.query('SELECT tid, tname, subid, image_url FROM teachmate.topics ORDER BY tid ASC');
+    const result = await queryPrepared('topic_all', 'SELECT tid, tname, subid, image_url FROM teachmate.topics ORDER BY tid ASC', [], reader());
     return result.rows;
   } catch (error) {
     console.error('Error in findAllTopics:', error);
@@ -22,6 +23,44 @@ export const findAllTopics = async (): Promise<any[]> => {
   }
 };
 
+/**
+ * Reads all topics batch by batch through a server-side cursor (GET /topics?stream=ndjson).
+ * @param onBatch Receives the next topics; resolve to false to stop early.
+ * @returns A Promise that resolves to the number of topics read.
+ */
+export const forEachTopicBatch = async (onBatch: (topics: any[]) => Promise<boolean>): Promise<number> => {
+  try {
+    return await forEachCursorBatch(
+      'SELECT tid, tname, subid, image_url FROM teachmate.topics ORDER BY tid ASC', [], STREAM_BATCH_SIZE, onBatch
+    );
+  } catch (error) {
+    console.error('Error in forEachTopicBatch:', error);
+    throw new Error('Could not stream topics');
+  }
+};
+
+/**
+ * Retrieves the topics with the given IDs (used by delta sync).
+ * @param tids The topic IDs.
+ * @returns A Promise that resolves to the Topic objects that still exist.
+ */
+export const findTopicsByIds = async (tids: number[]): Promise<any[]> => {
+  if (tids.length === 0) {
+    return [];
+  }
+  try {
+    const result = await queryPrepared('topic_by_ids',
+      'SELECT tid, tname, subid, image_url FROM teachmate.topics WHERE tid = ANY($1::int[]) ORDER BY tid ASC',
+      [tids],
+      reader()
+    );
+    return result.rows;
+  } catch (error) {
+    console.error('Error in findTopicsByIds:', error);
+    throw new Error('Could not retrieve topics by IDs');
+  }
+};
+
 /**
  * Retrieves a single topic by its ID from the database.
  * @param tid The ID of the topic.
@@ -30,7 +69,7 @@ export const findAllTopics = async (): Promise<any[]> => {
 export const findTopicById = async (tid: number): Promise<any | undefined> => {
   try {
     // Corrected table and column names
-    const result = await pool.query('SELECT tid, tname, subid, image_url FROM teachmate.topics WHERE tid = $1', [tid]);
+    const result = await reader().query('SELECT tid, tname, subid, image_url FROM teachmate.topics WHERE tid = $1', [tid]);
     return result.rows[0]; // Returns undefined if no row is found
   } catch (error) {
     console.error(`Error in findTopicById (TID: ${tid}):`, error);
@@ -46,7 +85,7 @@ export const findTopicById = async (tid: number): Promise<any | undefined> => {
 export const findTopicsBySubject = async (subid: number): Promise<any[]> => {
   try {
     // Corrected table and column names
-    const result = await pool.query('SELECT tid, tname, subid, image_url FROM teachmate.topics WHERE subid = $1 ORDER BY tname ASC', [subid]);
+    const result = await reader().query('SELECT tid, tname, subid, image_url FROM teachmate.topics WHERE subid = $1 ORDER BY tname ASC', [subid]);
     return result.rows;
   } catch (error) {
     console.error(`Error in findTopicsBySubject (SUBID: ${subid}):`, error);
@@ -67,28 +106,25 @@ export const findTopicsBySubject = async (subid: number): Promise<any[]> => {
  */
 export const createNewTopic = async (tname: string, subid: number, image_url?: string): Promise<any | null | false> => {
   try {
-    // 1. Validate that the subid (subject) exists
-    const subjectExists = await findSubjectById(subid); // Corrected to use subid
-    if (!subjectExists) {
-      return null; // Indicate that the foreign key (subid) is invalid
-    }
-
-    // 2. Check for duplicate topic name for this specific subject (subid)
-    const existingTopic = await pool.query(
-      'SELECT tid FROM teachmate.topics WHERE subid = $1 AND tname = $2', // Corrected table and column names
-      [subid, tname]
-    );
-    if (existingTopic.rowCount != null && existingTopic.rowCount > 0) { // Added null check
-      return false; // Indicate duplicate topic for this subject
-    }
-
+    // One statement: insert only if the subject exists; the (subid, tname) unique index turns
+    // a duplicate into "nothing inserted" instead of a second row, even for concurrent requests.
     // Note: Assuming 'tid' is handled by an IDENTITY column or SERIAL in your database.
-    // image_url is now included in the insert.
     const result = await pool.query(
-      'INSERT INTO teachmate.topics (tname, subid, image_url) VALUES ($1, $2, $3) RETURNING tid, tname, subid, image_url', // Corrected table and column names, added image_url
+      `WITH parent AS (SELECT subid FROM teachmate.subjects WHERE subid = $2),
+       inserted AS (
+         INSERT INTO teachmate.topics (tname, subid, image_url)
+         SELECT $1::text, subid, $3::text FROM parent
+         ON CONFLICT (subid, tname) DO NOTHING
+         RETURNING tid, tname, subid, image_url)
+       SELECT EXISTS (SELECT 1 FROM parent) AS parent_exists,
+              (SELECT row_to_json(inserted) FROM inserted) AS topic`,
       [tname, subid, image_url]
     );
-    return result.rows[0];
+    const { parent_exists, topic } = result.rows[0];
+    if (!parent_exists) {
+      return null; // Indicate that the foreign key (subid) is invalid
+    }
+    return topic ?? false; // false: duplicate topic for this subject
   } catch (error) {
     console.error('Error in createNewTopic:', error);
     throw new Error('Could not create topic');
@@ -117,9 +153,6 @@ export const updateExistingTopic = async (tid: number, topicData: { tname?: stri
     return '404'; // Topic not found
   }
 
-  const targetTname = tname !== undefined ? tname : currentTopic.tname;
-  const targetSid = subid !== undefined ? subid : currentTopic.subid; // Corrected to subid
-
   // Validate that the new/updated subid (subject) exists if provided
   if (subid !== undefined) {
     const subjectExists = await findSubjectById(subid); // Corrected to use subid
@@ -128,14 +161,7 @@ export const updateExistingTopic = async (tid: number, topicData: { tname?: stri
     }
   }
 
-  // Check for duplicate topic name for the target subject (excluding self)
-  const existingDuplicateTopic = await pool.query(
-    'SELECT tid FROM teachmate.topics WHERE subid = $1 AND tname = $2 AND tid != $3', // Corrected table and column names
-    [targetSid, targetTname, tid]
-  );
-  if (existingDuplicateTopic.rowCount != null && existingDuplicateTopic.rowCount > 0) { // Added null check
-    return false; // This update would create a duplicate topic for this subject
-  }
+  // A duplicate topic name for the target subject is rejected by the (subid, tname) unique index
 
   if (tname !== undefined) {
     fields.push(`tname = $${paramIndex++}`);
@@ -161,6 +187,9 @@ export const updateExistingTopic = async (tid: number, topicData: { tname?: stri
     const result = await pool.query(query, values);
     return result.rows[0]; // Returns undefined if no row was updated (should be caught by 404 check above)
   } catch (error) {
+    if (isUniqueViolation(error)) {
+      return false; // This update would create a duplicate topic for this subject
+    }
     console.error(`Error in updateExistingTopic (TID: ${tid}):`, error);
     throw new Error(`Could not update topic with ID ${tid}`);
   }
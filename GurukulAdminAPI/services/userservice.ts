@@ -1,11 +1,12 @@
 // services/userService.ts - Targeted Type Fixes
 
-import pool from '../utils/db';
+import pool, { queryPrepared, reader } from '../utils/db';
+import { forEachCursorBatch, STREAM_BATCH_SIZE } from '../utils/cursor';
 import { findSubjectById } from './subjectService';
 import bcrypt from 'bcryptjs';
 import { findGurukulById } from './gurukulService';
 import { findMilestoneById } from './milestoneService';
-import { findSubjectsByLevel } from './subjectService'; 
+import { reconcileStudentSlog } from './slogService';
 import { console } from 'inspector';
 
 
@@ -30,6 +31,32 @@ const getRoleSpecificIds = async (userid: number, role: string) => {
 };
 
 
+// --- Query for the full user list (active, or only soft-deleted ones), optionally filtered by role ---
+const allUsersQuery = (role?: string, deleted: boolean = false): { text: string; params: any[] } => {
+  let text = `
+    SELECT
+        u.userid,
+        u.username,
+        u.email,
+        u.role,
+        u.isdeleted,
+        u.created_at,
+        u.user_role_link
+    FROM
+        public.users u
+    WHERE
+        u.isdeleted = $1
+  `;
+  const params: any[] = [deleted];
+  if (role) {
+    text += ` AND u.role = $2`;
+    params.push(role);
+  }
+  text += ` ORDER BY u.username ASC`;
+  return { text, params };
+};
+
+
 // --- User Service Functions ---
 
 /**
@@ -37,62 +64,145 @@ const getRoleSpecificIds = async (userid: number, role: string) => {
  * Enhances results with role-specific data (teachid/sid, assigned subjects/gurukuls/milestones).
  * Finds role-specific data by looking up the user_role_link and role type.
  * @param role Optional role to filter by.
+ * @param deleted If true, lists only the soft-deleted users instead (e.g. to restore them).
  * @returns An array of User objects with enhanced details.
  */
-export const findAllUsers = async (role?: string): Promise<any[]> => {
+export const findAllUsers = async (role?: string, deleted: boolean = false): Promise<any[]> => {
   try {
-    let queryText = `
-      SELECT
-          u.userid,
-          u.username,
-          u.email,
-          u.role,
-          u.isdeleted,
-          u.created_at,
-          u.user_role_link
-      FROM
-          public.users u
-      WHERE
-          u.isdeleted = FALSE
-    `;
-    const queryParams: any[] = [];
-    let paramIndex = 1;
-
-    if (role) {
-      queryText += ` AND u.role = $${paramIndex++}`;
-      queryParams.push(role);
-    }
+    const { text, params } = allUsersQuery(role, deleted);
+    const result = await reader().query(text, params);
+    return await enhanceUsers(result.rows);
+  } catch (error) {
+    console.error('Error in findAllUsers:', error);
+    throw new Error('Could not retrieve users');
+  }
+};
 
-    queryText += ` ORDER BY u.username ASC`;
+/**
+ * Reads the same users as findAllUsers batch by batch through a server-side cursor,
+ * enhancing each batch before handing it on (used by GET /users?stream=ndjson).
+ * @param role Optional role to filter by.
+ * @param deleted If true, streams only the soft-deleted users.
+ * @param onBatch Receives the next enhanced users; resolve to false to stop early.
+ * @returns A Promise that resolves to the number of users read.
+ */
+export const forEachUserBatch = async (
+  role: string | undefined,
+  deleted: boolean,
+  onBatch: (users: any[]) => Promise<boolean>
+): Promise<number> => {
+  try {
+    const { text, params } = allUsersQuery(role, deleted);
+    return await forEachCursorBatch(text, params, STREAM_BATCH_SIZE, async (rows) => onBatch(await enhanceUsers(rows)));
+  } catch (error) {
+    console.error('Error in forEachUserBatch:', error);
+    throw new Error('Could not stream users');
+  }
+};
 
-    const result = await pool.query(queryText, queryParams);
-    const users = result.rows;
+/**
+ * Retrieves the non-deleted users with the given IDs, enhanced like findAllUsers.
+ * Used by delta sync (GET /changes) to send only the rows that changed.
+ * @param userids The public.users.userid values.
+ * @returns An array of User objects with enhanced details (deleted/missing IDs are omitted).
+ */
+export const findUsersByIds = async (userids: number[]): Promise<any[]> => {
+  if (userids.length === 0) {
+    return [];
+  }
+  try {
+    const result = await reader().query(
+      `SELECT userid, username, email, role, isdeleted, created_at, user_role_link
+       FROM public.users
+       WHERE userid = ANY($1::int[]) AND isdeleted = FALSE
+       ORDER BY username ASC`,
+      [userids]
+    );
+    return await enhanceUsers(result.rows);
+  } catch (error) {
+    console.error('Error in findUsersByIds:', error);
+    throw new Error('Could not retrieve users by IDs');
+  }
+};
 
-    const enhancedUsers = [];
-    for (const user of users) {
-      if (user.role === 'teacher' && user.user_role_link) {
-        const teacherResult = await pool.query('SELECT teachid, last_login FROM teachmate.teachers WHERE teachid = $1', [user.user_role_link]);
-        if (teacherResult.rows[0]) {
-            user.teachid = teacherResult.rows[0].teachid;
-            user.last_login = teacherResult.rows[0].last_login;
-            user.assigned_subjects = await findSubjectsAssignedToTeacher(user.teachid);
-        }
-      } else if (user.role === 'student' && user.user_role_link) {
-        const studentResult = await pool.query('SELECT sid FROM studentmate.students WHERE sid = $1', [user.user_role_link]);
-        if (studentResult.rows[0]) {
-            user.sid = studentResult.rows[0].sid;
-            user.assigned_gurukuls = await findGurukulsAssignedToStudent(user.sid);
-            user.assigned_milestones = await findMilestonesAssignedToStudent(user.sid);
-        }
-      }
-      enhancedUsers.push(user);
+// Groups rows by one column, keeping their order; the column itself is dropped from the rows.
+const groupRows = (rows: any[], column: string): Map<number, any[]> => {
+  const groups = new Map<number, any[]>();
+  rows.forEach(({ [column]: key, ...row }) => {
+    const group = groups.get(key);
+    if (group) {
+      group.push(row);
+    } else {
+      groups.set(key, [row]);
     }
+  });
+  return groups;
+};
 
-    return enhancedUsers;
-  } catch (error) {
-    console.error('Error in findAllUsers:', error);
-    throw new Error('Could not retrieve users');
+/**
+ * Adds role-specific details (teachid/sid, assigned subjects/gurukuls/milestones) to user rows.
+ * The role rows and assignments of all the users are read with one `= ANY($1)` query per table,
+ * one query after another, so a list holds a single connection however many users it has.
+ * Assignments are keyed by user_role_link (the teachid / sid) and only attached if the role row exists.
+ * @param users Rows from public.users.
+ * @returns The same rows, enhanced in place.
+ */
+const enhanceUsers = async (users: any[]): Promise<any[]> => {
+  const links = (role: string): number[] =>
+    users.filter((user) => user.role === role && user.user_role_link).map((user) => user.user_role_link);
+  const teachids = links('teacher');
+  const sids = links('student');
+  const db = reader();
+
+  if (teachids.length > 0) {
+    const teachers = await queryPrepared('teacher_rows',
+      'SELECT teachid, last_login FROM teachmate.teachers WHERE teachid = ANY($1::int[])', [teachids], db);
+    const subjects = await queryPrepared('teachers_subjects',
+      `SELECT ts.teacher_id, s.subid, s.subname, s.level, s.image_url
+       FROM teachmate.subjects s
+       JOIN teachmate.teacher_assignments ts ON s.subid = ts.sub_id
+       WHERE ts.teacher_id = ANY($1::int[])
+       ORDER BY s.subname ASC`,
+      [teachids], db);
+    const teacherById = new Map(teachers.rows.map((row: any) => [row.teachid, row]));
+    const subjectsByTeacher = groupRows(subjects.rows, 'teacher_id');
+    users.forEach((user) => {
+      const teacher: any = user.role === 'teacher' && teacherById.get(user.user_role_link);
+      if (teacher) {
+        user.teachid = teacher.teachid;
+        user.last_login = teacher.last_login;
+        user.assigned_subjects = subjectsByTeacher.get(teacher.teachid) || [];
+      }
+    });
+  }
+
+  if (sids.length > 0) {
+    const students = await queryPrepared('student_rows',
+      'SELECT sid FROM studentmate.students WHERE sid = ANY($1::int[])', [sids], db);
+    const gurukuls = await queryPrepared('students_gurukuls',
+      `SELECT sg.sid, g.gid, g.gname, sg.starttime, sg.endtime, sg.status
+       FROM public.gurukul g
+       JOIN studentmate.sgurukul sg ON g.gid = sg.gid
+       WHERE sg.sid = ANY($1::int[])`,
+      [sids], db);
+    const milestones = await queryPrepared('students_milestones',
+      `SELECT sm.sid, m.mid, m.class, m.level, sm.starttime, sm.endtime, sm.status, sm.score
+       FROM public.milestones m
+       JOIN studentmate.smilestones sm ON m.mid = sm.mid
+       WHERE sm.sid = ANY($1::int[])`,
+      [sids], db);
+    const studentIds = new Set(students.rows.map((row: any) => row.sid));
+    const gurukulsByStudent = groupRows(gurukuls.rows, 'sid');
+    const milestonesByStudent = groupRows(milestones.rows, 'sid');
+    users.forEach((user) => {
+      if (user.role === 'student' && studentIds.has(user.user_role_link)) {
+        user.sid = user.user_role_link;
+        user.assigned_gurukuls = gurukulsByStudent.get(user.sid) || [];
+        user.assigned_milestones = milestonesByStudent.get(user.sid) || [];
+      }
+    });
   }
+  return users;
 };
 
 /**
@@ -102,30 +212,13 @@ export const findAllUsers = async (role?: string): Promise<any[]> => {
  */
 export const findUserById = async (userid: number): Promise<any | undefined> => {
   try {
-    const result = await pool.query(
+    const result = await queryPrepared('user_by_id',
       `SELECT userid, username, email, role, isdeleted, created_at, user_role_link FROM public.users WHERE userid = $1 AND isdeleted = FALSE`,
-      [userid]
+      [userid],
+      reader()
     );
     const user = result.rows[0];
-
-    if (user) {
-        if (user.role === 'teacher' && user.user_role_link) {
-            const teacherResult = await pool.query('SELECT teachid, last_login FROM teachmate.teachers WHERE teachid = $1', [user.user_role_link]);
-            if (teacherResult.rows[0]) {
-                user.teachid = teacherResult.rows[0].teachid;
-                user.last_login = teacherResult.rows[0].last_login;
-                user.assigned_subjects = await findSubjectsAssignedToTeacher(user.teachid);
-            }
-        } else if (user.role === 'student' && user.user_role_link) {
-            const studentResult = await pool.query('SELECT sid FROM studentmate.students WHERE sid = $1', [user.user_role_link]);
-            if (studentResult.rows[0]) {
-                user.sid = studentResult.rows[0].sid;
-                user.assigned_gurukuls = await findGurukulsAssignedToStudent(user.sid);
-                user.assigned_milestones = await findMilestonesAssignedToStudent(user.sid);
-            }
-        }
-    }
-    return user;
+    return user ? (await enhanceUsers([user]))[0] : user;
   } catch (error) {
     console.error(`Error in findUserById (User ID: ${userid}):`, error);
     throw new Error(`Could not retrieve user with ID ${userid}`);
@@ -152,6 +245,7 @@ export const createNewUser = async (
     milestoneId?: number | null,
     subjectIds?: number[]
 ): Promise<any | false> => {
+  let newUserId: number;
   const client = await pool.connect(); // Get a PoolClient for the transaction
   try {
     await client.query('BEGIN'); // Start transaction
@@ -220,7 +314,7 @@ export const createNewUser = async (
     const newUser = userResult.rows[0];
 
     await client.query('COMMIT');
-    return await findUserById(newUser.userid);
+    newUserId = newUser.userid;
   } catch (error) {
     await client.query('ROLLBACK');
     console.error('Error in createNewUser:', error);
@@ -228,61 +322,27 @@ export const createNewUser = async (
   } finally {
     client.release();
   }
+  // Read back once the transaction's client is released, so the lookups never wait behind it
+  return await findUserById(newUserId);
 };
 
-// Helper function to find journeys by subject IDs
-async function findJourneysBySubjectIds(subjectIds: number[], client: any): Promise<{ jid: number }[]> {
-    if (subjectIds.length === 0) {
-        return []; // No subject IDs to query
-    }
-    // Using ANY($1::int[]) to efficiently query for multiple subject_ids.
-    const journeysResult = await client.query(
-        'SELECT jid FROM teachmate.journey WHERE subject_id = ANY($1::int[])',
-        [subjectIds]
-    );
-    console.log("I AM SELECTING THE JOURNEYS");
-    console.table(journeysResult.rows);
-    return journeysResult.rows;
-}
-
-// Helper function to insert journeys into the slog table
-async function insertJourneysIntoSlog(studentId: number, journeyIds: number[], client: any): Promise<void> {
-    if (journeyIds.length === 0) {
-        console.log(`No journeys to insert into slog for student ${studentId}.`);
-        return;
-    }
-    console.log("insert joueny into slog: ")
-    console.log(journeyIds);
-    const insertPromises = journeyIds.map(jid =>
-        client.query(
-            'INSERT INTO studentmate.slog (sid, jid, starttime, status) VALUES ($1, $2, NOW(), $3)',
-            [studentId, jid, 'Started']
-        )
-    );
-
-    try {
-        await Promise.all(insertPromises);
-        console.log(`Successfully assigned ${journeyIds.length} new journeys to student ${studentId} with status 'Started'.`);
-    } catch (error) {
-        console.error(`Error: Failed to insert new journeys into slog for student ${studentId}. Details:`, error);
-        // Do not stop the service, but log the critical error.
-    }
-}
-
-
 /**
  * Updates an existing user in public.users, and propagates changes to role-specific tables.
  * @param userid The public.users.userid of the user to update.
  * @param userData Object containing optional username, email, role, subject_ids (for teachers), gurukulId, and milestoneId (for students).
+ *                 slogMode ('reconcile' or 'reset') controls how the student's journeys follow a new milestone.
  * @returns A Promise that resolves to the updated User object if successful, undefined if not found.
  * Returns false if the update would create a duplicate email.
  * Returns '404' string if user itself is not found.
  */
 export const updateExistingUser = async (
     userid: number,
-    userData: { username?: string; email?: string; role?: string; subject_ids?: number[]; gurukulId?: number | null; milestoneId?: number | null }
+    userData: {
+      username?: string; email?: string; role?: string; subject_ids?: number[];
+      gurukulId?: number | null; milestoneId?: number | null; slogMode?: string;
+    }
 ): Promise<any | false | '404'> => {
-  const { username, email, role, subject_ids, gurukulId, milestoneId } = userData;
+  const { username, email, role, subject_ids, gurukulId, milestoneId, slogMode = 'reconcile' } = userData;
   const client = await pool.connect();
   try {
     await client.query('BEGIN');
@@ -348,8 +408,9 @@ export const updateExistingUser = async (
         }
     }
     
-    // Get the most up-to-date user data including potentially updated role and user_role_link
-    const updatedPublicUser = await findUserById(userid);
+    // Get the most up-to-date role and user_role_link, as this transaction sees them
+    const updatedPublicUserResult = await client.query('SELECT userid, role, user_role_link FROM public.users WHERE userid = $1', [userid]);
+    const updatedPublicUser = updatedPublicUserResult.rows[0];
     if (!updatedPublicUser) {
         await client.query('ROLLBACK');
         return '404';
@@ -406,67 +467,18 @@ export const updateExistingUser = async (
         }
         if (milestoneId !== undefined && milestoneId !== null) {
             await assignMilestoneToStudent(studentId, milestoneId, client);
-            // --- Logic for updating student's journey (slog) entries based on new milestone level ---
-            console.log("milestone change. New logic starts");
-            // 1. Retrieve and log current slog entries for the student.
-            // This step allows for a record of what journeys the student was on before the update.
-            const currentSlogEntriesResult = await client.query(
-                'SELECT distinct jid FROM studentmate.slog WHERE sid = $1',
-                [studentId]
-            );
-            console.log(`Student ${studentId} was previously engaged in these journeys:`, currentSlogEntriesResult.rows);
-
-            // Delete all existing slog entries for the student.
-            // This ensures a clean slate before assigning new level-specific journeys.
-            await client.query('DELETE FROM studentmate.slog WHERE sid = $1', [studentId]);
-            console.log(`Successfully removed all prior slog entries for student ${studentId}.`);
-
-            // 2. Assign new journeys based on the student's updated level.
-            // First, fetch the student's current level directly from the milestone using milestoneService.
+            // Bring the student's journey log (slog) in line with the new milestone's level.
             const milestone = await findMilestoneById(milestoneId);
-
-            // Handle cases where the milestone might not be found or has no level.
             if (!milestone || milestone.level === null || milestone.level === undefined) {
-                console.warn(`Info: Milestone ${milestoneId} not found or has no level defined. Cannot assign new journeys.`);
-                return; // Not an error to stop service, just an info/warning.
+                console.warn(`Info: Milestone ${milestoneId} not found or has no level defined. Journeys left unchanged.`);
+            } else {
+                await reconcileStudentSlog(client, studentId, milestone.level, slogMode);
             }
-
-            const newStudentLevel = milestone.level;
-            console.log(`Student ${studentId} has a new level based on milestone ${milestoneId}: ${newStudentLevel}. Fetching new journeys.`);
-
-            // Retrieve subjects associated with the student's new level using subjectService.
-            const subjects = await findSubjectsByLevel(newStudentLevel);
-            const subjectIds = subjects.map(row => row.subject_id);
-
-            // If no subjects are found for the new level, no journeys can be assigned.
-            if (subjectIds.length === 0) {
-                console.log(`Info: No subjects found for level ${newStudentLevel}. No new journeys will be assigned.`);
-                return; // Not an error to stop service, just an info.
-            }
-            
-            // Retrieve journeys associated with the identified subjects using the new helper.
-            const journeys = await findJourneysBySubjectIds(subjectIds, client);
-            console.log("In updateExxtingUser: Got the result in findJourneysBySubjectIds ");
-            console.log(journeys);
-            const newJourneyIds = journeys.map(row => row.jid);
-
-            // If no journeys are found for the subjects, skip insertion.
-            if (newJourneyIds.length === 0) {
-                console.log(`Info: No new journeys found for the assigned subjects. No new slog entries will be created.`);
-                return; // Not an error to stop service, just an info.
-            }
-
-            console.log("sending joueneys to create slogs: ");
-            console.log(newJourneyIds);
-            // Insert the new journeys into the `studentmate.slog` table using the new helper.
-            await insertJourneysIntoSlog(studentId, newJourneyIds, client);
-
         }//!milestoneId
 
     }
 
     await client.query('COMMIT');
-    return await findUserById(userid);
   } catch (error) {
     await client.query('ROLLBACK');
     console.error(`Error in updateExistingUser (User ID: ${userid}):`, error);
@@ -474,6 +486,8 @@ export const updateExistingUser = async (
   } finally {
     client.release();
   }
+  // Read back once the transaction's client is released, so the lookups never wait behind it
+  return await findUserById(userid);
 };
 
 /**
@@ -523,6 +537,94 @@ export const softDeleteUserById = async (userid: number): Promise<boolean> => {
   }
 };
 
+/**
+ * Soft-deletes many users at once: one UPDATE ... WHERE userid = ANY($1) in a transaction,
+ * then their teachmate.teachers / studentmate.students rows are deleted with one statement
+ * each (assignments go with them via ON DELETE CASCADE), as softDeleteUserById does for one.
+ * @param userids The public.users.userid values.
+ * @returns A Promise that resolves to { deleted, notFound }: the IDs soft-deleted now, and the
+ *          IDs that do not exist or were already deleted.
+ */
+export const softDeleteUsersByIds = async (userids: number[]): Promise<{ deleted: number[]; notFound: number[] }> => {
+  const client = await pool.connect();
+  try {
+    await client.query('BEGIN');
+    const result = await client.query(
+      `UPDATE public.users SET isdeleted = TRUE
+       WHERE userid = ANY($1::int[]) AND isdeleted = FALSE
+       RETURNING userid, role, user_role_link`,
+      [userids]
+    );
+    const links = (role: string) =>
+      result.rows.filter((u) => u.role === role && u.user_role_link !== null).map((u) => u.user_role_link);
+    await client.query('DELETE FROM teachmate.teachers WHERE teachid = ANY($1::int[])', [links('teacher')]);
+    await client.query('DELETE FROM studentmate.students WHERE sid = ANY($1::int[])', [links('student')]);
+    await client.query('COMMIT');
+
+    const deleted = result.rows.map((u) => u.userid);
+    const deletedSet = new Set(deleted);
+    console.log(`Soft-deleted ${deleted.length} of ${userids.length} users`);
+    return { deleted, notFound: userids.filter((id) => !deletedSet.has(id)) };
+  } catch (error) {
+    await client.query('ROLLBACK');
+    console.error(`Error in softDeleteUsersByIds (${userids.length} IDs):`, error);
+    throw new Error('Could not soft delete users');
+  } finally {
+    client.release();
+  }
+};
+
+/**
+ * Restores many soft-deleted users at once (isdeleted back to FALSE) in one transaction.
+ * Soft-deleting removed their teacher/student rows, so those are re-created under the same
+ * teachid/sid (user_role_link) with the default password, as createNewUser does. Gurukul,
+ * milestone and subject assignments were removed with them and are not restored.
+ * @param userids The public.users.userid values.
+ * @returns A Promise that resolves to { restored, notFound }: the IDs restored now, and the
+ *          IDs that do not exist or were not deleted.
+ */
+export const restoreUsersByIds = async (userids: number[]): Promise<{ restored: number[]; notFound: number[] }> => {
+  const passwordHash = await bcrypt.hash('password123', 10);
+  const client = await pool.connect();
+  try {
+    await client.query('BEGIN');
+    const result = await client.query(
+      `UPDATE public.users SET isdeleted = FALSE
+       WHERE userid = ANY($1::int[]) AND isdeleted = TRUE
+       RETURNING userid, username, email, role, user_role_link`,
+      [userids]
+    );
+    const restored = result.rows.map((u) => u.userid);
+    await client.query(
+      `INSERT INTO teachmate.teachers (teachid, name, email, password_hash, created_at)
+       SELECT u.user_role_link, u.username, u.email, $2, NOW()
+       FROM public.users u
+       WHERE u.userid = ANY($1::int[]) AND u.role = 'teacher' AND u.user_role_link IS NOT NULL
+       ON CONFLICT DO NOTHING`,
+      [restored, passwordHash]
+    );
+    await client.query(
+      `INSERT INTO studentmate.students (sid, sname, email, password_hash)
+       SELECT u.user_role_link, u.username, u.email, $2
+       FROM public.users u
+       WHERE u.userid = ANY($1::int[]) AND u.role = 'student' AND u.user_role_link IS NOT NULL
+       ON CONFLICT DO NOTHING`,
+      [restored, passwordHash]
+    );
+    await client.query('COMMIT');
+
+    const restoredSet = new Set(restored);
+    console.log(`Restored ${restored.length} of ${userids.length} users`);
+    return { restored, notFound: userids.filter((id) => !restoredSet.has(id)) };
+  } catch (error) {
+    await client.query('ROLLBACK');
+    console.error(`Error in restoreUsersByIds (${userids.length} IDs):`, error);
+    throw new Error('Could not restore users');
+  } finally {
+    client.release();
+  }
+};
+
 /**
  * Retrieves all subjects assigned to a specific teacher.
  * IMPORTANT: This function expects teachmate.teachers.teachid.
@@ -531,7 +633,7 @@ export const softDeleteUserById = async (userid: number): Promise<boolean> => {
  */
 export const findSubjectsAssignedToTeacher = async (teachid: number): Promise<any[]> => {
   try {
-    const result = await pool.query(
+    const result = await queryPrepared('teacher_subjects',
       `SELECT
           s.subid,
           s.subname,
@@ -545,7 +647,8 @@ export const findSubjectsAssignedToTeacher = async (teachid: number): Promise<an
           ts.teacher_id = $1
       ORDER BY
           s.subname ASC`,
-      [teachid]
+      [teachid],
+      reader()
     );
     return result.rows;
   } catch (error) {
@@ -570,18 +673,23 @@ export const assignSubjectsToTeacher = async (teachid: number, subjectIds: numbe
       return false;
     }
 
-    await queryClient.query('DELETE FROM teachmate.teacher_assignments WHERE teacher_id = $1', [teachid]);
+    // Validate the subjects together (findSubjectById batches them into one query) while the old assignments are cleared
+    const [subjects] = await Promise.all([
+      Promise.all(subjectIds.map((subid) => findSubjectById(subid))),
+      queryClient.query('DELETE FROM teachmate.teacher_assignments WHERE teacher_id = $1', [teachid]),
+    ]);
 
-    for (const subid of subjectIds) {
-      const subjectExists = await findSubjectById(subid);
-      if (!subjectExists) {
+    const existingSubjectIds = subjectIds.filter((subid, i) => {
+      if (!subjects[i]) {
         console.warn(`Subject with ID ${subid} not found during assignment to teacher ${teachid}. Skipping.`);
-      } else {
-        await queryClient.query(
-          'INSERT INTO teachmate.teacher_assignments (teacher_id, sub_id, isapprover) VALUES ($1, $2, FALSE)',
-          [teachid, subid]
-        );
       }
+      return Boolean(subjects[i]);
+    });
+    if (existingSubjectIds.length > 0) {
+      await queryClient.query(
+        'INSERT INTO teachmate.teacher_assignments (teacher_id, sub_id, isapprover) SELECT $1, unnest($2::int[]), FALSE',
+        [teachid, existingSubjectIds]
+      );
     }
     return true;
   } catch (error) {
@@ -676,7 +784,7 @@ export const findGurukulsAssignedToStudent = async (sid: number): Promise<any[]>
     try {
       console.log(`findGurukulsAssignedToStudent ${sid} `);
 
-        const result = await pool.query(
+        const result = await queryPrepared('student_gurukuls',
             `SELECT
                 g.gid,
                 g.gname,
@@ -689,7 +797,8 @@ export const findGurukulsAssignedToStudent = async (sid: number): Promise<any[]>
                 studentmate.sgurukul sg ON g.gid = sg.gid
             WHERE
                 sg.sid = $1`,
-            [sid]
+            [sid],
+            reader()
         );
         // Check if result is found
 if (result.rows.length === 0) {
@@ -713,7 +822,7 @@ if (result.rows.length === 0) {
  */
 export const findMilestonesAssignedToStudent = async (sid: number): Promise<any[]> => {
     try {
-        const result = await pool.query(
+        const result = await queryPrepared('student_milestones',
             `SELECT
                 m.mid,
                 m.class,
@@ -728,7 +837,8 @@ export const findMilestonesAssignedToStudent = async (sid: number): Promise<any[
                 studentmate.smilestones sm ON m.mid = sm.mid
             WHERE
                 sm.sid = $1`,
-            [sid]
+            [sid],
+            reader()
         );
         // Check if result is found
 if (result.rows.length === 0) {
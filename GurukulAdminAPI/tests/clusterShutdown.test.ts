@@ -0,0 +1,74 @@
+// tests/clusterShutdown.test.ts - Stopping the cluster while a change stream is open (cluster.ts, index.ts)
+// Starts dist/cluster.js with one worker against the database from .env (section 7 of `tables`
+// installed), opens GET /changes/stream and sends SIGTERM to the primary. The worker has to end the
+// stream and exit on its own, well before the primary would kill it. Skipped without DB_HOST.
+import dotenv from 'dotenv';
+dotenv.config();
+
+import test from 'node:test';
+import assert from 'assert';
+import http from 'http';
+import path from 'path';
+import { spawn } from 'child_process';
+
+const PORT = 5391;
+const SHUTDOWN_TIMEOUT_MS = 20000; // the primary's kill timer
+const DRAIN_TIMEOUT_MS = 5000;
+
+const get = (urlPath: string): Promise<http.IncomingMessage> =>
+  new Promise((resolve, reject) => {
+    http.get({ host: '127.0.0.1', port: PORT, path: urlPath }, resolve).on('error', reject);
+  });
+
+const waitUntilUp = async (timeoutMs: number): Promise<void> => {
+  const deadline = Date.now() + timeoutMs;
+  for (;;) {
+    try {
+      (await get('/')).resume();
+      return;
+    } catch (error) {
+      if (Date.now() > deadline) {
+        throw new Error(`API did not answer on port ${PORT} within ${timeoutMs} ms`);
+      }
+      await new Promise((resolve) => setTimeout(resolve, 250));
+    }
+  }
+};
+
+test('SIGTERM stops a worker with an open change stream before the kill timeout', { skip: !process.env.DB_HOST && 'DB_HOST not set' }, async (t) => {
+  const primary = spawn(process.execPath, [path.join(__dirname, '..', 'cluster.js')], {
+    env: {
+      ...process.env,
+      WORKERS: '1',
+      PORT: String(PORT),
+      WORKER_SHUTDOWN_TIMEOUT_MS: String(SHUTDOWN_TIMEOUT_MS),
+      WORKER_DRAIN_TIMEOUT_MS: String(DRAIN_TIMEOUT_MS),
+    },
+    stdio: 'ignore',
+  });
+  const exited = new Promise<number | null>((resolve) => primary.once('exit', (code) => resolve(code)));
+  try {
+    await waitUntilUp(30000);
+    const stream = await get('/changes/stream');
+    if (stream.statusCode !== 200) {
+      stream.resume();
+      t.skip(`change feed not available (HTTP ${stream.statusCode})`);
+      return;
+    }
+    const streamClosed = new Promise<void>((resolve) => stream.on('close', () => resolve()));
+    stream.resume();
+
+    const started = Date.now();
+    primary.kill('SIGTERM');
+    const code = await exited;
+    const elapsed = Date.now() - started;
+
+    assert.strictEqual(code, 0);
+    assert.ok(elapsed < SHUTDOWN_TIMEOUT_MS, `cluster took ${elapsed} ms to stop (kill timer: ${SHUTDOWN_TIMEOUT_MS} ms)`);
+    await streamClosed;
+  } finally {
+    if (primary.exitCode === null && primary.signalCode === null) {
+      primary.kill('SIGKILL');
+    }
+  }
+});
@@ -0,0 +1,76 @@
+// tests/deltaSync.test.ts - Users delta (GET /changes?table=users) after renames of embedded rows
+// User rows embed subject names and gurukul names, so renaming a subject or a gurukul has to mark
+// the users assigned to it as changed. Runs against the database from .env with sections 7 and 8
+// of `tables` installed; each test restores the name it changed. Skipped without DB_HOST.
+import dotenv from 'dotenv';
+dotenv.config();
+
+import test, { after } from 'node:test';
+import assert from 'assert';
+import pool, { readPool } from '../utils/db';
+import { findCollectionDelta } from '../services/deltaSyncService';
+
+const dbTest = { skip: !process.env.DB_HOST && 'DB_HOST not set' };
+
+after(async () => {
+  await Promise.all([pool.end(), readPool === pool ? undefined : readPool.end()]);
+});
+
+/**
+ * Renames a row, and returns the users delta since just before the rename (the name is restored afterwards).
+ */
+const usersDeltaAfterRename = async (table: string, key: string, column: string, id: number, oldName: string, newName: string) => {
+  const before = await findCollectionDelta('users');
+  await pool.query(`UPDATE ${table} SET ${column} = $2 WHERE ${key} = $1`, [id, newName]);
+  try {
+    return await findCollectionDelta('users', before!.seq);
+  } finally {
+    await pool.query(`UPDATE ${table} SET ${column} = $2 WHERE ${key} = $1`, [id, oldName]);
+  }
+};
+
+test('a subject rename shows up in the users delta of its teachers', dbTest, async (t) => {
+  const found = await pool.query(
+    `SELECT u.userid, s.subid, s.subname
+     FROM teachmate.teacher_assignments ta
+     JOIN teachmate.subjects s ON s.subid = ta.sub_id
+     JOIN public.users u ON u.role = 'teacher' AND u.user_role_link = ta.teacher_id AND u.isdeleted = FALSE
+     LIMIT 1`
+  );
+  if (found.rows.length === 0) {
+    t.skip('no teacher with an assigned subject');
+    return;
+  }
+  const { userid, subid, subname } = found.rows[0];
+  const renamed = `${subname} (renamed)`;
+
+  const delta = await usersDeltaAfterRename('teachmate.subjects', 'subid', 'subname', subid, subname, renamed);
+
+  assert.strictEqual(delta!.reset, false);
+  const user = delta!.upserts.find((row) => row.userid === userid);
+  assert.ok(user, `teacher ${userid} is not in the delta`);
+  assert.ok(user.assigned_subjects.some((s: any) => s.subid === subid && s.subname === renamed));
+});
+
+test('a gurukul rename shows up in the users delta of its students', dbTest, async (t) => {
+  const found = await pool.query(
+    `SELECT u.userid, g.gid, g.gname
+     FROM studentmate.sgurukul sg
+     JOIN public.gurukul g ON g.gid = sg.gid
+     JOIN public.users u ON u.role = 'student' AND u.user_role_link = sg.sid AND u.isdeleted = FALSE
+     LIMIT 1`
+  );
+  if (found.rows.length === 0) {
+    t.skip('no student with an assigned gurukul');
+    return;
+  }
+  const { userid, gid, gname } = found.rows[0];
+  const renamed = `${gname} (renamed)`;
+
+  const delta = await usersDeltaAfterRename('public.gurukul', 'gid', 'gname', gid, gname, renamed);
+
+  assert.strictEqual(delta!.reset, false);
+  const user = delta!.upserts.find((row) => row.userid === userid);
+  assert.ok(user, `student ${userid} is not in the delta`);
+  assert.ok(user.assigned_gurukuls.some((g: any) => g.gid === gid && g.gname === renamed));
+});
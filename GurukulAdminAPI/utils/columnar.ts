@@ -0,0 +1,57 @@
+// utils/columnar.ts - Column-oriented JSON encoding for list endpoints
+// List routes answer `?format=columnar` with one array per column instead of one
+// object per row, which drops the repeated keys from the payload and lets the UI
+// hand each column straight to Arrow/pandas.
+
+import { Request, Response } from 'express';
+
+/**
+ * Column-oriented list payload: data[column][i] is the value of `column` in row i.
+ */
+export interface ColumnarPayload {
+  format: 'columnar';
+  length: number;
+  columns: string[];
+  data: { [column: string]: any[] };
+}
+
+/**
+ * True if the client asked for the columnar encoding (`?format=columnar`).
+ * @param req Request object
+ */
+export const wantsColumnar = (req: Request): boolean => req.query.format === 'columnar';
+
+/**
+ * Transposes query rows into a ColumnarPayload.
+ * Columns are the union of the keys of all rows, in order of first appearance: enhanced rows
+ * (e.g. users, whose role-specific fields depend on the role) do not all share the same keys.
+ * Rows without a column get null in it.
+ * @param rows Rows as returned by pg (or by a service)
+ */
+export const toColumnar = (rows: Array<{ [key: string]: any }>): ColumnarPayload => {
+  const seen = new Set<string>();
+  for (const row of rows) {
+    Object.keys(row).forEach((key) => seen.add(key));
+  }
+  const columns = Array.from(seen);
+  const data: { [column: string]: any[] } = {};
+  for (const column of columns) {
+    data[column] = new Array(rows.length);
+  }
+  rows.forEach((row, i) => {
+    for (const column of columns) {
+      data[column][i] = row[column] === undefined ? null : row[column];
+    }
+  });
+  return { format: 'columnar', length: rows.length, columns, data };
+};
+
+/**
+ * Sends a list response as a JSON array of rows, or columnar when requested.
+ * @param req Request object (checks the 'format' query param)
+ * @param res Response object
+ * @param rows Rows to send
+ */
+export const sendRows = (req: Request, res: Response, rows: Array<{ [key: string]: any }>): void => {
+  res.status(200).json(wantsColumnar(req) ? toColumnar(rows) : rows);
+};
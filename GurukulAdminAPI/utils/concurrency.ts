@@ -0,0 +1,32 @@
+// utils/concurrency.ts - Runs independent async lookups side by side, a few at a time
+// Enriching a list (students with their gurukuls and milestones) used to await one
+// query after another. Running them all at once would instead queue the whole list on the
+// pool and starve other requests, so lists are processed QUERY_CONCURRENCY items at a time.
+// An item may run a few queries of its own at once (a student's gurukuls and milestones), so
+// the default keeps QUERY_CONCURRENCY x queries per item under pg's default pool size of 10.
+
+export const QUERY_CONCURRENCY = parseInt(process.env.QUERY_CONCURRENCY || '3', 10);
+
+/**
+ * Maps items through fn with at most `limit` calls in flight; results keep the input order.
+ * Rejects with the first error (calls already started are left to finish).
+ * @param items The inputs.
+ * @param fn The async mapping.
+ * @param limit Maximum number of concurrent calls.
+ */
+export const mapWithConcurrency = async <T, R>(
+  items: T[],
+  fn: (item: T, index: number) => Promise<R>,
+  limit: number = QUERY_CONCURRENCY
+): Promise<R[]> => {
+  const results = new Array<R>(items.length);
+  let next = 0;
+  const worker = async (): Promise<void> => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+  await Promise.all(Array.from({ length: Math.max(1, Math.min(limit, items.length)) }, worker));
+  return results;
+};
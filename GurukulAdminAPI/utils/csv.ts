@@ -0,0 +1,29 @@
+// utils/csv.ts - Minimal RFC 4180 CSV encoding for streamed exports
+
+const needsQuoting = /[",\r\n]/;
+
+/**
+ * Encodes one value as a CSV field: null/undefined become empty, dates ISO 8601,
+ * arrays are joined with '; ', and fields containing quotes, commas or newlines are quoted.
+ */
+export const csvField = (value: any): string => {
+  if (value === null || value === undefined) {
+    return '';
+  }
+  let text: string;
+  if (value instanceof Date) {
+    text = value.toISOString();
+  } else if (Array.isArray(value)) {
+    text = value.join('; ');
+  } else if (typeof value === 'object') {
+    text = JSON.stringify(value);
+  } else {
+    text = String(value);
+  }
+  return needsQuoting.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+};
+
+/**
+ * Encodes one CSV record, including the trailing CRLF.
+ */
+export const csvLine = (values: any[]): string => values.map(csvField).join(',') + '\r\n';
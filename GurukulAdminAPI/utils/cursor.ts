@@ -0,0 +1,55 @@
+// utils/cursor.ts - Reads large query results batch by batch through a server-side cursor
+// The query runs as DECLARE ... CURSOR inside a read-only transaction on a dedicated
+// connection and is read with FETCH n, so only one batch is held in memory at a time
+// (plain SQL, no pg-cursor dependency). Used by the streamed list routes and exports.
+
+import pool from './db';
+
+export const STREAM_BATCH_SIZE = parseInt(process.env.STREAM_BATCH_SIZE || '500', 10);
+// The transaction stays open while a batch is written to a slow client, so the pool's
+// idle_in_transaction_session_timeout (utils/db.ts) is raised to this for cursor reads
+const STREAM_IDLE_TIMEOUT_MS = parseInt(process.env.STREAM_IDLE_TIMEOUT_MS || '300000', 10);
+
+/**
+ * Runs a query through a cursor and hands the rows over batch by batch.
+ * onBatch is awaited before the next FETCH, so a slow consumer slows the reads down;
+ * it is called once with no rows for an empty result, so the column names are still known.
+ * Note the cursor keeps its pool connection until the last batch has been handled.
+ * @param queryText The SELECT to read (must not end with a semicolon).
+ * @param params Query parameters.
+ * @param batchSize Rows per FETCH.
+ * @param onBatch Receives the next rows and the column names; resolve to false to stop early.
+ * @returns A Promise that resolves to the number of rows read.
+ */
+export const forEachCursorBatch = async (
+  queryText: string,
+  params: any[],
+  batchSize: number,
+  onBatch: (rows: any[], columns: string[]) => Promise<boolean>
+): Promise<number> => {
+  const client = await pool.connect();
+  let total = 0;
+  try {
+    await client.query('BEGIN READ ONLY');
+    await client.query(`SET LOCAL idle_in_transaction_session_timeout = ${STREAM_IDLE_TIMEOUT_MS}`);
+    await client.query(`DECLARE batch_cursor NO SCROLL CURSOR FOR ${queryText}`, params);
+    while (true) {
+      const result = await client.query(`FETCH ${batchSize} FROM batch_cursor`);
+      if (result.rows.length === 0 && total > 0) {
+        break;
+      }
+      total += result.rows.length;
+      const keepGoing = await onBatch(result.rows, result.fields.map((f) => f.name));
+      if (!keepGoing || result.rows.length < batchSize) {
+        break;
+      }
+    }
+    await client.query('COMMIT');
+    return total;
+  } catch (error) {
+    await client.query('ROLLBACK').catch(() => undefined);
+    throw error;
+  } finally {
+    client.release();
+  }
+};
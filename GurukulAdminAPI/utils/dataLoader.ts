@@ -0,0 +1,104 @@
+// utils/dataLoader.ts - Per-request batching of lookups by ID (DataLoader-style)
+// Services look rows up one ID at a time (findSubjectById, findGurukulById, ...), and one
+// request often does that for many IDs, or for the same ID more than once. A loader collects
+// the IDs asked for in the same tick, fetches them with one `WHERE id = ANY($1)` query, and
+// remembers each row for the rest of the request.
+// Loaders live in an AsyncLocalStorage store opened per request by requestLoaders(). Outside
+// a request (job workers, startup) loads issued together are still batched, but nothing is kept.
+
+import { AsyncLocalStorage } from 'async_hooks';
+import { RequestHandler } from 'express';
+
+/** Fetches the rows for a batch of keys; keys without a row are simply absent from the Map. */
+export type BatchLoadFn<K, V> = (keys: K[]) => Promise<Map<K, V>>;
+
+export class DataLoader<K, V> {
+  private cache = new Map<K, Promise<V | undefined>>();
+  private queue: { key: K; resolve: (value: V | undefined) => void; reject: (error: any) => void }[] = [];
+
+  /**
+   * @param batchLoad Fetches a batch of keys.
+   * @param keep Keep loaded rows until clear() (per-request loaders), or only while in flight.
+   */
+  constructor(private batchLoad: BatchLoadFn<K, V>, private keep = true) {}
+
+  /** Resolves to the row for key, or undefined if there is none. */
+  load(key: K): Promise<V | undefined> {
+    const cached = this.cache.get(key);
+    if (cached) {
+      return cached;
+    }
+    const promise = new Promise<V | undefined>((resolve, reject) => {
+      this.queue.push({ key, resolve, reject });
+      if (this.queue.length === 1) {
+        // Dispatch after the promise jobs of the current tick, so loads issued from
+        // Promise.all(ids.map(...)) and their continuations land in the same batch
+        Promise.resolve().then(() => process.nextTick(() => this.dispatch()));
+      }
+    });
+    this.cache.set(key, promise);
+    return promise;
+  }
+
+  /** Forgets one key (after it was written) or everything. */
+  clear(key?: K): void {
+    if (key === undefined) {
+      this.cache.clear();
+    } else {
+      this.cache.delete(key);
+    }
+  }
+
+  private async dispatch(): Promise<void> {
+    const batch = this.queue;
+    this.queue = [];
+    const keys = batch.map(({ key }) => key);
+    try {
+      const rows = await this.batchLoad(Array.from(new Set(keys)));
+      for (const { key, resolve } of batch) {
+        resolve(rows.get(key));
+      }
+    } catch (error) {
+      keys.forEach((key) => this.cache.delete(key)); // let a later load retry
+      for (const { reject } of batch) {
+        reject(error);
+      }
+      return;
+    }
+    if (!this.keep) {
+      keys.forEach((key) => this.cache.delete(key));
+    }
+  }
+}
+
+/** Indexes rows by one of their columns, for BatchLoadFn results. */
+export const rowsByKey = <V extends { [column: string]: any }>(rows: V[], column: string): Map<any, V> =>
+  new Map(rows.map((row) => [row[column], row]));
+
+const requestStore = new AsyncLocalStorage<Map<string, DataLoader<any, any>>>();
+const unscoped = new Map<string, DataLoader<any, any>>();
+
+/** Express middleware giving every request its own set of loaders. */
+export const requestLoaders = (): RequestHandler => (req, res, next) => {
+  requestStore.run(new Map(), () => next());
+};
+
+/**
+ * The current request's loader called `name`, created with batchLoad on first use.
+ * Outside a request, a shared loader that only batches and does not keep rows.
+ */
+export const getLoader = <K, V>(name: string, batchLoad: BatchLoadFn<K, V>): DataLoader<K, V> => {
+  const loaders = requestStore.getStore();
+  const registry = loaders ?? unscoped;
+  let loader = registry.get(name);
+  if (!loader) {
+    loader = new DataLoader(batchLoad, loaders !== undefined);
+    registry.set(name, loader);
+  }
+  return loader;
+};
+
+/** Drops what the current request's loader `name` remembers for key (or everything). */
+export const clearLoader = (name: string, key?: any): void => {
+  requestStore.getStore()?.get(name)?.clear(key);
+};
@@ -1,6 +1,20 @@
 // utils/db.ts - PostgreSQL Database Connection Pool
 
-import { Pool } from 'pg'; // Import the Pool class from 'pg'
+import { AsyncLocalStorage } from 'async_hooks';
+import { RequestHandler } from 'express';
+import { ClientConfig, Pool, PoolConfig, QueryConfig, QueryResult } from 'pg'; // Import the Pool class from 'pg'
+
+/**
+ * Anything services can run a query on: the pool, or a PoolClient inside a transaction.
+ * Services that take an optional `db` default it to the pool.
+ */
+export type Queryable = { query: (text: string, params?: any[]) => Promise<QueryResult<any>> };
+
+// SQLSTATE of a unique constraint violation. Writes rely on the unique indexes (see `tables`,
+// section 11) instead of checking for duplicates first, and map this to their "duplicate" result.
+export const PG_UNIQUE_VIOLATION = '23505';
+
+export const isUniqueViolation = (error: any): boolean => error?.code === PG_UNIQUE_VIOLATION;
 
 // Log environment variables BEFORE initializing the pool
 console.log('--- Database Environment Variables ---');
@@ -16,26 +30,162 @@ console.log('------------------------------------');
 // For this setup, we will directly access process.env.
 // In a real application, you might use a config library or dotenv.config() at startup.
 
-const pool = new Pool({
+const envInt = (name: string, fallback: number): number => parseInt(process.env[name] || String(fallback), 10);
+
+/**
+ * Connection settings shared by the pool and the change feed's LISTEN connection.
+ * statement_timeout and idle_in_transaction_session_timeout are sent as session settings when a
+ * connection opens, so a runaway query or a transaction left open by a bug cannot hold a
+ * connection forever (0 turns either off). application_name shows up in pg_stat_activity.
+ */
+export const connectionConfig: ClientConfig = {
   user: process.env.DB_USER,
   host: process.env.DB_HOST, // This will be your A.B.C.D
   database: process.env.DB_NAME,
   password: process.env.DB_PASSWORD,
-  port: parseInt(process.env.DB_PORT || '5432', 10), // Parse port as integer, default to 5432
-});
+  port: envInt('DB_PORT', 5432), // Parse port as integer, default to 5432
+  application_name: process.env.DB_APPLICATION_NAME || 'gurukul-admin-api',
+  connectionTimeoutMillis: envInt('DB_CONNECTION_TIMEOUT_MS', 10000), // wait for a new connection
+  statement_timeout: envInt('DB_STATEMENT_TIMEOUT_MS', 30000),
+  idle_in_transaction_session_timeout: envInt('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 60000),
+};
+
+/**
+ * Pool sizing. DB_POOL_MAX is the number of connections this process may open (pg's default
+ * is 10); queries beyond that wait for a free connection (see `waiting` in GET /metrics).
+ * benchmarks/pool_size_bench.py measures list throughput at different sizes.
+ */
+export const poolConfig: PoolConfig = {
+  ...connectionConfig,
+  max: envInt('DB_POOL_MAX', 10),
+  idleTimeoutMillis: envInt('DB_POOL_IDLE_TIMEOUT_MS', 30000), // close connections idle this long
+};
+
+const pool = new Pool(poolConfig);
+
+// The read pool connects to a replica when any DB_READ_* setting is given (DB_READ_URL, a
+// postgres:// DSN, wins over the separate fields), otherwise to the primary's database.
+const READ_REPLICA = Boolean(process.env.DB_READ_URL || process.env.DB_READ_HOST || process.env.DB_READ_PORT || process.env.DB_READ_NAME);
+
+/**
+ * Read pool sizing. With a replica, list and lookup traffic gets its own DB_READ_POOL_MAX
+ * connections (default 10) there. Without one, reads share the primary pool unless
+ * DB_READ_POOL_MAX is set, which gives them separate connections to the primary database, so
+ * a burst of GUI list requests queues on this pool and not in front of create/update
+ * transactions. DB_READ_POOL_MAX=0 sends every read to the primary pool.
+ */
+export const readPoolConfig: PoolConfig = {
+  ...connectionConfig,
+  user: process.env.DB_READ_USER || connectionConfig.user,
+  host: process.env.DB_READ_HOST || connectionConfig.host,
+  database: process.env.DB_READ_NAME || connectionConfig.database,
+  password: process.env.DB_READ_PASSWORD || connectionConfig.password,
+  port: envInt('DB_READ_PORT', connectionConfig.port as number),
+  connectionString: process.env.DB_READ_URL || undefined,
+  application_name: `${connectionConfig.application_name}-read`,
+  max: envInt('DB_READ_POOL_MAX', READ_REPLICA ? 10 : 0),
+  idleTimeoutMillis: poolConfig.idleTimeoutMillis,
+};
+
+export const readPool: Pool = readPoolConfig.max! > 0 ? new Pool(readPoolConfig) : pool;
+
+// Set for the duration of GET and HEAD requests (see routeReads)
+const readOnlyRequest = new AsyncLocalStorage<boolean>();
+
+// Request header carrying the client's freshness hint (see routeReads)
+export const FRESHNESS_HEADER = 'X-Min-Change-Seq';
+
+/** True once the read pool's replica has the change_log row `seq` (seq is its primary key). */
+const replicaHasChange = async (seq: number): Promise<boolean> =>
+  (await readPool.query('SELECT 1 FROM public.change_log WHERE seq = $1', [seq])).rows.length > 0;
+
+/**
+ * Express middleware: GET and HEAD requests read from the read pool. Every other request
+ * (and everything outside a request, such as job workers) stays on the primary, so a write
+ * request validates against and returns rows the replica may not have yet.
+ *
+ * Clients that cache lists until the change feed reports a change (the admin UI) send the
+ * change_log seq of the last event they saw in FRESHNESS_HEADER, or 'primary' while they know
+ * none. A replica only serves such a request once it has replayed that change_log row; until
+ * then the request reads from the primary, so a list re-fetched right after an event cannot
+ * be the pre-change one.
+ */
+export const routeReads = (): RequestHandler => async (req, res, next) => {
+  if (readPool === pool || (req.method !== 'GET' && req.method !== 'HEAD')) {
+    next();
+    return;
+  }
+  const hint = req.get(FRESHNESS_HEADER);
+  let fromReadPool = true;
+  if (hint !== undefined && READ_REPLICA) {
+    const seq = Number(hint);
+    try {
+      fromReadPool = Number.isInteger(seq) && seq > 0 && await replicaHasChange(seq);
+    } catch (error: any) {
+      console.error('Error in routeReads (replica check):', error.message);
+      fromReadPool = false;
+    }
+  }
+  if (fromReadPool) {
+    readOnlyRequest.run(true, () => next());
+  } else {
+    next();
+  }
+};
+
+/** The pool find* functions should query: the read pool in a read-only request, else the primary. */
+export const reader = (): Pool => (readOnlyRequest.getStore() ? readPool : pool);
+
+/**
+ * Runs fn with reader() returning the primary pool, also inside a GET request. For reads that
+ * must not mix the primary and a replica (delta sync reads its cursor on the primary).
+ */
+export const onPrimary = <T>(fn: () => Promise<T>): Promise<T> => readOnlyRequest.run(false, fn);
+
+/**
+ * False while reads go to a replica, which may lag behind the primary. Rows read then are
+ * served but not put into the reference caches (services/referenceCache.ts), where a row
+ * older than the change feed's invalidation could otherwise stay until its TTL.
+ */
+export const readsAreCurrent = (): boolean => !READ_REPLICA || reader() === pool;
+
+// Named prepared statements can be turned off for poolers in transaction mode (e.g. PgBouncer < 1.21)
+const PREPARED_STATEMENTS = process.env.DB_PREPARED_STATEMENTS !== 'false';
+
+/**
+ * Runs a hot query as a named prepared statement: each connection parses and plans it once
+ * and afterwards only binds and executes it. A name must always be used with the same text.
+ * @param name Statement name, unique per query text.
+ * @param text The SQL.
+ * @param values Query parameters.
+ * @param db The pool (default) or a transaction client.
+ */
+export const queryPrepared = (
+  name: string,
+  text: string,
+  values: any[] = [],
+  db: { query: (config: QueryConfig) => Promise<QueryResult<any>> } = pool
+): Promise<QueryResult<any>> => db.query(PREPARED_STATEMENTS ? { name, text, values } : { text, values });
 
 // Event listener for database connection errors
 pool.on('error', (err, client) => {
   console.error('Unexpected error on idle client', err);
   // process.exit(-1); // In a production app, you might want to gracefully restart or log
 });
+if (readPool !== pool) {
+  readPool.on('error', (err) => console.error('Unexpected error on idle read pool client', err));
+}
 // Test connection when the pool is initialized
 pool.query('SELECT NOW()')
   .then(() => console.log('Database connected successfully!'))
   .catch(err => console.error('Database connection test failed:', err.message));
 
 
-console.log(`Database pool initialized for ${process.env.DB_USER}@${process.env.DB_HOST}:${process.env.DB_PORT}/${process.env.DB_NAME}`);
+console.log(`Database pool initialized for ${process.env.DB_USER}@${process.env.DB_HOST}:${process.env.DB_PORT}/${process.env.DB_NAME} ` +
+  `(max ${poolConfig.max} connections, statement_timeout ${connectionConfig.statement_timeout} ms)`);
+console.log(readPool === pool
+  ? 'Reads use the primary pool (no replica configured, DB_READ_POOL_MAX unset or 0)'
+  : `Read pool initialized for ${READ_REPLICA ? 'a replica' : 'the primary database'} (max ${readPoolConfig.max} connections)`);
 
 // Export the pool to be used throughout the application
 export default pool;
@@ -1,7 +0,0 @@
-// --- Level Mapping (MUST be consistent with UI) ---
-const LEVEL_MAPPING: { [key: string]: string[] } = {
-  "G1": ["L1", "L2", "L3", "L4"],
-  "G2": ["L5", "L6", "L7", "L8"],
-  "G3": ["L9", "L10", "L11", "L12"],
-  "G4": ["L13", "L14", "L15", "L16"],
-};
@@ -0,0 +1,94 @@
+// utils/lruCache.ts - Small in-process LRU cache with hit/miss counters
+// Entries are kept in a Map in recency order (a hit moves the entry to the end), so the first
+// key is always the least recently used one and is evicted when the cache is full. Entries
+// also expire after ttlMs, as a bound on staleness if an invalidation is ever missed.
+// Every cache registers itself by name so GET /metrics can report all of them.
+
+export interface CacheStats {
+  name: string;
+  size: number;
+  maxEntries: number;
+  hits: number;
+  misses: number;
+  evictions: number;
+  hitRate: number | null; // hits / (hits + misses), null before the first lookup
+}
+
+const registry = new Map<string, LruCache<any, any>>();
+
+export class LruCache<K, V> {
+  private entries = new Map<K, { value: V; expires: number }>();
+  private hits = 0;
+  private misses = 0;
+  private evictions = 0;
+
+  /**
+   * @param name Name reported by cacheStats() (must be unique).
+   * @param maxEntries Entries kept before the least recently used one is evicted.
+   * @param ttlMs Lifetime of an entry.
+   */
+  constructor(readonly name: string, private maxEntries: number, private ttlMs: number) {
+    registry.set(name, this);
+  }
+
+  /** The cached value, or undefined (counted as a miss) if absent or expired. */
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry || entry.expires <= Date.now()) {
+      if (entry) {
+        this.entries.delete(key);
+      }
+      this.misses++;
+      return undefined;
+    }
+    this.entries.delete(key); // re-insert as most recently used
+    this.entries.set(key, entry);
+    this.hits++;
+    return entry.value;
+  }
+
+  set(key: K, value: V): void {
+    if (this.maxEntries <= 0) {
+      return;
+    }
+    this.entries.delete(key);
+    this.entries.set(key, { value, expires: Date.now() + this.ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as K);
+      this.evictions++;
+    }
+  }
+
+  delete(key: K): void {
+    this.entries.delete(key);
+  }
+
+  /** Drops every entry whose value matches, e.g. the offerings of a deleted gurukul. */
+  deleteWhere(predicate: (value: V) => boolean): void {
+    for (const [key, entry] of Array.from(this.entries)) {
+      if (predicate(entry.value)) {
+        this.entries.delete(key);
+      }
+    }
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+
+  stats(): CacheStats {
+    const lookups = this.hits + this.misses;
+    return {
+      name: this.name,
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      hitRate: lookups > 0 ? this.hits / lookups : null,
+    };
+  }
+}
+
+/** Counters of every LruCache in the process. */
+export const cacheStats = (): CacheStats[] => Array.from(registry.values()).map((cache) => cache.stats());
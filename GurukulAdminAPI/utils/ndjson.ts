@@ -0,0 +1,79 @@
+// utils/ndjson.ts - Newline-delimited JSON streaming for large list endpoints
+// List routes answer `?stream=ndjson` with one JSON object per line, written batch by
+// batch as a server-side cursor reads the rows (utils/cursor.ts). Writes respect
+// backpressure, so a slow client slows the cursor down instead of growing the heap.
+
+import { Request, Response } from 'express';
+
+/**
+ * Resolves once the response can take more data; false if the client went away first.
+ * @param res Response object
+ */
+export const waitForDrain = (res: Response): Promise<boolean> =>
+  new Promise((resolve) => {
+    const onDrain = () => { cleanup(); resolve(true); };
+    const onClose = () => { cleanup(); resolve(false); };
+    const cleanup = () => {
+      res.off('drain', onDrain);
+      res.off('close', onClose);
+    };
+    res.on('drain', onDrain);
+    res.on('close', onClose);
+  });
+
+/**
+ * True if the client asked for a streamed NDJSON response (`?stream=ndjson`).
+ * @param req Request object
+ */
+export const wantsNdjson = (req: Request): boolean => req.query.stream === 'ndjson';
+
+/**
+ * Streams rows as NDJSON (Content-Type application/x-ndjson).
+ * Errors before the first batch are answered with the usual 500 JSON body; after that the
+ * connection is destroyed, so the client sees a truncated stream instead of a short list.
+ * @param res Response object
+ * @param label Name used in log messages (usually the controller function).
+ * @param forEachBatch Service function that reads the rows batch by batch and awaits onBatch.
+ */
+export const streamNdjson = async (
+  res: Response,
+  label: string,
+  forEachBatch: (onBatch: (rows: any[]) => Promise<boolean>) => Promise<number>
+): Promise<void> => {
+  let clientGone = false;
+  res.on('close', () => {
+    clientGone = !res.writableFinished;
+  });
+
+  try {
+    const total = await forEachBatch(async (rows) => {
+      if (!res.headersSent) {
+        res.status(200);
+        res.setHeader('Content-Type', 'application/x-ndjson; charset=utf-8');
+      }
+      if (clientGone) {
+        return false;
+      }
+      const chunk = rows.map((row) => JSON.stringify(row) + '\n').join('');
+      if (!res.write(chunk)) {
+        return waitForDrain(res);
+      }
+      return true;
+    });
+    if (clientGone) {
+      console.warn(`${label}: stream stopped after ${total} rows, client disconnected`);
+      return;
+    }
+    if (!res.headersSent) {
+      res.status(200).setHeader('Content-Type', 'application/x-ndjson; charset=utf-8');
+    }
+    res.end();
+  } catch (error: any) {
+    console.error(`Error in ${label} (stream):`, error);
+    if (res.headersSent) {
+      res.destroy(error);
+      return;
+    }
+    res.status(500).json({ message: 'Internal Server Error', details: error.message });
+  }
+};
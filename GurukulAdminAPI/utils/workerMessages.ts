@@ -0,0 +1,22 @@
+// utils/workerMessages.ts - IPC messages between the cluster primary (cluster.ts) and the API workers
+// Kept free of imports so the primary can use it without opening database pools.
+//
+// GET /metrics in a worker:  worker --METRICS_REQUEST--> primary --METRICS_COLLECT--> every worker
+//                            every worker --METRICS_REPORT--> primary --METRICS_RESULT--> worker
+// Stopping a worker:         primary --WORKER_SHUTDOWN--> worker, which drains and disconnects itself
+
+export const METRICS_REQUEST = 'metrics:request'; // { id }: collect the metrics of every worker
+export const METRICS_COLLECT = 'metrics:collect'; // { id }: send this worker's metrics
+export const METRICS_REPORT = 'metrics:report'; // { id, metrics }: one worker's metrics
+export const METRICS_RESULT = 'metrics:result'; // { id, metrics: [...] }: every worker's metrics
+export const WORKER_SHUTDOWN = 'worker:shutdown'; // { id: 0 }: stop gracefully and exit
+
+export interface WorkerMessage {
+  type: string;
+  id: number;
+  metrics?: any;
+}
+
+/** True for messages of this protocol (workers may also receive internal cluster messages). */
+export const isWorkerMessage = (message: any): message is WorkerMessage =>
+  typeof message === 'object' && message !== null && typeof message.type === 'string' && typeof message.id === 'number';
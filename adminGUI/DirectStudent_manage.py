@@ -4,9 +4,14 @@ import streamlit as st
 import requests
 import json
 import re # Import regex for parsing IDs from display strings
+from api_logging import get_logger, log_request, log_response, LazyBody
+from change_feed import CACHE_TTL, invalidated_by
+from api_session import session
+from grid_data import iter_rows
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002"
+logger = get_logger(__name__)
 
 # --- API Interaction Functions ---
 
@@ -15,61 +20,56 @@ def direct_api_call(method, endpoint, payload=None):
     headers = {"Content-Type": "application/json"}
     
     try:
-        # st.markdown(f"**DEBUG API CALL:** Method={method}, Endpoint={endpoint}, Payload={payload}")
-        print(f"DEBUG API CALL: Method={method}, Endpoint={endpoint}, Payload={payload}")
+        log_request(logger, method, endpoint, payload)
         if method == 'GET':
-            response = requests.get(url, headers=headers)
+            response = session.get(url, headers=headers)
         elif method == 'POST':
-            response = requests.post(url, headers=headers, data=json.dumps(payload))
+            response = session.post(url, headers=headers, data=json.dumps(payload))
         elif method == 'PUT':
-            response = requests.put(url, headers=headers, data=json.dumps(payload))
+            response = session.put(url, headers=headers, data=json.dumps(payload))
         elif method == 'DELETE':
-            response = requests.delete(url, headers=headers)
+            response = session.delete(url, headers=headers)
         else:
             return 400, {"message": "Unsupported HTTP method"}
 
+        log_response(logger, method, endpoint, response)
         if response.status_code == 204:
-            # st.markdown(f"**DEBUG API RESPONSE:** Status=204 (No Content) for {endpoint}")
-            print(f"DEBUG API RESPONSE: Status=204 (No Content) for {endpoint}")
             return response.status_code, {}
 
         try:
             data = response.json()
-            # st.markdown(f"**DEBUG API RESPONSE:** Status={response.status_code}, Data={data} for {endpoint}")
-            print(f"DEBUG API RESPONSE: Status={response.status_code}, Data={data} for {endpoint}")
         except json.JSONDecodeError:
-            # st.markdown(f"**DEBUG: JSONDecodeError** for {method} {url}. Raw response content: '{response.text}'")
-            print(f"DEBUG: JSONDecodeError for {method} {url}. Raw response content: '{response.text}'")
+            logger.warning("Invalid JSON from %s %s: %s", method, url, LazyBody(response.text))
             return response.status_code, {"message": f"Invalid JSON response from API: {response.text}"}
 
         return response.status_code, data
 
     except requests.exceptions.ConnectionError:
         st.error(f"Failed to connect to API at {API_BASE_URL}. Please ensure the backend server is running.")
-        # st.markdown(f"**ERROR: ConnectionError** to API at {API_BASE_URL}")
-        print(f"ERROR: ConnectionError to API at {API_BASE_URL}")
+        logger.error("ConnectionError to API at %s", API_BASE_URL)
         return 503, {"message": "API service unavailable"}
     except requests.exceptions.Timeout:
         st.error("API request timed out.")
-        # st.markdown("**ERROR: API request timed out.**")
-        print("ERROR: API request timed out.")
+        logger.error("API request timed out: %s %s", method, endpoint)
         return 408, {"message": "API request timed out"}
     except requests.exceptions.RequestException as e:
         st.error(f"An unexpected error occurred during API request: {e}")
-        # st.markdown(f"**ERROR: Unexpected API request error:** {e}")
-        print(f"ERROR: Unexpected API request error: {e}")
+        logger.error("Unexpected API request error for %s %s: %s", method, endpoint, e)
         return 500, {"message": f"API request error: {e}"}
 
 
-@st.cache_data(ttl=60)
+@invalidated_by("studentmate.students", "studentmate.sgurukul", "studentmate.smilestones", "public.gurukul", "public.milestones")
+@st.cache_data(ttl=CACHE_TTL)
 def fetch_all_students_direct():
-    status, data = direct_api_call('GET', '/students')
-    if status == 200:
-        return data
-    st.error(f"Failed to fetch students directly: {data.get('message', 'Unknown error')}")
-    return []
+    try:
+        return list(iter_rows(API_BASE_URL, '/students'))  # NDJSON, parsed as it streams in
+    except requests.exceptions.RequestException as e:
+        st.error(f"Failed to fetch students directly: {e}")
+        logger.warning("Error fetching students directly: %s", e)
+        return []
 
-@st.cache_data(ttl=60)
+@invalidated_by("public.gurukul")
+@st.cache_data(ttl=CACHE_TTL)
 def fetch_all_gurukuls():
     status, data = direct_api_call('GET', '/gurukul')
     if status == 200:
@@ -77,7 +77,8 @@ def fetch_all_gurukuls():
     st.error(f"Failed to fetch gurukuls: {data.get('message', 'Unknown error')}")
     return []
 
-@st.cache_data(ttl=60)
+@invalidated_by("public.milestones", "public.gurukul_offerings")
+@st.cache_data(ttl=CACHE_TTL)
 def fetch_milestones_by_gurukul(gid):
     if gid is None:
         return []
@@ -87,7 +88,8 @@ def fetch_milestones_by_gurukul(gid):
     st.error(f"Failed to fetch milestones for Gurukul ID {gid}: {data.get('message', 'Unknown error')}")
     return []
 
-@st.cache_data(ttl=60)
+@invalidated_by("public.milestones")
+@st.cache_data(ttl=CACHE_TTL)
 def fetch_all_milestones():
     status, data = direct_api_call('GET', '/milestones')
     if status == 200:
@@ -95,7 +97,8 @@ def fetch_all_milestones():
     st.error(f"Failed to fetch all milestones: {data.get('message', 'Unknown error')}")
     return []
 
-@st.cache_data(ttl=60)
+@invalidated_by("public.gurukul_offerings")
+@st.cache_data(ttl=CACHE_TTL)
 def fetch_all_offerings():
     status, data = direct_api_call('GET', '/gurukul-offerings')
     if status == 200:
@@ -257,7 +260,6 @@ def show_student_crud_direct():
                     'gurukulId': st.session_state.direct_selected_add_student_gurukul_id,
                     'milestoneId': st.session_state.direct_selected_add_student_milestone_id
                 }
-                print(f"DEBUG: Sending add student payload: {payload}")
                 status, data = direct_api_call('POST', '/students', payload)
                 if status == 201:
                     st.success(f"Student '{new_student_name_input}' added successfully!")
@@ -269,9 +271,7 @@ def show_student_crud_direct():
                     st.error(f"Failed to add student: {data.get('message', 'Unknown error')}")
     st.subheader("Existing Students")
     students = fetch_all_students_direct()
-    # ### DEBUG: Added debug print for raw fetched students data (UI and console)
-    #st.markdown(f"**DEBUG (Raw Student Data from /students endpoint):** {json.dumps(students, indent=2)}")
-    print(f"DEBUG: Fetched existing students (raw data): {json.dumps(students, indent=2)}")
+    logger.debug("Fetched %d existing students: %s", len(students), LazyBody(students))
     if not students:
         st.info("No Students found. Add one above!")
     else:
@@ -407,9 +407,7 @@ def show_student_crud_direct():
                     if match:
                         final_milestone_id_to_send = int(match.group(1))
 
-                # --- Debugging (Optional, can be removed in final version) ---
-                print(f"CONSOLE DEBUG (Update Button Click): Final Gurukul ID to send: {final_gurukul_id_to_send}")
-                print(f"CONSOLE DEBUG (Update Button Click): Final Milestone ID to send: {final_milestone_id_to_send}")
+                logger.debug("Update form selection: gurukul_id=%s milestone_id=%s", final_gurukul_id_to_send, final_milestone_id_to_send)
 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -423,7 +421,6 @@ def show_student_crud_direct():
                                 'gurukulId': final_gurukul_id_to_send,
                                 'milestoneId': final_milestone_id_to_send
                             }
-                            print(f"DEBUG: Sending update student payload for SID {st.session_state.selected_student_id}: {update_payload}")
                             status, data = direct_api_call('PUT', f'/students/{st.session_state.selected_student_id}', update_payload)
                             if status == 200:
                                 st.success(f"Student '{updated_name}' updated successfully!")
@@ -4,48 +4,58 @@ import streamlit as st
 import requests
 import json
 import re # Import regex for parsing IDs from display strings
+from api_logging import get_logger, log_request, log_response, LazyBody
+from change_feed import CACHE_TTL, invalidated_by
+from api_session import session
 
 API_BASE_URL = "http://localhost:5002"
+logger = get_logger(__name__)
 
 def direct_api_call(method, endpoint, payload=None):
     url = f"{API_BASE_URL}{endpoint}"
     headers = {"Content-Type": "application/json"}
     
     try:
+        log_request(logger, method, endpoint, payload)
         if method == 'GET':
-            response = requests.get(url, headers=headers)
+            response = session.get(url, headers=headers)
         elif method == 'POST':
-            response = requests.post(url, headers=headers, data=json.dumps(payload))
+            response = session.post(url, headers=headers, data=json.dumps(payload))
         elif method == 'PUT':
-            response = requests.put(url, headers=headers, data=json.dumps(payload))
+            response = session.put(url, headers=headers, data=json.dumps(payload))
         elif method == 'DELETE':
-            response = requests.delete(url, headers=headers)
+            response = session.delete(url, headers=headers)
         else:
             return 400, {"message": "Unsupported HTTP method"}
 
+        log_response(logger, method, endpoint, response)
         if response.status_code == 204:
             return response.status_code, {}
 
         try:
             data = response.json()
         except json.JSONDecodeError:
-            print(f"DEBUG: JSONDecodeError for {method} {url}. Raw response content: '{response.text}'")
+            logger.warning("Invalid JSON from %s %s: %s", method, url, LazyBody(response.text))
             return response.status_code, {"message": f"Invalid JSON response from API: {response.text}"}
 
         return response.status_code, data
 
     except requests.exceptions.ConnectionError:
         st.error(f"Failed to connect to API at {API_BASE_URL}. Please ensure the backend server is running.")
+        logger.error("ConnectionError to API at %s", API_BASE_URL)
         return 503, {"message": "API service unavailable"}
     except requests.exceptions.Timeout:
         st.error("API request timed out.")
+        logger.error("API request timed out: %s %s", method, endpoint)
         return 408, {"message": "API request timed out"}
     except requests.exceptions.RequestException as e:
         st.error(f"An unexpected error occurred during API request: {e}")
+        logger.error("Unexpected API request error for %s %s: %s", method, endpoint, e)
         return 500, {"message": f"API request error: {e}"}
 
 
-@st.cache_data(ttl=60)
+@invalidated_by("teachmate.teachers", "teachmate.teacher_assignments", "teachmate.subjects")
+@st.cache_data(ttl=CACHE_TTL)
 def fetch_all_teachers_direct():
     status, data = direct_api_call('GET', '/teachers')
     if status == 200:
@@ -53,7 +63,8 @@ def fetch_all_teachers_direct():
     st.error(f"Failed to fetch teachers directly: {data.get('message', 'Unknown error')}")
     return []
 
-@st.cache_data(ttl=60)
+@invalidated_by("teachmate.subjects")
+@st.cache_data(ttl=CACHE_TTL)
 def fetch_all_subjects():
     """Fetches all subjects, including their level, for use in dropdowns."""
     status, data = direct_api_call('GET', '/subjects')
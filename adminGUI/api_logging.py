@@ -0,0 +1,142 @@
+# api_logging.py
+# Leveled, lazily formatted and sampled logging for the Admin UI.
+#
+# Off by default: only WARNING and above are emitted unless ADMIN_GUI_LOG_LEVEL is
+# lowered, or an admin ticks "Debug logging" in the sidebar, which turns on DEBUG
+# output for their session only. Request/response bodies are wrapped in LazyBody,
+# so nothing is serialized unless a record is actually emitted, and even then the
+# output is truncated. Secret fields (passwords) in dict payloads are masked.
+#
+# Environment variables:
+#   ADMIN_GUI_LOG_LEVEL        DEBUG / INFO / WARNING (default) / ERROR
+#   ADMIN_GUI_LOG_MAX_BODY     max characters of a logged body (default 500)
+#   ADMIN_GUI_LOG_MAX_ITEMS    max list items serialized for a logged body (default 3)
+#   ADMIN_GUI_LOG_SAMPLE_RATE  fraction of DEBUG/INFO records kept, 0.0-1.0 (default 1.0)
+import json
+import logging
+import os
+import random
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# --- Configuration ---
+LOGGER_NAME = "adminGUI"
+LOG_LEVEL = logging.getLevelName(os.environ.get("ADMIN_GUI_LOG_LEVEL", "WARNING").upper())
+MAX_BODY_CHARS = int(os.environ.get("ADMIN_GUI_LOG_MAX_BODY", "500"))
+MAX_LIST_ITEMS = int(os.environ.get("ADMIN_GUI_LOG_MAX_ITEMS", "3"))
+SAMPLE_RATE = float(os.environ.get("ADMIN_GUI_LOG_SAMPLE_RATE", "1.0"))
+SESSION_DEBUG_KEY = "debug_logging_enabled"
+
+if not isinstance(LOG_LEVEL, int):  # unknown names come back as "Level X"
+    LOG_LEVEL = logging.WARNING
+
+SECRET_KEYS = frozenset({"password"})  # payload fields never written to the log
+
+
+# --- Lazy Formatting ---
+
+def mask_secrets(value):
+    """Returns a copy of a payload with SECRET_KEYS values replaced by '***' (dicts and lists, recursively)."""
+    if isinstance(value, dict):
+        return {k: ("***" if k in SECRET_KEYS and v else mask_secrets(v)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [mask_secrets(v) for v in value]
+    return value
+
+
+class LazyBody:
+    """Wraps a payload/response body; serializes and truncates only when formatted."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit=None):
+        self.value = value
+        self.limit = limit or MAX_BODY_CHARS
+
+    def __str__(self):
+        value = self.value
+        suffix = ""
+        if isinstance(value, (list, tuple)) and len(value) > MAX_LIST_ITEMS:
+            suffix = f" ... ({len(value)} items)"
+            value = list(value[:MAX_LIST_ITEMS])
+        if isinstance(value, bytes):
+            text = value[:self.limit * 4].decode("utf-8", errors="replace")
+        elif isinstance(value, str):
+            text = value
+        else:
+            value = mask_secrets(value)
+            try:
+                text = json.dumps(value, default=str)
+            except (TypeError, ValueError):
+                text = repr(value)
+        if len(text) > self.limit:
+            text = f"{text[:self.limit]}... <{len(text) - self.limit} more chars>"
+        return text + suffix
+
+
+# --- Filters ---
+
+def session_debug_enabled():
+    """True if the current Streamlit session switched debug logging on."""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return False  # not inside a script run (e.g. background thread)
+    return bool(st.session_state.get(SESSION_DEBUG_KEY, False))
+
+
+class _LevelFilter(logging.Filter):
+    """Passes records at/above LOG_LEVEL, or anything when the session opted into debug."""
+
+    def filter(self, record):
+        return record.levelno >= LOG_LEVEL or session_debug_enabled()
+
+
+class _SamplingFilter(logging.Filter):
+    """Keeps a SAMPLE_RATE fraction of DEBUG/INFO records; never drops warnings or errors."""
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or SAMPLE_RATE >= 1.0 or random.random() < SAMPLE_RATE
+
+
+def _configure():
+    root = logging.getLogger(LOGGER_NAME)
+    if root.handlers:
+        return root  # Streamlit re-executes main.py on every rerun; configure once per process
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+    handler.addFilter(_LevelFilter())
+    handler.addFilter(_SamplingFilter())
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)  # the handler filters decide; per-session debug needs records to exist
+    root.propagate = False
+    return root
+
+
+_configure()
+
+
+# --- Public Helpers ---
+
+def get_logger(module_name):
+    """Returns the logger for a page module, e.g. get_logger(__name__)."""
+    return logging.getLogger(f"{LOGGER_NAME}.{module_name}")
+
+
+def log_request(logger, method, url, payload=None):
+    """Logs an outgoing API call at DEBUG."""
+    logger.debug("API %s %s payload=%s", method, url, LazyBody(payload))
+
+
+def log_response(logger, method, url, response):
+    """Logs an API response at DEBUG (status, size, elapsed, truncated body)."""
+    logger.debug("API %s %s -> %s (%d bytes, %.0f ms) body=%s", method, url, response.status_code,
+                 len(response.content), response.elapsed.total_seconds() * 1000, LazyBody(response.content))
+
+
+def render_logging_controls():
+    """Sidebar toggle that switches DEBUG logging on for the current session only."""
+    st.checkbox(
+        "Debug logging (this session)",
+        key=SESSION_DEBUG_KEY,
+        help="Writes API calls and page debug details to the server console for your session only.",
+    )
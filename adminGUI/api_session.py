@@ -0,0 +1,39 @@
+# api_session.py
+# One shared requests.Session for calls to the Admin API.
+#
+# Keeps connections to the API alive between calls (a new TCP connection per
+# request is what plain requests.get does) and asks for compressed responses:
+# brotli when the optional `brotli` (or `brotlicffi`) package is installed, gzip
+# otherwise. requests/urllib3 decode either transparently, so callers still just
+# use response.json().
+#
+# Every request also carries a freshness hint (X-Min-Change-Seq) kept current by
+# change_feed.py: the change_log seq of the last change event, or "primary" while none
+# is known. An API that reads lists from a replica serves them from the primary until
+# the replica has that change, so a list re-fetched after an invalidation is never the
+# pre-change one.
+import requests
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes 'br' with it)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# --- Configuration ---
+ACCEPT_ENCODING = "br, gzip, deflate" if BROTLI_AVAILABLE else "gzip, deflate"
+
+FRESHNESS_HEADER = "X-Min-Change-Seq"
+
+session = requests.Session()
+session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+session.headers[FRESHNESS_HEADER] = "primary"
+
+
+def set_freshness_hint(seq):
+    """Sets the change_log seq later requests need the API's data to include (None: read from the primary)."""
+    session.headers[FRESHNESS_HEADER] = "primary" if seq is None else str(seq)
@@ -0,0 +1,147 @@
+# availability.py
+# Which offering types each gurukul is still missing, and which levels each offering has
+# no milestone for yet, as computed by the API in SQL (GET /gurukul/available-gtypes,
+# GET /milestones/available-levels). The creation forms used to work this out by scanning
+# every offering / milestone on each rerun.
+#
+# One index per Streamlit server process, shared by every session. It is loaded once and
+# patched in place after this UI creates, updates or deletes offerings and milestones
+# (creates need no request; updates and deletes re-fetch only the affected gurukul or
+# offering), so the rerun after a write does not wait for a reload. Like the other caches
+# it is dropped when the change feed reports a change to those tables.
+#
+#   index = get_availability_index(API_BASE_URL)
+#   index.gtypes_for(gid)        -> ("G2", "G4")
+#   index.levels_for(oid)        -> ("L5", "L7")
+#   index.milestone_created(oid, "L5")
+import threading
+
+import requests
+import streamlit as st
+
+from api_logging import get_logger
+from api_session import session
+from change_feed import invalidated_by
+
+# --- Configuration ---
+REQUEST_TIMEOUT = 60
+logger = get_logger(__name__)
+
+
+class AvailabilityIndex:
+    """Available gtypes per gurukul and levels per offering; thread-safe, shared by every session.
+
+    Gurukuls / offerings that are complete are absent, so lookups for them return ().
+    Lookups raise requests.exceptions.RequestException if the index cannot be loaded.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._gtypes = None  # gid -> tuple of gtypes without an offering
+        self._levels = None  # oid -> (gid, tuple of levels without a milestone)
+        self._lock = threading.RLock()
+
+    def _fetch(self, path, params=None):
+        response = session.get(f"{self.base_url}{path}", params=params, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def _gtype_map(self):
+        with self._lock:
+            if self._gtypes is None:
+                rows = self._fetch("/gurukul/available-gtypes")
+                self._gtypes = {row["gid"]: tuple(row["gtypes"]) for row in rows}
+                logger.debug("Loaded available gtypes for %d gurukuls", len(self._gtypes))
+            return self._gtypes
+
+    def _level_map(self):
+        with self._lock:
+            if self._levels is None:
+                rows = self._fetch("/milestones/available-levels")
+                self._levels = {row["oid"]: (row["gid"], tuple(row["levels"])) for row in rows}
+                logger.debug("Loaded available levels for %d offerings", len(self._levels))
+            return self._levels
+
+    # --- Lookups ---
+
+    def gtypes_for(self, gid):
+        """Offering types the gurukul does not have yet, in mapping order."""
+        return self._gtype_map().get(gid, ())
+
+    def levels_for(self, oid):
+        """Levels the offering has no milestone for yet, in mapping order."""
+        return self._level_map().get(oid, (None, ()))[1]
+
+    # --- Updates after this UI's own writes ---
+
+    def gurukul_created(self, gid, gtypes):
+        """A new gurukul is missing every gtype."""
+        with self._lock:
+            if self._gtypes is not None:
+                self._gtypes[gid] = tuple(gtypes)
+
+    def offering_created(self, offering, levels):
+        """The gurukul loses the offering's gtype; the new offering is missing every level of it."""
+        with self._lock:
+            if self._gtypes is not None:
+                remaining = tuple(g for g in self._gtypes.get(offering["gid"], ()) if g != offering["gtype"])
+                self._set(self._gtypes, offering["gid"], remaining)
+            if self._levels is not None:
+                self._set(self._levels, offering["oid"], (offering["gid"], tuple(levels)) if levels else ())
+
+    def milestone_created(self, oid, level):
+        """The offering no longer lacks `level`."""
+        with self._lock:
+            if self._levels is not None and oid in self._levels:
+                gid, levels = self._levels[oid]
+                remaining = tuple(lvl for lvl in levels if lvl != level)
+                self._set(self._levels, oid, (gid, remaining) if remaining else ())
+
+    def refresh_gurukul(self, gid):
+        """Re-fetches the gurukul's available gtypes and its offerings' available levels."""
+        with self._lock:
+            try:
+                if self._gtypes is not None:
+                    rows = self._fetch("/gurukul/available-gtypes", {"gid": gid})
+                    self._set(self._gtypes, gid, tuple(rows[0]["gtypes"]) if rows else ())
+                if self._levels is not None:
+                    rows = self._fetch("/milestones/available-levels", {"gid": gid})
+                    for oid in [oid for oid, (owner, _) in self._levels.items() if owner == gid]:
+                        del self._levels[oid]
+                    self._levels.update({row["oid"]: (gid, tuple(row["levels"])) for row in rows})
+            except requests.exceptions.RequestException as e:
+                logger.warning("Could not refresh availability of gurukul %s, reloading it later: %s", gid, e)
+                self.clear()
+
+    def refresh_offering(self, oid):
+        """Re-fetches the offering's available levels (after a milestone update or delete)."""
+        with self._lock:
+            if self._levels is None:
+                return
+            try:
+                rows = self._fetch("/milestones/available-levels", {"oid": oid})
+            except requests.exceptions.RequestException as e:
+                logger.warning("Could not refresh availability of offering %s, reloading it later: %s", oid, e)
+                self.clear()
+                return
+            self._set(self._levels, oid, (rows[0]["gid"], tuple(rows[0]["levels"])) if rows else ())
+
+    def clear(self):
+        """Drops everything; the next lookup reloads from the API."""
+        with self._lock:
+            self._gtypes = None
+            self._levels = None
+
+    @staticmethod
+    def _set(mapping, key, value):
+        if value:
+            mapping[key] = value
+        else:
+            mapping.pop(key, None)
+
+
+@invalidated_by("public.gurukul", "public.gurukul_offerings", "public.milestones")
+@st.cache_resource
+def get_availability_index(base_url):
+    """Returns the shared AvailabilityIndex for the API at base_url."""
+    return AvailabilityIndex(base_url)
@@ -0,0 +1,168 @@
+# change_feed.py
+# Invalidates cached API data when the database changes, instead of relying on short TTLs.
+#
+# The API relays Postgres NOTIFY events as Server-Sent Events on /changes/stream.
+# One background thread per Streamlit server process reads that stream and clears
+# the st.cache_data functions registered for the changed table, so cached lists
+# can live for hours. While the stream is down, registered caches are cleared
+# every FALLBACK_TTL seconds instead, which matches the old ttl=60 behaviour.
+# Each event's change_log seq becomes the freshness hint of the shared API session
+# (api_session.set_freshness_hint), so the re-fetch after an invalidation never comes
+# from a replica that has not caught up with the change.
+#
+#   @invalidated_by("public.gurukul")
+#   @st.cache_data(ttl=CACHE_TTL)
+#   def fetch_all_gurukuls(): ...
+import json
+import threading
+import time
+
+import requests
+import streamlit as st
+
+from api_logging import get_logger
+from api_session import set_freshness_hint
+
+# --- Configuration ---
+API_BASE_URL = "http://localhost:5002"
+CACHE_TTL = 6 * 60 * 60  # Upper bound for cached lists while the feed is live
+FALLBACK_TTL = 60        # How often registered caches are cleared while it is not
+RECONNECT_DELAY = 5      # Seconds between reconnect attempts
+READ_TIMEOUT = 60        # The API sends a heartbeat every 25 s
+logger = get_logger(__name__)
+
+# "schema.table" -> {function key: cached function}
+_registry = {}
+_registry_lock = threading.Lock()
+_listener = None
+
+
+# --- Registration ---
+
+def invalidated_by(*tables):
+    """Decorator for st.cache_data functions: clears the function's cache when any of `tables` changes."""
+    def register(cached_func):
+        key = f"{cached_func.__module__}.{cached_func.__qualname__}"
+        with _registry_lock:
+            for table in tables:
+                _registry.setdefault(table, {})[key] = cached_func
+        return cached_func
+    return register
+
+
+def invalidate_table(table):
+    """Clears every cached function registered for `table`. Returns how many were cleared."""
+    with _registry_lock:
+        funcs = list(_registry.get(table, {}).values())
+    for func in funcs:
+        func.clear()
+    return len(funcs)
+
+
+def invalidate_all():
+    """Clears every registered cached function (used when events may have been missed)."""
+    with _registry_lock:
+        funcs = {key: func for entries in _registry.values() for key, func in entries.items()}
+    for func in funcs.values():
+        func.clear()
+
+
+# --- Listener ---
+
+class ChangeFeedListener:
+    """Background thread reading /changes/stream and invalidating registered caches."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.live = False
+        self.last_event_id = None
+        self.events_received = 0
+        self._last_clear = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="admin-change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _set_live(self, live):
+        if live == self.live:
+            return
+        self.live = live
+        # Anything cached while disconnected may be stale; start over either way.
+        set_freshness_hint(None)  # until the stream's position event arrives
+        invalidate_all()
+        self._last_clear = time.monotonic()
+        if live:
+            logger.info("Change feed connected to %s", self.base_url)
+        else:
+            logger.warning("Change feed disconnected; clearing cached data every %ss until it is back", FALLBACK_TTL)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._consume()
+            except requests.exceptions.RequestException as e:
+                logger.debug("Change feed unavailable: %s", e)
+            self._set_live(False)
+            if time.monotonic() - self._last_clear >= FALLBACK_TTL:
+                invalidate_all()
+                self._last_clear = time.monotonic()
+            self._stop.wait(RECONNECT_DELAY)
+
+    def _consume(self):
+        headers = {"Accept": "text/event-stream"}
+        if self.last_event_id is not None:
+            headers["Last-Event-ID"] = self.last_event_id
+        with requests.get(f"{self.base_url}/changes/stream", headers=headers, stream=True,
+                          timeout=(5, READ_TIMEOUT)) as response:
+            response.raise_for_status()
+            self._set_live(True)
+            event = {}
+            for line in response.iter_lines(decode_unicode=True):
+                if self._stop.is_set():
+                    return
+                if not line:  # blank line ends an event
+                    if event:
+                        self._dispatch(event)
+                    event = {}
+                elif not line.startswith(":"):  # ':' lines are heartbeats
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    event[field] = f"{event[field]}\n{value}" if field == "data" and "data" in event else value
+
+    def _dispatch(self, event):
+        if "id" in event:
+            self.last_event_id = event["id"]
+        kind = event.get("event", "message")
+        if kind == "reset":
+            logger.info("Change feed reset; clearing all cached data")
+            set_freshness_hint(None)  # the missed changes are unknown
+            invalidate_all()
+        elif kind in ("change", "position"):
+            try:
+                change = json.loads(event.get("data", "{}"))
+            except ValueError:
+                logger.warning("Ignoring malformed %s event: %s", kind, event.get("data"))
+                return
+            if change.get("seq") is not None:
+                set_freshness_hint(change["seq"])  # before invalidating, so the re-fetch carries it
+            if kind == "position":
+                return
+            self.events_received += 1
+            cleared = invalidate_table(change.get("table"))
+            logger.debug("Change %s %s id=%s cleared %d cached function(s)",
+                         change.get("op"), change.get("table"), change.get("row"), cleared)
+
+
+@st.cache_resource
+def start_change_feed(base_url=API_BASE_URL):
+    """Starts the process-wide listener (once; Streamlit reruns reuse it) and returns it."""
+    global _listener
+    _listener = ChangeFeedListener(base_url)
+    return _listener
+
+
+def is_live():
+    """True while the change feed is connected, i.e. cached data is being kept current."""
+    return _listener is not None and _listener.live
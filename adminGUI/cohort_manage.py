@@ -0,0 +1,148 @@
+# cohort_manage.py
+# Moves whole cohorts of students between statuses (Started -> In_progress -> Done)
+# with one request: pick the cohort by gurukul, milestone and/or level, check how many
+# students it covers, then apply the transition (POST /cohorts/<kind>/transition).
+import streamlit as st
+import requests
+from api_logging import get_logger, LazyBody
+from api_session import session
+from level_lookup import get_level_lookup
+
+# --- Configuration ---
+API_BASE_URL = "http://localhost:5002"
+STATUSES = ["Started", "In_progress", "Done"]
+COHORT_KINDS = {"Gurukul enrolments (sgurukul)": "gurukul", "Milestone enrolments (smilestones)": "milestone"}
+logger = get_logger(__name__)
+
+
+# --- API Interaction Functions ---
+
+def get_gurukuls():
+    """Fetches all gurukuls for the cohort filter."""
+    try:
+        response = session.get(f"{API_BASE_URL}/gurukul")
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching gurukuls: {e}")
+        logger.warning("Error fetching gurukuls: %s", e)
+        return []
+
+
+def get_milestones_by_gurukul(gid):
+    """Fetches the milestones of one gurukul."""
+    try:
+        response = session.get(f"{API_BASE_URL}/milestones/by-gurukul/{gid}")
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching milestones for gurukul {gid}: {e}")
+        logger.warning("Error fetching milestones for gurukul %s: %s", gid, e)
+        return []
+
+
+def get_distinct_levels():
+    """Fetches the levels that have milestones."""
+    try:
+        response = session.get(f"{API_BASE_URL}/milestones/distinct-levels")
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching levels: {e}")
+        logger.warning("Error fetching levels: %s", e)
+        return []
+
+
+def get_cohort_summary(kind, cohort_filter):
+    """Returns {status: student count} for the cohort, or None on error."""
+    try:
+        response = session.get(f"{API_BASE_URL}/cohorts/{kind}", params=cohort_filter)
+        response.raise_for_status()
+        return {row["status"]: row["students"] for row in response.json()["summary"]}
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching cohort summary: {e}")
+        logger.warning("Error fetching %s cohort summary: %s", kind, e)
+        return None
+
+
+def transition_cohort(kind, cohort_filter, from_status, to_status):
+    """Moves the cohort from one status to another. Returns the API's result, or None on error."""
+    payload = dict(cohort_filter, **{"from": from_status, "to": to_status})
+    logger.debug("Cohort transition %s payload: %s", kind, LazyBody(payload))
+    try:
+        response = session.post(f"{API_BASE_URL}/cohorts/{kind}/transition", json=payload)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error updating cohort: {e}")
+        logger.warning("Error moving %s cohort: %s", kind, e)
+        return None
+
+
+# --- Streamlit UI for Cohort Transitions ---
+
+def cohort_manage_page():
+    st.title("Cohort Status Transitions")
+    st.write("Move every student in a cohort to the next status at once, e.g. at the end of a term.")
+
+    if "cohort_message" in st.session_state:
+        st.success(st.session_state.pop("cohort_message"))
+
+    kind_label = st.radio("Cohort type", list(COHORT_KINDS), horizontal=True, key="cohort_kind")
+    kind = COHORT_KINDS[kind_label]
+
+    # --- Cohort Filter ---
+    st.subheader("Select Cohort")
+    col_gurukul, col_milestone, col_level = st.columns(3)
+    gurukul_options = {"Any gurukul": None}
+    gurukul_options.update({f"{g['gname']} (ID: {g['gid']})": g["gid"] for g in get_gurukuls()})
+    with col_gurukul:
+        gid = gurukul_options[st.selectbox("Gurukul", list(gurukul_options), key="cohort_gurukul")]
+
+    milestone_options = {"Any milestone": None}
+    if gid is not None:
+        milestone_options.update({f"Class {m['class']} - {m['level']} (ID: {m['mid']})": m["mid"]
+                                  for m in get_milestones_by_gurukul(gid)})
+    with col_milestone:
+        mid = milestone_options[st.selectbox("Milestone", list(milestone_options), key="cohort_milestone",
+                                             disabled=gid is None, help="Choose a gurukul first")]
+
+    with col_level:
+        level = st.selectbox("Level", ["Any level"] + get_level_lookup(API_BASE_URL).sorted(get_distinct_levels()), key="cohort_level")
+        level = None if level == "Any level" else level
+
+    cohort_filter = {k: v for k, v in {"gid": gid, "mid": mid, "level": level}.items() if v is not None}
+    if not cohort_filter:
+        st.info("Choose a gurukul, milestone or level to select a cohort.")
+        return
+
+    summary = get_cohort_summary(kind, cohort_filter)
+    if summary is None:
+        return
+    for column, status in zip(st.columns(len(STATUSES)), STATUSES):
+        column.metric(status.replace("_", " "), summary.get(status, 0))
+
+    st.markdown("---")
+
+    # --- Apply Transition ---
+    st.subheader("Move Cohort")
+    col_from, col_to = st.columns(2)
+    with col_from:
+        from_status = st.selectbox("From status", STATUSES[:-1], key="cohort_from")
+    with col_to:
+        to_status = st.selectbox("To status", STATUSES[STATUSES.index(from_status) + 1:], key="cohort_to")
+
+    affected = summary.get(from_status, 0)
+    if affected == 0:
+        st.info(f"No students in this cohort are '{from_status}'.")
+        return
+
+    confirmed = st.checkbox(f"Move {affected} student(s) from '{from_status}' to '{to_status}'", key="cohort_confirm")
+    if st.button("Apply Transition", key="cohort_apply", disabled=not confirmed):
+        with st.spinner("Updating cohort..."):
+            result = transition_cohort(kind, cohort_filter, from_status, to_status)
+        if result is not None:
+            logger.info("Moved %s %s cohort rows %s -> %s", result["updated"], kind, from_status, to_status)
+            st.session_state.cohort_message = f"Moved {result['updated']} student(s) from '{from_status}' to '{to_status}'."
+            del st.session_state.cohort_confirm
+            st.rerun() # Rerun to refresh the counts
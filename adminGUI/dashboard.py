@@ -0,0 +1,88 @@
+# dashboard.py
+# Admin dashboard: counts and distributions from GET /stats, which computes them with
+# SQL aggregates in one query. Nothing here downloads the full user or milestone lists.
+import pandas as pd
+import requests
+import streamlit as st
+
+from api_logging import get_logger
+from api_session import session
+
+# --- Configuration ---
+API_BASE_URL = "http://localhost:5002"
+STATS_TTL = 60  # The API caches /stats for about as long
+STATUSES = ["Started", "In_progress", "Done"]
+logger = get_logger(__name__)
+
+
+# --- API Interaction Functions ---
+
+@st.cache_data(ttl=STATS_TTL, show_spinner="Loading statistics...")
+def fetch_stats(base_url, fresh=False):
+    """Fetches the dashboard statistics; fresh=True bypasses the API's cache too.
+
+    Raises requests.exceptions.RequestException, so failures are not cached.
+    """
+    response = session.get(f"{base_url}/stats", params={"fresh": "true"} if fresh else None)
+    response.raise_for_status()
+    return response.json()
+
+
+# --- Streamlit UI for the Dashboard ---
+
+def _status_frame(stats):
+    return pd.DataFrame({
+        "Gurukul enrolments": [stats["gurukul_status"].get(s, 0) for s in STATUSES],
+        "Milestone enrolments": [stats["milestone_status"].get(s, 0) for s in STATUSES],
+    }, index=[s.replace("_", " ") for s in STATUSES])
+
+
+def _request_refresh():
+    st.session_state.stats_fresh = True
+
+
+def admin_dashboard_page():
+    fresh = st.session_state.pop("stats_fresh", False)
+    if fresh:
+        fetch_stats.clear()
+    try:
+        stats = fetch_stats(API_BASE_URL, fresh)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching statistics: {e}")
+        logger.warning("Error fetching stats: %s", e)
+        return
+
+    totals = stats["totals"]
+    for column, (label, key) in zip(st.columns(7), [("Gurukuls", "gurukuls"), ("Offerings", "offerings"),
+                                                     ("Milestones", "milestones"), ("Subjects", "subjects"),
+                                                     ("Topics", "topics"), ("Teachers", "teachers"),
+                                                     ("Students", "students")]):
+        column.metric(label, f"{totals[key]:,}")
+    st.caption(f"As of {stats['generated_at']}")
+
+    col_left, col_right = st.columns(2)
+    with col_left:
+        st.subheader("Students per Gurukul")
+        per_gurukul = pd.DataFrame(stats["students_per_gurukul"], columns=["gid", "gname", "students"])
+        st.bar_chart(per_gurukul.set_index("gname")["students"], horizontal=True)
+    with col_right:
+        st.subheader("Students per Level")
+        per_level = pd.DataFrame(stats["students_per_level"], columns=["level", "students"])
+        st.bar_chart(per_level.set_index("level")["students"])
+
+    st.subheader("Status Breakdown")
+    st.bar_chart(_status_frame(stats), stack=False)
+
+    col_left, col_right = st.columns(2)
+    with col_left:
+        st.subheader("Average Score per Milestone")
+        scores = pd.DataFrame(stats["milestone_scores"],
+                              columns=["mid", "gname", "class", "level", "students", "avg_score"])
+        st.dataframe(scores.rename(columns={"gname": "gurukul", "avg_score": "average score"}),
+                     use_container_width=True, hide_index=True)
+    with col_right:
+        st.subheader("Teachers per Subject")
+        teachers = pd.DataFrame(stats["teachers_per_subject"], columns=["subid", "subname", "level", "teachers"])
+        st.dataframe(teachers.rename(columns={"subname": "subject"}), use_container_width=True, hide_index=True)
+
+    st.button("Refresh statistics", key="refresh_stats", on_click=_request_refresh)
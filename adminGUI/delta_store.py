@@ -0,0 +1,101 @@
+# delta_store.py
+# Process-wide copies of the large collections (users, topics, milestones), kept
+# current with GET /changes?table=<name>&since=<seq> instead of re-downloading the
+# whole list on every render. The first sync (or a 'reset' answer) loads the full
+# collection; after that each render only pulls the rows that changed.
+#
+#   collection = get_collection("topics", API_BASE_URL)
+#   rows = collection.sync().rows()     # raises requests.exceptions.RequestException
+#   table = collection.table()          # pyarrow Table for grid_data.table_to_frame
+import threading
+
+import streamlit as st
+
+from api_logging import get_logger
+from api_session import session
+from grid_data import fetch_table, rows_to_table
+
+# --- Configuration ---
+REQUEST_TIMEOUT = 60
+logger = get_logger(__name__)
+
+# collection name -> (key column, full-list path, sort key matching the list endpoint's ORDER BY)
+COLLECTIONS = {
+    "users": ("userid", "/users", lambda row: row.get("username") or ""),
+    "topics": ("tid", "/topics", lambda row: row["tid"]),
+    "milestones": ("mid", "/milestones", lambda row: row["mid"]),
+}
+
+
+class DeltaCollection:
+    """One collection plus its sync cursor; thread-safe, shared by every session."""
+
+    def __init__(self, base_url, name):
+        self.base_url = base_url
+        self.name = name
+        self.key, self.list_path, self.sort_key = COLLECTIONS[name]
+        self.seq = None
+        self.version = 0
+        self.delta_supported = True
+        self._rows = {}
+        self._sorted = None
+        self._table = None
+        self._lock = threading.RLock()
+
+    def sync(self):
+        """Applies the changes since the last sync (or loads everything the first time). Returns self."""
+        with self._lock:
+            if self.delta_supported:
+                params = {"table": self.name}
+                if self.seq is not None:
+                    params["since"] = self.seq
+                response = session.get(f"{self.base_url}/changes", params=params, timeout=REQUEST_TIMEOUT)
+                if response.status_code == 404:
+                    logger.warning("API has no /changes endpoint; %s will be fully reloaded each time", self.name)
+                    self.delta_supported = False
+                else:
+                    response.raise_for_status()
+                    self._apply(response.json())
+                    return self
+            rows = fetch_table(self.base_url, self.list_path).to_pylist()
+            self._apply({"reset": True, "upserts": rows, "deletes": [], "seq": None})
+            return self
+
+    def _apply(self, delta):
+        upserts, deletes = delta.get("upserts", []), delta.get("deletes", [])
+        if delta.get("reset"):
+            self._rows = {row[self.key]: row for row in upserts}
+            changed = True
+        else:
+            for row in upserts:
+                self._rows[row[self.key]] = row
+            for key in deletes:
+                self._rows.pop(key, None)
+            changed = bool(upserts or deletes)
+        self.seq = delta.get("seq")
+        if changed:
+            self.version += 1
+            self._sorted = None
+            self._table = None
+        logger.debug("Synced %s: reset=%s upserts=%d deletes=%d seq=%s", self.name, delta.get("reset"),
+                     len(upserts), len(deletes), self.seq)
+
+    def rows(self):
+        """Rows in the list endpoint's order. Treat them as read-only; they are shared across sessions."""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._rows.values(), key=self.sort_key)
+            return self._sorted
+
+    def table(self):
+        """The rows as a pyarrow Table, rebuilt only when the collection changed."""
+        with self._lock:
+            if self._table is None:
+                self._table = rows_to_table(self.rows())
+            return self._table
+
+
+@st.cache_resource
+def get_collection(name, base_url):
+    """Returns the shared DeltaCollection for `name` (users, topics or milestones)."""
+    return DeltaCollection(base_url, name)
@@ -0,0 +1,103 @@
+# export_download.py
+# Download buttons for GET /export/<kind> (users, students, teachers).
+#
+# The export is only fetched when the button is clicked (st.download_button runs the
+# data callable then, off the script thread). The CSV is streamed from the API into a
+# spooled temp file; for Parquet, the CSV stream is parsed batch by batch with pyarrow
+# and written straight into a Parquet file, so neither format holds the parsed table
+# in memory.
+#
+#   render_export_buttons(API_BASE_URL, "students")
+import csv
+import io
+import tempfile
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import streamlit as st
+
+from api_logging import get_logger
+from api_session import session
+
+# --- Configuration ---
+REQUEST_TIMEOUT = 300
+SPOOL_MAX_BYTES = 16 * 1024 * 1024  # exports larger than this spill to disk
+CHUNK_BYTES = 256 * 1024
+logger = get_logger(__name__)
+
+# Column types for the Parquet file; every other column is a string.
+INT_COLUMNS = {"userid", "user_role_link", "sid", "gid", "mid", "class", "score", "teachid"}
+BOOL_COLUMNS = {"isdeleted"}
+TIMESTAMP_COLUMNS = {"created_at", "last_login", "gurukul_start", "gurukul_end", "milestone_start", "milestone_end"}
+
+
+def _column_type(name):
+    if name in INT_COLUMNS:
+        return pa.int64()
+    if name in BOOL_COLUMNS:
+        return pa.bool_()
+    if name in TIMESTAMP_COLUMNS:
+        return pa.timestamp("ms", tz="UTC")
+    return pa.string()
+
+
+def _open_export(base_url, kind):
+    response = session.get(f"{base_url}/export/{kind}", params={"format": "csv"}, stream=True, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    response.raw.decode_content = True  # undo gzip/br while streaming
+    return response
+
+
+def export_csv(base_url, kind):
+    """Downloads an export as CSV into a (spooled) temp file, rewound for reading."""
+    sink = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with _open_export(base_url, kind) as response:
+        for chunk in response.iter_content(CHUNK_BYTES):
+            sink.write(chunk)
+    sink.seek(0)
+    return sink
+
+
+def export_parquet(base_url, kind):
+    """Downloads an export and converts it to Parquet while it streams in."""
+    sink = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    with _open_export(base_url, kind) as response:
+        response.raw.auto_close = False  # let pyarrow read to EOF instead of hitting a closed file
+        source = io.BufferedReader(response.raw, CHUNK_BYTES)
+        columns = next(csv.reader([source.readline().decode("utf-8")]))
+        reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(column_names=columns, block_size=CHUNK_BYTES),
+            convert_options=pa_csv.ConvertOptions(column_types={c: _column_type(c) for c in columns},
+                                                  strings_can_be_null=True),
+        )
+        with pq.ParquetWriter(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+    sink.seek(0)
+    return sink
+
+
+def render_export_buttons(base_url, kind):
+    """CSV and Parquet download buttons for one export kind."""
+    stamp = date.today().isoformat()
+
+    def download(converter):
+        def run():
+            try:
+                return converter(base_url, kind)
+            except Exception as e:  # runs off the script thread, so st.error would be dropped
+                logger.warning("Export of %s failed: %s", kind, e)
+                raise
+        return run
+
+    col_csv, col_parquet, _ = st.columns([1, 1, 4])
+    with col_csv:
+        st.download_button(f"⬇️ Export {kind} (CSV)", data=download(export_csv), file_name=f"{kind}-{stamp}.csv",
+                           mime="text/csv", key=f"export_{kind}_csv", on_click="ignore")
+    with col_parquet:
+        st.download_button(f"⬇️ Export {kind} (Parquet)", data=download(export_parquet),
+                           file_name=f"{kind}-{stamp}.parquet", mime="application/vnd.apache.parquet",
+                           key=f"export_{kind}_parquet", on_click="ignore")
@@ -0,0 +1,126 @@
+# grid_data.py
+# Arrow-backed data for the list grids.
+#
+# List endpoints are fetched with ?format=columnar (one array per column, see the
+# API's utils/columnar.ts) and turned straight into a pyarrow Table, skipping the
+# list-of-dicts -> DataFrame step. Low-cardinality text columns are dictionary
+# encoded, so they arrive in pandas as Categoricals and go back to Arrow for
+# st.dataframe without re-encoding every string.
+#
+# The largest lists (users, topics, students) can also be streamed as NDJSON
+# (?stream=ndjson): iter_rows parses them line by line and fetch_table_streamed builds
+# the table STREAM_BATCH_ROWS rows at a time, so the raw body and a full list of dicts
+# are never held at once.
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from api_session import session
+
+# --- Configuration ---
+CATEGORICAL_COLUMNS = ("role", "level", "gtype", "status")
+REQUEST_TIMEOUT = 60
+STREAM_BATCH_ROWS = 5000
+
+# Nullable integer columns stay integers in pandas instead of becoming float64.
+_PANDAS_TYPES = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+
+# --- Conversion ---
+
+def _column_array(name, values):
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = pa.array([None if v is None else str(v) for v in values], type=pa.string())  # mixed types
+    if name in CATEGORICAL_COLUMNS and pa.types.is_string(array.type):
+        array = pc.dictionary_encode(array)
+    return array
+
+
+def columnar_to_table(payload):
+    """Builds a pyarrow Table from a {columns, data} columnar payload."""
+    columns = payload.get("columns", [])
+    data = payload.get("data", {})
+    return pa.table({name: _column_array(name, data.get(name, [])) for name in columns})
+
+
+def row_columns(rows):
+    """Union of the keys of all rows, in order of first appearance (rows may differ, e.g. per user role)."""
+    return list(dict.fromkeys(key for row in rows for key in row))
+
+
+def rows_to_table(rows):
+    """Builds a pyarrow Table from a plain list of row dicts (APIs without columnar support)."""
+    if not rows:
+        return pa.table({})
+    columns = row_columns(rows)
+    return pa.table({name: _column_array(name, [row.get(name) for row in rows]) for name in columns})
+
+
+def fetch_table(base_url, path, params=None):
+    """GETs a list endpoint in columnar form and returns a pyarrow Table.
+
+    Raises requests.exceptions.RequestException like a plain requests.get would,
+    so callers keep their own error messages.
+    """
+    response = session.get(f"{base_url}{path}", params={**(params or {}), "format": "columnar"},
+                            timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    payload = response.json()
+    if isinstance(payload, list):
+        return rows_to_table(payload)
+    return columnar_to_table(payload)
+
+
+def table_to_frame(table, columns=None):
+    """DataFrame for st.dataframe; dictionary columns become pandas Categoricals.
+
+    Columns missing from the table are skipped rather than raising KeyError.
+    """
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    return table.to_pandas(types_mapper=_PANDAS_TYPES.get)
+
+
+# --- NDJSON Streaming ---
+
+def iter_rows(base_url, path, params=None):
+    """Yields the rows of a list endpoint one by one, parsed as the NDJSON stream arrives.
+
+    APIs that ignore ?stream=ndjson answer with a plain JSON array, which is parsed whole.
+    Raises requests.exceptions.RequestException like a plain requests.get would.
+    """
+    with session.get(f"{base_url}{path}", params={**(params or {}), "stream": "ndjson"},
+                     stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        if "ndjson" not in response.headers.get("Content-Type", ""):
+            yield from response.json()
+            return
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+def fetch_table_streamed(base_url, path, params=None):
+    """Like fetch_table, but streams the list as NDJSON and converts it in batches."""
+    batches, rows = [], []
+    for row in iter_rows(base_url, path, params):
+        rows.append(row)
+        if len(rows) >= STREAM_BATCH_ROWS:
+            batches.append(rows_to_table(rows))
+            rows = []
+    if rows or not batches:
+        batches.append(rows_to_table(rows))
+    if len(batches) == 1:
+        return batches[0]
+    # A batch where a column is all null has type null; permissive promotion unifies it.
+    return pa.concat_tables(batches, promote_options="permissive")
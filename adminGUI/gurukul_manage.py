@@ -2,9 +2,15 @@
 import streamlit as st
 import requests
 import pandas as pd
+from api_logging import get_logger
+from api_session import session
+from availability import get_availability_index
+from level_lookup import get_level_lookup
+from job_progress import render_job_progress, submit_job
 
 # Define the base URL for your Node.js API
 API_BASE_URL = "http://localhost:5002"
+logger = get_logger(__name__)
 
 # --- API Interaction Functions ---
 
@@ -12,45 +18,43 @@ API_BASE_URL = "http://localhost:5002"
 def get_all_gurukuls():
     """Fetches all gurukuls from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/gurukul")
+        response = session.get(f"{API_BASE_URL}/gurukul")
         response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching gurukuls: {e}")
+        logger.warning("Error fetching gurukuls: %s", e)
         return []
 
 # Function to create a new gurukul via the API
 def create_gurukul(gname):
     """Creates a new gurukul with the given name."""
     try:
-        response = requests.post(f"{API_BASE_URL}/gurukul", json={"gname": gname})
+        response = session.post(f"{API_BASE_URL}/gurukul", json={"gname": gname})
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error creating gurukul: {e}")
+        logger.warning("Error creating gurukul: %s", e)
         return None
 
 # Function to update an existing gurukul via the API
 def update_gurukul(gid, gname):
     """Updates an existing gurukul with the given ID and new name."""
     try:
-        response = requests.put(f"{API_BASE_URL}/gurukul/{gid}", json={"gname": gname})
+        response = session.put(f"{API_BASE_URL}/gurukul/{gid}", json={"gname": gname})
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error updating gurukul: {e}")
+        logger.warning("Error updating gurukul: %s", e)
         return None
 
-# Function to delete a gurukul via the API
+# Function to delete a gurukul in the background (a large gurukul cascades to many offerings)
 def delete_gurukul(gid):
-    """Deletes a gurukul with the given ID."""
-    try:
-        response = requests.delete(f"{API_BASE_URL}/gurukul/{gid}")
-        response.raise_for_status()
-        return response.status_code == 200 # Check for successful deletion (status 200 OK)
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error deleting gurukul: {e}")
-        return False
+    """Queues deletion of the gurukul with the given ID; progress shows under 'Delete Gurukul'."""
+    job = submit_job(API_BASE_URL, "delete_gurukul", {"gid": gid}, f"Delete gurukul ID {gid}", scope="gurukul")
+    return job is not None
 
 # --- Streamlit UI for Gurukul Management ---
 
@@ -75,6 +79,7 @@ def gurukul_manage_page():
                 with st.spinner("Creating gurukul..."):
                     result = create_gurukul(new_gurukul_name)
                     if result:
+                        get_availability_index(API_BASE_URL).gurukul_created(result['gid'], get_level_lookup(API_BASE_URL).gtypes)
                         st.success(f"Gurukul '{result['gname']}' (ID: {result['gid']}) created successfully!")
                         st.rerun() # Rerun to refresh list
                     else:
@@ -164,13 +169,10 @@ def gurukul_manage_page():
         
         if 'confirm_delete_gurukul_id' in st.session_state and st.session_state.confirm_delete_gurukul_id == selected_gurukul_id_delete:
             if st.button("Confirm Deletion", key="confirm_delete_final_button"):
-                with st.spinner(f"Deleting gurukul ID {selected_gurukul_id_delete}..."):
-                    success = delete_gurukul(selected_gurukul_id_delete)
-                    if success:
-                        st.success(f"Gurukul ID {selected_gurukul_id_delete} and its offerings deleted successfully!")
-                        del st.session_state.confirm_delete_gurukul_id # Clear confirmation state
-                        st.rerun() # Rerun to refresh list
-                    else:
-                        st.error("Failed to delete gurukul. Please check API logs.")
+                if delete_gurukul(selected_gurukul_id_delete):
+                    del st.session_state.confirm_delete_gurukul_id # Clear confirmation state
+                    st.rerun() # Rerun to show the job's progress
     else:
-        st.info("No gurukuls available to delete.")
\ No newline at end of file
+        st.info("No gurukuls available to delete.")
+
+    render_job_progress(API_BASE_URL, scope="gurukul")
\ No newline at end of file
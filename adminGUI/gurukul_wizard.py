@@ -0,0 +1,114 @@
+# gurukul_wizard.py
+# Sets up a new gurukul in one step: the gurukul, its offerings (gtypes) and a milestone
+# per level are sent as one POST /batch. Offerings refer to the new gurukul and milestones
+# to their offering with {"$ref": "<ref>.<field>"}, and the API creates all of them in one
+# transaction, so a rejected row leaves nothing half-created.
+import streamlit as st
+import requests
+from api_logging import get_logger, LazyBody
+from api_session import session
+from availability import get_availability_index
+from change_feed import is_live
+from level_lookup import get_level_lookup
+
+# --- Configuration ---
+API_BASE_URL = "http://localhost:5002"
+logger = get_logger(__name__)
+
+
+# --- API Interaction Functions ---
+
+def run_batch(operations):
+    """Runs the operations in one transaction. Returns the per-operation results, or None on error."""
+    logger.debug("Batch payload: %s", LazyBody(operations))
+    try:
+        response = session.post(f"{API_BASE_URL}/batch", json={"operations": operations})
+        response.raise_for_status()
+        return response.json()["results"]
+    except requests.exceptions.RequestException as e:
+        detail = _error_detail(e.response) if e.response is not None else None
+        st.error(f"Error setting up gurukul: {detail or e}")
+        logger.warning("Batch failed: %s", detail or e)
+        return None
+
+
+def _error_detail(response):
+    """The API's message for a rejected batch, naming the failed operation."""
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    if "index" in body:
+        return f"operation {body['index'] + 1} ({body['op']}): {body['message']}"
+    return body.get("message")
+
+
+def build_operations(gname, milestone_classes):
+    """Builds the batch: one gurukul, one offering per gtype, one milestone per (level, class).
+
+    milestone_classes maps gtype -> {level: class}.
+    """
+    operations = [{"op": "gurukul.create", "ref": "gurukul", "args": {"gname": gname}}]
+    for gtype, classes in milestone_classes.items():
+        offering_ref = f"offering_{gtype}"
+        operations.append({"op": "offering.create", "ref": offering_ref,
+                           "args": {"gid": {"$ref": "gurukul.gid"}, "gtype": gtype}})
+        for level, milestone_class in classes.items():
+            operations.append({"op": "milestone.create",
+                               "args": {"class": milestone_class, "level": level,
+                                        "oid": {"$ref": f"{offering_ref}.oid"}}})
+    return operations
+
+
+# --- Streamlit UI for the Setup Wizard ---
+
+def gurukul_wizard_page():
+    st.title("Gurukul Setup Wizard")
+    st.write("Create a gurukul together with its offerings and milestones. "
+             "Everything is saved in one request, or nothing is if any part is rejected.")
+
+    if "wizard_message" in st.session_state:
+        st.success(st.session_state.pop("wizard_message"))
+
+    # --- Step 1: Gurukul ---
+    st.subheader("1. Gurukul")
+    gname = st.text_input("Gurukul Name", key="wizard_gname").strip()
+
+    # --- Step 2: Offerings ---
+    st.subheader("2. Offerings")
+    levels = get_level_lookup(API_BASE_URL)
+    gtypes = st.multiselect("Offering types (gtype)", levels.gtypes, key="wizard_gtypes")
+
+    # --- Step 3: Milestones ---
+    st.subheader("3. Milestones")
+    st.caption("Enter the class for each level that should get a milestone; leave it empty to skip the level.")
+    milestone_classes = {}
+    for gtype in gtypes:
+        st.markdown(f"**{gtype}**")
+        classes = {}
+        for column, level in zip(st.columns(len(levels.levels_for(gtype))), levels.levels_for(gtype)):
+            with column:
+                milestone_class = st.number_input(f"{level} class", min_value=1, step=1, value=None,
+                                                  key=f"wizard_class_{level}")
+            if milestone_class is not None:
+                classes[level] = int(milestone_class)
+        milestone_classes[gtype] = classes
+
+    st.markdown("---")
+    milestone_count = sum(len(classes) for classes in milestone_classes.values())
+    st.write(f"Will create 1 gurukul, {len(gtypes)} offering(s) and {milestone_count} milestone(s).")
+
+    if st.button("Create Gurukul", key="wizard_create", disabled=not gname):
+        with st.spinner("Creating gurukul..."):
+            results = run_batch(build_operations(gname, milestone_classes))
+        if results is not None:
+            gurukul = results[0]["result"]
+            logger.info("Wizard created gurukul %s with %s operations", gurukul["gid"], len(results))
+            get_availability_index(API_BASE_URL).refresh_gurukul(gurukul["gid"])
+            st.session_state.wizard_message = (f"Created gurukul '{gurukul['gname']}' (ID: {gurukul['gid']}) with "
+                                               f"{len(gtypes)} offering(s) and {milestone_count} milestone(s).")
+            for key in [k for k in st.session_state if k.startswith("wizard_") and k != "wizard_message"]:
+                del st.session_state[key]
+            if not is_live():
+                st.cache_data.clear()  # otherwise the change feed already invalidated what changed
+            st.rerun()
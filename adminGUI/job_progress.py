@@ -0,0 +1,112 @@
+# job_progress.py
+# Runs long admin operations as API background jobs (POST /jobs) and shows their
+# progress without blocking the page.
+#
+# submit_job() queues the job and remembers it in this session; render_job_progress()
+# draws a progress bar per remembered job inside an st.fragment that polls
+# GET /jobs/<id> every JOB_POLL_SECONDS, so only that fragment reruns while the rest
+# of the page stays usable. When a job finishes the whole page is rerun once so its
+# lists reflect the change.
+#
+#   job = submit_job(API_BASE_URL, "delete_gurukul", {"gid": 7}, "Delete gurukul 7", scope="gurukul")
+#   render_job_progress(API_BASE_URL, scope="gurukul")
+import requests
+import streamlit as st
+
+from api_logging import get_logger
+from api_session import session
+from change_feed import is_live
+
+# --- Configuration ---
+JOB_POLL_SECONDS = 1.0
+FINISHED_STATUSES = ("succeeded", "failed")
+_STATE_KEY = "tracked_jobs"
+logger = get_logger(__name__)
+
+
+# --- API Interaction Functions ---
+
+def submit_job(base_url, job_type, payload, label, scope):
+    """Queues a background job and tracks it under `scope`. Returns the job, or None on error."""
+    try:
+        response = session.post(f"{base_url}/jobs", json={"type": job_type, "payload": payload})
+        response.raise_for_status()
+        job = response.json()
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error queuing job '{label}': {e}")
+        logger.warning("Error queuing %s job: %s", job_type, e)
+        return None
+    _tracked(scope)[job["id"]] = {"label": label, "job": job, "notified": False}
+    logger.info("Queued %s job %s", job_type, job["id"])
+    return job
+
+
+def get_job(base_url, job_id):
+    """Fetches one job's status and progress, or None on error."""
+    try:
+        response = session.get(f"{base_url}/jobs/{job_id}")
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        logger.warning("Error fetching job %s: %s", job_id, e)
+        return None
+
+
+# --- Progress Display ---
+
+def _tracked(scope):
+    return st.session_state.setdefault(_STATE_KEY, {}).setdefault(scope, {})
+
+
+def _describe(job):
+    result = job.get("result") or {}
+    if job["status"] == "failed":
+        return job.get("error") or "Job failed"
+    if "created" in result:
+        skipped = len(result.get("duplicates", [])) + len(result.get("failed", []))
+        return f"{result['created']} created, {skipped} skipped"
+    if "newSlogsCount" in result:
+        return f"{result['newSlogsCount']} lessons assigned to {result['students']} students"
+    return job.get("message") or "Done"
+
+
+def _draw_jobs(base_url, scope):
+    tracked = _tracked(scope)
+    finished_now = False
+    for job_id, entry in list(tracked.items()):
+        job = entry["job"]
+        if job["status"] not in FINISHED_STATUSES:
+            job = get_job(base_url, job_id) or job
+            entry["job"] = job
+        status = job["status"]
+        if status == "succeeded":
+            st.success(f"{entry['label']}: {_describe(job)}")
+        elif status == "failed":
+            st.error(f"{entry['label']}: {_describe(job)}")
+        else:
+            percent = job.get("percent") or 0
+            text = job.get("message") or ("Waiting for a worker..." if status == "queued" else "Running...")
+            st.progress(percent, text=f"{entry['label']}: {text}")
+        if status in FINISHED_STATUSES and not entry["notified"]:
+            entry["notified"] = True
+            finished_now = True
+
+    if any(e["job"]["status"] in FINISHED_STATUSES for e in tracked.values()):
+        if st.button("Clear finished jobs", key=f"clear_jobs_{scope}"):
+            for job_id in [k for k, e in tracked.items() if e["job"]["status"] in FINISHED_STATUSES]:
+                del tracked[job_id]
+            st.rerun(scope="app")
+
+    if finished_now:
+        if not is_live():
+            st.cache_data.clear()  # otherwise the change feed already invalidated what changed
+        st.rerun(scope="app")
+
+
+def render_job_progress(base_url, scope):
+    """Shows this session's jobs for `scope`; polls only while one of them is still queued or running."""
+    tracked = _tracked(scope)
+    if not tracked:
+        return
+    active = any(e["job"]["status"] not in FINISHED_STATUSES for e in tracked.values())
+    st.fragment(_draw_jobs, run_every=JOB_POLL_SECONDS if active else None)(base_url, scope)
@@ -0,0 +1,98 @@
+# level_lookup.py
+# The gtype -> level mapping (G1: L1-L4, ...) from GET /levels, which the API reads from
+# public.level_mapping. It is loaded once per Streamlit server process and shared by every
+# page and session (st.cache_resource), with the lookups pages need precomputed: levels per
+# gtype, the gtype of each level, and the natural order of levels (L2 before L10).
+#
+#   levels = get_level_lookup(API_BASE_URL)
+#   levels.levels_for("G2")        -> ("L5", "L6", "L7", "L8")
+#   levels.gtype_of("L10")         -> "G3"
+#   levels.sorted(["L10", "L2"])   -> ["L2", "L10"]
+#
+# After LEVELS_TTL the mapping is revalidated with If-None-Match, so an unchanged mapping
+# costs a 304 with no body.
+import re
+from dataclasses import dataclass, field
+
+import requests
+import streamlit as st
+
+from api_logging import get_logger
+from api_session import session
+
+# --- Configuration ---
+LEVELS_TTL = 6 * 60 * 60  # Seconds before the mapping is revalidated
+logger = get_logger(__name__)
+
+# base_url -> (etag, mapping) of the last 200 response, for revalidation
+_validated = {}
+
+
+def _natural_key(name):
+    """'L10' -> ['L', 10, ''], so levels and gtypes sort by their number."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+@dataclass(frozen=True)
+class LevelLookup:
+    """The level mapping plus precomputed lookups; build it with LevelLookup.from_mapping."""
+    mapping: dict = field(default_factory=dict)      # gtype -> tuple of levels in teaching order
+    gtypes: tuple = ()                               # gtypes in natural order
+    levels: tuple = ()                               # every level, grouped by gtype, in order
+    level_gtype: dict = field(default_factory=dict)  # level -> gtype
+    level_rank: dict = field(default_factory=dict)   # level -> position in `levels`
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        gtypes = tuple(sorted(mapping, key=_natural_key))
+        ordered = {gtype: tuple(mapping[gtype]) for gtype in gtypes}
+        levels = tuple(level for gtype in gtypes for level in ordered[gtype])
+        return cls(mapping=ordered, gtypes=gtypes, levels=levels,
+                   level_gtype={level: gtype for gtype in gtypes for level in ordered[gtype]},
+                   level_rank={level: rank for rank, level in enumerate(levels)})
+
+    def levels_for(self, gtype):
+        """The levels of an offering type, in order (empty for an unknown gtype)."""
+        return self.mapping.get(gtype, ())
+
+    def gtype_of(self, level):
+        """The offering type a level belongs to, or None."""
+        return self.level_gtype.get(level)
+
+    def sort_key(self, level):
+        """Sort key for levels: mapping order, then unknown levels in natural order."""
+        rank = self.level_rank.get(level)
+        return (0, rank, []) if rank is not None else (1, 0, _natural_key(str(level)))
+
+    def sorted(self, levels):
+        return sorted(levels, key=self.sort_key)
+
+
+# --- API Interaction Functions ---
+
+@st.cache_resource(ttl=LEVELS_TTL, show_spinner=False)
+def load_level_lookup(base_url):
+    """Fetches GET /levels (revalidating the last copy with its ETag) and builds the lookup.
+
+    Raises requests.exceptions.RequestException, so failures are not cached.
+    """
+    etag, mapping = _validated.get(base_url, (None, None))
+    response = session.get(f"{base_url}/levels", headers={"If-None-Match": etag} if etag else None)
+    if response.status_code == 304 and mapping is not None:
+        logger.debug("Level mapping unchanged (ETag %s)", etag)
+    else:
+        response.raise_for_status()
+        mapping = response.json()
+        _validated[base_url] = (response.headers.get("ETag"), mapping)
+        logger.info("Loaded level mapping: %s gtypes", len(mapping))
+    return LevelLookup.from_mapping(mapping)
+
+
+def get_level_lookup(base_url):
+    """The shared LevelLookup; an empty one (after showing the error) if the API is unreachable."""
+    try:
+        return load_level_lookup(base_url)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching level mapping: {e}")
+        logger.warning("Error fetching level mapping: %s", e)
+        return LevelLookup()
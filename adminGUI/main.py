@@ -13,20 +13,28 @@ from u_teachers_manage import u_teachers_manage_page
 from u_students_manage import u_students_manage_page
 from showTopicbySubject import show_topics_by_subject_page
 from showTopicsbyLevel import show_topics_by_level_page
+from cohort_manage import cohort_manage_page
+from score_upload import score_upload_page
+from dashboard import admin_dashboard_page
+from gurukul_wizard import gurukul_wizard_page
 
 # Imports for the new direct management sections
 from DirectTeacher_manage import show_teacher_crud_direct
 from DirectStudent_manage import show_student_crud_direct
+from api_logging import render_logging_controls
+from change_feed import is_live, start_change_feed
 
 # --- Helper Function for Navigation ---
 def set_view(view_name):
-    """Sets the current view in session state and clears cache."""
+    """Sets the current view in session state and clears cache unless the change feed keeps it current."""
     st.session_state.current_view = view_name
-    st.cache_data.clear() # Clear cache when changing views to ensure fresh data
+    if not is_live():
+        st.cache_data.clear() # No change feed: clear cache when changing views to ensure fresh data
 
 # --- Main Application ---
 def main():
     st.set_page_config(layout="wide", page_title="Gurukul Admin UI")
+    start_change_feed() # Background listener that invalidates cached data as the database changes
 
     # Initialize session state for page navigation, using 'current_view' consistently
     if 'current_view' not in st.session_state:
@@ -40,6 +48,8 @@ def main():
         # Buttons for different management sections, all using set_view
         if st.button("Manage Gurukuls"):
             set_view("gurukuls_page") # Using a consistent view name
+        if st.button("Gurukul Setup Wizard"):
+            set_view("gurukul_wizard_page")
         if st.button("Manage Gurukul Offerings"):
             set_view("offerings_page")
         if st.button("Manage Milestones"):
@@ -70,12 +80,20 @@ def main():
             set_view("u_teachers_page")
         if st.button("Manage Students"):
             set_view("u_students_page")
+        if st.button("Cohort Transitions"):
+            set_view("cohorts_page")
+        if st.button("Upload Milestone Scores"):
+            set_view("score_upload_page")
 
         # Optional: A "Back to Dashboard" button for all sub-pages
         st.markdown("---")
         if st.session_state.current_view != "admin_dashboard":
             st.button("↩️ Back to Dashboard", on_click=lambda: set_view('admin_dashboard'))
 
+        # Per-session debug logging (console only; off by default)
+        st.markdown("---")
+        render_logging_controls()
+
 
     # --- Main Content Area ---
     st.markdown("---") # Add a horizontal line for visual separation
@@ -84,12 +102,13 @@ def main():
     if st.session_state.current_view == "admin_dashboard":
         st.header("Welcome to Admin UI!")
         st.info("Select a management section from the sidebar to get started.")
-        # Assuming "flower.png" exists in your project directory
-        st.image("flower.png", caption="", use_container_width=True)
+        admin_dashboard_page()
 
     # Existing Management Pages
     elif st.session_state.current_view == "gurukuls_page":
         gurukul_manage_page()
+    elif st.session_state.current_view == "gurukul_wizard_page":
+        gurukul_wizard_page()
     elif st.session_state.current_view == "offerings_page":
         offerings_manage_page()
     elif st.session_state.current_view == "milestones_page":
@@ -104,6 +123,10 @@ def main():
         u_teachers_manage_page()
     elif st.session_state.current_view == "u_students_page":
         u_students_manage_page()
+    elif st.session_state.current_view == "cohorts_page":
+        cohort_manage_page()
+    elif st.session_state.current_view == "score_upload_page":
+        score_upload_page()
     elif st.session_state.current_view == "topics_by_subject_page":
         show_topics_by_subject_page()
     elif st.session_state.current_view == "topics_by_level_page":
@@ -2,28 +2,24 @@
 import streamlit as st
 import requests
 import pandas as pd
+from api_logging import get_logger
+from delta_store import get_collection
+from api_session import session
+from availability import get_availability_index
+from level_lookup import get_level_lookup
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Your Node.js API URL
-
-# --- Level Mapping (MUST be consistent with API) ---
-LEVEL_MAPPING = {
-    "G1": ["L1", "L2", "L3", "L4"],
-    "G2": ["L5", "L6", "L7", "L8"],
-    "G3": ["L9", "L10", "L11", "L12"],
-    "G4": ["L13", "L14", "L15", "L16"],
-}
-ALL_POSSIBLE_LEVELS = sorted(list(set(level for levels in LEVEL_MAPPING.values() for level in levels)))
+logger = get_logger(__name__)
 
 
 # --- API Interaction Functions for Milestones ---
 
 def get_all_milestones():
-    """Fetches all milestones from the backend API."""
+    """Fetches all milestones, applying only the changes since the last sync (shared, read-only rows)."""
+    collection = get_collection("milestones", API_BASE_URL)
     try:
-        response = requests.get(f"{API_BASE_URL}/milestones")
-        response.raise_for_status()
-        return response.json()
+        return collection.sync().rows()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching milestones: {e}")
         return []
@@ -31,7 +27,7 @@ def get_all_milestones():
 def create_milestone(milestone_class, level, oid):
     """Creates a new milestone."""
     try:
-        response = requests.post(f"{API_BASE_URL}/milestones", json={"class": milestone_class, "level": level, "oid": oid})
+        response = session.post(f"{API_BASE_URL}/milestones", json={"class": milestone_class, "level": level, "oid": oid})
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -49,7 +45,7 @@ def update_milestone(mid, milestone_class=None, level=None, oid=None):
         payload["oid"] = oid
     
     try:
-        response = requests.put(f"{API_BASE_URL}/milestones/{mid}", json=payload)
+        response = session.put(f"{API_BASE_URL}/milestones/{mid}", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -59,7 +55,7 @@ def update_milestone(mid, milestone_class=None, level=None, oid=None):
 def delete_milestone(mid):
     """Deletes a milestone."""
     try:
-        response = requests.delete(f"{API_BASE_URL}/milestones/{mid}")
+        response = session.delete(f"{API_BASE_URL}/milestones/{mid}")
         response.raise_for_status()
         return response.status_code == 200
     except requests.exceptions.RequestException as e:
@@ -71,7 +67,7 @@ def delete_milestone(mid):
 def get_all_gurukul_offerings():
     """Fetches all gurukul offerings from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/gurukul-offerings")
+        response = session.get(f"{API_BASE_URL}/gurukul-offerings")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -81,7 +77,7 @@ def get_all_gurukul_offerings():
 def get_all_gurukuls_for_dropdown():
     """Fetches all gurukuls (gid, gname) for use in dropdowns (for display purposes)."""
     try:
-        response = requests.get(f"{API_BASE_URL}/gurukul")
+        response = session.get(f"{API_BASE_URL}/gurukul")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -100,17 +96,23 @@ def milestones_manage_page():
     all_milestones = get_all_milestones()
     all_gurukul_offerings = get_all_gurukul_offerings()
     all_gurukuls = get_all_gurukuls_for_dropdown()
+    levels = get_level_lookup(API_BASE_URL) # Levels per gtype, from GET /levels
 
     # Create maps for easy lookup
     gurukul_id_to_name_map = {g['gid']: g['gname'] for g in all_gurukuls}
     offering_id_to_details_map = {o['oid']: o for o in all_gurukul_offerings}
-    
-    # Group existing milestones by offering (oid) and level to prevent duplicates
-    # This assumes a milestone is unique by (oid, level)
-    milestone_oid_level_map = {}
-    for m in all_milestones:
-        key = (m['oid'], m['level'])
-        milestone_oid_level_map[key] = m['mid']
+
+    # Levels each offering has no milestone for yet, from the shared availability index
+    # (computed by the API; a milestone is unique by (oid, level))
+    availability = get_availability_index(API_BASE_URL)
+
+    def available_levels(oid):
+        try:
+            return list(availability.levels_for(oid))
+        except requests.exceptions.RequestException as e:
+            st.error(f"Error fetching available levels: {e}")
+            logger.warning("Error fetching available levels: %s", e)
+            return []
 
 
     # --- Create New Milestone Section ---
@@ -160,20 +162,13 @@ def milestones_manage_page():
     # Dynamic filtering of Levels based on selected Gurukul Offering's gtype
     available_levels_for_creation_current_selection = []
     if selected_offering_gtype:
-        all_levels_for_gtype = LEVEL_MAPPING.get(selected_offering_gtype, [])
-        existing_levels_for_oid = {level for oid, level in milestone_oid_level_map if oid == selected_offering_create_oid}
-        
-        available_levels_for_creation_current_selection = [
-            lvl for lvl in all_levels_for_gtype if lvl not in existing_levels_for_oid
-        ]
-        available_levels_for_creation_current_selection.sort()
+        available_levels_for_creation_current_selection = available_levels(selected_offering_create_oid)
 
     # --- Debugging Information (Create Section) ---
-    print(f"DEBUG (Create): Selected Gurukul ID: {selected_gurukul_create_id}")
-    print(f"DEBUG (Create): Selected Offering OID: {selected_offering_create_oid}")
-    print(f"DEBUG (Create): Selected Offering GType: {selected_offering_gtype}")
-    print(f"DEBUG (Create): Existing Levels for this OID: {list(existing_levels_for_oid) if selected_offering_create_oid else 'N/A'}")
-    print(f"DEBUG (Create): Available Levels for dropdown: {available_levels_for_creation_current_selection}")
+    logger.debug("Create: Selected Gurukul ID: %s", selected_gurukul_create_id)
+    logger.debug("Create: Selected Offering OID: %s", selected_offering_create_oid)
+    logger.debug("Create: Selected Offering GType: %s", selected_offering_gtype)
+    logger.debug("Create: Available Levels for dropdown: %s", available_levels_for_creation_current_selection)
     # --- End Debugging Information ---
 
     with st.form("create_milestone_form"):
@@ -197,6 +192,7 @@ def milestones_manage_page():
                 with st.spinner("Creating milestone..."):
                     result = create_milestone(milestone_class, new_level, selected_offering_create_oid)
                     if result:
+                        availability.milestone_created(result['oid'], result['level'])
                         st.success(f"Milestone (ID: {result['mid']}, Level: {result['level']}) created successfully!")
                         st.rerun()
                     else:
@@ -319,26 +315,19 @@ def milestones_manage_page():
     # Calculate available levels based on the *current/selected* OID's gtype
     available_levels_for_update = []
     if updated_offering_details_gtype:
-        all_levels_for_updated_gtype = LEVEL_MAPPING.get(updated_offering_details_gtype, [])
-        
-        existing_levels_for_selected_oid_excluding_current = set()
-        for oid_key, level_key in milestone_oid_level_map:
-            if oid_key == initial_oid: # Check against the initial_oid which is the current milestone's oid
-                if not (oid_key == initial_oid and level_key == initial_level and milestone_oid_level_map.get((oid_key, level_key)) == selected_milestone_id):
-                    existing_levels_for_selected_oid_excluding_current.add(level_key)
-        
+        # The milestone's own level stays selectable; other levels only if the offering lacks them
+        free_levels_for_oid = available_levels(initial_oid)
         available_levels_for_update = [
-            lvl for lvl in all_levels_for_updated_gtype if lvl not in existing_levels_for_selected_oid_excluding_current
+            lvl for lvl in levels.levels_for(updated_offering_details_gtype)
+            if lvl == initial_level or lvl in free_levels_for_oid
         ]
-    available_levels_for_update.sort()
 
     # --- Debugging Information (Update Section) ---
-    print(f"DEBUG (Update): Selected Milestone ID: {selected_milestone_id}")
-    print(f"DEBUG (Update): Current OID: {initial_oid}, Current Level: {initial_level}, Current Class: {initial_class}")
-    print(f"DEBUG (Update): GType of current Offering ({initial_oid}): {updated_offering_details_gtype}")
-    print(f"DEBUG (Update): Levels defined for GType: {LEVEL_MAPPING.get(updated_offering_details_gtype, [])}")
-    print(f"DEBUG (Update): Existing Levels for current OID (excluding current milestone's): {list(existing_levels_for_selected_oid_excluding_current)}")
-    print(f"DEBUG (Update): Available Levels for new Level dropdown: {available_levels_for_update}")
+    logger.debug("Update: Selected Milestone ID: %s", selected_milestone_id)
+    logger.debug("Update: Current OID: %s, Current Level: %s, Current Class: %s", initial_oid, initial_level, initial_class)
+    logger.debug("Update: GType of current Offering (%s): %s", initial_oid, updated_offering_details_gtype)
+    logger.debug("Update: Levels defined for GType: %s", levels.levels_for(updated_offering_details_gtype))
+    logger.debug("Update: Available Levels for new Level dropdown: %s", available_levels_for_update)
     # --- End Debugging Information ---
 
 
@@ -389,6 +378,7 @@ def milestones_manage_page():
 
                     result = update_milestone(selected_milestone_id, **update_payload)
                     if result:
+                        availability.refresh_offering(initial_oid)
                         st.success(f"Milestone ID {result['mid']} updated successfully!")
                         st.rerun()
                     else:
@@ -423,6 +413,9 @@ def milestones_manage_page():
                 with st.spinner(f"Deleting milestone ID {selected_milestone_id_delete}..."):
                     success = delete_milestone(selected_milestone_id_delete)
                     if success:
+                        deleted = next((m for m in all_milestones if m['mid'] == selected_milestone_id_delete), None)
+                        if deleted:
+                            availability.refresh_offering(deleted['oid'])
                         st.success(f"Milestone ID {selected_milestone_id_delete} deleted successfully!")
                         del st.session_state.confirm_delete_milestone_id
                         st.rerun()
@@ -2,27 +2,21 @@
 import streamlit as st
 import requests
 import pandas as pd
+from api_logging import get_logger
+from api_session import session
+from availability import get_availability_index
+from level_lookup import get_level_lookup
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Corrected API Base URL
-ALL_GTYPES = ["G1", "G2", "G3", "G4"] # All possible offering types
-
-# --- Level Mapping (MUST be consistent with API) ---
-LEVEL_MAPPING = {
-    "G1": ["L1", "L2", "L3", "L4"],
-    "G2": ["L5", "L6", "L7", "L8"],
-    "G3": ["L9", "L10", "L11", "L12"],
-    "G4": ["L13", "L14", "L15", "L16"],
-}
-# Note: ALL_POSSIBLE_LEVELS is not directly used in offerings_manage.py
-ALL_POSSIBLE_LEVELS = sorted(list(set(level for levels in LEVEL_MAPPING.values() for level in levels)))
+logger = get_logger(__name__)
 
 # --- API Interaction Functions ---
 
 def get_all_gurukul_offerings():
     """Fetches all gurukul offerings from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/gurukul-offerings")
+        response = session.get(f"{API_BASE_URL}/gurukul-offerings")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -32,7 +26,7 @@ def get_all_gurukul_offerings():
 def get_all_gurukuls_for_dropdown():
     """Fetches all gurukuls (gid, gname) for use in dropdowns."""
     try:
-        response = requests.get(f"{API_BASE_URL}/gurukul")
+        response = session.get(f"{API_BASE_URL}/gurukul")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -42,7 +36,7 @@ def get_all_gurukuls_for_dropdown():
 def create_gurukul_offering(gid, gtype):
     """Creates a new gurukul offering."""
     try:
-        response = requests.post(f"{API_BASE_URL}/gurukul-offerings", json={"gid": gid, "gtype": gtype})
+        response = session.post(f"{API_BASE_URL}/gurukul-offerings", json={"gid": gid, "gtype": gtype})
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -52,7 +46,7 @@ def create_gurukul_offering(gid, gtype):
 def update_gurukul_offering(oid, gid, gtype):
     """Updates an existing gurukul offering."""
     try:
-        response = requests.put(f"{API_BASE_URL}/gurukul-offerings/{oid}", json={"gid": gid, "gtype": gtype})
+        response = session.put(f"{API_BASE_URL}/gurukul-offerings/{oid}", json={"gid": gid, "gtype": gtype})
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -62,7 +56,7 @@ def update_gurukul_offering(oid, gid, gtype):
 def delete_gurukul_offering(oid):
     """Deletes a gurukul offering."""
     try:
-        response = requests.delete(f"{API_BASE_URL}/gurukul-offerings/{oid}")
+        response = session.delete(f"{API_BASE_URL}/gurukul-offerings/{oid}")
         response.raise_for_status()
         return response.status_code == 200
     except requests.exceptions.RequestException as e:
@@ -75,6 +69,8 @@ def offerings_manage_page():
     """Renders the UI for managing Gurukul Offerings."""
     st.header("Manage Gurukul Offerings")
     st.write("Here you can create, view, update, and delete Gurukul Offerings.")
+    levels = get_level_lookup(API_BASE_URL)
+    all_gtypes = list(levels.gtypes) # All possible offering types, from GET /levels
 
     # Fetch all gurukuls and offerings
     gurukuls = get_all_gurukuls_for_dropdown()
@@ -83,22 +79,14 @@ def offerings_manage_page():
     # Create a map for gurukul names (ID to Name)
     gurukul_id_to_name_map = {g['gid']: g['gname'] for g in gurukuls}
 
-    # Group existing offerings by gurukul ID to check for completeness
-    gurukul_offerings_map = {}
-    for offering in all_offerings:
-        gid = offering['gid']
-        gtype = offering['gtype']
-        if gid not in gurukul_offerings_map:
-            gurukul_offerings_map[gid] = set()
-        gurukul_offerings_map[gid].add(gtype)
-
-    # Filter gurukuls that DO NOT have all G-types
-    creatable_gurukuls = []
-    for g in gurukuls:
-        gid = g['gid']
-        existing_gtypes = gurukul_offerings_map.get(gid, set())
-        if not all(gt in existing_gtypes for gt in ALL_GTYPES):
-            creatable_gurukuls.append(g)
+    # Gurukuls that DO NOT have all G-types, from the shared availability index (computed by the API)
+    availability = get_availability_index(API_BASE_URL)
+    try:
+        creatable_gurukuls = [g for g in gurukuls if availability.gtypes_for(g['gid'])]
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching available offering types: {e}")
+        logger.warning("Error fetching available gtypes: %s", e)
+        creatable_gurukuls = []
     
     # Sort creatable gurukuls by name for consistent display
     creatable_gurukuls.sort(key=lambda x: x['gname'])
@@ -124,16 +112,11 @@ def offerings_manage_page():
         # Dynamic filtering of GTypes based on selected Gurukul
         available_gtypes_for_creation_current_selection = []
         if selected_gurukul_create_id is not None:
-            existing_gtypes_for_selected_gurukul = gurukul_offerings_map.get(selected_gurukul_create_id, set())
-            available_gtypes_for_creation_current_selection = [
-                gt for gt in ALL_GTYPES if gt not in existing_gtypes_for_selected_gurukul
-            ]
-            available_gtypes_for_creation_current_selection.sort()
+            available_gtypes_for_creation_current_selection = list(availability.gtypes_for(selected_gurukul_create_id))
 
         # --- Debugging Information ---
-        print(f"DEBUG (Create): Selected Gurukul ID: {selected_gurukul_create_id}")
-        print(f"DEBUG (Create): Existing GTypes for selected Gurukul: {list(existing_gtypes_for_selected_gurukul)}")
-        print(f"DEBUG (Create): Available GTypes for dropdown: {available_gtypes_for_creation_current_selection}")
+        logger.debug("Create: Selected Gurukul ID: %s", selected_gurukul_create_id)
+        logger.debug("Create: Available GTypes for dropdown: %s", available_gtypes_for_creation_current_selection)
         # --- End Debugging Information ---
 
         with st.form("create_offering_form"):
@@ -155,6 +138,7 @@ def offerings_manage_page():
                     with st.spinner("Creating offering..."):
                         result = create_gurukul_offering(selected_gurukul_create_id, new_gtype)
                         if result:
+                            availability.offering_created(result, levels.levels_for(result['gtype']))
                             st.success(f"Offering '{result['gtype']}' (ID: {result['oid']}) created for Gurukul ID {result['gid']} successfully!")
                             st.rerun()
                         else:
@@ -208,7 +192,7 @@ def offerings_manage_page():
 
         with st.form("update_offering_form"):
             initial_gurukul_id = current_offering_obj['gid'] if current_offering_obj else (gurukuls[0]['gid'] if gurukuls else None)
-            initial_gtype = current_offering_obj['gtype'] if current_offering_obj else ALL_GTYPES[0]
+            initial_gtype = current_offering_obj['gtype'] if current_offering_obj else (all_gtypes[0] if all_gtypes else None)
 
             # Pre-select the current Gurukul for update
             initial_gurukul_display = f"{gurukul_id_to_name_map.get(initial_gurukul_id, 'N/A')} (ID: {initial_gurukul_id})" if initial_gurukul_id else (all_gurukul_display_options[0] if all_gurukul_display_options else "")
@@ -227,8 +211,8 @@ def offerings_manage_page():
             # All G_TYPES are available for selection during update; backend handles uniqueness
             updated_gtype = st.selectbox(
                 "New Offering Type",
-                options=ALL_GTYPES,
-                index=ALL_GTYPES.index(initial_gtype) if initial_gtype in ALL_GTYPES else 0,
+                options=all_gtypes,
+                index=all_gtypes.index(initial_gtype) if initial_gtype in all_gtypes else 0,
                 key="update_offering_gtype_new_select"
             )
             
@@ -239,6 +223,8 @@ def offerings_manage_page():
                     with st.spinner(f"Updating offering ID {selected_offering_id}..."):
                         result = update_gurukul_offering(selected_offering_id, updated_gurukul_id, updated_gtype)
                         if result:
+                            for gid in {initial_gurukul_id, result['gid']}:
+                                availability.refresh_gurukul(gid)
                             st.success(f"Offering ID {result['oid']} updated successfully!")
                             st.rerun()
                         else:
@@ -280,6 +266,9 @@ def offerings_manage_page():
                 with st.spinner(f"Deleting offering ID {selected_offering_id_delete}..."):
                     success = delete_gurukul_offering(selected_offering_id_delete)
                     if success:
+                        deleted = next((o for o in all_offerings if o['oid'] == selected_offering_id_delete), None)
+                        if deleted:
+                            availability.refresh_gurukul(deleted['gid'])
                         st.success(f"Gurukul Offering ID {selected_offering_id_delete} deleted successfully!")
                         del st.session_state.confirm_delete_offering_id
                         st.rerun()
@@ -0,0 +1,129 @@
+# score_upload.py
+# Uploads milestone score sheets (CSV, or Excel when openpyxl is installed) to
+# POST /smilestones/scores/bulk. The sheet is sent in chunks of CHUNK_ROWS rows, so a
+# whole gurukul's scores take a handful of requests, and the per-chunk summaries are
+# added up into one report of updated / unchanged / unknown rows.
+#
+# Sheet columns: mid, score and either sid or email (extra columns are ignored).
+import pandas as pd
+import requests
+import streamlit as st
+
+from api_logging import get_logger
+from api_session import session
+
+try:
+    import openpyxl  # noqa: F401  (pandas.read_excel needs it for .xlsx)
+    EXCEL_AVAILABLE = True
+except ImportError:
+    EXCEL_AVAILABLE = False
+
+# --- Configuration ---
+API_BASE_URL = "http://localhost:5002"
+CHUNK_ROWS = 1000
+logger = get_logger(__name__)
+
+
+# --- Sheet Parsing ---
+
+def read_sheet(uploaded_file):
+    """Reads an uploaded CSV/XLSX into a DataFrame with lower-case column names."""
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        frame = pd.read_excel(uploaded_file)
+    else:
+        frame = pd.read_csv(uploaded_file)
+    frame.columns = [str(c).strip().lower() for c in frame.columns]
+    return frame
+
+
+def sheet_to_rows(frame):
+    """Converts the sheet to API rows. Returns (rows, problems); problems lists unusable lines."""
+    missing = [c for c in ("mid", "score") if c not in frame.columns]
+    if missing or not ({"sid", "email"} & set(frame.columns)):
+        need = missing + ([] if {"sid", "email"} & set(frame.columns) else ["sid or email"])
+        return [], [f"Missing column(s): {', '.join(need)}"]
+
+    mids = pd.to_numeric(frame["mid"], errors="coerce")
+    scores = pd.to_numeric(frame["score"], errors="coerce")
+    sids = pd.to_numeric(frame["sid"], errors="coerce") if "sid" in frame.columns else pd.Series(float("nan"), index=frame.index)
+    emails = frame["email"].astype("string").str.strip() if "email" in frame.columns else pd.Series(pd.NA, index=frame.index, dtype="string")
+
+    rows, problems = [], []
+    for position, (sid, email, mid, score) in enumerate(zip(sids, emails, mids, scores)):
+        line = position + 2  # header is line 1
+        if pd.isna(mid) or pd.isna(score) or score < 0 or score != int(score) or (pd.isna(sid) and pd.isna(email)):
+            problems.append(f"Line {line}: needs mid, a non-negative whole-number score and sid or email")
+            continue
+        row = {"line": line, "mid": int(mid), "score": int(score)}
+        if not pd.isna(sid):
+            row["sid"] = int(sid)
+        else:
+            row["email"] = str(email)
+        rows.append(row)
+    return rows, problems
+
+
+# --- API Interaction Functions ---
+
+def upload_scores(rows, progress=None):
+    """Sends rows in CHUNK_ROWS chunks and returns the combined summary, or None if a chunk failed."""
+    total = {"received": 0, "updated": 0, "unchanged": 0, "duplicates": 0, "unknown": []}
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = rows[start:start + CHUNK_ROWS]
+        try:
+            response = session.post(f"{API_BASE_URL}/smilestones/scores/bulk", json={"rows": chunk})
+            response.raise_for_status()
+            summary = response.json()
+        except requests.exceptions.RequestException as e:
+            st.error(f"Error uploading rows {chunk[0]['line']}-{chunk[-1]['line']}: {e}")
+            logger.warning("Score upload failed at line %s: %s", chunk[0]["line"], e)
+            return None
+        for key in ("received", "updated", "unchanged", "duplicates"):
+            total[key] += summary[key]
+        total["unknown"].extend(summary["unknown"])
+        if progress is not None:
+            done = min(start + CHUNK_ROWS, len(rows))
+            progress.progress(done / len(rows), text=f"Uploaded {done} of {len(rows)} rows")
+    logger.info("Score upload: %s", {k: v for k, v in total.items() if k != "unknown"})
+    return total
+
+
+# --- Streamlit UI for Score Upload ---
+
+def score_upload_page():
+    st.title("Upload Milestone Scores")
+    st.write("Upload a score sheet with the columns **mid**, **score** and **sid** or **email**. "
+             "Only students already assigned to the milestone are updated.")
+
+    file_types = ["csv", "xlsx"] if EXCEL_AVAILABLE else ["csv"]
+    if not EXCEL_AVAILABLE:
+        st.caption("Excel upload needs the optional `openpyxl` package; save the sheet as CSV instead.")
+    uploaded_file = st.file_uploader("Score sheet", type=file_types, key="score_sheet")
+    if uploaded_file is None:
+        return
+
+    try:
+        frame = read_sheet(uploaded_file)
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"Could not read the sheet: {e}")
+        return
+
+    rows, problems = sheet_to_rows(frame)
+    st.write(f"{len(frame)} rows read, {len(rows)} ready to upload.")
+    st.dataframe(frame.head(20), use_container_width=True)
+    if problems:
+        with st.expander(f"{len(problems)} row(s) will be skipped", expanded=not rows):
+            st.write("\n".join(f"- {p}" for p in problems[:200]))
+    if not rows:
+        return
+
+    if st.button("Upload Scores", key="score_upload_button"):
+        progress = st.progress(0.0, text="Uploading...")
+        summary = upload_scores(rows, progress)
+        if summary is None:
+            return
+        st.success(f"{summary['updated']} scores updated, {summary['unchanged']} unchanged, "
+                   f"{summary['duplicates']} duplicate rows ignored, {len(summary['unknown'])} unknown.")
+        if summary["unknown"]:
+            st.warning("These rows did not match a student assigned to the milestone:")
+            st.dataframe(pd.DataFrame(summary["unknown"]), use_container_width=True, hide_index=True)
@@ -3,30 +3,34 @@ import streamlit as st
 import requests
 import pandas as pd
 import re
+from api_logging import get_logger
+from api_session import session
+from grid_data import iter_rows
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Your Node.js API URL
+logger = get_logger(__name__)
 
 # --- API Interaction Functions ---
 
 def get_all_subjects_api():
     """Fetches all subjects from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/subjects")
+        response = session.get(f"{API_BASE_URL}/subjects")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching subjects: {e}")
+        logger.warning("Error fetching subjects: %s", e)
         return []
 
-def get_all_topics_api():
-    """Fetches all topics from the backend API."""
+def get_topics_for_subject_api(subid):
+    """Streams the topic list (NDJSON) and keeps only the topics of one subject."""
     try:
-        response = requests.get(f"{API_BASE_URL}/topics")
-        response.raise_for_status()
-        return response.json()
+        return [topic for topic in iter_rows(API_BASE_URL, "/topics") if topic.get('subid') == subid]
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching topics: {e}")
+        logger.warning("Error fetching topics: %s", e)
         return []
 
 # --- Streamlit UI ---
@@ -37,7 +41,6 @@ def show_topics_by_subject_page():
     st.write("Select a subject to view all topics associated with it.")
 
     all_subjects = get_all_subjects_api()
-    all_topics = get_all_topics_api()
 
     # Create a map for subject ID to name lookup
     subject_id_to_name_map = {s['subid']: s['subname'] for s in all_subjects}
@@ -78,9 +81,7 @@ def show_topics_by_subject_page():
         st.subheader(f"Topics for: {subject_id_to_name_map.get(selected_subject_id, 'N/A')}")
         
         # Filter topics based on the selected subject ID
-        filtered_topics = [
-            topic for topic in all_topics if topic.get('subid') == selected_subject_id
-        ]
+        filtered_topics = get_topics_for_subject_api(selected_subject_id)
 
         if filtered_topics:
             # Prepare data for DataFrame, including subject name
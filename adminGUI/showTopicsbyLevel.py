@@ -3,30 +3,35 @@ import streamlit as st
 import requests
 import pandas as pd
 import re # Import the regular expression module
+from api_logging import get_logger
+from api_session import session
+from grid_data import iter_rows
+from level_lookup import get_level_lookup
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Your Node.js API URL
+logger = get_logger(__name__)
 
 # --- API Interaction Functions ---
 
 def get_all_subjects_api():
     """Fetches all subjects from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/subjects")
+        response = session.get(f"{API_BASE_URL}/subjects")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching subjects: {e}")
+        logger.warning("Error fetching subjects: %s", e)
         return []
 
-def get_all_topics_api():
-    """Fetches all topics from the backend API."""
+def get_topics_for_subject_api(subid):
+    """Streams the topic list (NDJSON) and keeps only the topics of one subject."""
     try:
-        response = requests.get(f"{API_BASE_URL}/topics")
-        response.raise_for_status()
-        return response.json()
+        return [topic for topic in iter_rows(API_BASE_URL, "/topics") if topic.get('subid') == subid]
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching topics: {e}")
+        logger.warning("Error fetching topics: %s", e)
         return []
 
 # --- Streamlit UI ---
@@ -37,7 +42,6 @@ def show_topics_by_level_page():
     st.write("First, select a Level, then a Subject within that Level to view its associated topics.")
 
     all_subjects = get_all_subjects_api()
-    all_topics = get_all_topics_api()
 
     # Create a map for subject ID to name lookup
     subject_id_to_name_map = {s['subid']: s['subname'] for s in all_subjects}
@@ -47,13 +51,15 @@ def show_topics_by_level_page():
         return
 
     # --- Select Level ---
-    # Get unique levels, excluding None, and sort them
-    unique_levels = sorted(list(set([s.get('level') for s in all_subjects if s.get('level') is not None])))
+    # Get unique levels, excluding None, in level order (L2 before L10)
+    levels = get_level_lookup(API_BASE_URL)
+    unique_levels = levels.sorted({s.get('level') for s in all_subjects if s.get('level') is not None})
     level_options = ["--- Select a Level ---"] + unique_levels
 
     selected_level = st.selectbox(
         "Select Level",
         options=level_options,
+        format_func=lambda lvl: f"{lvl} ({levels.gtype_of(lvl)})" if levels.gtype_of(lvl) else lvl,
         key="select_level_for_topics_view_by_level_page" # Changed key for uniqueness
     )
 
@@ -105,9 +111,7 @@ def show_topics_by_level_page():
         st.subheader(f"Topics for: {subject_id_to_name_map.get(selected_subject_id, 'N/A')}")
         
         # Filter topics based on the selected subject ID
-        filtered_topics = [
-            topic for topic in all_topics if topic.get('subid') == selected_subject_id
-        ]
+        filtered_topics = get_topics_for_subject_api(selected_subject_id)
 
         if filtered_topics:
             display_topics_data = []
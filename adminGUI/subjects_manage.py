@@ -2,27 +2,22 @@
 import streamlit as st
 import requests
 import pandas as pd
+from api_logging import get_logger, LazyBody
+from api_session import session
+from change_feed import CACHE_TTL, invalidated_by
+from job_progress import render_job_progress, submit_job
+from level_lookup import get_level_lookup
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Your Node.js API URL
-
-# --- Level Mapping (MUST be consistent with API) ---
-# This is used as a reference for all possible levels, but actual available levels
-# are fetched from the milestones API.
-LEVEL_MAPPING = {
-    "G1": ["L1", "L2", "L3", "L4"],
-    "G2": ["L5", "L6", "L7", "L8"],
-    "G3": ["L9", "L10", "L11", "L12"],
-    "G4": ["L13", "L14", "L15", "L16"],
-}
-ALL_POSSIBLE_LEVELS = sorted(list(set(level for levels in LEVEL_MAPPING.values() for level in levels)))
+logger = get_logger(__name__)
 
 # --- API Interaction Functions for Subjects ---
 
 def get_all_subjects():
     """Fetches all subjects from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/subjects")
+        response = session.get(f"{API_BASE_URL}/subjects")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -35,7 +30,7 @@ def create_subject(subname, level, image_url):
         payload = {"subname": subname, "level": level}
         if image_url: # Only add image_url if it's not empty
             payload["image_url"] = image_url
-        response = requests.post(f"{API_BASE_URL}/subjects", json=payload)
+        response = session.post(f"{API_BASE_URL}/subjects", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -53,7 +48,7 @@ def update_subject(subid, subname=None, level=None, image_url=None):
         payload["image_url"] = image_url
     
     try:
-        response = requests.put(f"{API_BASE_URL}/subjects/{subid}", json=payload)
+        response = session.put(f"{API_BASE_URL}/subjects/{subid}", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -61,59 +56,25 @@ def update_subject(subid, subname=None, level=None, image_url=None):
         return None
 
 def delete_subject(subid):
-    """Deletes a subject."""
-    try:
-        response = requests.delete(f"{API_BASE_URL}/subjects/{subid}")
-        response.raise_for_status()
-        return response.status_code == 200
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error deleting subject: {e}")
-        return False
+    """Queues deletion of a subject and its topics; progress shows under 'Delete Subject'."""
+    job = submit_job(API_BASE_URL, "delete_subject", {"subid": subid}, f"Delete subject ID {subid}", scope="subjects")
+    return job is not None
 
 # --- API Interaction Function for Milestones (to get distinct levels) ---
 
+@invalidated_by("public.milestones")
+@st.cache_data(ttl=CACHE_TTL)
 def get_distinct_milestone_levels():
-    """Fetches all distinct levels present in the milestones table from the backend API."""
+    """Fetches the distinct levels present in the milestones table (cached until milestones change)."""
     try:
-        response = requests.get(f"{API_BASE_URL}/milestones/distinct-levels")
-        response.raise_for_status() # This will raise an exception for 4xx/5xx responses
-
+        response = session.get(f"{API_BASE_URL}/milestones/distinct-levels")
+        response.raise_for_status()
         levels_data = response.json()
-        
-        # --- Debugging Information for API Response ---
-        print(f"DEBUG: Raw API response JSON for distinct levels: {levels_data}")
-        print(f"DEBUG: Type of levels_data: {type(levels_data)}")
-        # --- End Debugging Information ---
-
-        if not isinstance(levels_data, list):
-            st.error(f"API response for distinct levels was not a list. Type: {type(levels_data)}, Content: {levels_data}")
-            return []
-
-        # List to hold the extracted levels
-        extracted_levels = []
-        for i, item in enumerate(levels_data):
-            # --- Debugging Information for List Items ---
-            print(f"DEBUG: Processing item {i}: {item}, Type: {type(item)}")
-            # --- End Debugging Information ---
-            if isinstance(item, str): # Corrected: Expect string directly
-                extracted_levels.append(item)
-            else:
-                st.error(f"API response item {i} for distinct levels was not a string as expected. Item: {item}")
-                # For robustness, we will continue and just skip this malformed item.
-                
-        if not extracted_levels:
-            st.warning("No valid 'level' data (as strings) found in the distinct milestones API response. Check your database or API endpoint.")
-            
-        return sorted(extracted_levels)
-
+        logger.debug("Raw API response JSON for distinct levels: %s", LazyBody(levels_data))
+        return [level for level in levels_data if isinstance(level, str)]
     except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching distinct milestone levels (RequestException): {e}")
-        return []
-    except ValueError: # Catch JSON decoding errors if response.json() fails
-        st.error(f"API response for distinct levels was not valid JSON. Response text: {response.text}")
-        return []
-    except Exception as e:
-        st.error(f"An unexpected error occurred while fetching distinct milestone levels: {e}")
+        st.error(f"Error fetching distinct milestone levels: {e}")
+        logger.warning("Error fetching distinct milestone levels: %s", e)
         return []
 
 # --- Streamlit UI for Subject Management ---
@@ -128,13 +89,13 @@ def subjects_manage_page():
     # Fetch distinct levels that actually exist in the milestones table
     existing_milestone_levels = get_distinct_milestone_levels()
 
-    # Filter ALL_POSSIBLE_LEVELS to only include those present in existing_milestone_levels
-    available_levels_for_subjects = sorted([
-        lvl for lvl in ALL_POSSIBLE_LEVELS if lvl in existing_milestone_levels
-    ])
+    # Only levels of the mapping (GET /levels) that are present in existing_milestone_levels, in level order
+    available_levels_for_subjects = [
+        lvl for lvl in get_level_lookup(API_BASE_URL).levels if lvl in existing_milestone_levels
+    ]
 
     if not available_levels_for_subjects:
-        st.warning("No levels (L1-L16) found in the Milestones table. Cannot create/update subjects until milestones are added with defined levels.")
+        st.warning("No levels found in the Milestones table. Cannot create/update subjects until milestones are added with defined levels.")
 
     # --- Create New Subject Section ---
     st.subheader("Create New Subject")
@@ -245,10 +206,10 @@ def subjects_manage_page():
                                 update_payload['image_url'] = updated_image_url
                             
                             # --- Debugging Information (Update Section) ---
-                            st.info(f"DEBUG (Update): Selected Subject ID: {selected_subject_id}")
-                            st.info(f"DEBUG (Update): Initial Data: Name='{initial_subname}', Level='{initial_level}', Image='{initial_image_url}'")
-                            st.info(f"DEBUG (Update): Updated Data: Name='{updated_subname}', Level='{updated_level}', Image='{updated_image_url}'")
-                            st.info(f"DEBUG (Update): Payload to send: {update_payload}")
+                            logger.debug("Update: Selected Subject ID: %s", selected_subject_id)
+                            logger.debug("Update: Initial Data: Name='%s', Level='%s', Image='%s'", initial_subname, initial_level, initial_image_url)
+                            logger.debug("Update: Updated Data: Name='%s', Level='%s', Image='%s'", updated_subname, updated_level, updated_image_url)
+                            logger.debug("Update: Payload to send: %s", update_payload)
                             # --- End Debugging Information ---
 
                             if not update_payload:
@@ -291,13 +252,10 @@ def subjects_manage_page():
         
         if 'confirm_delete_subject_id' in st.session_state and st.session_state.confirm_delete_subject_id == selected_subject_id_delete:
             if st.button("Confirm Deletion", key="confirm_delete_subject_final_button"):
-                with st.spinner(f"Deleting subject ID {selected_subject_id_delete}..."):
-                    success = delete_subject(selected_subject_id_delete)
-                    if success:
-                        st.success(f"Subject ID {selected_subject_id_delete} and associated topics deleted successfully!")
-                        del st.session_state.confirm_delete_subject_id
-                        st.rerun()
-                    else:
-                        st.error("Failed to delete subject. Please check API logs.")
+                if delete_subject(selected_subject_id_delete):
+                    del st.session_state.confirm_delete_subject_id
+                    st.rerun()
     else:
         st.info("No subjects available to delete.")
+
+    render_job_progress(API_BASE_URL, scope="subjects")
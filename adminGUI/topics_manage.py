@@ -3,21 +3,26 @@ import streamlit as st
 import requests
 import pandas as pd
 import re # Import regex for parsing IDs from display strings
+from api_logging import get_logger
+from grid_data import table_to_frame
+from delta_store import get_collection
+from api_session import session
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Your Node.js API URL
+logger = get_logger(__name__)
 
 # --- API Interaction Functions for Topics ---
 
-def get_all_topics():
-    """Fetches all topics from the backend API."""
+def get_all_topics_collection():
+    """Returns the shared topics collection, synced with the API's latest changes."""
+    collection = get_collection("topics", API_BASE_URL)
     try:
-        response = requests.get(f"{API_BASE_URL}/topics")
-        response.raise_for_status()
-        return response.json()
+        collection.sync()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching topics: {e}")
-        return []
+        logger.warning("Error fetching topics: %s", e)
+    return collection
 
 def create_topic(tname, subid, image_url):
     """Creates a new topic."""
@@ -25,7 +30,7 @@ def create_topic(tname, subid, image_url):
         payload = {"tname": tname, "subid": subid}
         if image_url:
             payload["image_url"] = image_url
-        response = requests.post(f"{API_BASE_URL}/topics", json=payload)
+        response = session.post(f"{API_BASE_URL}/topics", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -43,7 +48,7 @@ def update_topic(tid, tname=None, subid=None, image_url=None):
         payload["image_url"] = image_url
     
     try:
-        response = requests.put(f"{API_BASE_URL}/topics/{tid}", json=payload)
+        response = session.put(f"{API_BASE_URL}/topics/{tid}", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -53,7 +58,7 @@ def update_topic(tid, tname=None, subid=None, image_url=None):
 def delete_topic(tid):
     """Deletes a topic."""
     try:
-        response = requests.delete(f"{API_BASE_URL}/topics/{tid}")
+        response = session.delete(f"{API_BASE_URL}/topics/{tid}")
         response.raise_for_status()
         return response.status_code == 200
     except requests.exceptions.RequestException as e:
@@ -66,7 +71,7 @@ def get_all_subjects_for_dropdown():
     """Fetches all subjects (subid, subname, level) for use in dropdowns.
        Assumes the /subjects endpoint returns 'level' field."""
     try:
-        response = requests.get(f"{API_BASE_URL}/subjects")
+        response = session.get(f"{API_BASE_URL}/subjects")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -81,7 +86,8 @@ def topics_manage_page():
     st.write("Here you can create, view, update, and delete Topics.")
 
     # Fetch all necessary data
-    all_topics = get_all_topics()
+    topics_collection = get_all_topics_collection()
+    all_topics = topics_collection.rows() # Shared row dicts for the create/update/delete sections (read-only)
     all_subjects = get_all_subjects_for_dropdown()
 
     # Create maps for easy lookup
@@ -152,29 +158,17 @@ def topics_manage_page():
     # --- List Existing Topics Section ---
     st.subheader("Existing Topics")
     if all_topics:
-        # Enhance with Subject names for better display
-        displayed_topics = []
-        for t in all_topics:
-            # [START Change 1 - Use full subject object for display]
-            subject_obj = subject_id_to_full_obj_map.get(t['subid'], {})
-            subject_name = subject_obj.get('subname', "N/A Subject")
-            subject_level = subject_obj.get('level', 'N/A')
-            subject_display_str = f"{subject_name} (Level: {subject_level}, ID: {t['subid']})"
-            # [END Change 1 - Use full subject object for display]
-
-            displayed_topics.append({
-                "tid": t['tid'],
-                "tname": t['tname'],
-                "subid": t['subid'],
-                "subject_info": subject_display_str, # Changed key to reflect full info
-                "image_url": t.get('image_url', '') # Use .get for robustness
-            })
-        
-        # [START Change 1 - Adjust DataFrame columns]
-        df_topics = pd.DataFrame(displayed_topics)
-        df_topics = df_topics[['tid', 'tname', 'subject_info', 'image_url']] # Adjusted columns
-        df_topics.rename(columns={'subject_info': 'Parent Subject'}, inplace=True) # Rename column for better display
-        # [END Change 1 - Adjust DataFrame columns]
+        # Enhance with Subject names for better display: one label per subject, mapped over the subid column
+        subject_info_by_id = {
+            sid: f"{s.get('subname', 'N/A Subject')} (Level: {s.get('level', 'N/A')}, ID: {sid})"
+            for sid, s in subject_id_to_full_obj_map.items()
+        }
+        df_topics = table_to_frame(topics_collection.table(), ['tid', 'tname', 'subid', 'image_url'])
+        parent_subject = df_topics['subid'].map(subject_info_by_id)
+        missing = parent_subject.isna()
+        parent_subject[missing] = "N/A Subject (Level: N/A, ID: " + df_topics.loc[missing, 'subid'].astype(str) + ")"
+        df_topics.insert(2, 'Parent Subject', parent_subject.astype('category'))
+        df_topics = df_topics[['tid', 'tname', 'Parent Subject', 'image_url']]
         st.dataframe(df_topics, use_container_width=True)
     else:
         st.info("No topics found yet.")
@@ -306,10 +300,10 @@ def topics_manage_page():
                                 update_payload['image_url'] = updated_image_url
                             
                             # --- Debugging Information (Update Section) ---
-                            st.info(f"DEBUG (Update): Selected Topic ID: {selected_topic_id}")
-                            st.info(f"DEBUG (Update): Initial Data: Name='{initial_tname}', Subject ID='{initial_subid}', Image='{initial_image_url}'")
-                            st.info(f"DEBUG (Update): Updated Data: Name='{updated_tname}', New Subject ID='{new_subid_for_update}', Image='{updated_image_url}'")
-                            st.info(f"DEBUG (Update): Payload to send: {update_payload}")
+                            logger.debug("Update: Selected Topic ID: %s", selected_topic_id)
+                            logger.debug("Update: Initial Data: Name='%s', Subject ID='%s', Image='%s'", initial_tname, initial_subid, initial_image_url)
+                            logger.debug("Update: Updated Data: Name='%s', New Subject ID='%s', Image='%s'", updated_tname, new_subid_for_update, updated_image_url)
+                            logger.debug("Update: Payload to send: %s", update_payload)
                             # --- End Debugging Information ---
 
                             if not update_payload:
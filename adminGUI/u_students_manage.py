@@ -3,9 +3,14 @@ import streamlit as st
 import requests
 import pandas as pd
 import re # Import the regular expression module
+from api_logging import get_logger, LazyBody
+from api_session import session
+from grid_data import iter_rows
+from export_download import render_export_buttons
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Your Node.js API URL
+logger = get_logger(__name__)
 
 # --- API Interaction Functions for Students (via Users API) ---
 
@@ -15,23 +20,22 @@ def get_all_students_from_users():
     Assumes backend's /users?role=student returns full user objects including 'userid', 'username', 'email', 'user_role_link', and assigned_gurukuls/milestones.
     """
     try:
-        response = requests.get(f"{API_BASE_URL}/users?role=student")
-        response.raise_for_status()
-        return response.json()
+        return list(iter_rows(API_BASE_URL, "/users", {"role": "student"}))  # parsed as it streams in
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching students: {e}")
-        print(f"ERROR: get_all_students_from_users failed: {e}") # Console log
+        logger.error("get_all_students_from_users failed: %s", e)
         if e.response is not None:
-            print(f"API Response Status Code: {e.response.status_code}")
-            print(f"API Response Text: {e.response.text}")
+            logger.error("API Response Status Code: %s", e.response.status_code)
+            logger.error("API Response Text: %s", LazyBody(e.response.text))
         return []
 
-def update_user_student_assignments(userid, gurukul_id=None, milestone_id=None):
+def update_user_student_assignments(userid, gurukul_id=None, milestone_id=None, slog_mode="reconcile"):
     """
     Sends an update request to the /users/:id endpoint with the new gurukul_id or milestone_id.
     The backend's userService will handle the assignment logic (deleting existing and inserting new).
+    slog_mode 'reconcile' keeps the student's journeys that still apply at the new level; 'reset' restarts them all.
     """
-    payload = {}
+    payload = {"slog_mode": slog_mode}
     # Ensure None is passed explicitly for unassignment, but only include if relevant
     if gurukul_id is not None:
         payload["gurukul_id"] = gurukul_id
@@ -43,27 +47,22 @@ def update_user_student_assignments(userid, gurukul_id=None, milestone_id=None):
     elif milestone_id is None: # If explicit unassign requested for milestone
         payload["milestone_id"] = None
     
-    if not payload:
+    if "gurukul_id" not in payload and "milestone_id" not in payload:
         st.warning("No Gurukul or Milestone provided for update.")
         return None
 
-    # --- Debugging API Request Payload (Console and UI Expander) ---
-    print(f"DEBUG (update_user_student_assignments): Sending payload for user {userid}: {payload}") # Console log
-    with st.expander("API Request Debug Info"):
-        st.write(f"Sending payload for user {userid}:")
-        st.json(payload)
-    # --- End Debugging API Request Payload ---
+    logger.debug("update_user_student_assignments: Sending payload for user %s: %s", userid, payload)
 
     try:
-        response = requests.put(f"{API_BASE_URL}/users/{userid}", json=payload)
+        response = session.put(f"{API_BASE_URL}/users/{userid}", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error updating student assignments via /users API: {e}")
-        print(f"ERROR: update_user_student_assignments failed: {e}") # Console log
+        logger.error("update_user_student_assignments failed: %s", e)
         if e.response is not None:
-            print(f"API Response Status Code: {e.response.status_code}")
-            print(f"API Response Text: {e.response.text}")
+            logger.error("API Response Status Code: %s", e.response.status_code)
+            logger.error("API Response Text: %s", LazyBody(e.response.text))
         return None
 
 # --- API Interaction Functions for Gurukuls, Offerings, Milestones (for dropdowns) ---
@@ -71,34 +70,34 @@ def update_user_student_assignments(userid, gurukul_id=None, milestone_id=None):
 def get_all_gurukuls_api():
     """Fetches all gurukuls from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/gurukul")
+        response = session.get(f"{API_BASE_URL}/gurukul")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching gurukuls: {e}")
-        print(f"ERROR: get_all_gurukuls_api failed: {e}") # Console log
+        logger.error("get_all_gurukuls_api failed: %s", e)
         return []
 
 def get_all_gurukul_offerings_api():
     """Fetches all gurukul offerings from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/gurukul-offerings")
+        response = session.get(f"{API_BASE_URL}/gurukul-offerings")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching gurukul offerings: {e}")
-        print(f"ERROR: get_all_gurukul_offerings_api failed: {e}") # Console log
+        logger.error("get_all_gurukul_offerings_api failed: %s", e)
         return []
 
 def get_all_milestones_api():
     """Fetches all milestones from the backend API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/milestones")
+        response = session.get(f"{API_BASE_URL}/milestones")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching milestones: {e}")
-        print(f"ERROR: get_all_milestones_api failed: {e}") # Console log
+        logger.error("get_all_milestones_api failed: %s", e)
         return []
 
 # --- Streamlit UI for Student Assignment Management ---
@@ -124,6 +123,9 @@ def u_students_manage_page():
         st.markdown("---")
         return
 
+    # All students with their current assignments, as one file
+    render_export_buttons(API_BASE_URL, "students")
+
     # --- Select Student ---
     student_options = [f"{s['username']} (ID: {s['userid']})" for s in all_students]
     selected_student_display = st.selectbox(
@@ -196,7 +198,7 @@ def u_students_manage_page():
                 key="assign_gurukul_combined_select"
             )
             
-            print(f"CONSOLE DEBUG: Selected Gurukul Display (from selectbox): '{selected_gurukul_display}'") # Console log
+            logger.debug("Selected Gurukul Display (from selectbox): '%s'", selected_gurukul_display)
 
             # Initialize these to None. Their values will be set conditionally below.
             selected_offering_display = None
@@ -221,7 +223,7 @@ def u_students_manage_page():
                         options=offering_options_for_milestone,
                         key="assign_offering_combined_select"
                     )
-                    print(f"CONSOLE DEBUG: Selected Offering Display (from selectbox): '{selected_offering_display}'") # Console log
+                    logger.debug("Selected Offering Display (from selectbox): '%s'", selected_offering_display)
 
                     # Filter Milestones by Selected Offering
                     if selected_offering_display is not None:
@@ -242,8 +244,14 @@ def u_students_manage_page():
                         options=milestone_options_with_none,
                         key="assign_milestone_combined_select"
                     )
-                    print(f"CONSOLE DEBUG: Selected Milestone Display: '{selected_milestone_display}'") # Console log
+                    logger.debug("Selected Milestone Display: '%s'", selected_milestone_display)
             
+            restart_journeys = st.checkbox(
+                "Restart all journeys for the new milestone's level",
+                key="assign_milestone_reset_slog",
+                help="By default, journeys that still apply at the new level keep their progress and completed journeys stay in the history."
+            )
+
             # --- Button Click Logic ---
             if st.button("Assign Gurukul & Milestone", key="assign_gurukul_milestone_button"):
                 final_gurukul_id_to_send = None
@@ -276,13 +284,8 @@ def u_students_manage_page():
                     else:
                         final_milestone_id_to_send = None # User explicitly selected None for milestone
 
-                # --- Debugging values before API call ---
-                print(f"CONSOLE DEBUG (Assign Button Click): Final Gurukul ID to send: {final_gurukul_id_to_send}") # Console log
-                print(f"CONSOLE DEBUG (Assign Button Click): Final Milestone ID to send: {final_milestone_id_to_send}") # Console log
-                with st.expander("Final Assignment Values (Before API Call)"):
-                    st.write(f"Gurukul ID: {final_gurukul_id_to_send}")
-                    st.write(f"Milestone ID: {final_milestone_id_to_send}")
-                # --- End Debugging ---
+                logger.debug("Assign Button Click: Final Gurukul ID to send: %s, Final Milestone ID to send: %s",
+                             final_gurukul_id_to_send, final_milestone_id_to_send)
 
                 # Handle assignment/unassignment logic
                 if final_gurukul_id_to_send is None and final_milestone_id_to_send is None:
@@ -292,7 +295,8 @@ def u_students_manage_page():
                         result = update_user_student_assignments(
                             selected_student_user_id,
                             gurukul_id=final_gurukul_id_to_send,
-                            milestone_id=final_milestone_id_to_send
+                            milestone_id=final_milestone_id_to_send,
+                            slog_mode="reset" if restart_journeys else "reconcile"
                         )
                         if result:
                             st.success(f"Gurukul and Milestone assignments updated successfully for {selected_student_obj['username']}!")
@@ -2,9 +2,14 @@
 import streamlit as st
 import requests
 import pandas as pd
+from api_logging import get_logger
+from api_session import session
+from grid_data import iter_rows
+from export_download import render_export_buttons
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Your Node.js API URL
+logger = get_logger(__name__)
 
 # --- API Interaction Functions (Adapted for User API based assignment) ---
 
@@ -14,11 +19,10 @@ def get_all_teachers_from_users():
     Assumes backend's /users?role=teacher returns full user objects including 'userid', 'username', 'email', 'user_role_link', and 'assigned_subjects'.
     """
     try:
-        response = requests.get(f"{API_BASE_URL}/users?role=teacher")
-        response.raise_for_status()
-        return response.json()
+        return list(iter_rows(API_BASE_URL, "/users", {"role": "teacher"}))  # parsed as it streams in
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching teachers: {e}")
+        logger.warning("Error fetching teachers: %s", e)
         return []
 
 def update_user_with_assignments(userid, updated_subject_ids):
@@ -30,11 +34,12 @@ def update_user_with_assignments(userid, updated_subject_ids):
         "subject_ids": updated_subject_ids
     }
     try:
-        response = requests.put(f"{API_BASE_URL}/users/{userid}", json=payload)
+        response = session.put(f"{API_BASE_URL}/users/{userid}", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error updating teacher assignments via /users API: {e}")
+        logger.warning("Error updating teacher assignments via /users API: %s", e)
         if e.response is not None:
             st.error(f"API Response Status Code: {e.response.status_code}")
             st.error(f"API Response Text: {e.response.text}")
@@ -45,11 +50,12 @@ def update_user_with_assignments(userid, updated_subject_ids):
 def get_all_subjects_for_dropdown():
     """Fetches all subjects (subid, subname, level) for use in dropdowns."""
     try:
-        response = requests.get(f"{API_BASE_URL}/subjects")
+        response = session.get(f"{API_BASE_URL}/subjects")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching subjects for dropdown: {e}")
+        logger.warning("Error fetching subjects for dropdown: %s", e)
         return []
 
 # --- Streamlit UI for Teacher Assignment Management ---
@@ -109,6 +115,7 @@ def u_teachers_manage_page():
             })
         df_teachers = pd.DataFrame(display_teacher_data)
         st.dataframe(df_teachers, use_container_width=True)
+        render_export_buttons(API_BASE_URL, "teachers")
     else:
         st.info("No teachers found yet.")
     
@@ -2,21 +2,27 @@
 import streamlit as st
 import requests
 import pandas as pd
+from api_logging import get_logger, LazyBody
+from grid_data import fetch_table, table_to_frame
+from delta_store import get_collection
+from api_session import session
+from export_download import render_export_buttons
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:5002" # Your Node.js API URL
+logger = get_logger(__name__)
 
 # --- API Interaction Functions for Users ---
 
-def get_all_users_general():
-    """Fetches all users from the backend API (public.users table)."""
+def get_all_users_collection():
+    """Returns the shared users collection (public.users table), synced with the API's latest changes."""
+    collection = get_collection("users", API_BASE_URL)
     try:
-        response = requests.get(f"{API_BASE_URL}/users")
-        response.raise_for_status()
-        return response.json()
+        collection.sync()
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching all users: {e}")
-        return []
+        logger.warning("Error fetching all users: %s", e)
+    return collection
 
 def create_user_general(username, email, password, role):
     """Creates a new general user entry (and related role entry in backend)."""
@@ -28,11 +34,11 @@ def create_user_general(username, email, password, role):
     }
     
     # --- Debugging API Request ---
-    st.info(f"DEBUG (Create User): Sending payload: {payload}")
+    logger.debug("Create User: Sending payload: %s", LazyBody(payload))
     # --- End Debugging API Request ---
 
     try:
-        response = requests.post(f"{API_BASE_URL}/users", json=payload)
+        response = session.post(f"{API_BASE_URL}/users", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -59,11 +65,11 @@ def update_user_general(userid, username=None, email=None, password=None, role=N
         payload["isdeleted"] = isdeleted
     
     # --- Debugging API Request ---
-    st.info(f"DEBUG (Update User): Sending payload: {payload}")
+    logger.debug("Update User: Sending payload: %s", LazyBody(payload))
     # --- End Debugging API Request ---
 
     try:
-        response = requests.put(f"{API_BASE_URL}/users/{userid}", json=payload)
+        response = session.put(f"{API_BASE_URL}/users/{userid}", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -75,28 +81,43 @@ def update_user_general(userid, username=None, email=None, password=None, role=N
         # --- End Debugging API Response on Error ---
         return None
 
-def delete_user_general(userid):
-    """Soft deletes a user from public.users."""
+def bulk_user_action(action, userids):
+    """POSTs /users/bulk-delete or /users/bulk-restore for many users at once. Returns the summary, or None on error."""
     try:
-        # Note: Your API's deleteUser marks isdeleted=true.
-        response = requests.delete(f"{API_BASE_URL}/users/{userid}")
+        response = session.post(f"{API_BASE_URL}/users/bulk-{action}", json={"userids": [int(u) for u in userids]})
         response.raise_for_status()
-        return response.status_code == 200
+        return response.json()
     except requests.exceptions.RequestException as e:
-        st.error(f"Error soft-deleting user: {e}")
-        if e.response is not None:
-            st.error(f"API Response Status Code: {e.response.status_code}")
-            st.error(f"API Response Text: {e.response.text}")
-        return False
+        st.error(f"Error in bulk {action} of users: {e}")
+        logger.warning("Bulk %s of %d users failed: %s", action, len(userids), e)
+        return None
+
+def get_deleted_users():
+    """Fetches the soft-deleted users (GET /users?deleted=true) as a DataFrame, for restoring."""
+    try:
+        return table_to_frame(fetch_table(API_BASE_URL, "/users", {"deleted": "true"}),
+                              ['userid', 'username', 'email', 'role', 'created_at', 'user_role_link'])
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching deleted users: {e}")
+        logger.warning("Error fetching deleted users: %s", e)
+        return pd.DataFrame()
+
+def _selected_userids(event, frame):
+    """userid values of the rows picked in a multi-row st.dataframe."""
+    return frame.iloc[event.selection.rows]['userid'].tolist() if event.selection.rows else []
 
 # --- Streamlit UI for General User Management ---
 
 def users_manage_page():
     """Renders the UI for managing General Users (from public.users table)."""
     st.header("Manage All Users")
-    st.write("Here you can create, view, update, and soft-delete general user accounts.")
+    st.write("Here you can create, view, update, soft-delete and restore general user accounts.")
+
+    if "users_bulk_message" in st.session_state:
+        st.success(st.session_state.pop("users_bulk_message"))
 
-    all_users = get_all_users_general()
+    users_collection = get_all_users_collection()
+    all_users = users_collection.rows() # Shared row dicts for the update/delete selectors (read-only)
 
     # --- Create New User Section ---
     st.subheader("Create New User Account")
@@ -125,10 +146,29 @@ def users_manage_page():
     # --- List Existing Users Section ---
     st.subheader("Existing User Accounts")
     if all_users:
-        df_users = pd.DataFrame(all_users)
-        # Display relevant columns
+        # Display relevant columns ('role' arrives as a Categorical); tick rows to soft-delete them together
         display_cols = ['userid', 'username', 'email', 'role', 'isdeleted', 'created_at', 'user_role_link']
-        st.dataframe(df_users[display_cols], use_container_width=True)
+        users_frame = table_to_frame(users_collection.table(), display_cols)
+        users_event = st.dataframe(users_frame, use_container_width=True, hide_index=True,
+                                   on_select="rerun", selection_mode="multi-row", key="users_grid")
+        render_export_buttons(API_BASE_URL, "users")
+
+        selected_ids = _selected_userids(users_event, users_frame)
+        if selected_ids:
+            confirmed = st.checkbox(f"Soft-delete the {len(selected_ids)} selected user account(s) and their teacher/student records",
+                                    key="users_bulk_delete_confirm")
+            if st.button("Soft-Delete Selected", key="users_bulk_delete_button", disabled=not confirmed):
+                with st.spinner(f"Soft-deleting {len(selected_ids)} user accounts..."):
+                    result = bulk_user_action("delete", selected_ids)
+                if result is not None:
+                    logger.info("Bulk soft-deleted %d users (%d not found)", len(result['deleted']), len(result['not_found']))
+                    st.session_state.users_bulk_message = (f"Soft-deleted {len(result['deleted'])} user account(s)"
+                                                           + (f"; {len(result['not_found'])} were already deleted." if result['not_found'] else "."))
+                    for key in ("users_grid", "users_bulk_delete_confirm"):
+                        st.session_state.pop(key, None)
+                    st.rerun()
+        else:
+            st.caption("Select rows in the table to soft-delete several accounts at once.")
     else:
         st.info("No user accounts found yet.")
 
@@ -184,10 +224,10 @@ def users_manage_page():
                                 update_payload['isdeleted'] = updated_isdeleted
                             
                             # --- Debugging Information (Update Section) ---
-                            st.info(f"DEBUG (Update): Selected User ID: {selected_user_id}")
-                            st.info(f"DEBUG (Update): Initial Data: Name='{initial_username}', Email='{initial_email}', Role='{initial_role}', Deleted='{initial_isdeleted}'")
-                            st.info(f"DEBUG (Update): Updated Data: Name='{updated_username}', Email='{updated_email}', Role='{updated_role}', Deleted='{updated_isdeleted}', Password provided: {'Yes' if updated_password else 'No'}")
-                            st.info(f"DEBUG (Update): Payload to send: {update_payload}")
+                            logger.debug("Update: Selected User ID: %s", selected_user_id)
+                            logger.debug("Update: Initial Data: Name='%s', Email='%s', Role='%s', Deleted='%s'", initial_username, initial_email, initial_role, initial_isdeleted)
+                            logger.debug("Update: Updated Data: Name='%s', Email='%s', Role='%s', Deleted='%s', Password provided: %s", updated_username, updated_email, updated_role, updated_isdeleted, 'Yes' if updated_password else 'No')
+                            logger.debug("Update: Payload to send: %s", LazyBody(update_payload))
                             # --- End Debugging Information ---
 
                             if not update_payload:
@@ -210,39 +250,21 @@ def users_manage_page():
 
     st.markdown("---") # Separator
 
-    # --- Delete User Section (Soft Delete) ---
-    st.subheader("Soft-Delete User Account")
-    if all_users:
-        # Only show active users for soft-deletion (isdeleted=false)
-        active_users_for_delete = [u for u in all_users if not u.get('isdeleted', False)]
-        if active_users_for_delete:
-            user_options_delete = {f"ID: {u['userid']} ({u['username']} - {u['role']})": u['userid'] for u in sorted(active_users_for_delete, key=lambda x: x['userid'])}
-            selected_user_display_delete = st.selectbox(
-                "Select User Account to Soft-Delete",
-                options=list(user_options_delete.keys()),
-                key="delete_user_general_select"
-            )
-            selected_user_id_delete = user_options_delete.get(selected_user_display_delete)
-
-            if st.button("Soft-Delete User Account", key="delete_user_general_button"):
-                if selected_user_id_delete is not None:
-                    st.session_state.confirm_delete_user_general_id = selected_user_id_delete
-                    st.warning(f"Are you sure you want to soft-delete User Account ID: {selected_user_id_delete}? This will mark the user as deleted and may affect associated teacher/student records.")
-                else:
-                    st.warning("Please select a user account to soft-delete.")
-            
-            if 'confirm_delete_user_general_id' in st.session_state and st.session_state.confirm_delete_user_general_id == selected_user_id_delete:
-                if st.button("Confirm Soft-Deletion", key="confirm_delete_user_general_final_button"):
-                    with st.spinner(f"Soft-deleting user account ID {selected_user_id_delete}..."):
-                        success = delete_user_general(selected_user_id_delete)
-                        if success:
-                            st.success(f"User account ID {selected_user_id_delete} soft-deleted successfully!")
-                            del st.session_state.confirm_delete_user_general_id
-                            st.rerun()
-                        else:
-                            st.error("Failed to soft-delete user account. Please check API logs.")
-        else:
-            st.info("No active user accounts available for soft-deletion.")
-    else:
-        st.info("No user accounts found yet to delete.")
-
+    # --- Restore Soft-Deleted Users Section ---
+    st.subheader("Restore Soft-Deleted User Accounts")
+    deleted_frame = get_deleted_users()
+    if deleted_frame.empty:
+        st.info("No soft-deleted user accounts.")
+        return
+    st.caption("Restored accounts get the default password and come back without their gurukul, milestone or subject assignments.")
+    deleted_event = st.dataframe(deleted_frame, use_container_width=True, hide_index=True,
+                                 on_select="rerun", selection_mode="multi-row", key="deleted_users_grid")
+    restore_ids = _selected_userids(deleted_event, deleted_frame)
+    if st.button(f"Restore {len(restore_ids)} Selected", key="users_bulk_restore_button", disabled=not restore_ids):
+        with st.spinner(f"Restoring {len(restore_ids)} user accounts..."):
+            result = bulk_user_action("restore", restore_ids)
+        if result is not None:
+            logger.info("Bulk restored %d users (%d not found)", len(result['restored']), len(result['not_found']))
+            st.session_state.users_bulk_message = f"Restored {len(result['restored'])} user account(s)."
+            st.session_state.pop("deleted_users_grid", None)
+            st.rerun()
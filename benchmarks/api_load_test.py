@@ -0,0 +1,229 @@
+# api_load_test.py
+# Replays admin-style traffic against GurukulAdminAPI (or the stand-in API) with a
+# fixed number of concurrent workers, then reports throughput and latency
+# percentiles per route.
+#
+#   psql -d gurukul_loadtest -f benchmarks/seed_loadtest_db.sql     # seed once
+#   python benchmarks/api_load_test.py --mix mixed --concurrency 16 --duration 60
+#   python benchmarks/api_load_test.py --mix browse --output benchmarks/results/load.json
+#
+# benchmarks/pool_size_bench.py reuses run_load() to compare connection pool sizes.
+import argparse
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+import requests
+
+API_BASE_URL = "http://localhost:5002"
+
+# --- Traffic Mixes ---
+# operation name -> relative weight
+MIXES = {
+    # Admins paging through the list screens.
+    "browse": {
+        "list_gurukuls": 10, "list_offerings": 10, "list_milestones": 10, "list_subjects": 10,
+        "list_topics": 10, "list_users": 8, "list_students": 8, "list_teachers": 8,
+        "milestones_by_gurukul": 8, "distinct_levels": 6, "get_user": 12,
+    },
+    # Assignment sessions: pick a student/teacher, update, re-read.
+    "assign": {
+        "list_students": 10, "list_teachers": 10, "get_user": 20,
+        "assign_student": 35, "assign_teacher": 25,
+    },
+    # Only the list endpoints (what pool_size_bench.py measures by default).
+    "lists": {
+        "list_gurukuls": 1, "list_offerings": 1, "list_milestones": 1, "list_subjects": 1,
+        "list_topics": 1, "list_users": 1, "list_students": 1, "list_teachers": 1,
+    },
+    # What a normal working day looks like.
+    "mixed": {
+        "list_gurukuls": 8, "list_offerings": 6, "list_milestones": 6, "list_subjects": 6, "list_topics": 6,
+        "list_users": 6, "list_students": 6, "list_teachers": 6, "milestones_by_gurukul": 6,
+        "distinct_levels": 4, "get_user": 14, "assign_student": 14, "assign_teacher": 8, "create_user": 4,
+    },
+}
+
+
+class Fixtures:
+    """IDs discovered from the API up front so generated requests are valid."""
+
+    def __init__(self, base_url):
+        def get(path):
+            response = requests.get(f"{base_url}{path}", timeout=300)
+            response.raise_for_status()
+            return response.json()
+
+        self.gurukuls = [g["gid"] for g in get("/gurukul")]
+        offerings = {o["oid"]: o["gid"] for o in get("/gurukul-offerings")}
+        # (gid, mid) pairs that are consistent with each other
+        self.gurukul_milestones = [(offerings[m["oid"]], m["mid"]) for m in get("/milestones") if m["oid"] in offerings]
+        self.subjects = [s["subid"] for s in get("/subjects")]
+        users = get("/users")
+        self.students = [u["userid"] for u in users if u["role"] == "student"]
+        self.teachers = [u["userid"] for u in users if u["role"] == "teacher"]
+        self.users = self.students + self.teachers
+        if not (self.gurukuls and self.gurukul_milestones and self.subjects and self.students and self.teachers):
+            raise SystemExit("Target API has too little data; seed it with benchmarks/seed_loadtest_db.sql first.")
+
+
+def build_operation(name, fx, rng):
+    """Returns (route label, method, path, json body) for one operation."""
+    if name == "list_gurukuls":
+        return "GET /gurukul", "GET", "/gurukul", None
+    if name == "list_offerings":
+        return "GET /gurukul-offerings", "GET", "/gurukul-offerings", None
+    if name == "list_milestones":
+        return "GET /milestones", "GET", "/milestones", None
+    if name == "list_subjects":
+        return "GET /subjects", "GET", "/subjects", None
+    if name == "list_topics":
+        return "GET /topics", "GET", "/topics", None
+    if name == "list_users":
+        return "GET /users", "GET", "/users", None
+    if name == "list_students":
+        return "GET /users?role=student", "GET", "/users?role=student", None
+    if name == "list_teachers":
+        return "GET /users?role=teacher", "GET", "/users?role=teacher", None
+    if name == "milestones_by_gurukul":
+        return "GET /milestones/by-gurukul/:gid", "GET", f"/milestones/by-gurukul/{rng.choice(fx.gurukuls)}", None
+    if name == "distinct_levels":
+        return "GET /milestones/distinct-levels", "GET", "/milestones/distinct-levels", None
+    if name == "get_user":
+        return "GET /users/:id", "GET", f"/users/{rng.choice(fx.users)}", None
+    if name == "assign_student":
+        gid, mid = rng.choice(fx.gurukul_milestones)
+        body = {"gurukul_id": gid, "milestone_id": mid}
+        return "PUT /users/:id (student)", "PUT", f"/users/{rng.choice(fx.students)}", body
+    if name == "assign_teacher":
+        body = {"subject_ids": rng.sample(fx.subjects, min(3, len(fx.subjects)))}
+        return "PUT /users/:id (teacher)", "PUT", f"/users/{rng.choice(fx.teachers)}", body
+    if name == "create_user":
+        tag = uuid.uuid4().hex[:12]
+        body = {"username": f"Load {tag}", "email": f"load-{tag}@example.com", "role": rng.choice(["student", "teacher"])}
+        return "POST /users", "POST", "/users", body
+    raise ValueError(f"Unknown operation '{name}'")
+
+
+class Recorder:
+    """Thread-safe per-route latency / error collection."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.bytes = {}
+
+    def add(self, label, seconds, ok, nbytes):
+        with self.lock:
+            self.samples.setdefault(label, []).append(seconds)
+            self.bytes[label] = self.bytes.get(label, 0) + nbytes
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def worker(base_url, fx, mix, deadline, remaining, recorder, seed, timeout):
+    rng = random.Random(seed)
+    names, weights = zip(*mix.items())
+    session = requests.Session()
+    while time.monotonic() < deadline:
+        if remaining is not None and next(remaining) <= 0:
+            return
+        label, method, path, body = build_operation(rng.choices(names, weights)[0], fx, rng)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, f"{base_url}{path}", json=body, timeout=timeout)
+            ok, nbytes = response.status_code < 400, len(response.content)
+        except requests.exceptions.RequestException:
+            ok, nbytes = False, 0
+        recorder.add(label, time.perf_counter() - started, ok, nbytes)
+
+
+def summarize(recorder, elapsed):
+    rows = []
+    for label in sorted(recorder.samples):
+        values = sorted(recorder.samples[label])
+        rows.append({
+            "route": label,
+            "requests": len(values),
+            "errors": recorder.errors.get(label, 0),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "bytes": recorder.bytes.get(label, 0),
+            **{f"p{p}_ms": round(percentile(values, p) * 1000, 2) for p in (50, 90, 95, 99)},
+            "max_ms": round(values[-1] * 1000, 2),
+        })
+    total = sum(r["requests"] for r in rows)
+    return {"elapsed_s": round(elapsed, 2), "total_requests": total,
+            "total_errors": sum(r["errors"] for r in rows), "throughput_rps": round(total / elapsed, 2), "routes": rows}
+
+
+def run_load(base_url, fx, mix, concurrency, duration, requests_total=None, seed=1, timeout=60.0):
+    """Runs `concurrency` workers for up to `duration` seconds (or requests_total requests) and returns the report."""
+    recorder = Recorder()
+    counter = itertools.count(requests_total, -1) if requests_total else None
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=worker, args=(base_url, fx, MIXES[mix], deadline, counter, recorder, seed + i, timeout),
+                         daemon=True)
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    report = summarize(recorder, time.perf_counter() - started)
+    report.update({"mix": mix, "concurrency": concurrency, "base_url": base_url})
+    return report
+
+
+def print_report(report):
+    print(f"{'route':<36}{'reqs':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    for r in report["routes"]:
+        print(f"{r['route']:<36}{r['requests']:>7}{r['errors']:>6}{r['throughput_rps']:>9.1f}{r['p50_ms']:>9.1f}"
+              f"{r['p90_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}")
+    print(f"\n{report['total_requests']} requests, {report['total_errors']} errors in {report['elapsed_s']}s "
+          f"-> {report['throughput_rps']} req/s overall")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test GurukulAdminAPI with realistic admin traffic.")
+    parser.add_argument("--base-url", default=os.environ.get("API_BASE_URL", API_BASE_URL))
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client workers.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run (upper bound).")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests in total.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    fx = Fixtures(args.base_url)
+    print(f"Fixtures: {len(fx.gurukuls)} gurukuls, {len(fx.gurukul_milestones)} milestones, {len(fx.subjects)} subjects, "
+          f"{len(fx.students)} students, {len(fx.teachers)} teachers")
+    print(f"Running mix '{args.mix}' with {args.concurrency} workers against {args.base_url}\n")
+
+    report = run_load(args.base_url, fx, args.mix, args.concurrency, args.duration, args.requests, args.seed, args.timeout)
+
+    print_report(report)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# compression_bench.py
+# Measures what response compression saves on the big list endpoints. The stand-in
+# API is put behind a TCP proxy that limits bandwidth and adds round-trip delay, and
+# each endpoint is fetched with Accept-Encoding identity, gzip and br; the report lists
+# bytes on the wire and the median time to download and parse the JSON.
+#
+#   python benchmarks/compression_bench.py                              # large, 20 Mbit/s, 40 ms RTT
+#   python benchmarks/compression_bench.py --mbps 100 --rtt-ms 5 --repeat 10
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from page_render_bench import RESULTS_DIR, git_revision
+from standin_api import StandInServer, brotli
+from synthetic_data import SCALES, Scale, generate_dataset
+
+ENDPOINTS = ["/users?role=student", "/users?role=teacher", "/topics", "/milestones"]
+ENCODINGS = ["identity", "gzip", "br"]
+CHUNK = 16 * 1024
+
+
+# --- Throttling proxy ---
+
+class ThrottledProxy:
+    """Forwards TCP connections to target, adding rtt/2 per direction and capping downstream bandwidth."""
+
+    def __init__(self, target, mbps, rtt_ms):
+        self.target = target
+        self.bytes_per_s = mbps * 1e6 / 8 if mbps > 0 else None
+        self.half_rtt = rtt_ms / 2000.0
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self._closed = False
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._listener.getsockname()[1]}"
+
+    def start(self):
+        threading.Thread(target=self._accept, name="throttled-proxy", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._closed = True
+        self._listener.close()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(self.target)
+            for sock in (client, upstream):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._pipe, args=(client, upstream, False), daemon=True).start()
+            threading.Thread(target=self._pipe, args=(upstream, client, True), daemon=True).start()
+
+    def _pipe(self, source, sink, throttle):
+        # A read after an idle gap starts a new message, which pays the one-way delay;
+        # downstream bytes are then paced at the configured bandwidth.
+        last = 0.0
+        try:
+            while True:
+                data = source.recv(CHUNK)
+                if not data:
+                    break
+                now = time.perf_counter()
+                if now - last > self.half_rtt:
+                    time.sleep(self.half_rtt)
+                if throttle and self.bytes_per_s:
+                    time.sleep(len(data) / self.bytes_per_s)
+                sink.sendall(data)
+                last = time.perf_counter()
+        except OSError:
+            pass
+        finally:
+            for sock in (source, sink):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+# --- Benchmark ---
+
+def fetch(session, url, encoding):
+    """Downloads and parses one response; returns (seconds, wire bytes, json bytes, Content-Encoding)."""
+    started = time.perf_counter()
+    response = session.get(url, headers={"Accept-Encoding": encoding}, timeout=300)
+    response.raise_for_status()
+    payload = response.json()
+    seconds = time.perf_counter() - started
+    wire = int(response.headers.get("Content-Length") or len(response.content))
+    return seconds, wire, len(json.dumps(payload)), response.headers.get("Content-Encoding", "identity")
+
+
+def run_benchmark(scale_name, endpoints, encodings, repeat, mbps, rtt_ms, threshold):
+    dataset = generate_dataset(Scale.preset(scale_name))
+    server = StandInServer(dataset, port=0, compress_threshold=threshold).start()
+    proxy = ThrottledProxy(server.server_address[:2], mbps, rtt_ms).start()
+    results = []
+    try:
+        for endpoint in endpoints:
+            for encoding in encodings:
+                with requests.Session() as session:
+                    fetch(session, proxy.base_url + endpoint, encoding)  # warm the connection and response cache
+                    runs = [fetch(session, proxy.base_url + endpoint, encoding) for _ in range(repeat)]
+                seconds = [r[0] for r in runs]
+                _, wire, raw, served = runs[-1]
+                results.append({
+                    "endpoint": endpoint,
+                    "encoding": encoding,
+                    "served_encoding": served,
+                    "wire_bytes": wire,
+                    "json_bytes": raw,
+                    "median_s": round(statistics.median(seconds), 4),
+                    "seconds_all": [round(s, 4) for s in seconds],
+                })
+                print(f"{endpoint:<22} {encoding:>8} -> {served:<8} {wire / 1e6:>8.3f} MB on the wire "
+                      f"({wire / raw:>6.1%})  median {statistics.median(seconds):>7.3f}s")
+    finally:
+        proxy.stop()
+        server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare identity/gzip/br transfer of list endpoints over a throttled link.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="large")
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS)
+    parser.add_argument("--encodings", nargs="+", choices=ENCODINGS, default=ENCODINGS)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed fetches per endpoint and encoding.")
+    parser.add_argument("--mbps", type=float, default=20.0, help="Downstream bandwidth in Mbit/s (0 = unlimited).")
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="Round-trip time added by the proxy.")
+    parser.add_argument("--threshold", type=int, default=1024, help="Stand-in compression threshold in bytes.")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/compression-<git rev>.json).")
+    args = parser.parse_args()
+
+    encodings = args.encodings
+    if "br" in encodings and brotli is None:
+        print("brotli is not installed; skipping 'br'")
+        encodings = [e for e in encodings if e != "br"]
+
+    revision = git_revision()
+    output = os.path.abspath(args.output or os.path.join(RESULTS_DIR, f"compression-{revision}.json"))
+    results = run_benchmark(args.scale, args.endpoints, encodings, args.repeat, args.mbps, args.rtt_ms, args.threshold)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "git_revision": revision,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "scale": args.scale,
+                "mbps": args.mbps,
+                "rtt_ms": args.rtt_ms,
+                "threshold": args.threshold,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# page_render_bench.py
+# Renders each adminGUI page through streamlit.testing.v1.AppTest against the
+# in-memory stand-in API at several dataset sizes, and records wall time, HTTP
+# calls, bytes transferred and peak Python memory per page.
+#
+#   python benchmarks/page_render_bench.py                         # small + medium
+#   python benchmarks/page_render_bench.py --scales small large --pages users_manage_page
+#   python benchmarks/page_render_bench.py --compare benchmarks/results/page_render-<old>.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+from standin_api import StandInServer
+from synthetic_data import SCALES, Scale, generate_dataset
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_DIR = os.path.join(REPO_ROOT, "adminGUI")
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+# page function name -> module that defines it (mirrors main.py's imports)
+PAGES = {
+    "admin_dashboard_page": "dashboard",
+    "gurukul_manage_page": "gurukul_manage",
+    "gurukul_wizard_page": "gurukul_wizard",
+    "offerings_manage_page": "offerings_manage",
+    "milestones_manage_page": "milestones_manage",
+    "subjects_manage_page": "subjects_manage",
+    "topics_manage_page": "topics_manage",
+    "users_manage_page": "users_manage",
+    "u_teachers_manage_page": "u_teachers_manage",
+    "u_students_manage_page": "u_students_manage",
+    "show_topics_by_subject_page": "showTopicbySubject",
+    "show_topics_by_level_page": "showTopicsbyLevel",
+    "show_teacher_crud_direct": "DirectTeacher_manage",
+    "show_student_crud_direct": "DirectStudent_manage",
+}
+
+# AppTest executes this as the app script. Pages keep their module-level
+# API_BASE_URL, so it is pointed at the stand-in before rendering.
+SCRIPT_TEMPLATE = """
+import sys
+sys.path.insert(0, {gui_dir!r})
+import {module} as page_module
+page_module.API_BASE_URL = {base_url!r}
+page_module.{page}()
+"""
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def render_once(server, module, page, timeout):
+    """Runs one page render and returns its measurements."""
+    script = SCRIPT_TEMPLATE.format(gui_dir=GUI_DIR, module=module, base_url=server.base_url, page=page)
+    app = AppTest.from_string(script, default_timeout=timeout)
+    streamlit.cache_data.clear()
+    server.reset_stats()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    app.run()
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = server.stats()
+    return {
+        "wall_s": round(wall, 4),
+        "http_requests": stats["requests"],
+        "bytes_transferred": stats["bytes_sent"],
+        "peak_memory_bytes": peak,
+        "routes": stats["routes"],
+        "exceptions": [str(e.value) for e in app.exception],
+        "errors": [e.value for e in app.error],
+    }
+
+
+def run_benchmark(scales, pages, repeat, latency_ms, timeout):
+    os.chdir(GUI_DIR)  # pages load flower.png relative to the GUI directory
+    results = []
+    warmed_up = False
+    for scale_name in scales:
+        dataset = generate_dataset(Scale.preset(scale_name))
+        server = StandInServer(dataset, port=0, latency_ms=latency_ms).start()
+        try:
+            if not warmed_up:
+                # The first AppTest run in a process pays for Streamlit/pandas imports; keep it out of the numbers.
+                render_once(server, PAGES[pages[0]], pages[0], timeout)
+                warmed_up = True
+            for page in pages:
+                runs = [render_once(server, PAGES[page], page, timeout) for _ in range(repeat)]
+                best = min(runs, key=lambda r: r["wall_s"])
+                results.append(dict(best, page=page, scale=scale_name, counts=dataset.counts(),
+                                    wall_s_all=[r["wall_s"] for r in runs]))
+                print(f"{scale_name:>7} {page:<30} {best['wall_s']:>8.3f}s {best['http_requests']:>4} req "
+                      f"{best['bytes_transferred'] / 1e6:>8.2f} MB {best['peak_memory_bytes'] / 1e6:>8.1f} MB peak"
+                      + ("  [exception]" if best["exceptions"] else ""))
+        finally:
+            server.stop()
+    return results
+
+
+def compare(current, baseline_path):
+    """Prints the wall-time / bytes / memory delta against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = {(r["scale"], r["page"]): r for r in json.load(f)["results"]}
+    print(f"\nComparison against {baseline_path}:")
+    for r in current:
+        old = baseline.get((r["scale"], r["page"]))
+        if not old:
+            continue
+        def pct(key):
+            return (r[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        print(f"{r['scale']:>7} {r['page']:<30} wall {pct('wall_s'):+7.1f}%  "
+              f"bytes {pct('bytes_transferred'):+7.1f}%  peak mem {pct('peak_memory_bytes'):+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark adminGUI page renders against the stand-in API.")
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=["small", "medium"])
+    parser.add_argument("--pages", nargs="+", choices=sorted(PAGES), default=list(PAGES))
+    parser.add_argument("--repeat", type=int, default=3, help="Renders per page; the fastest is reported.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency injected by the stand-in API.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="AppTest timeout per render, in seconds.")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/page_render-<git rev>.json).")
+    parser.add_argument("--compare", help="Earlier results file to diff against.")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    output = os.path.abspath(args.output or os.path.join(RESULTS_DIR, f"page_render-{revision}.json"))
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    results = run_benchmark(args.scales, args.pages, args.repeat, args.latency_ms, args.timeout)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "git_revision": revision,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "streamlit": streamlit.__version__,
+                "latency_ms": args.latency_ms,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# pool_size_bench.py
+# Finds a good DB_POOL_MAX for GurukulAdminAPI: starts the API once per pool size, runs the
+# list-only load of api_load_test.py against it, and reports throughput and latency per size.
+# While the load runs, GET /metrics is sampled to record how many queries waited for a
+# connection (pool.waiting); a size is big enough once that stays near 0.
+#
+#   (cd GurukulAdminAPI && npm run build)
+#   python benchmarks/pool_size_bench.py --pool-sizes 2 5 10 20 --concurrency 32 --duration 30
+#   python benchmarks/pool_size_bench.py --output benchmarks/results/pool_sizes.json
+#
+# The API is started with `--api-command` in GurukulAdminAPI/ and gets DB_POOL_MAX and PORT
+# in its environment; "{port}" in the command is replaced as well, e.g. to try the harness
+# against the stand-in: --api-command "python ../benchmarks/standin_api.py --port {port}"
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+
+import requests
+
+from api_load_test import Fixtures, run_load
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "GurukulAdminAPI")
+
+
+def wait_until_up(base_url, process, timeout):
+    """Polls GET / until the API answers; raises if it exits or does not come up in time."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API exited with code {process.returncode} during startup")
+        try:
+            requests.get(f"{base_url}/", timeout=2)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.25)
+    raise RuntimeError(f"API did not answer on {base_url} within {timeout}s")
+
+
+class PoolSampler(threading.Thread):
+    """Samples GET /metrics every `interval` seconds and keeps the largest pool.waiting seen."""
+
+    def __init__(self, base_url, interval=0.5):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.interval = interval
+        self.max_waiting = None  # stays None if the API has no /metrics
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            try:
+                response = requests.get(f"{self.base_url}/metrics", timeout=2)
+                response.raise_for_status()
+                waiting = response.json()["pool"]["waiting"]
+            except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
+                continue
+            self.max_waiting = max(self.max_waiting or 0, waiting)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def bench_pool_size(args, pool_size):
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = {**os.environ, "DB_POOL_MAX": str(pool_size), "PORT": str(args.port)}
+    command = shlex.split(args.api_command.format(port=args.port))
+    log = open(os.path.join(args.log_dir, f"api_pool_{pool_size}.log"), "w") if args.log_dir else subprocess.DEVNULL
+    process = subprocess.Popen(command, cwd=args.api_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_until_up(base_url, process, args.startup_timeout)
+        fx = Fixtures(base_url)
+        sampler = PoolSampler(base_url)
+        sampler.start()
+        try:
+            report = run_load(base_url, fx, args.mix, args.concurrency, args.duration, seed=args.seed,
+                              timeout=args.timeout)
+        finally:
+            sampler.stop()
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        if log is not subprocess.DEVNULL:
+            log.close()
+
+    # Latency over all routes of the mix, weighted by request count
+    routes = report["routes"]
+    total = report["total_requests"] or 1
+    return {
+        "pool_size": pool_size,
+        "throughput_rps": report["throughput_rps"],
+        "total_requests": report["total_requests"],
+        "total_errors": report["total_errors"],
+        "p50_ms": round(sum(r["p50_ms"] * r["requests"] for r in routes) / total, 2),
+        "p95_ms": round(sum(r["p95_ms"] * r["requests"] for r in routes) / total, 2),
+        "max_pool_waiting": sampler.max_waiting,
+        "report": report,
+    }
+
+
+def print_table(results):
+    print(f"{'pool':>6}{'reqs':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'waiting':>9}  (ms)")
+    for r in results:
+        waiting = "-" if r["max_pool_waiting"] is None else r["max_pool_waiting"]
+        print(f"{r['pool_size']:>6}{r['total_requests']:>8}{r['total_errors']:>6}{r['throughput_rps']:>9.1f}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{waiting:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare GurukulAdminAPI throughput across pg pool sizes.")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[2, 5, 10, 20], help="DB_POOL_MAX values to try.")
+    parser.add_argument("--api-command", default="node dist/index.js", help="Command that starts the API.")
+    parser.add_argument("--api-dir", default=API_DIR, help="Working directory of the API command.")
+    parser.add_argument("--port", type=int, default=5102, help="Port the API is started on.")
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--mix", default="lists", help="api_load_test.py traffic mix.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client workers.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load per pool size.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-dir", help="Keep the API's output per pool size in this directory.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    results = []
+    for pool_size in args.pool_sizes:
+        print(f"DB_POOL_MAX={pool_size}: mix '{args.mix}', {args.concurrency} workers, {args.duration}s")
+        results.append(bench_pool_size(args, pool_size))
+    print()
+    print_table(results)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
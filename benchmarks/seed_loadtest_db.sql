@@ -0,0 +1,296 @@
+-- seed_loadtest_db.sql
+-- Populates a LOCAL, DISPOSABLE Postgres database with synthetic GurukulAdminAPI data
+-- for load testing. It TRUNCATEs every table it touches, so never point it at real data.
+--
+--   createdb gurukul_loadtest
+--   psql -d gurukul_loadtest -v gurukuls=50 -v users=10000 -v topics=50000 -f benchmarks/seed_loadtest_db.sql
+--
+-- Every scale variable is optional; defaults are shown below. Then start the API with
+-- DB_NAME=gurukul_loadtest and drive it with benchmarks/api_load_test.py.
+
+\set ON_ERROR_STOP on
+
+\if :{?gurukuls}
+\else
+  \set gurukuls 50
+\endif
+\if :{?subjects}
+\else
+  \set subjects 400
+\endif
+\if :{?topics}
+\else
+  \set topics 50000
+\endif
+\if :{?lessons_per_topic}
+\else
+  \set lessons_per_topic 2
+\endif
+\if :{?users}
+\else
+  \set users 10000
+\endif
+\if :{?teacher_pct}
+\else
+  \set teacher_pct 20
+\endif
+\if :{?subjects_per_teacher}
+\else
+  \set subjects_per_teacher 3
+\endif
+\if :{?slog_per_student}
+\else
+  \set slog_per_student 20
+\endif
+
+-- Ensure schemas exist
+CREATE SCHEMA IF NOT EXISTS teachmate;
+CREATE SCHEMA IF NOT EXISTS studentmate;
+
+-- --- Tables (created only if missing; mirrors the columns the API queries) ---
+CREATE TABLE IF NOT EXISTS public.gurukul (
+    gid SERIAL PRIMARY KEY,
+    gname VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS public.gurukul_offerings (
+    oid SERIAL PRIMARY KEY,
+    gid INTEGER NOT NULL REFERENCES public.gurukul(gid) ON DELETE CASCADE,
+    gtype VARCHAR(10) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS public.milestones (
+    mid SERIAL PRIMARY KEY,
+    class INTEGER,
+    level VARCHAR(10) NOT NULL,
+    oid INTEGER NOT NULL REFERENCES public.gurukul_offerings(oid) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS teachmate.subjects (
+    subid SERIAL PRIMARY KEY,
+    subname VARCHAR(255) NOT NULL,
+    level VARCHAR(10),
+    image_url TEXT,
+    isdeleted BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS teachmate.topics (
+    tid SERIAL PRIMARY KEY,
+    tname VARCHAR(255) NOT NULL,
+    subid INTEGER NOT NULL REFERENCES teachmate.subjects(subid) ON DELETE CASCADE,
+    image_url TEXT
+);
+
+CREATE TABLE IF NOT EXISTS teachmate.lessons (
+    lid SERIAL PRIMARY KEY,
+    lname VARCHAR(255) NOT NULL,
+    tid INTEGER NOT NULL REFERENCES teachmate.topics(tid) ON DELETE CASCADE,
+    status INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS teachmate.journey (
+    jid SERIAL PRIMARY KEY,
+    lesson_id INTEGER NOT NULL REFERENCES teachmate.lessons(lid) ON DELETE CASCADE,
+    subject_id INTEGER NOT NULL REFERENCES teachmate.subjects(subid) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS public.users (
+    userid SERIAL PRIMARY KEY,
+    username VARCHAR(255) NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    role VARCHAR(50) NOT NULL,
+    isdeleted BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    user_role_link INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS teachmate.teachers (
+    teachid SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP WITHOUT TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS teachmate.teacher_assignments (
+    assign_id SERIAL PRIMARY KEY,
+    teacher_id INTEGER NOT NULL REFERENCES teachmate.teachers(teachid) ON DELETE CASCADE,
+    sub_id INTEGER NOT NULL REFERENCES teachmate.subjects(subid) ON DELETE CASCADE,
+    assigned_on TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+    isapprover BOOLEAN DEFAULT false,
+    UNIQUE (teacher_id, sub_id)
+);
+
+CREATE TABLE IF NOT EXISTS studentmate.students (
+    sid SERIAL PRIMARY KEY,
+    sname VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS studentmate.sgurukul (
+    s_gid_id SERIAL PRIMARY KEY,
+    sid INTEGER NOT NULL REFERENCES studentmate.students(sid) ON DELETE CASCADE,
+    gid INTEGER NOT NULL,
+    starttime TIMESTAMP WITHOUT TIME ZONE,
+    endtime TIMESTAMP WITHOUT TIME ZONE,
+    status VARCHAR(255),
+    CONSTRAINT sgurukul_status_check CHECK (((status)::text = ANY (ARRAY[('Started'::character varying)::text, ('In_progress'::character varying)::text, ('Done'::character varying)::text]))),
+    UNIQUE (sid, gid)
+);
+
+CREATE TABLE IF NOT EXISTS studentmate.smilestones (
+    s_mid_id SERIAL PRIMARY KEY,
+    sid INTEGER NOT NULL REFERENCES studentmate.students(sid) ON DELETE CASCADE,
+    mid INTEGER NOT NULL,
+    starttime TIMESTAMP WITHOUT TIME ZONE,
+    endtime TIMESTAMP WITHOUT TIME ZONE,
+    status VARCHAR(255),
+    score INTEGER DEFAULT 0,
+    CONSTRAINT smilestones_status_check CHECK (((status)::text = ANY (ARRAY[('Started'::character varying)::text, ('In_progress'::character varying)::text, ('Done'::character varying)::text]))),
+    UNIQUE (sid, mid)
+);
+
+CREATE TABLE IF NOT EXISTS studentmate.slog (
+    sid INTEGER NOT NULL,
+    jid INTEGER NOT NULL,
+    starttime TIMESTAMP WITHOUT TIME ZONE,
+    status VARCHAR(255)
+);
+
+-- --- Reset ---
+TRUNCATE
+    studentmate.slog, studentmate.smilestones, studentmate.sgurukul, studentmate.students,
+    teachmate.teacher_assignments, teachmate.teachers, public.users,
+    teachmate.journey, teachmate.lessons, teachmate.topics, teachmate.subjects,
+    public.milestones, public.gurukul_offerings, public.gurukul
+RESTART IDENTITY CASCADE;
+
+BEGIN;
+
+-- Level mapping used by the API (G1 -> L1..L4, G2 -> L5..L8, ...).
+CREATE TEMP TABLE seed_levels ON COMMIT DROP AS
+SELECT 'G' || ((n - 1) / 4 + 1) AS gtype, 'L' || n AS level, n AS level_no
+FROM generate_series(1, 16) AS n;
+
+-- Gurukuls, each offering every gtype except ~30% that skip one.
+INSERT INTO public.gurukul (gname)
+SELECT format('Gurukul %s', lpad(g::text, 3, '0')) FROM generate_series(1, :gurukuls) AS g;
+
+INSERT INTO public.gurukul_offerings (gid, gtype)
+SELECT g.gid, t.gtype
+FROM public.gurukul g
+CROSS JOIN (VALUES ('G1'), ('G2'), ('G3'), ('G4')) AS t(gtype)
+WHERE NOT (g.gid % 10 < 3 AND t.gtype = 'G' || (g.gid % 4 + 1))
+ORDER BY g.gid, t.gtype;
+
+-- Milestones: one per level for ~85% of (offering, level) pairs.
+INSERT INTO public.milestones (class, level, oid)
+SELECT l.level_no, l.level, o.oid
+FROM public.gurukul_offerings o
+JOIN seed_levels l ON l.gtype = o.gtype
+WHERE hashtext(o.oid::text || l.level) % 100 NOT BETWEEN -7 AND 7
+ORDER BY o.oid, l.level_no;
+
+-- Subjects spread round-robin across levels; topics, lessons and journeys hang off them.
+INSERT INTO teachmate.subjects (subname, level, image_url)
+SELECT format('Subject %s', lpad(s::text, 4, '0')), 'L' || ((s - 1) % 16 + 1),
+       format('https://example.com/subjects/%s.png', s)
+FROM generate_series(1, :subjects) AS s;
+
+INSERT INTO teachmate.topics (tname, subid, image_url)
+SELECT format('Topic %s', lpad(t::text, 5, '0')), (t - 1) % :subjects + 1,
+       format('https://example.com/topics/%s.png', t)
+FROM generate_series(1, :topics) AS t;
+
+INSERT INTO teachmate.lessons (lname, tid, status)
+SELECT format('Lesson %s.%s', t.tid, n), t.tid, CASE WHEN n = 1 THEN 2 ELSE 1 END
+FROM teachmate.topics t
+CROSS JOIN generate_series(1, :lessons_per_topic) AS n;
+
+INSERT INTO teachmate.journey (lesson_id, subject_id)
+SELECT l.lid, t.subid
+FROM teachmate.lessons l
+JOIN teachmate.topics t ON t.tid = l.tid
+WHERE l.status = 2;
+
+-- Users: teacher_pct percent are teachers, the rest students.
+-- Role rows are inserted in userid order so user_role_link can be derived with row_number().
+CREATE TEMP TABLE seed_users ON COMMIT DROP AS
+SELECT u AS n,
+       CASE WHEN u % 100 < :teacher_pct THEN 'teacher' ELSE 'student' END AS role,
+       format('user%s@example.com', u) AS email,
+       now() - (u % 365) * interval '1 day' AS created_at
+FROM generate_series(1, :users) AS u;
+
+INSERT INTO teachmate.teachers (name, email, password_hash, created_at, last_login)
+SELECT format('Teacher %s', lpad(n::text, 5, '0')), email, 'seeded-not-a-real-hash', created_at,
+       now() - (n % 30) * interval '1 day'
+FROM seed_users WHERE role = 'teacher' ORDER BY n;
+
+INSERT INTO studentmate.students (sname, email, password_hash)
+SELECT format('Student %s', lpad(n::text, 5, '0')), email, 'seeded-not-a-real-hash'
+FROM seed_users WHERE role = 'student' ORDER BY n;
+
+INSERT INTO public.users (username, email, role, isdeleted, created_at, user_role_link)
+SELECT format('%s %s', initcap(role), lpad(n::text, 5, '0')), email, role, FALSE, created_at,
+       row_number() OVER (PARTITION BY role ORDER BY n)
+FROM seed_users
+ORDER BY n;
+
+-- Teacher subject assignments.
+INSERT INTO teachmate.teacher_assignments (teacher_id, sub_id, isapprover)
+SELECT t.teachid, ((t.teachid * 7 + k * 13) % :subjects) + 1, FALSE
+FROM teachmate.teachers t
+CROSS JOIN generate_series(1, :subjects_per_teacher) AS k
+ON CONFLICT (teacher_id, sub_id) DO NOTHING;
+
+-- Each student gets one milestone, the matching gurukul, and up to slog_per_student slog rows
+-- drawn from that level's journeys (the full set would be subjects/level x topics/subject rows each).
+CREATE TEMP TABLE seed_student_milestone ON COMMIT DROP AS
+SELECT s.sid, m.mid, m.level, o.gid,
+       (ARRAY['Started', 'In_progress', 'Done'])[s.sid % 3 + 1] AS status
+FROM studentmate.students s
+JOIN LATERAL (
+    SELECT mid, level, oid FROM public.milestones
+    ORDER BY mid OFFSET (s.sid % (SELECT count(*) FROM public.milestones)) LIMIT 1
+) m ON TRUE
+JOIN public.gurukul_offerings o ON o.oid = m.oid;
+
+INSERT INTO studentmate.sgurukul (sid, gid, starttime, status)
+SELECT sid, gid, now() - interval '30 days', status FROM seed_student_milestone;
+
+INSERT INTO studentmate.smilestones (sid, mid, starttime, status, score)
+SELECT sid, mid, now() - interval '30 days', status, sid % 101 FROM seed_student_milestone;
+
+INSERT INTO studentmate.slog (sid, jid, starttime, status)
+SELECT sm.sid, j.jid, now() - interval '7 days', 'Started'
+FROM seed_student_milestone sm
+CROSS JOIN LATERAL (
+    SELECT jr.jid
+    FROM teachmate.journey jr
+    JOIN teachmate.subjects s ON s.subid = jr.subject_id
+    WHERE s.level = sm.level
+    ORDER BY jr.jid
+    LIMIT :slog_per_student
+) j;
+
+COMMIT;
+
+ANALYZE;
+
+SELECT 'gurukul' AS table_name, count(*) FROM public.gurukul
+UNION ALL SELECT 'gurukul_offerings', count(*) FROM public.gurukul_offerings
+UNION ALL SELECT 'milestones', count(*) FROM public.milestones
+UNION ALL SELECT 'subjects', count(*) FROM teachmate.subjects
+UNION ALL SELECT 'topics', count(*) FROM teachmate.topics
+UNION ALL SELECT 'lessons', count(*) FROM teachmate.lessons
+UNION ALL SELECT 'journey', count(*) FROM teachmate.journey
+UNION ALL SELECT 'users', count(*) FROM public.users
+UNION ALL SELECT 'teachers', count(*) FROM teachmate.teachers
+UNION ALL SELECT 'students', count(*) FROM studentmate.students
+UNION ALL SELECT 'teacher_assignments', count(*) FROM teachmate.teacher_assignments
+UNION ALL SELECT 'sgurukul', count(*) FROM studentmate.sgurukul
+UNION ALL SELECT 'smilestones', count(*) FROM studentmate.smilestones
+UNION ALL SELECT 'slog', count(*) FROM studentmate.slog;
@@ -0,0 +1,1265 @@
+# standin_api.py
+# In-memory stand-in for GurukulAdminAPI. It serves the same routes and response
+# shapes the adminGUI uses, backed by synthetic_data.generate_dataset(), so GUI-side
+# costs can be measured reproducibly without Node or Postgres.
+#
+# Run standalone (the GUI expects port 5002):
+#   python benchmarks/standin_api.py --scale large --latency-ms 20
+# or embed it:
+#   server = StandInServer(generate_dataset(Scale.preset("medium")), port=0).start()
+#   ... server.base_url ... server.stats() ... server.stop()
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import queue
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from synthetic_data import LEVEL_MAPPING, SCALES, Scale, generate_dataset
+
+
+class ApiError(Exception):
+    """Raised by store methods; mapped to an HTTP status + {message, **extra} body."""
+
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.extra = extra
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+# --- Data Store ---
+
+class StandInStore:
+    """Holds the dataset plus the indexes needed to answer API queries cheaply."""
+
+    def __init__(self, dataset):
+        self.lock = threading.RLock()
+        self.version = 0
+        self.gurukuls = {g["gid"]: dict(g) for g in dataset.gurukuls}
+        self.offerings = {o["oid"]: dict(o) for o in dataset.offerings}
+        self.milestones = {m["mid"]: dict(m) for m in dataset.milestones}
+        self.subjects = {s["subid"]: dict(s) for s in dataset.subjects}
+        self.topics = {t["tid"]: dict(t) for t in dataset.topics}
+        self.users = {u["userid"]: dict(u) for u in dataset.users}
+        self.teachers = {t["teachid"]: dict(t) for t in dataset.teachers}
+        self.students = {s["sid"]: dict(s) for s in dataset.students}
+        self.teacher_subjects = {}
+        for row in dataset.teacher_assignments:
+            self.teacher_subjects.setdefault(row["teacher_id"], []).append(row["sub_id"])
+        self.sgurukul = {row["sid"]: dict(row) for row in dataset.sgurukul}
+        self.smilestones = {row["sid"]: dict(row) for row in dataset.smilestones}
+        self.change_seq = 0
+        self.change_log = []  # (seq, resource, key or None meaning "everything")
+        self.jobs = {}
+
+    def touch(self):
+        """Bumps the dataset version so cached response bodies are rebuilt."""
+        self.version += 1
+
+    # --- Delta sync (mirrors services/deltaSyncService.ts) ---
+
+    def log_change(self, route_label, key):
+        """Records which delta collection a write touched; key None forces a reset for it."""
+        prefix = "/" + route_label.split("/")[1]
+        for resource, own_prefix in (("users", "/users"), ("topics", "/topics"), ("milestones", "/milestones")):
+            if prefix in DELTA_ROUTES[resource]:
+                self.change_seq += 1
+                self.change_log.append((self.change_seq, resource, key if prefix == own_prefix else None))
+
+    def delta(self, resource, since):
+        if resource not in DELTA_KEYS:
+            raise ApiError(400, f"Query param 'table' must be one of: {', '.join(DELTA_KEYS)}")
+        entries = [e for e in self.change_log if e[1] == resource and since is not None and e[0] > since]
+        if since is None or since > self.change_seq or any(key is None for _, _, key in entries):
+            return {"table": resource, "seq": self.change_seq, "reset": True,
+                    "upserts": self._delta_rows(resource, None), "deletes": []}
+        keys = sorted({key for _, _, key in entries})
+        upserts = self._delta_rows(resource, set(keys))
+        present = {row[DELTA_KEYS[resource]] for row in upserts}
+        return {"table": resource, "seq": self.change_seq, "reset": False,
+                "upserts": upserts, "deletes": [k for k in keys if k not in present]}
+
+    def _delta_rows(self, resource, keys):
+        if resource == "users":
+            users = [u for u in self.users.values() if keys is None or u["userid"] in keys]
+            users = [u for u in users if not u["isdeleted"]]
+            return [self.enhanced_user(u) for u in sorted(users, key=lambda u: u["username"])]
+        table = self.topics if resource == "topics" else self.milestones
+        return [dict(table[k]) for k in sorted(table) if keys is None or k in keys]
+
+    @staticmethod
+    def _next_id(table):
+        return max(table, default=0) + 1
+
+    # --- Role enrichment (mirrors userService / *DirectService) ---
+
+    def assigned_subjects(self, teachid):
+        rows = [self.subjects[s] for s in self.teacher_subjects.get(teachid, []) if s in self.subjects]
+        rows = [{k: s[k] for k in ("subid", "subname", "level", "image_url")} for s in rows]
+        return sorted(rows, key=lambda s: s["subname"])
+
+    def assigned_gurukuls(self, sid):
+        row = self.sgurukul.get(sid)
+        if not row or row["gid"] not in self.gurukuls:
+            return []
+        return [{"gid": row["gid"], "gname": self.gurukuls[row["gid"]]["gname"], "starttime": row["starttime"],
+                 "endtime": row["endtime"], "status": row["status"]}]
+
+    def assigned_milestones(self, sid):
+        row = self.smilestones.get(sid)
+        if not row or row["mid"] not in self.milestones:
+            return []
+        m = self.milestones[row["mid"]]
+        return [{"mid": m["mid"], "class": m["class"], "level": m["level"], "starttime": row["starttime"],
+                 "endtime": row["endtime"], "status": row["status"], "score": row["score"]}]
+
+    def enhanced_user(self, user):
+        user = dict(user)
+        link = user.get("user_role_link")
+        if user["role"] == "teacher" and link in self.teachers:
+            user["teachid"] = link
+            user["last_login"] = self.teachers[link]["last_login"]
+            user["assigned_subjects"] = self.assigned_subjects(link)
+        elif user["role"] == "student" and link in self.students:
+            user["sid"] = link
+            user["assigned_gurukuls"] = self.assigned_gurukuls(link)
+            user["assigned_milestones"] = self.assigned_milestones(link)
+        return user
+
+    def teacher_view(self, teacher):
+        return dict(teacher, assigned_subjects=self.assigned_subjects(teacher["teachid"]))
+
+    def student_view(self, student):
+        sid = student["sid"]
+        return dict(student, assigned_gurukuls=self.assigned_gurukuls(sid), assigned_milestones=self.assigned_milestones(sid))
+
+    # --- List queries ---
+
+    def list_users(self, role=None, deleted=False):
+        rows = [u for u in self.users.values() if u["isdeleted"] == deleted and (role is None or u["role"] == role)]
+        rows.sort(key=lambda u: u["username"])
+        return [self.enhanced_user(u) for u in rows]
+
+    def list_teachers(self):
+        return [self.teacher_view(t) for t in sorted(self.teachers.values(), key=lambda t: t["teachid"])]
+
+    def list_students(self):
+        return [self.student_view(s) for s in sorted(self.students.values(), key=lambda s: s["sname"])]
+
+    def milestones_by_gurukul(self, gid):
+        oids = {o["oid"] for o in self.offerings.values() if o["gid"] == gid}
+        return sorted((m for m in self.milestones.values() if m["oid"] in oids), key=lambda m: m["level"])
+
+    def distinct_levels(self):
+        return sorted({m["level"] for m in self.milestones.values()})
+
+    def available_gtypes(self, gid=None):
+        taken = {(o["gid"], o["gtype"]) for o in self.offerings.values()}
+        rows = ({"gid": g, "gtypes": [t for t in LEVEL_MAPPING if (g, t) not in taken]}
+                for g in sorted(self.gurukuls) if gid is None or g == gid)
+        return [row for row in rows if row["gtypes"]]
+
+    def available_levels(self, oid=None, gid=None):
+        taken = {(m["oid"], m["level"]) for m in self.milestones.values()}
+        rows = ({"oid": o["oid"], "gid": o["gid"], "gtype": o["gtype"],
+                 "levels": [lvl for lvl in LEVEL_MAPPING[o["gtype"]] if (o["oid"], lvl) not in taken]}
+                for o in sorted(self.offerings.values(), key=lambda o: o["oid"])
+                if (oid is None or o["oid"] == oid) and (gid is None or o["gid"] == gid))
+        return [row for row in rows if row["levels"]]
+
+    # --- Writes: catalog ---
+
+    def save_gurukul(self, body, gid=None):
+        gname = body.get("gname")
+        if not isinstance(gname, str) or not gname:
+            raise ApiError(400, "Gurukul name (gname) is required and must be a string")
+        if gid is None:
+            gid = self._next_id(self.gurukuls)
+        elif gid not in self.gurukuls:
+            raise ApiError(404, "Gurukul not found")
+        self.gurukuls[gid] = {"gid": gid, "gname": gname}
+        return self.gurukuls[gid]
+
+    def delete_gurukul(self, gid):
+        if self.gurukuls.pop(gid, None) is None:
+            raise ApiError(404, "Gurukul not found")
+        for oid in [o["oid"] for o in self.offerings.values() if o["gid"] == gid]:
+            del self.offerings[oid]
+
+    def save_offering(self, body, oid=None):
+        gid, gtype = body.get("gid"), body.get("gtype")
+        if not isinstance(gid, int) or gtype not in LEVEL_MAPPING:
+            raise ApiError(400, "Gurukul ID (gid, number) and type (gtype, string) are required")
+        if gid not in self.gurukuls:
+            raise ApiError(400, f"Gurukul with ID {gid} does not exist.")
+        if any(o["gid"] == gid and o["gtype"] == gtype and o["oid"] != oid for o in self.offerings.values()):
+            raise ApiError(409, f"Gurukul offering with type '{gtype}' already exists for this gurukul.")
+        if oid is None:
+            oid = self._next_id(self.offerings)
+        elif oid not in self.offerings:
+            raise ApiError(404, "Gurukul Offering not found")
+        self.offerings[oid] = {"oid": oid, "gid": gid, "gtype": gtype}
+        return self.offerings[oid]
+
+    def save_milestone(self, body, mid=None):
+        current = self.milestones.get(mid, {}) if mid is not None else {}
+        if mid is not None and not current:
+            raise ApiError(404, "Milestone not found")
+        row = {"class": body.get("class", current.get("class")), "level": body.get("level", current.get("level")),
+               "oid": body.get("oid", current.get("oid"))}
+        offering = self.offerings.get(row["oid"])
+        if offering is None:
+            raise ApiError(400, f"Gurukul Offering with ID {row['oid']} does not exist.")
+        if row["level"] not in LEVEL_MAPPING[offering["gtype"]]:
+            raise ApiError(400, f"Level '{row['level']}' is not valid for offering type '{offering['gtype']}'.")
+        if any(m["oid"] == row["oid"] and m["level"] == row["level"] and m["mid"] != mid for m in self.milestones.values()):
+            raise ApiError(409, "A milestone with this level already exists for this offering.")
+        mid = mid if mid is not None else self._next_id(self.milestones)
+        self.milestones[mid] = dict(row, mid=mid)
+        return self.milestones[mid]
+
+    def run_batch(self, operations):
+        """Mirrors POST /batch: create operations in order, all-or-nothing, with {"$ref": "ref.field"} args."""
+        if not isinstance(operations, list) or not operations:
+            raise ApiError(400, "'operations' must be a non-empty array")
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise ApiError(400, f"A batch can contain at most {MAX_BATCH_OPERATIONS} operations")
+        refs = set()
+        for i, operation in enumerate(operations):
+            op = operation.get("op") if isinstance(operation, dict) else None
+            if op not in BATCH_OPERATIONS:
+                raise ApiError(400, f"Operation {i}: 'op' must be one of: {', '.join(BATCH_OPERATIONS)}")
+            if not isinstance(operation.get("args"), dict):
+                raise ApiError(400, f"Operation {i}: 'args' must be an object")
+            for value in operation["args"].values():
+                if isinstance(value, dict) and value.get("$ref", "").split(".")[0] not in refs:
+                    raise ApiError(400, f"Operation {i}: '$ref' {value.get('$ref')} does not name an earlier operation")
+            if operation.get("ref") is not None:
+                refs.add(operation["ref"])
+
+        snapshot = (dict(self.gurukuls), dict(self.offerings), dict(self.milestones))
+        results, output = {}, []
+        for i, operation in enumerate(operations):
+            args = {}
+            for key, value in operation["args"].items():
+                if isinstance(value, dict):
+                    ref, _, field = value["$ref"].partition(".")
+                    value = results[ref].get(field) if field else results[ref]
+                args[key] = value
+            try:
+                result = getattr(self, BATCH_OPERATIONS[operation["op"]])(args)
+            except ApiError as e:
+                self.gurukuls, self.offerings, self.milestones = snapshot  # ROLLBACK
+                raise ApiError(e.status, e.message, index=i, op=operation["op"])
+            if operation.get("ref") is not None:
+                results[operation["ref"]] = result
+            output.append({"op": operation["op"], "ref": operation.get("ref"), "result": result})
+        return output
+
+    def save_subject(self, body, subid=None):
+        current = self.subjects.get(subid, {}) if subid is not None else {}
+        if subid is not None and not current:
+            raise ApiError(404, "Subject not found")
+        row = {"subname": body.get("subname", current.get("subname")), "level": body.get("level", current.get("level")),
+               "image_url": body.get("image_url", current.get("image_url")), "isdeleted": False}
+        if not row["subname"] or not row["level"]:
+            raise ApiError(400, "Subject name (subname) and level are required")
+        if any(s["subname"] == row["subname"] and s["level"] == row["level"] and s["subid"] != subid
+               for s in self.subjects.values()):
+            raise ApiError(409, "A subject with this name and level already exists.")
+        subid = subid if subid is not None else self._next_id(self.subjects)
+        self.subjects[subid] = dict(row, subid=subid)
+        return self.subjects[subid]
+
+    def delete_subject(self, subid):
+        if self.subjects.pop(subid, None) is None:
+            raise ApiError(404, "Subject not found")
+        for tid in [t["tid"] for t in self.topics.values() if t["subid"] == subid]:
+            del self.topics[tid]
+
+    def save_topic(self, body, tid=None):
+        current = self.topics.get(tid, {}) if tid is not None else {}
+        if tid is not None and not current:
+            raise ApiError(404, "Topic not found")
+        row = {"tname": body.get("tname", current.get("tname")), "subid": body.get("subid", current.get("subid")),
+               "image_url": body.get("image_url", current.get("image_url"))}
+        if row["subid"] not in self.subjects:
+            raise ApiError(400, f"Subject with ID {row['subid']} does not exist.")
+        if any(t["tname"] == row["tname"] and t["subid"] == row["subid"] and t["tid"] != tid for t in self.topics.values()):
+            raise ApiError(409, "A topic with this name already exists for this subject.")
+        tid = tid if tid is not None else self._next_id(self.topics)
+        self.topics[tid] = dict(row, tid=tid)
+        return self.topics[tid]
+
+    # --- Writes: users / teachers / students ---
+
+    def _assign_student(self, sid, body):
+        if "gurukul_id" in body:
+            gid = body["gurukul_id"]
+            self.sgurukul.pop(sid, None)
+            if gid is not None and gid in self.gurukuls:
+                self.sgurukul[sid] = {"sid": sid, "gid": gid, "starttime": _now(), "endtime": None, "status": "Started"}
+        if "milestone_id" in body:
+            mid = body["milestone_id"]
+            self.smilestones.pop(sid, None)
+            if mid is not None and mid in self.milestones:
+                self.smilestones[sid] = {"sid": sid, "mid": mid, "starttime": _now(), "endtime": None,
+                                         "status": "Started", "score": 0}
+
+    def _assign_teacher(self, teachid, body):
+        if "subject_ids" in body:
+            self.teacher_subjects[teachid] = [s for s in body["subject_ids"] or [] if s in self.subjects]
+
+    def _email_taken(self, email, userid=None):
+        return any(u["email"] == email and u["userid"] != userid and not u["isdeleted"] for u in self.users.values())
+
+    def create_user(self, body):
+        username, email, role = body.get("username"), body.get("email"), body.get("role")
+        if not username or not email or role not in ("teacher", "student"):
+            raise ApiError(400, "username, email and a valid role (teacher/student) are required")
+        if self._email_taken(email):
+            raise ApiError(409, "User with this email already exists.")
+        if role == "teacher":
+            link = self.create_teacher({"name": username, "email": email})["teachid"]
+        else:
+            link = self.create_student({"sname": username, "email": email})["sid"]
+        userid = self._next_id(self.users)
+        self.users[userid] = {"userid": userid, "username": username, "email": email, "role": role,
+                              "isdeleted": False, "created_at": _now(), "user_role_link": link}
+        return self.enhanced_user(self.users[userid])
+
+    # --- Cohorts (mirrors services/cohortService.ts) ---
+
+    def _cohort_rows(self, kind, q):
+        gid, mid, level = (int(q["gid"]) if q.get("gid") else None, int(q["mid"]) if q.get("mid") else None,
+                           q.get("level") or None)
+        if kind not in ("gurukul", "milestone"):
+            raise ApiError(400, "Cohort kind must be one of: gurukul, milestone")
+
+        def milestone_matches(m_id, by_gid):
+            milestone = self.milestones.get(m_id)
+            if milestone is None:
+                return False
+            offering = self.offerings.get(milestone["oid"], {})
+            return ((not by_gid or gid is None or offering.get("gid") == gid)
+                    and (mid is None or m_id == mid) and (level is None or milestone["level"] == level))
+
+        if kind == "gurukul":
+            return [row for row in self.sgurukul.values()
+                    if (gid is None or row["gid"] == gid)
+                    and (mid is None and level is None
+                         or (row["sid"] in self.smilestones
+                             and milestone_matches(self.smilestones[row["sid"]]["mid"], by_gid=False)))]
+        return [row for row in self.smilestones.values() if milestone_matches(row["mid"], by_gid=True)]
+
+    def cohort_summary(self, kind, q):
+        rows = self._cohort_rows(kind, q)
+        return {"kind": kind, "summary": [{"status": status, "students": sum(1 for r in rows if r["status"] == status)}
+                                          for status in COHORT_STATUSES]}
+
+    def transition_cohort(self, kind, body):
+        from_status = body.get("from")
+        to_status = body.get("to") or (COHORT_STATUSES[COHORT_STATUSES.index(from_status) + 1]
+                                       if from_status in COHORT_STATUSES[:-1] else None)
+        if (from_status not in COHORT_STATUSES or to_status not in COHORT_STATUSES
+                or COHORT_STATUSES.index(to_status) <= COHORT_STATUSES.index(from_status)):
+            raise ApiError(400, "'from' and 'to' must be statuses in the order Started -> In_progress -> Done")
+        if not any(body.get(k) for k in ("gid", "mid", "level")):
+            raise ApiError(400, "At least one of gid, mid or level is required to select a cohort")
+        updated = 0
+        for row in self._cohort_rows(kind, {k: str(v) if k != "level" else v for k, v in body.items()
+                                            if k in ("gid", "mid", "level") and v is not None}):
+            if row["status"] == from_status:
+                row["status"] = to_status
+                row["starttime"] = row.get("starttime") or _now()
+                if to_status == "Done":
+                    row["endtime"] = _now()
+                updated += 1
+        return {"kind": kind, "from": from_status, "to": to_status, "updated": updated}
+
+    def apply_scores(self, rows):
+        if not isinstance(rows, list) or not rows or len(rows) > 5000:
+            raise ApiError(400, "'rows' must be a non-empty array of at most 5000 score rows")
+        sid_by_email = {s["email"].lower(): s["sid"] for s in self.students.values()}
+        latest, unknown, matched = {}, [], 0
+        for i, row in enumerate(rows):
+            sid = row.get("sid") if row.get("sid") is not None else sid_by_email.get(str(row.get("email", "")).lower())
+            assignment = self.smilestones.get(sid)
+            if assignment is None or assignment["mid"] != row.get("mid"):
+                unknown.append({"line": row.get("line", i + 1), "sid": row.get("sid"), "email": row.get("email"),
+                                "mid": row.get("mid")})
+                continue
+            matched += 1
+            latest[(sid, row["mid"])] = row["score"]
+        updated = 0
+        for (sid, _), score in latest.items():
+            if self.smilestones[sid].get("score") != score:
+                self.smilestones[sid]["score"] = score
+                updated += 1
+        return {"received": len(rows), "updated": updated, "unchanged": len(latest) - updated,
+                "duplicates": matched - len(latest), "unknown": unknown}
+
+    # --- Dashboard (mirrors services/statsService.ts) ---
+
+    def stats(self):
+        active = [u for u in self.users.values() if not u["isdeleted"]]
+        gid_by_oid = {o["oid"]: o["gid"] for o in self.offerings.values()}
+        per_gurukul = {gid: 0 for gid in self.gurukuls}
+        for row in self.sgurukul.values():
+            per_gurukul[row["gid"]] = per_gurukul.get(row["gid"], 0) + 1
+        per_level, scores = {}, {}
+        for m in self.milestones.values():
+            per_level.setdefault(m["level"], 0)
+            scores[m["mid"]] = []
+        for row in self.smilestones.values():
+            milestone = self.milestones.get(row["mid"])
+            if milestone:
+                per_level[milestone["level"]] += 1
+                scores[row["mid"]].append(row.get("score") or 0)
+        teachers = {subid: 0 for subid in self.subjects}
+        for subids in self.teacher_subjects.values():
+            for subid in subids:
+                teachers[subid] = teachers.get(subid, 0) + 1
+
+        def status_counts(rows):
+            counts = {}
+            for row in rows:
+                counts[row["status"] or "None"] = counts.get(row["status"] or "None", 0) + 1
+            return counts
+
+        return {
+            "totals": {"gurukuls": len(self.gurukuls), "offerings": len(self.offerings),
+                       "milestones": len(self.milestones), "subjects": len(self.subjects), "topics": len(self.topics),
+                       "teachers": sum(u["role"] == "teacher" for u in active),
+                       "students": sum(u["role"] == "student" for u in active)},
+            "students_per_gurukul": sorted(({"gid": gid, "gname": self.gurukuls[gid]["gname"], "students": n}
+                                            for gid, n in per_gurukul.items() if gid in self.gurukuls),
+                                           key=lambda r: (-r["students"], r["gname"])),
+            "students_per_level": [{"level": level, "students": n} for level, n in sorted(per_level.items())],
+            "gurukul_status": status_counts(self.sgurukul.values()),
+            "milestone_status": status_counts(self.smilestones.values()),
+            "milestone_scores": sorted(({"mid": m["mid"], "class": m["class"], "level": m["level"],
+                                         "gname": self.gurukuls.get(gid_by_oid.get(m["oid"]), {}).get("gname"),
+                                         "students": len(scores[m["mid"]]),
+                                         "avg_score": round(sum(scores[m["mid"]]) / len(scores[m["mid"]]), 1)
+                                         if scores[m["mid"]] else None}
+                                        for m in self.milestones.values()),
+                                       key=lambda r: (r["gname"] or "", r["level"])),
+            "teachers_per_subject": sorted(({"subid": subid, "subname": self.subjects[subid]["subname"],
+                                             "level": self.subjects[subid]["level"], "teachers": n}
+                                            for subid, n in teachers.items() if subid in self.subjects),
+                                           key=lambda r: (-r["teachers"], r["subname"])),
+            "generated_at": _now(),
+        }
+
+    # --- Exports (mirrors services/exportService.ts: one flattened row per record) ---
+
+    def _subject_columns(self, teachid):
+        subids = sorted(self.teacher_subjects.get(teachid, []))
+        names = "; ".join(f"{self.subjects[s]['subname']} ({self.subjects[s]['level']})" for s in subids if s in self.subjects)
+        return {"subject_ids": "; ".join(map(str, subids)) or None, "subjects": names or None}
+
+    def _student_columns(self, sid):
+        sg, sm = self.sgurukul.get(sid) or {}, self.smilestones.get(sid) or {}
+        milestone = self.milestones.get(sm.get("mid"), {})
+        return {"gid": sg.get("gid"), "gname": self.gurukuls.get(sg.get("gid"), {}).get("gname"),
+                "gurukul_status": sg.get("status"), "gurukul_start": sg.get("starttime"), "gurukul_end": sg.get("endtime"),
+                "mid": sm.get("mid"), "class": milestone.get("class"), "level": milestone.get("level"),
+                "milestone_status": sm.get("status"), "score": sm.get("score"),
+                "milestone_start": sm.get("starttime"), "milestone_end": sm.get("endtime")}
+
+    def export_rows(self, kind):
+        """Returns (columns, rows) for an export kind, or None if unknown."""
+        if kind == "users":
+            columns = ["userid", "username", "email", "role", "isdeleted", "created_at", "user_role_link",
+                       "subject_ids", "subjects", "gid", "gname", "gurukul_status", "mid", "class", "level",
+                       "milestone_status", "score"]
+            rows = []
+            for u in sorted(self.users.values(), key=lambda u: u["userid"]):
+                row = dict(u)
+                link = u.get("user_role_link")
+                row.update(self._subject_columns(link) if u["role"] == "teacher" else {})
+                row.update(self._student_columns(link) if u["role"] == "student" else {})
+                rows.append(row)
+        elif kind == "students":
+            columns = ["sid", "sname", "email", "gid", "gname", "gurukul_status", "gurukul_start", "gurukul_end",
+                       "mid", "class", "level", "milestone_status", "score", "milestone_start", "milestone_end"]
+            rows = [dict(s, **self._student_columns(s["sid"])) for s in sorted(self.students.values(), key=lambda s: s["sid"])]
+        elif kind == "teachers":
+            columns = ["teachid", "name", "email", "created_at", "last_login", "subject_ids", "subjects"]
+            rows = [dict(t, **self._subject_columns(t["teachid"])) for t in sorted(self.teachers.values(), key=lambda t: t["teachid"])]
+        else:
+            return None
+        return columns, rows
+
+    # --- Background jobs (mirrors services/jobService.ts, but each job runs to completion on POST) ---
+
+    def run_job(self, body):
+        job_type, payload = body.get("type"), body.get("payload") or {}
+        runners = {
+            "delete_gurukul": lambda: self.delete_gurukul(payload["gid"]) or {"gid": payload["gid"], "deleted": True},
+            "delete_subject": lambda: self.delete_subject(payload["subid"]) or {"subid": payload["subid"], "deleted": True},
+            "create_users": lambda: self._create_users_job(payload["users"]),
+        }
+        if job_type not in runners:
+            raise ApiError(400, f"Unknown job type '{job_type}'. Expected one of: {', '.join(runners)}")
+        job_id = self._next_id(self.jobs)
+        job = {"id": job_id, "job_type": job_type, "payload": payload, "status": "succeeded", "done": 1, "total": 1,
+               "percent": 100, "message": None, "result": None, "error": None, "attempts": 1,
+               "created_at": _now(), "started_at": _now(), "finished_at": _now(), "updated_at": _now()}
+        try:
+            job["result"] = runners[job_type]()
+        except (ApiError, KeyError, TypeError) as e:
+            job.update(status="failed", error=getattr(e, "message", None) or f"Invalid payload: {e}")
+        self.jobs[job_id] = job
+        return job
+
+    def _create_users_job(self, users):
+        created, duplicates = [], []
+        for body in users:
+            try:
+                created.append(self.create_user(body)["userid"])
+            except ApiError as e:
+                if e.status != 409:
+                    raise
+                duplicates.append(body.get("email"))
+        return {"created": len(created), "userids": created, "duplicates": duplicates, "failed": []}
+
+    def update_user(self, userid, body):
+        user = self.users.get(userid)
+        if user is None or user["isdeleted"]:
+            raise ApiError(404, "User not found")
+        if "email" in body and self._email_taken(body["email"], userid):
+            raise ApiError(409, "User with this email already exists.")
+        for key in ("username", "email", "role", "isdeleted"):
+            if key in body:
+                user[key] = body[key]
+        link = user["user_role_link"]
+        if user["role"] == "teacher" and link in self.teachers:
+            self._assign_teacher(link, body)
+        elif user["role"] == "student" and link in self.students:
+            self._assign_student(link, body)
+        return self.enhanced_user(user)
+
+    def delete_user(self, userid):
+        user = self.users.get(userid)
+        if user is None or user["isdeleted"]:
+            raise ApiError(404, "User not found")
+        user["isdeleted"] = True
+        if user["role"] == "teacher":
+            self.teachers.pop(user["user_role_link"], None)
+        else:
+            self.students.pop(user["user_role_link"], None)
+
+    def delete_users(self, userids):
+        """Mirrors softDeleteUsersByIds: returns (deleted, not_found)."""
+        deleted = [i for i in userids if i in self.users and not self.users[i]["isdeleted"]]
+        for userid in deleted:
+            self.delete_user(userid)
+        return deleted, [i for i in userids if i not in deleted]
+
+    def restore_users(self, userids):
+        """Mirrors restoreUsersByIds: the teacher/student row comes back under the same id, without assignments."""
+        restored = [i for i in userids if i in self.users and self.users[i]["isdeleted"]]
+        for userid in restored:
+            user = self.users[userid]
+            user["isdeleted"] = False
+            link = user["user_role_link"]
+            if user["role"] == "teacher":
+                self.teachers.setdefault(link, {"teachid": link, "name": user["username"], "email": user["email"],
+                                                "last_login": None, "created_at": _now()})
+                self.teacher_subjects.pop(link, None)
+            else:
+                self.students.setdefault(link, {"sid": link, "sname": user["username"], "email": user["email"]})
+                self.sgurukul.pop(link, None)
+                self.smilestones.pop(link, None)
+        return restored, [i for i in userids if i not in restored]
+
+    def create_teacher(self, body):
+        teachid = self._next_id(self.teachers)
+        self.teachers[teachid] = {"teachid": teachid, "name": body.get("name"), "email": body.get("email"),
+                                  "last_login": None, "created_at": _now()}
+        self._assign_teacher(teachid, body)
+        return self.teacher_view(self.teachers[teachid])
+
+    def update_teacher(self, teachid, body):
+        teacher = self.teachers.get(teachid)
+        if teacher is None:
+            raise ApiError(404, "Teacher not found")
+        for key in ("name", "email"):
+            if key in body:
+                teacher[key] = body[key]
+        self._assign_teacher(teachid, body)
+        return self.teacher_view(teacher)
+
+    def create_student(self, body):
+        sid = self._next_id(self.students)
+        self.students[sid] = {"sid": sid, "sname": body.get("sname"), "email": body.get("email")}
+        self._assign_student(sid, body)
+        return self.student_view(self.students[sid])
+
+    def update_student(self, sid, body):
+        student = self.students.get(sid)
+        if student is None:
+            raise ApiError(404, "Student not found")
+        for key in ("sname", "email"):
+            if key in body:
+                student[key] = body[key]
+        self._assign_student(sid, body)
+        return self.student_view(student)
+
+
+# --- Routing ---
+
+def _to_columnar(rows):
+    """Mirrors utils/columnar.ts: one array per column, columns are the union of all rows' keys."""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    return {"format": "columnar", "length": len(rows), "columns": columns,
+            "data": {c: [row.get(c) for row in rows] for c in columns}}
+
+
+def _get_or_404(table, key, label):
+    row = table.get(key)
+    if row is None:
+        raise ApiError(404, f"{label} not found")
+    return row
+
+
+# Path parameters that are names rather than numeric IDs
+WORD_PARAMS = {"kind": "[a-z]+"}
+
+# (method, route label, regex, handler(store, match, query, body) -> (status, payload), cacheable)
+ROUTES = []
+
+
+def route(method, label, cacheable=False):
+    pattern = "^" + re.sub(r":(\w+)", lambda p: "(?P<%s>%s)" % (p[1], WORD_PARAMS.get(p[1], r"\d+")), label) + "$"
+
+    def register(func):
+        ROUTES.append((method, label, re.compile(pattern), func, cacheable))
+        return func
+    return register
+
+
+@route("GET", "/gurukul", cacheable=True)
+def _list_gurukuls(store, m, q, body):
+    return 200, sorted(store.gurukuls.values(), key=lambda g: g["gid"])
+
+@route("GET", "/gurukul/available-gtypes")
+def _available_gtypes(store, m, q, body):
+    return 200, store.available_gtypes(int(q["gid"]) if q.get("gid") else None)
+
+@route("GET", "/gurukul/:id")
+def _get_gurukul(store, m, q, body):
+    return 200, _get_or_404(store.gurukuls, int(m["id"]), "Gurukul")
+
+@route("POST", "/gurukul")
+def _create_gurukul(store, m, q, body):
+    return 201, store.save_gurukul(body)
+
+@route("PUT", "/gurukul/:id")
+def _update_gurukul(store, m, q, body):
+    return 200, store.save_gurukul(body, int(m["id"]))
+
+@route("DELETE", "/gurukul/:id")
+def _delete_gurukul(store, m, q, body):
+    store.delete_gurukul(int(m["id"]))
+    return 204, None
+
+@route("GET", "/gurukul-offerings", cacheable=True)
+def _list_offerings(store, m, q, body):
+    return 200, sorted(store.offerings.values(), key=lambda o: o["oid"])
+
+@route("GET", "/gurukul-offerings/:id")
+def _get_offering(store, m, q, body):
+    return 200, _get_or_404(store.offerings, int(m["id"]), "Gurukul Offering")
+
+@route("POST", "/gurukul-offerings")
+def _create_offering(store, m, q, body):
+    return 201, store.save_offering(body)
+
+@route("PUT", "/gurukul-offerings/:id")
+def _update_offering(store, m, q, body):
+    return 200, store.save_offering(body, int(m["id"]))
+
+@route("DELETE", "/gurukul-offerings/:id")
+def _delete_offering(store, m, q, body):
+    _get_or_404(store.offerings, int(m["id"]), "Gurukul Offering")
+    del store.offerings[int(m["id"])]
+    return 204, None
+
+@route("GET", "/milestones", cacheable=True)
+def _list_milestones(store, m, q, body):
+    return 200, sorted(store.milestones.values(), key=lambda r: r["mid"])
+
+@route("GET", "/milestones/distinct-levels", cacheable=True)
+def _distinct_levels(store, m, q, body):
+    return 200, store.distinct_levels()
+
+@route("GET", "/milestones/available-levels")
+def _available_levels(store, m, q, body):
+    return 200, store.available_levels(int(q["oid"]) if q.get("oid") else None,
+                                       int(q["gid"]) if q.get("gid") else None)
+
+@route("GET", "/milestones/by-gurukul/:gid", cacheable=True)
+def _milestones_by_gurukul(store, m, q, body):
+    return 200, store.milestones_by_gurukul(int(m["gid"]))
+
+@route("GET", "/milestones/:id")
+def _get_milestone(store, m, q, body):
+    return 200, _get_or_404(store.milestones, int(m["id"]), "Milestone")
+
+@route("POST", "/milestones")
+def _create_milestone(store, m, q, body):
+    return 201, store.save_milestone(body)
+
+@route("PUT", "/milestones/:id")
+def _update_milestone(store, m, q, body):
+    return 200, store.save_milestone(body, int(m["id"]))
+
+@route("DELETE", "/milestones/:id")
+def _delete_milestone(store, m, q, body):
+    _get_or_404(store.milestones, int(m["id"]), "Milestone")
+    del store.milestones[int(m["id"])]
+    return 200, {"message": "Milestone deleted successfully"}
+
+@route("POST", "/batch")
+def _run_batch(store, m, q, body):
+    return 201, {"results": store.run_batch(body.get("operations"))}
+
+@route("GET", "/subjects", cacheable=True)
+def _list_subjects(store, m, q, body):
+    return 200, sorted(store.subjects.values(), key=lambda s: s["subid"])
+
+@route("GET", "/subjects/:id")
+def _get_subject(store, m, q, body):
+    return 200, _get_or_404(store.subjects, int(m["id"]), "Subject")
+
+@route("POST", "/subjects")
+def _create_subject(store, m, q, body):
+    return 201, store.save_subject(body)
+
+@route("PUT", "/subjects/:id")
+def _update_subject(store, m, q, body):
+    return 200, store.save_subject(body, int(m["id"]))
+
+@route("DELETE", "/subjects/:id")
+def _delete_subject(store, m, q, body):
+    store.delete_subject(int(m["id"]))
+    return 200, {"message": "Subject and associated topics deleted successfully"}
+
+@route("GET", "/topics", cacheable=True)
+def _list_topics(store, m, q, body):
+    return 200, sorted(store.topics.values(), key=lambda t: t["tid"])
+
+@route("GET", "/topics/:id")
+def _get_topic(store, m, q, body):
+    return 200, _get_or_404(store.topics, int(m["id"]), "Topic")
+
+@route("POST", "/topics")
+def _create_topic(store, m, q, body):
+    return 201, store.save_topic(body)
+
+@route("PUT", "/topics/:id")
+def _update_topic(store, m, q, body):
+    return 200, store.save_topic(body, int(m["id"]))
+
+@route("DELETE", "/topics/:id")
+def _delete_topic(store, m, q, body):
+    _get_or_404(store.topics, int(m["id"]), "Topic")
+    del store.topics[int(m["id"])]
+    return 200, {"message": "Topic deleted successfully"}
+
+@route("GET", "/cohorts/:kind")
+def _cohort_summary(store, m, q, body):
+    return 200, store.cohort_summary(m["kind"], q)
+
+@route("POST", "/cohorts/:kind/transition")
+def _transition_cohort(store, m, q, body):
+    return 200, store.transition_cohort(m["kind"], body)
+
+@route("POST", "/smilestones/scores/bulk")
+def _bulk_scores(store, m, q, body):
+    return 200, store.apply_scores(body.get("rows"))
+
+@route("GET", "/stats", cacheable=True)
+def _stats(store, m, q, body):
+    return 200, store.stats()
+
+@route("POST", "/jobs")
+def _create_job(store, m, q, body):
+    return 202, store.run_job(body)
+
+@route("GET", "/jobs/:id")
+def _get_job(store, m, q, body):
+    return 200, _get_or_404(store.jobs, int(m["id"]), "Job")
+
+@route("GET", "/changes")
+def _changes(store, m, q, body):
+    since = q.get("since")
+    if since not in (None, "") and not since.isdigit():
+        raise ApiError(400, "Query param 'since' must be a non-negative integer")
+    return 200, store.delta(q.get("table"), int(since) if since else None)
+
+@route("GET", "/users", cacheable=True)
+def _list_users(store, m, q, body):
+    return 200, store.list_users(q.get("role"), q.get("deleted") == "true")
+
+def _bulk_userids(body):
+    userids = body.get("userids")
+    if not isinstance(userids, list) or not 0 < len(userids) <= 5000 or not all(isinstance(i, int) for i in userids):
+        raise ApiError(400, "'userids' must be a non-empty array of at most 5000 user IDs")
+    return list(dict.fromkeys(userids))
+
+@route("POST", "/users/bulk-delete")
+def _bulk_delete_users(store, m, q, body):
+    userids = _bulk_userids(body)
+    deleted, not_found = store.delete_users(userids)
+    return 200, {"requested": len(userids), "deleted": deleted, "not_found": not_found}
+
+@route("POST", "/users/bulk-restore")
+def _bulk_restore_users(store, m, q, body):
+    userids = _bulk_userids(body)
+    restored, not_found = store.restore_users(userids)
+    return 200, {"requested": len(userids), "restored": restored, "not_found": not_found}
+
+@route("GET", "/users/:id")
+def _get_user(store, m, q, body):
+    user = store.users.get(int(m["id"]))
+    if user is None or user["isdeleted"]:
+        raise ApiError(404, "User not found")
+    return 200, store.enhanced_user(user)
+
+@route("POST", "/users")
+def _create_user(store, m, q, body):
+    return 201, store.create_user(body)
+
+@route("PUT", "/users/:id")
+def _update_user(store, m, q, body):
+    if body.get("slog_mode") not in (None, "reconcile", "reset"):  # slog rows are not modelled here
+        raise ApiError(400, "If provided, slog_mode must be one of: reconcile, reset")
+    return 200, store.update_user(int(m["id"]), body)
+
+@route("DELETE", "/users/:id")
+def _delete_user(store, m, q, body):
+    store.delete_user(int(m["id"]))
+    return 200, {"message": "User soft-deleted successfully"}
+
+@route("GET", "/teachers", cacheable=True)
+def _list_teachers(store, m, q, body):
+    return 200, store.list_teachers()
+
+@route("GET", "/teachers/:id")
+def _get_teacher(store, m, q, body):
+    return 200, store.teacher_view(_get_or_404(store.teachers, int(m["id"]), "Teacher"))
+
+@route("POST", "/teachers")
+def _create_teacher(store, m, q, body):
+    return 201, store.create_teacher(body)
+
+@route("PUT", "/teachers/:id")
+def _update_teacher(store, m, q, body):
+    return 200, store.update_teacher(int(m["id"]), body)
+
+@route("GET", "/students", cacheable=True)
+def _list_students(store, m, q, body):
+    return 200, store.list_students()
+
+@route("GET", "/students/:id")
+def _get_student(store, m, q, body):
+    return 200, store.student_view(_get_or_404(store.students, int(m["id"]), "Student"))
+
+@route("POST", "/students")
+def _create_student(store, m, q, body):
+    return 201, store.create_student(body)
+
+@route("PUT", "/students/:id")
+def _update_student(store, m, q, body):
+    return 200, store.update_student(int(m["id"]), body)
+
+
+# route prefix -> tables a write can touch, as named in change events (see the NOTIFY triggers in `tables`)
+_ASSIGNMENT_TABLES = ("teachmate.teacher_assignments", "studentmate.sgurukul", "studentmate.smilestones")
+CHANGE_TABLES = {
+    "/gurukul": ("public.gurukul", "public.gurukul_offerings"),
+    "/gurukul-offerings": ("public.gurukul_offerings",),
+    "/milestones": ("public.milestones",),
+    "/batch": ("public.gurukul", "public.gurukul_offerings", "public.milestones"),
+    "/subjects": ("teachmate.subjects", "teachmate.topics"),
+    "/topics": ("teachmate.topics",),
+    "/users": ("public.users", "teachmate.teachers", "studentmate.students") + _ASSIGNMENT_TABLES,
+    "/teachers": ("teachmate.teachers", "teachmate.teacher_assignments"),
+    "/students": ("studentmate.students", "studentmate.sgurukul", "studentmate.smilestones"),
+    "/cohorts": ("studentmate.sgurukul", "studentmate.smilestones"),
+    "/smilestones": ("studentmate.smilestones",),
+    "/jobs": ("public.gurukul", "public.gurukul_offerings", "public.milestones", "teachmate.subjects",
+              "teachmate.topics", "public.users", "teachmate.teachers", "studentmate.students"),
+}
+SSE_HEARTBEAT_S = 15
+COHORT_STATUSES = ["Started", "In_progress", "Done"]
+EXPORT_BATCH_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+NDJSON_ROUTES = ("/users", "/topics", "/students")  # list routes that accept ?stream=ndjson
+MAX_BATCH_OPERATIONS = 200
+LEVELS_MAX_AGE = 86400
+BATCH_OPERATIONS = {"gurukul.create": "save_gurukul", "offering.create": "save_offering",
+                    "milestone.create": "save_milestone"}
+
+# Response compression, mirroring the API's compression() middleware (threshold '1kb').
+COMPRESS_THRESHOLD = 1024
+GZIP_LEVEL = 6  # zlib default, as used by the compression package
+BROTLI_QUALITY = 4  # compression package default
+
+# delta collection -> key column, and the route prefixes whose writes can change it
+DELTA_KEYS = {"users": "userid", "topics": "tid", "milestones": "mid"}
+DELTA_ROUTES = {
+    # user rows embed subject, gurukul and milestone names/levels (and lose deleted ones)
+    "users": ("/users", "/teachers", "/students", "/cohorts", "/smilestones", "/jobs",
+              "/subjects", "/gurukul", "/gurukul-offerings", "/milestones"),
+    "topics": ("/topics", "/subjects", "/jobs"),  # deleting a subject deletes its topics
+    "milestones": ("/milestones", "/gurukul", "/gurukul-offerings", "/jobs", "/batch"),  # cascades
+}
+
+
+# --- HTTP Server ---
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Dispatches requests against ROUTES; state lives on self.server."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _encoding_for(self, body_bytes):
+        threshold = self.server.compress_threshold
+        if threshold is None or not body_bytes or len(body_bytes) < threshold:
+            return None
+        accepted = {part.split(";")[0].strip().lower()
+                    for part in self.headers.get("Accept-Encoding", "").split(",")}
+        if "br" in accepted and brotli is not None:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _send(self, status, body_bytes, label, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body_bytes is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Vary", "Accept-Encoding")
+        encoding = self._encoding_for(body_bytes)
+        if encoding == "br":
+            body_bytes = brotli.compress(body_bytes, quality=BROTLI_QUALITY)
+        elif encoding == "gzip":
+            body_bytes = gzip.compress(body_bytes, compresslevel=GZIP_LEVEL, mtime=0)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body_bytes or b"")))
+        self.end_headers()
+        if body_bytes:
+            self.wfile.write(body_bytes)
+        self.server.record(f"{self.command} {label}", len(body_bytes or b""))
+
+    def _handle(self):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/") or "/"
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+        if path == "/changes/stream" and self.command == "GET":
+            return self._stream_changes()
+        if path.startswith("/export/") and self.command == "GET":
+            return self._stream_export(path.split("/")[2])
+        if path in NDJSON_ROUTES and self.command == "GET" and query.get("stream") == "ndjson":
+            return self._stream_ndjson(path, query)
+        if path == "/levels" and self.command == "GET":
+            return self._send_levels()
+
+        if path == "/__stats":
+            if self.command == "DELETE":
+                self.server.reset_stats()
+                return self._send(204, None, path)
+            return self._send(200, json.dumps(self.server.stats()).encode(), path)
+
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            return self._send(400, b'{"message": "Invalid JSON body"}', path)
+
+        for method, label, pattern, handler, cacheable in ROUTES:
+            match = pattern.match(path)
+            if method != self.command or not match:
+                continue
+            self.server.inject_latency()
+            store = self.server.store
+            try:
+                with store.lock:
+                    cache_key = (label, parts.query)
+                    if cacheable:
+                        cached = self.server.response_cache.get(cache_key)
+                        if cached and cached[0] == store.version:
+                            return self._send(200, cached[1], label)
+                    status, payload = handler(store, match.groupdict(), query, body)
+                    if query.get("format") == "columnar" and isinstance(payload, list):
+                        payload = _to_columnar(payload)
+                    body_bytes = None if payload is None else json.dumps(payload, default=str).encode()
+                    if cacheable:
+                        self.server.response_cache[cache_key] = (store.version, body_bytes)
+                    elif self.command != "GET":
+                        store.touch()
+                        self.server.publish_change(label, self.command, match.groupdict().get("id"))
+                        key = match.groupdict().get("id")
+                        if key is None and isinstance(payload, dict):
+                            key = next((payload[k] for k in DELTA_KEYS.values() if k in payload), None)
+                        store.log_change(label, int(key) if key is not None else None)
+            except ApiError as e:
+                body_bytes = json.dumps(dict({"message": e.message}, **e.extra)).encode()
+                return self._send(e.status, body_bytes, label)
+            except Exception as e:
+                body_bytes = json.dumps({"message": "Internal Server Error", "details": str(e)}).encode()
+                return self._send(500, body_bytes, label)
+            return self._send(status, body_bytes, label)
+
+        self._send(404, json.dumps({"message": f"Cannot {self.command} {path}"}).encode(), path)
+
+    def _stream_changes(self):
+        """Mirrors GET /changes/stream: Server-Sent Events, chunked, until the client goes away."""
+        events = self.server.subscribe()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.server.record("GET /changes/stream", 0)
+        try:
+            self._write_chunk(b"retry: 3000\n\n")
+            while True:
+                try:
+                    event = events.get(timeout=SSE_HEARTBEAT_S)
+                except queue.Empty:
+                    self._write_chunk(b": ping\n\n")
+                    continue
+                if event is None:  # server stopping
+                    break
+                self._write_chunk(f"id: {event['id']}\nevent: change\ndata: {json.dumps(event)}\n\n".encode())
+            self._write_chunk(b"")
+        except OSError:
+            pass  # client disconnected
+        finally:
+            self.server.unsubscribe(events)
+            self.close_connection = True
+
+    def _stream_export(self, kind):
+        """Mirrors GET /export/<kind>: CSV written in chunks of EXPORT_BATCH_SIZE rows."""
+        self.server.inject_latency()
+        with self.server.store.lock:
+            export = self.server.store.export_rows(kind)
+        if export is None:
+            return self._send(404, json.dumps({"message": f"Unknown export '{kind}'"}).encode(), "/export/:kind")
+        columns, rows = export
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = 0
+        try:
+            for start in range(-1, len(rows), EXPORT_BATCH_SIZE):
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator="\r\n")
+                if start < 0:
+                    writer.writerow(columns)  # header chunk
+                else:
+                    writer.writerows([[row.get(c) for c in columns] for row in rows[start:start + EXPORT_BATCH_SIZE]])
+                data = buffer.getvalue().encode()
+                self._write_chunk(data)
+                sent += len(data)
+            self._write_chunk(b"")
+        except OSError:
+            self.close_connection = True  # client disconnected
+        self.server.record(f"GET /export/{kind}", sent)
+
+    def _stream_ndjson(self, label, query):
+        """Mirrors ?stream=ndjson on the large list routes: one JSON row per line, STREAM_BATCH_SIZE rows per chunk."""
+        self.server.inject_latency()
+        handler = next(h for method, l, _, h, _ in ROUTES if method == "GET" and l == label)
+        with self.server.store.lock:
+            _, rows = handler(self.server.store, {}, query, {})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = 0
+        try:
+            for start in range(0, len(rows), STREAM_BATCH_SIZE):
+                data = "".join(json.dumps(row, default=str) + "\n" for row in rows[start:start + STREAM_BATCH_SIZE]).encode()
+                self._write_chunk(data)
+                sent += len(data)
+            self._write_chunk(b"")
+        except OSError:
+            self.close_connection = True  # client disconnected
+        self.server.record(f"GET {label} (ndjson)", sent)
+
+    def _send_levels(self):
+        """Mirrors GET /levels: the level mapping with Cache-Control and an ETag (304 on If-None-Match)."""
+        self.server.inject_latency()
+        body_bytes = json.dumps(LEVEL_MAPPING).encode()
+        etag = f'"{hashlib.sha1(body_bytes).hexdigest()}"'
+        headers = {"Cache-Control": f"public, max-age={LEVELS_MAX_AGE}", "ETag": etag}
+        if (self.headers.get("If-None-Match") or "").removeprefix("W/") == etag:
+            return self._send(304, None, "/levels", headers)
+        self._send(200, body_bytes, "/levels", headers)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded HTTP server around a StandInStore, with latency injection and traffic stats."""
+
+    daemon_threads = True
+
+    def __init__(self, dataset, host="127.0.0.1", port=5002, latency_ms=0.0, jitter_ms=0.0, verbose=False, seed=None,
+                 compress_threshold=COMPRESS_THRESHOLD):
+        super().__init__((host, port), StandInHandler)
+        self.store = StandInStore(dataset)
+        self.compress_threshold = compress_threshold  # bytes; None disables compression
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.verbose = verbose
+        self.response_cache = {}
+        self._rng = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self._thread = None
+        self._subscribers = []
+        self._event_id = 0
+        self.reset_stats()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def inject_latency(self):
+        delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def record(self, route_label, nbytes):
+        with self._stats_lock:
+            self._requests += 1
+            self._bytes_sent += nbytes
+            entry = self._routes.setdefault(route_label, {"count": 0, "bytes": 0})
+            entry["count"] += 1
+            entry["bytes"] += nbytes
+
+    def subscribe(self):
+        events = queue.Queue()
+        with self._stats_lock:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events):
+        with self._stats_lock:
+            if events in self._subscribers:
+                self._subscribers.remove(events)
+
+    def publish_change(self, route_label, method, row_id):
+        """Sends change events (as the NOTIFY triggers would) to every /changes/stream client."""
+        op = {"POST": "INSERT", "PUT": "UPDATE", "DELETE": "DELETE"}.get(method, method)
+        with self._stats_lock:
+            for table in CHANGE_TABLES.get("/" + route_label.split("/")[1], ()):
+                self._event_id += 1
+                event = {"id": self._event_id, "table": table, "op": op, "row": row_id, "at": _now()}
+                for events in self._subscribers:
+                    events.put(event)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._requests = 0
+            self._bytes_sent = 0
+            self._routes = {}
+
+    def stats(self):
+        """Returns request/byte counters since the last reset_stats()."""
+        with self._stats_lock:
+            routes = {k: dict(v) for k, v in self._routes.items() if not k.endswith("/__stats")}
+            requests_total = sum(v["count"] for v in routes.values())
+            bytes_total = sum(v["bytes"] for v in routes.values())
+        return {"requests": requests_total, "bytes_sent": bytes_total, "routes": routes}
+
+    def start(self):
+        """Serves in a background thread and returns self."""
+        self._thread = threading.Thread(target=self.serve_forever, name="standin-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._stats_lock:
+            for events in self._subscribers:
+                events.put(None)
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic GurukulAdminAPI for GUI benchmarking.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Dataset size preset.")
+    parser.add_argument("--gurukuls", type=int, help="Override the number of gurukuls.")
+    parser.add_argument("--subjects", type=int, help="Override the number of subjects.")
+    parser.add_argument("--topics", type=int, help="Override the number of topics.")
+    parser.add_argument("--users", type=int, help="Override the number of users.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5002)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay added to every request.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random delay added on top.")
+    parser.add_argument("--compress-threshold", type=int, default=COMPRESS_THRESHOLD,
+                        help="Compress responses of at least this many bytes (negative disables).")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    scale = Scale.preset(args.scale, gurukuls=args.gurukuls, subjects=args.subjects, topics=args.topics,
+                         users=args.users, seed=args.seed)
+    dataset = generate_dataset(scale)
+    server = StandInServer(dataset, args.host, args.port, args.latency_ms, args.jitter_ms, args.verbose, args.seed,
+                           compress_threshold=None if args.compress_threshold < 0 else args.compress_threshold)
+    print(f"Stand-in API serving {dataset.counts()} at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
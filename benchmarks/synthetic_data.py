@@ -0,0 +1,166 @@
+# synthetic_data.py
+# Generates an in-memory dataset shaped like the GurukulAdminAPI database so the
+# adminGUI can be exercised without Postgres. Everything is driven by a seeded
+# random.Random, so the same scale + seed always produces the same rows.
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+# --- Level Mapping (MUST be consistent with API) ---
+LEVEL_MAPPING = {
+    "G1": ["L1", "L2", "L3", "L4"],
+    "G2": ["L5", "L6", "L7", "L8"],
+    "G3": ["L9", "L10", "L11", "L12"],
+    "G4": ["L13", "L14", "L15", "L16"],
+}
+ALL_LEVELS = [level for levels in LEVEL_MAPPING.values() for level in levels]
+STATUSES = ["Started", "In_progress", "Done"]
+
+# --- Named Presets ---
+SCALES = {
+    "small": {"gurukuls": 5, "subjects": 40, "topics": 400, "users": 200},
+    "medium": {"gurukuls": 20, "subjects": 120, "topics": 5000, "users": 2000},
+    "large": {"gurukuls": 50, "subjects": 400, "topics": 50000, "users": 10000},
+}
+
+
+@dataclass
+class Scale:
+    """Row counts used to build a synthetic dataset."""
+    gurukuls: int = 5
+    subjects: int = 40
+    topics: int = 400
+    users: int = 200
+    teacher_ratio: float = 0.2
+    subjects_per_teacher: int = 3
+    seed: int = 42
+
+    @classmethod
+    def preset(cls, name, **overrides):
+        """Builds a Scale from one of the named SCALES presets."""
+        if name not in SCALES:
+            raise ValueError(f"Unknown scale '{name}'. Choose one of: {', '.join(SCALES)}")
+        values = dict(SCALES[name])
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+
+@dataclass
+class Dataset:
+    """Table-shaped rows, keyed the same way the API's SQL returns them."""
+    gurukuls: list = field(default_factory=list)
+    offerings: list = field(default_factory=list)
+    milestones: list = field(default_factory=list)
+    subjects: list = field(default_factory=list)
+    topics: list = field(default_factory=list)
+    users: list = field(default_factory=list)
+    teachers: list = field(default_factory=list)
+    students: list = field(default_factory=list)
+    teacher_assignments: list = field(default_factory=list)  # {teacher_id, sub_id}
+    sgurukul: list = field(default_factory=list)  # {sid, gid, starttime, endtime, status}
+    smilestones: list = field(default_factory=list)  # {sid, mid, starttime, endtime, status, score}
+
+    def counts(self):
+        """Returns the number of rows per table, for reporting."""
+        return {name: len(rows) for name, rows in vars(self).items()}
+
+
+def _timestamp(base, rng, max_days=365):
+    return (base - timedelta(days=rng.randint(0, max_days), seconds=rng.randint(0, 86399))).isoformat() + "Z"
+
+
+def generate_dataset(scale=None):
+    """Builds a Dataset for the given Scale (defaults to the 'small' preset)."""
+    scale = scale or Scale()
+    rng = random.Random(scale.seed)
+    now = datetime(2025, 7, 1)
+    data = Dataset()
+
+    # Gurukuls and their offerings: most gurukuls offer every gtype, some skip one
+    # so the GUI's "available gtypes" logic has something to do.
+    oid = 0
+    for gid in range(1, scale.gurukuls + 1):
+        data.gurukuls.append({"gid": gid, "gname": f"Gurukul {gid:03d}"})
+        gtypes = list(LEVEL_MAPPING)
+        if rng.random() < 0.3:
+            gtypes.remove(rng.choice(gtypes))
+        for gtype in gtypes:
+            oid += 1
+            data.offerings.append({"oid": oid, "gid": gid, "gtype": gtype})
+
+    # Milestones: one per level for most offerings.
+    mid = 0
+    for offering in data.offerings:
+        for level in LEVEL_MAPPING[offering["gtype"]]:
+            if rng.random() < 0.85:
+                mid += 1
+                data.milestones.append({
+                    "mid": mid,
+                    "class": int(level[1:]),
+                    "level": level,
+                    "oid": offering["oid"],
+                })
+
+    # Subjects spread across levels, topics spread across subjects.
+    for subid in range(1, scale.subjects + 1):
+        data.subjects.append({
+            "subid": subid,
+            "subname": f"Subject {subid:04d}",
+            "level": ALL_LEVELS[(subid - 1) % len(ALL_LEVELS)],
+            "image_url": f"https://example.com/subjects/{subid}.png",
+            "isdeleted": False,
+        })
+    for tid in range(1, scale.topics + 1):
+        data.topics.append({
+            "tid": tid,
+            "tname": f"Topic {tid:05d}",
+            "subid": rng.randint(1, scale.subjects) if scale.subjects else None,
+            "image_url": f"https://example.com/topics/{tid}.png",
+        })
+
+    # Users and their role-specific rows, linked through user_role_link.
+    teachid = 0
+    sid = 0
+    for userid in range(1, scale.users + 1):
+        created_at = _timestamp(now, rng)
+        if rng.random() < scale.teacher_ratio:
+            teachid += 1
+            role, link = "teacher", teachid
+            data.teachers.append({
+                "teachid": teachid,
+                "name": f"Teacher {userid:05d}",
+                "email": f"user{userid}@example.com",
+                "last_login": _timestamp(now, rng, 30),
+                "created_at": created_at,
+            })
+            if data.subjects:
+                picks = rng.sample(range(1, scale.subjects + 1), min(scale.subjects_per_teacher, scale.subjects))
+                for subid in picks:
+                    data.teacher_assignments.append({"teacher_id": teachid, "sub_id": subid})
+        else:
+            sid += 1
+            role, link = "student", sid
+            data.students.append({"sid": sid, "sname": f"Student {userid:05d}", "email": f"user{userid}@example.com"})
+            if data.milestones:
+                milestone = rng.choice(data.milestones)
+                offering = data.offerings[milestone["oid"] - 1]
+                status = rng.choice(STATUSES)
+                data.sgurukul.append({
+                    "sid": sid, "gid": offering["gid"], "starttime": created_at,
+                    "endtime": None, "status": status,
+                })
+                data.smilestones.append({
+                    "sid": sid, "mid": milestone["mid"], "starttime": created_at,
+                    "endtime": None, "status": status, "score": rng.randint(0, 100),
+                })
+        data.users.append({
+            "userid": userid,
+            "username": f"{role.title()} {userid:05d}",
+            "email": f"user{userid}@example.com",
+            "role": role,
+            "isdeleted": False,
+            "created_at": created_at,
+            "user_role_link": link,
+        })
+
+    return data
@@ -0,0 +1,47 @@
+# test_standin_api.py
+# Checks that the stand-in keeps the GUI-facing behaviour of GurukulAdminAPI it mirrors.
+#   python -m pytest benchmarks/test_standin_api.py
+import pytest
+import requests
+
+from standin_api import StandInServer
+from synthetic_data import Scale, generate_dataset
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = StandInServer(generate_dataset(Scale.preset("small")), port=0).start()
+    yield server
+    server.stop()
+
+
+def users_delta(server, since=None):
+    params = {"table": "users"} if since is None else {"table": "users", "since": since}
+    response = requests.get(f"{server.base_url}/changes", params=params, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def test_subject_rename_reaches_users_delta(server):
+    teacher = next(u for u in users_delta(server)["upserts"] if u.get("assigned_subjects"))
+    subject = teacher["assigned_subjects"][0]
+    seq = users_delta(server)["seq"]
+
+    response = requests.put(f"{server.base_url}/subjects/{subject['subid']}",
+                            json={"subname": subject["subname"] + " (renamed)"}, timeout=10)
+    response.raise_for_status()
+
+    rows = {u["userid"]: u for u in users_delta(server, seq)["upserts"]}
+    assert subject["subname"] + " (renamed)" in [s["subname"] for s in rows[teacher["userid"]]["assigned_subjects"]]
+
+
+def test_gurukul_rename_reaches_users_delta(server):
+    student = next(u for u in users_delta(server)["upserts"] if u.get("assigned_gurukuls"))
+    gurukul = student["assigned_gurukuls"][0]
+    seq = users_delta(server)["seq"]
+
+    response = requests.put(f"{server.base_url}/gurukul/{gurukul['gid']}", json={"gname": "Renamed Gurukul"}, timeout=10)
+    response.raise_for_status()
+
+    rows = {u["userid"]: u for u in users_delta(server, seq)["upserts"]}
+    assert [g["gname"] for g in rows[student["userid"]]["assigned_gurukuls"]] == ["Renamed Gurukul"]